@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+"""
+Benchmark cold vs warm invocations of the DB Performance Analyzer Lambdas.
+
+Runs both lambda_handler functions in-process against a local PostgreSQL
+stand-in. SSM Parameter Store and Secrets Manager are replaced by local
+loaders that sleep for a configurable round-trip time, so the numbers show
+what connection and secret caching saves on a warm container.
+
+Pass --fanout-concurrency 1 to run each analysis's queries sequentially and
+compare against the default concurrent fan-out.
+
+"Cold" invocations get a brand-new ConnectionManager each time (what a fresh
+Lambda execution environment sees); "warm" invocations share one manager.
+
+Usage:
+    # Against an existing local PostgreSQL
+    python benchmark_lambda_connections.py --dsn "host=localhost dbname=postgres user=postgres"
+
+    # Or let the script start a throwaway server (requires `pip install pgserver`)
+    python benchmark_lambda_connections.py --iterations 100
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+import psycopg2
+import psycopg2.extensions
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import db_connection  # noqa: E402
+
+PG_ANALYZE_ACTIONS = {
+    "explain_query": {"query": "SELECT * FROM benchmark_orders WHERE customer_id = 42"},
+    "execute_query": {
+        "query": "SELECT id, customer_id, amount FROM benchmark_orders WHERE amount > 50"
+    },
+    "extract_ddl": {
+        "object_type": "table",
+        "object_name": "benchmark_orders",
+        "object_schema": "public",
+    },
+    "extract_schema_ddl": {"object_schema": "public"},
+}
+
+PGSTAT_ACTIONS = [
+    "connection_management_issues",
+    "index_analysis",
+    "autovacuum_analysis",
+    "io_analysis",
+    "system_health",
+    "xid_analysis",
+    "long_running_transactions",
+    "full_health_sweep",
+]
+
+
+def start_local_postgres():
+    """Start a throwaway PostgreSQL server with pgserver and return its DSN"""
+    try:
+        import pgserver
+    except ImportError:
+        sys.exit(
+            "No --dsn given and pgserver is not installed. "
+            "Pass --dsn or run `pip install pgserver`."
+        )
+    data_dir = tempfile.mkdtemp(prefix="db-analyzer-bench-")
+    server = pgserver.get_server(data_dir, cleanup_mode="delete")
+    return server.get_uri(), server
+
+
+def secret_from_dsn(dsn):
+    """Build a Secrets Manager-shaped payload from a libpq DSN or URI"""
+    params = psycopg2.extensions.parse_dsn(dsn)
+    return {
+        "host": params.get("host", "localhost"),
+        "port": params.get("port"),
+        "dbname": params.get("dbname", "postgres"),
+        "username": params.get("user", "postgres"),
+        "password": params.get("password", ""),
+    }
+
+
+def seed_database(secret):
+    conn = db_connection.open_connection(secret)
+    try:
+        with conn.cursor() as cur:
+            cur.execute("""
+                CREATE TABLE IF NOT EXISTS benchmark_orders (
+                    id serial PRIMARY KEY,
+                    customer_id integer NOT NULL,
+                    amount numeric(10, 2) NOT NULL,
+                    created_at timestamptz NOT NULL DEFAULT now()
+                )
+            """)
+            cur.execute("SELECT count(*) FROM benchmark_orders")
+            if cur.fetchone()[0] == 0:
+                cur.execute("""
+                    INSERT INTO benchmark_orders (customer_id, amount)
+                    SELECT (random() * 1000)::int, (random() * 100)::numeric(10, 2)
+                    FROM generate_series(1, 10000)
+                """)
+            cur.execute("ANALYZE benchmark_orders")
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def make_manager(secret, secret_latency_ms):
+    """Connection manager whose SSM/Secrets Manager lookups are local and simulated"""
+    delay = secret_latency_ms / 1000.0
+
+    def load_secret_name(environment):
+        time.sleep(delay)
+        return f"local-benchmark/{environment}"
+
+    def load_secret(secret_name):
+        time.sleep(delay)
+        return dict(secret)
+
+    return db_connection.ConnectionManager(
+        secret_name_loader=load_secret_name,
+        secret_loader=load_secret,
+    )
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    if not ordered:
+        return 0.0
+    index = min(
+        len(ordered) - 1, max(0, int(round(pct / 100.0 * len(ordered) + 0.5)) - 1)
+    )
+    return ordered[index]
+
+
+def invoke(handler, action_type, extra_args):
+    event = {
+        "arguments": {"environment": "dev", "action_type": action_type, **extra_args}
+    }
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        response = handler(event, None)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+    failed = "content" in response.get("functionResponse", {})
+    return elapsed_ms, failed
+
+
+def run_case(handler, action_type, extra_args, secret, args):
+    cold, warm, errors = [], [], 0
+
+    for _ in range(args.iterations):
+        manager = db_connection.set_connection_manager(
+            make_manager(secret, args.secret_latency_ms)
+        )
+        elapsed_ms, failed = invoke(handler, action_type, extra_args)
+        cold.append(elapsed_ms)
+        errors += failed
+        manager.close_all()
+
+    manager = db_connection.set_connection_manager(
+        make_manager(secret, args.secret_latency_ms)
+    )
+    invoke(handler, action_type, extra_args)  # warm-up invocation
+    for _ in range(args.iterations):
+        elapsed_ms, failed = invoke(handler, action_type, extra_args)
+        warm.append(elapsed_ms)
+        errors += failed
+    stats = manager.stats()
+    manager.close_all()
+
+    return {
+        "cold_p50": percentile(cold, 50),
+        "cold_p99": percentile(cold, 99),
+        "warm_p50": percentile(warm, 50),
+        "warm_p99": percentile(warm, 99),
+        "errors": errors,
+        "connections_opened": stats["connections_opened"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument(
+        "--dsn",
+        default=os.environ.get("BENCHMARK_PG_DSN"),
+        help="libpq DSN/URI of a local PostgreSQL (default: start one with pgserver)",
+    )
+    parser.add_argument(
+        "--iterations", type=int, default=30, help="Invocations per action and mode"
+    )
+    parser.add_argument(
+        "--secret-latency-ms",
+        type=float,
+        default=25.0,
+        help="Simulated round-trip time of each SSM / Secrets Manager call",
+    )
+    parser.add_argument(
+        "--actions", nargs="*", help="Only run these action_type values"
+    )
+    parser.add_argument(
+        "--fanout-concurrency",
+        type=int,
+        help="Connections used to run an analysis concurrently (1 = sequential)",
+    )
+    args = parser.parse_args()
+
+    os.environ.setdefault("REGION", "us-west-2")
+    if args.fanout_concurrency:
+        import query_fanout
+
+        query_fanout.FANOUT_MAX_CONCURRENCY = args.fanout_concurrency
+
+    server = None
+    dsn = args.dsn
+    if not dsn:
+        dsn, server = start_local_postgres()
+
+    secret = secret_from_dsn(dsn)
+    seed_database(secret)
+
+    import pg_analyze_performance
+    import pgstat_analyse_database
+
+    cases = [
+        (pg_analyze_performance.lambda_handler, action, extra)
+        for action, extra in PG_ANALYZE_ACTIONS.items()
+    ]
+    cases += [
+        (pgstat_analyse_database.lambda_handler, action, {})
+        for action in PGSTAT_ACTIONS
+    ]
+    if args.actions:
+        cases = [case for case in cases if case[1] in args.actions]
+
+    print(
+        f"Iterations per mode: {args.iterations}, simulated secret latency: {args.secret_latency_ms} ms\n"
+    )
+    header = f"{'action_type':<30} {'cold p50':>10} {'cold p99':>10} {'warm p50':>10} {'warm p99':>10} {'speedup':>8} {'conns':>6} {'errors':>6}"
+    print(header)
+    print("-" * len(header))
+    for handler, action_type, extra in cases:
+        result = run_case(handler, action_type, extra, secret, args)
+        speedup = result["cold_p50"] / result["warm_p50"] if result["warm_p50"] else 0.0
+        print(
+            f"{action_type:<30} {result['cold_p50']:>9.1f}ms {result['cold_p99']:>9.1f}ms "
+            f"{result['warm_p50']:>9.1f}ms {result['warm_p99']:>9.1f}ms {speedup:>7.1f}x "
+            f"{result['connections_opened']:>6} {result['errors']:>6}"
+        )
+
+    if server is not None:
+        server.cleanup()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark for the SQL lexer behind validate_query and
+analyze_query_complexity.
+
+Generates a corpus of large multi-statement queries (many joins, CTEs,
+string literals containing semicolons, dollar-quoted text and comments) and
+times, per query size:
+
+- legacy:   the previous character-by-character splitter, which rescanned the
+            text from position 0 to decide whether each ';' was inside quotes
+- lexer:    a cold single-pass tokenize + split + complexity scoring
+- cached:   the same call served from the LRU cache
+
+No database is needed:
+    python benchmark_sql_lexer.py --sizes 10 50 200 --repeat 5
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import sql_lexer  # noqa: E402
+
+
+def legacy_split_statements(query_text):
+    """The splitter validate_query used before the lexer (kept only as a baseline)"""
+
+    def is_within_quotes(text, position):
+        single_quotes = False
+        double_quotes = False
+        for i in range(position):
+            if text[i] == "'" and not double_quotes:
+                single_quotes = not single_quotes
+            elif text[i] == '"' and not single_quotes:
+                double_quotes = not double_quotes
+        return single_quotes or double_quotes
+
+    statements = []
+    current_stmt = []
+    i = 0
+    comment_block = False
+    line_comment = False
+    while i < len(query_text):
+        char = query_text[i]
+        if query_text[i : i + 2] == "/*" and not line_comment:
+            comment_block = True
+            current_stmt.append(char)
+            i += 1
+        elif query_text[i : i + 2] == "*/" and comment_block:
+            comment_block = False
+            current_stmt.append(char)
+            i += 1
+        elif query_text[i : i + 2] == "--" and not comment_block:
+            line_comment = True
+            current_stmt.append(char)
+            i += 1
+        elif char == "\n" and line_comment:
+            line_comment = False
+            current_stmt.append(char)
+        elif (
+            char == ";"
+            and not comment_block
+            and not line_comment
+            and not is_within_quotes(query_text, i)
+        ):
+            current_stmt.append(char)
+            stmt = "".join(current_stmt).strip()
+            if stmt:
+                statements.append(stmt)
+            current_stmt = []
+        else:
+            current_stmt.append(char)
+        i += 1
+    last_stmt = "".join(current_stmt).strip()
+    if last_stmt:
+        statements.append(last_stmt)
+    return statements
+
+
+def generate_statement(rng, joins):
+    ctes = ",\n".join(
+        f"cte_{n} AS (SELECT id, amount FROM orders_{n} WHERE note <> 'a;b''c {n}')"
+        for n in range(3)
+    )
+    join_clauses = "\n".join(
+        f"    LEFT JOIN table_{n} t{n} ON t{n}.id = base.id /* join {n}; keep */"
+        for n in range(joins)
+    )
+    literals = ", ".join(f"'value;{rng.randint(0, 10**6)}'" for _ in range(20))
+    return (
+        f"WITH {ctes}\n"
+        f"SELECT base.id, count(*), sum(base.amount), $$ text; with {rng.random()} $$, E'esc\\'aped;'\n"
+        f"FROM base_table base\n{join_clauses}\n"
+        f"WHERE base.status IN ({literals}) -- filter; on status\n"
+        f"AND base.created_at > now() - interval '1 day' OR base.id IN (SELECT id FROM recent)\n"
+        f"GROUP BY base.id"
+    )
+
+
+def generate_query(rng, target_kb):
+    statements = []
+    size = 0
+    while size < target_kb * 1024:
+        statement = generate_statement(rng, joins=rng.randint(5, 20))
+        statements.append(statement)
+        size += len(statement) + 2
+    return ";\n".join(statements) + ";"
+
+
+def best_of(repeat, func, *args):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args)
+        timings.append((time.perf_counter() - start) * 1000)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument(
+        "--sizes",
+        type=int,
+        nargs="*",
+        default=[10, 50, 100, 200],
+        help="Query sizes in KB",
+    )
+    parser.add_argument(
+        "--repeat", type=int, default=3, help="Runs per measurement (best is reported)"
+    )
+    parser.add_argument(
+        "--skip-legacy-above",
+        type=int,
+        default=200,
+        help="Skip the quadratic baseline for queries larger than this many KB",
+    )
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    header = f"{'size':>8} {'stmts':>6} {'tokens':>8} {'legacy':>12} {'lexer':>10} {'cached':>10} {'speedup':>9}"
+    print(header)
+    print("-" * len(header))
+    for size_kb in args.sizes:
+        query = generate_query(rng, size_kb)
+        token_count = len(sql_lexer.tokenize(query))
+
+        def cold(text=query):
+            sql_lexer.clear_cache()
+            return sql_lexer.analyze(text)
+
+        lexer_ms = best_of(args.repeat, cold)
+        statement_count = len(cold().statements)
+        cached_ms = best_of(args.repeat, sql_lexer.analyze, query)
+
+        if size_kb <= args.skip_legacy_above:
+            legacy_ms = best_of(1, legacy_split_statements, query)
+            legacy = f"{legacy_ms:>10.1f}ms"
+            speedup = f"{legacy_ms / lexer_ms:>8.1f}x"
+        else:
+            legacy, speedup = f"{'skipped':>12}", f"{'-':>9}"
+
+        print(
+            f"{size_kb:>6}KB {statement_count:>6} {token_count:>8} {legacy} "
+            f"{lexer_ms:>8.2f}ms {cached_ms:>8.3f}ms {speedup}"
+        )
+
+
+if __name__ == "__main__":
+    main()
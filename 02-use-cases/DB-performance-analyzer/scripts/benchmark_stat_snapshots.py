@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Benchmark the pg_stat_statements snapshot store.
+
+Writes a synthetic history of snapshots (one every --interval-minutes for
+--days, each with --statements entries) to a temporary local store and times:
+
+- append:       encoding and writing each segment
+- list:         finding the segments of the whole history from names alone
+- window delta: loading two snapshots, computing deltas and rankings
+- column scan:  reading two counter columns from every segment in the history
+- full scan:    reading every counter column from every segment
+
+No database is needed:
+    python benchmark_stat_snapshots.py --days 30 --interval-minutes 60 --statements 2000
+"""
+
+import argparse
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import stat_snapshots  # noqa: E402
+
+
+def generate_history(rng, statements, count, interval_seconds, start):
+    """Yield snapshots whose counters grow at per-statement rates"""
+    rates = [
+        {
+            "calls": rng.uniform(0.01, 50),
+            "total_exec_time": rng.uniform(0.1, 500),
+            "rows": rng.uniform(0, 200),
+            "shared_blks_hit": rng.uniform(0, 1000),
+            "shared_blks_read": rng.uniform(0, 100),
+            "temp_blks_written": rng.uniform(0, 5),
+            "blk_read_time": rng.uniform(0, 10),
+        }
+        for _ in range(statements)
+    ]
+    texts = [
+        f"SELECT * FROM table_{n % 97} WHERE id = $1 AND tenant = $2 /* {n} */"
+        for n in range(statements)
+    ]
+    for step in range(count):
+        elapsed = step * interval_seconds
+        rows = []
+        for n, rate in enumerate(rates):
+            row = {"queryid": 10**12 + n, "userid": 10, "dbid": 5, "query": texts[n]}
+            for name, per_second in rate.items():
+                value = per_second * elapsed
+                row[name] = (
+                    value if stat_snapshots.COLUMN_TYPES[name] == "d" else int(value)
+                )
+            rows.append(row)
+        yield stat_snapshots.Snapshot.from_rows(start + elapsed, rows)
+
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return result, (time.perf_counter() - start) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--days", type=int, default=30)
+    parser.add_argument("--interval-minutes", type=int, default=60)
+    parser.add_argument("--statements", type=int, default=2000)
+    parser.add_argument("--window-minutes", type=int, default=60)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    interval = args.interval_minutes * 60
+    count = args.days * 24 * 60 // args.interval_minutes
+    root = tempfile.mkdtemp(prefix="pg-stat-snapshots-")
+    store = stat_snapshots.SnapshotStore(
+        stat_snapshots.LocalSnapshotBackend(root), "benchmark"
+    )
+    start = time.time() - count * interval
+
+    try:
+        append_ms = 0.0
+        for snapshot in generate_history(rng, args.statements, count, interval, start):
+            _, elapsed = timed(lambda snapshot=snapshot: store.append(snapshot))
+            append_ms += elapsed
+        size = sum(
+            os.path.getsize(os.path.join(dirpath, name))
+            for dirpath, _, names in os.walk(root)
+            for name in names
+        )
+
+        entries, list_ms = timed(store.list_snapshots)
+        newest_time, newest_key = entries[-1]
+
+        def window_delta():
+            newest = store.load(newest_key)
+            baseline = store.baseline_for(newest_time, args.window_minutes * 60)
+            return stat_snapshots.rank_deltas(
+                stat_snapshots.compute_deltas(baseline, newest), newest
+            )
+
+        _, delta_ms = timed(window_delta)
+        _, column_scan_ms = timed(
+            lambda: sum(
+                len(s.columns["queryid"])
+                for s in store.scan(columns=["queryid", "total_exec_time"])
+            )
+        )
+        _, full_scan_ms = timed(
+            lambda: sum(len(s.columns["calls"]) for s in store.scan())
+        )
+
+        print(
+            f"Snapshots: {len(entries)} x {args.statements} statements, "
+            f"{size / 1024 / 1024:.1f} MB on disk ({size / len(entries) / 1024:.1f} KB per snapshot)\n"
+        )
+        print(f"{'operation':<28} {'total':>12} {'per snapshot':>14}")
+        print("-" * 56)
+        print(
+            f"{'append':<28} {append_ms:>10.1f}ms {append_ms / len(entries):>12.3f}ms"
+        )
+        print(f"{'list history':<28} {list_ms:>10.1f}ms {'':>14}")
+        print(f"{'window delta + rankings':<28} {delta_ms:>10.1f}ms {'':>14}")
+        print(
+            f"{'scan 2 columns':<28} {column_scan_ms:>10.1f}ms {column_scan_ms / len(entries):>12.3f}ms"
+        )
+        print(
+            f"{'scan all counters':<28} {full_scan_ms:>10.1f}ms {full_scan_ms / len(entries):>12.3f}ms"
+        )
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,486 @@
+"""
+Single-pass catalog loader for DDL extraction.
+
+extract_ddl used to run one catalog query per request, each with its own
+joins and correlated pg_namespace lookups, so generating the DDL of a whole
+schema meant one round trip per object. SchemaCatalog loads pg_class,
+pg_attribute, pg_attrdef, pg_constraint, pg_index, pg_sequence, pg_proc,
+pg_trigger, view definitions and comments for a schema in a single query,
+indexes them in memory and renders DDL locally.
+
+Loaded catalogs are cached per (secret, schema) together with a catalog
+version: an md5 over the xmin of every catalog row that contributes to the
+schema's DDL. Any DDL or COMMENT in the schema creates new row versions and
+therefore a new version. The version probe is itself skipped for
+CATALOG_VERSION_CHECK_SECONDS after a check, so repeated requests are served
+without touching the database.
+
+This file is packaged next to lambda_function.py by create_lambda.sh.
+"""
+
+import os
+import re
+import threading
+import time
+
+from sql_lexer import LRUCache
+
+CATALOG_CACHE_SIZE = int(os.environ.get("CATALOG_CACHE_SIZE", "16"))
+CATALOG_VERSION_CHECK_SECONDS = int(
+    os.environ.get("CATALOG_VERSION_CHECK_SECONDS", "30")
+)
+
+# object_type accepted by extract_ddl -> pg_class.relkind / pg_proc.prokind
+RELATION_KINDS = {
+    "table": ("r", "p"),
+    "view": ("v",),
+    "sequence": ("S",),
+    "index": ("i", "I"),
+}
+ROUTINE_KINDS = {"function": "f", "procedure": "p"}
+OBJECT_TYPES = (
+    "table",
+    "view",
+    "function",
+    "procedure",
+    "trigger",
+    "sequence",
+    "index",
+)
+
+CATALOG_QUERY = """
+    WITH ns AS (
+        SELECT oid, nspname
+        FROM pg_catalog.pg_namespace
+        WHERE nspname = %s
+        AND nspname NOT IN ('pg_catalog', 'information_schema')
+    ),
+    rel AS (
+        SELECT c.oid, c.relname, c.relkind
+        FROM pg_catalog.pg_class c
+        JOIN ns ON c.relnamespace = ns.oid
+        WHERE c.relkind IN ('r', 'p', 'v', 'S', 'i', 'I')
+    )
+    SELECT json_build_object(
+        'schema', (SELECT quote_ident(nspname) FROM ns),
+        'relations', (
+            SELECT coalesce(json_agg(json_build_object(
+                'oid', r.oid,
+                'name', r.relname,
+                'ident', quote_ident(r.relname),
+                'kind', r.relkind,
+                'description', d.description,
+                'view_definition', CASE WHEN r.relkind = 'v' THEN pg_catalog.pg_get_viewdef(r.oid, true) END
+            )), '[]')
+            FROM rel r
+            LEFT JOIN pg_catalog.pg_description d
+                ON d.objoid = r.oid
+                AND d.classoid = 'pg_catalog.pg_class'::regclass
+                AND d.objsubid = 0
+        ),
+        'attributes', (
+            SELECT coalesce(json_agg(json_build_object(
+                'relid', a.attrelid,
+                'ident', quote_ident(a.attname),
+                'type', pg_catalog.format_type(a.atttypid, a.atttypmod),
+                'not_null', a.attnotnull,
+                'default', pg_catalog.pg_get_expr(ad.adbin, ad.adrelid),
+                'identity', a.attidentity,
+                'generated', a.attgenerated
+            ) ORDER BY a.attrelid, a.attnum), '[]')
+            FROM pg_catalog.pg_attribute a
+            JOIN rel r ON r.oid = a.attrelid AND r.relkind IN ('r', 'p')
+            LEFT JOIN pg_catalog.pg_attrdef ad
+                ON ad.adrelid = a.attrelid
+                AND ad.adnum = a.attnum
+            WHERE a.attnum > 0
+            AND NOT a.attisdropped
+        ),
+        'constraints', (
+            SELECT coalesce(json_agg(json_build_object(
+                'relid', con.conrelid,
+                'ident', quote_ident(con.conname),
+                'type', con.contype,
+                'definition', pg_catalog.pg_get_constraintdef(con.oid, true),
+                'index_oid', con.conindid
+            ) ORDER BY con.conrelid, con.contype, con.conname), '[]')
+            FROM pg_catalog.pg_constraint con
+            JOIN rel r ON r.oid = con.conrelid
+            WHERE con.contype IN ('p', 'u', 'f', 'c', 'x')
+        ),
+        'indexes', (
+            SELECT coalesce(json_agg(json_build_object(
+                'oid', i.indexrelid,
+                'relid', i.indrelid,
+                'definition', pg_catalog.pg_get_indexdef(i.indexrelid)
+            )), '[]')
+            FROM pg_catalog.pg_index i
+            JOIN rel r ON r.oid = i.indexrelid
+        ),
+        'sequences', (
+            SELECT coalesce(json_agg(json_build_object(
+                'oid', s.seqrelid,
+                'increment', s.seqincrement,
+                'min', s.seqmin,
+                'max', s.seqmax,
+                'start', s.seqstart,
+                'cache', s.seqcache,
+                'cycle', s.seqcycle
+            )), '[]')
+            FROM pg_catalog.pg_sequence s
+            JOIN rel r ON r.oid = s.seqrelid
+        ),
+        'routines', (
+            SELECT coalesce(json_agg(json_build_object(
+                'name', p.proname,
+                'kind', p.prokind,
+                'definition', pg_catalog.pg_get_functiondef(p.oid),
+                'description', d.description,
+                'return_type', p.prorettype::regtype::text,
+                'provolatile', p.provolatile,
+                'proparallel', p.proparallel
+            ) ORDER BY p.proname, p.oid), '[]')
+            FROM pg_catalog.pg_proc p
+            JOIN ns ON p.pronamespace = ns.oid
+            LEFT JOIN pg_catalog.pg_description d
+                ON d.objoid = p.oid
+                AND d.classoid = 'pg_catalog.pg_proc'::regclass
+                AND d.objsubid = 0
+            WHERE p.prokind IN ('f', 'p')
+        ),
+        'triggers', (
+            SELECT coalesce(json_agg(json_build_object(
+                'name', t.tgname,
+                'relid', t.tgrelid,
+                'definition', pg_catalog.pg_get_triggerdef(t.oid, true),
+                'description', d.description
+            ) ORDER BY t.tgname), '[]')
+            FROM pg_catalog.pg_trigger t
+            JOIN rel r ON r.oid = t.tgrelid
+            LEFT JOIN pg_catalog.pg_description d
+                ON d.objoid = t.oid
+                AND d.classoid = 'pg_catalog.pg_trigger'::regclass
+                AND d.objsubid = 0
+            WHERE NOT t.tgisinternal
+        )
+    )
+"""
+
+CATALOG_VERSION_QUERY = """
+    WITH ns AS (
+        SELECT oid, xmin
+        FROM pg_catalog.pg_namespace
+        WHERE nspname = %s
+    ),
+    cls AS (
+        SELECT c.oid, c.xmin
+        FROM pg_catalog.pg_class c
+        JOIN ns ON c.relnamespace = ns.oid
+    ),
+    prc AS (
+        SELECT p.oid, p.xmin
+        FROM pg_catalog.pg_proc p
+        JOIN ns ON p.pronamespace = ns.oid
+    )
+    SELECT md5(coalesce(string_agg(v, ',' ORDER BY v), ''))
+    FROM (
+        SELECT 'n' || oid || ':' || xmin AS v FROM ns
+        UNION ALL SELECT 'c' || oid || ':' || xmin FROM cls
+        UNION ALL SELECT 'p' || oid || ':' || xmin FROM prc
+        UNION ALL
+        SELECT 'a' || a.attrelid || '.' || a.attnum || ':' || a.xmin
+        FROM pg_catalog.pg_attribute a JOIN cls ON cls.oid = a.attrelid
+        WHERE a.attnum > 0
+        UNION ALL
+        SELECT 'd' || ad.oid || ':' || ad.xmin
+        FROM pg_catalog.pg_attrdef ad JOIN cls ON cls.oid = ad.adrelid
+        UNION ALL
+        SELECT 'k' || con.oid || ':' || con.xmin
+        FROM pg_catalog.pg_constraint con JOIN cls ON cls.oid = con.conrelid
+        UNION ALL
+        SELECT 'i' || i.indexrelid || ':' || i.xmin
+        FROM pg_catalog.pg_index i JOIN cls ON cls.oid = i.indexrelid
+        UNION ALL
+        SELECT 's' || s.seqrelid || ':' || s.xmin
+        FROM pg_catalog.pg_sequence s JOIN cls ON cls.oid = s.seqrelid
+        UNION ALL
+        SELECT 't' || t.oid || ':' || t.xmin
+        FROM pg_catalog.pg_trigger t JOIN cls ON cls.oid = t.tgrelid
+        UNION ALL
+        SELECT 'm' || d.objoid || '.' || d.classoid || ':' || d.xmin
+        FROM pg_catalog.pg_description d
+        WHERE d.objoid IN (SELECT oid FROM cls UNION ALL SELECT oid FROM prc)
+        OR d.objoid IN (SELECT t.oid FROM pg_catalog.pg_trigger t JOIN cls ON cls.oid = t.tgrelid)
+    ) versions
+"""
+
+
+def ilike_pattern(pattern):
+    """Compile a SQL ILIKE pattern (% and _ wildcards, backslash escapes) to a regex"""
+    parts = []
+    escaped = False
+    for char in pattern:
+        if escaped:
+            parts.append(re.escape(char))
+            escaped = False
+        elif char == "\\":
+            escaped = True
+        elif char == "%":
+            parts.append(".*")
+        elif char == "_":
+            parts.append(".")
+        else:
+            parts.append(re.escape(char))
+    return re.compile("".join(parts) + r"\Z", re.IGNORECASE | re.DOTALL)
+
+
+class SchemaCatalog:
+    """
+    In-memory indexes over one schema's catalog rows, with local DDL rendering
+
+    Built from the JSON document returned by CATALOG_QUERY.
+    """
+
+    def __init__(self, schema_name, payload, version=None):
+        self.schema_name = schema_name
+        self.version = version
+        self.schema_ident = payload.get("schema") or schema_name
+        self.relations = {rel["oid"]: rel for rel in payload.get("relations") or []}
+        self.routines = payload.get("routines") or []
+        self.triggers = payload.get("triggers") or []
+        self.sequences = {seq["oid"]: seq for seq in payload.get("sequences") or []}
+        self.indexes = {index["oid"]: index for index in payload.get("indexes") or []}
+
+        self.attributes_by_relation = {}
+        for attribute in payload.get("attributes") or []:
+            self.attributes_by_relation.setdefault(attribute["relid"], []).append(
+                attribute
+            )
+        self.constraints_by_relation = {}
+        constraint_indexes = set()
+        for constraint in payload.get("constraints") or []:
+            self.constraints_by_relation.setdefault(constraint["relid"], []).append(
+                constraint
+            )
+            if constraint["type"] in ("p", "u", "x") and constraint["index_oid"]:
+                constraint_indexes.add(constraint["index_oid"])
+        # Indexes created by CREATE INDEX, i.e. not implied by a table constraint
+        self.standalone_indexes_by_relation = {}
+        for index in self.indexes.values():
+            if index["oid"] not in constraint_indexes:
+                self.standalone_indexes_by_relation.setdefault(
+                    index["relid"], []
+                ).append(index)
+        self.relations_by_kind = {}
+        for rel in sorted(self.relations.values(), key=lambda r: r["name"]):
+            self.relations_by_kind.setdefault(rel["kind"], []).append(rel)
+
+    @classmethod
+    def load(cls, cur, schema_name, version=None):
+        """Load a schema's catalog with a single query"""
+        cur.execute(CATALOG_QUERY, (schema_name,))
+        return cls(schema_name, cur.fetchone()[0] or {}, version)
+
+    @property
+    def object_count(self):
+        return len(self.relations) + len(self.routines) + len(self.triggers)
+
+    def _qualified(self, ident):
+        return f"{self.schema_ident}.{ident}"
+
+    def render_table(self, rel):
+        lines = []
+        for attribute in self.attributes_by_relation.get(rel["oid"], []):
+            line = f"    {attribute['ident']} {attribute['type']}"
+            if attribute["generated"] == "s":
+                line += f" GENERATED ALWAYS AS ({attribute['default']}) STORED"
+            elif attribute["identity"] == "a":
+                line += " GENERATED ALWAYS AS IDENTITY"
+            elif attribute["identity"] == "d":
+                line += " GENERATED BY DEFAULT AS IDENTITY"
+            if attribute["not_null"] and not attribute["identity"]:
+                line += " NOT NULL"
+            if attribute["default"] is not None and not attribute["generated"]:
+                line += f" DEFAULT {attribute['default']}"
+            lines.append(line)
+        if not lines:
+            return "ERROR: No columns found for this table"
+        for constraint in self.constraints_by_relation.get(rel["oid"], []):
+            lines.append(
+                f"    CONSTRAINT {constraint['ident']} {constraint['definition']}"
+            )
+        statements = [
+            f"CREATE TABLE {self._qualified(rel['ident'])} (\n"
+            + ",\n".join(lines)
+            + "\n);"
+        ]
+        for index in self.standalone_indexes_by_relation.get(rel["oid"], []):
+            statements.append(f"{index['definition']};")
+        return "\n".join(statements)
+
+    def render_view(self, rel):
+        return f"CREATE OR REPLACE VIEW {self._qualified(rel['ident'])} AS\n{rel['view_definition']}"
+
+    def render_sequence(self, rel):
+        seq = self.sequences.get(rel["oid"])
+        if seq is None:
+            return "ERROR: Sequence parameters not found"
+        return (
+            f"CREATE SEQUENCE {self._qualified(rel['ident'])}\n"
+            f"    INCREMENT {seq['increment']}\n"
+            f"    MINVALUE {seq['min']}\n"
+            f"    MAXVALUE {seq['max']}\n"
+            f"    START {seq['start']}\n"
+            f"    CACHE {seq['cache']}{chr(10) + '    CYCLE' if seq['cycle'] else ''};"
+        )
+
+    def render_index(self, rel):
+        index = self.indexes.get(rel["oid"])
+        return index["definition"] if index else "ERROR: Index definition not found"
+
+    def _relation_result(self, object_type, rel):
+        renderers = {
+            "table": self.render_table,
+            "view": self.render_view,
+            "sequence": self.render_sequence,
+            "index": self.render_index,
+        }
+        return {
+            "object_name": f"{self.schema_name}.{rel['name']}",
+            "object_type": object_type.upper(),
+            "definition": renderers[object_type](rel),
+            "description": rel["description"],
+        }
+
+    def find(self, object_type, name_pattern="%"):
+        """
+        Objects of one type whose name matches an ILIKE pattern
+
+        Returns:
+            list: Dicts shaped like the rows extract_ddl has always returned
+                  (object_name, object_type, definition, description, plus
+                  return_type/provolatile/proparallel for functions)
+        """
+        if object_type not in OBJECT_TYPES:
+            raise ValueError(
+                f"Invalid object_type: {object_type}. Valid types are: {', '.join(OBJECT_TYPES)}"
+            )
+        matcher = ilike_pattern(name_pattern or "%")
+        results = []
+
+        if object_type in RELATION_KINDS:
+            for kind in RELATION_KINDS[object_type]:
+                for rel in self.relations_by_kind.get(kind, []):
+                    if matcher.match(rel["name"]):
+                        results.append(self._relation_result(object_type, rel))
+        elif object_type in ROUTINE_KINDS:
+            for routine in self.routines:
+                if routine["kind"] != ROUTINE_KINDS[object_type] or not matcher.match(
+                    routine["name"]
+                ):
+                    continue
+                result = {
+                    "object_name": f"{self.schema_name}.{routine['name']}",
+                    "object_type": object_type.upper(),
+                    "definition": routine["definition"],
+                    "description": routine["description"],
+                }
+                if object_type == "function":
+                    result.update(
+                        {
+                            "return_type": routine["return_type"],
+                            "provolatile": routine["provolatile"],
+                            "proparallel": routine["proparallel"],
+                        }
+                    )
+                results.append(result)
+        else:
+            for trigger in self.triggers:
+                if matcher.match(trigger["name"]):
+                    results.append(
+                        {
+                            "object_name": f"{self.schema_name}.{trigger['name']}",
+                            "object_type": "TRIGGER",
+                            "definition": trigger["definition"],
+                            "description": trigger["description"],
+                        }
+                    )
+        return results
+
+    def render_schema(self, object_types=None):
+        """
+        DDL for every object in the schema, in an order that can be replayed
+
+        Sequences come before the tables whose defaults use them, and
+        standalone indexes are emitted with their table, so 'index' is not
+        listed separately here.
+        """
+        order = ("sequence", "table", "view", "function", "procedure", "trigger")
+        wanted = [
+            object_type
+            for object_type in order
+            if object_types is None or object_type in object_types
+        ]
+        results = []
+        for object_type in wanted:
+            results.extend(self.find(object_type))
+        if object_types and "index" in object_types and "table" not in object_types:
+            results.extend(self.find("index"))
+        return results
+
+
+class CatalogCache:
+    """
+    SchemaCatalog per (secret, schema), revalidated against the catalog version
+
+    Within CATALOG_VERSION_CHECK_SECONDS of the last check an entry is used
+    as-is; after that one cheap version query decides whether to reuse it.
+    """
+
+    def __init__(self, maxsize=None, check_seconds=None, clock=time.monotonic):
+        self.check_seconds = (
+            CATALOG_VERSION_CHECK_SECONDS if check_seconds is None else check_seconds
+        )
+        self._entries = LRUCache(maxsize or CATALOG_CACHE_SIZE)
+        self._clock = clock
+        self._lock = threading.Lock()
+        self.loads = 0
+
+    def get(self, cur, secret_name, schema_name, refresh=False):
+        """
+        Returns:
+            tuple: (SchemaCatalog, source) where source is 'cache',
+                   'revalidated' or 'loaded'
+        """
+        key = (secret_name, schema_name)
+        entry = None if refresh else self._entries.get(key)
+        now = self._clock()
+        if entry is not None and now - entry["checked_at"] < self.check_seconds:
+            return entry["catalog"], "cache"
+
+        cur.execute(CATALOG_VERSION_QUERY, (schema_name,))
+        version = cur.fetchone()[0]
+        if entry is not None and entry["catalog"].version == version:
+            entry["checked_at"] = now
+            return entry["catalog"], "revalidated"
+
+        catalog = SchemaCatalog.load(cur, schema_name, version)
+        with self._lock:
+            self.loads += 1
+        self._entries.put(key, {"catalog": catalog, "checked_at": now})
+        return catalog, "loaded"
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self):
+        info = self._entries.info()
+        info["loads"] = self.loads
+        return info
+
+
+catalog_cache = CatalogCache()
+
+
+def get_catalog_cache():
+    return catalog_cache
@@ -11,6 +11,9 @@ source "$PROJECT_DIR/config/cognito_config.env"
 
 echo "Creating Lambda functions for DB Performance Analyzer..."
 
+# Helper modules imported by both Lambda functions; packaged next to lambda_function.py
+SHARED_MODULES="db_connection.py query_fanout.py sql_lexer.py stat_snapshots.py plan_cache.py catalog_loader.py"
+
 # Use the correct path to the pg_analyze_performance.py file
 PG_ANALYZE_PY_FILE="$SCRIPT_DIR/pg_analyze_performance.py"
 if [ -f "$PG_ANALYZE_PY_FILE" ]; then
@@ -24,6 +27,9 @@ fi
 LAMBDA_DIR=$(mktemp -d)
 echo "Creating Lambda package in $LAMBDA_DIR"
 cp "$PG_ANALYZE_PY_FILE" "$LAMBDA_DIR/lambda_function.py"
+for module in $SHARED_MODULES; do
+    cp "$SCRIPT_DIR/$module" "$LAMBDA_DIR/$module"
+done
 
 # Create a zip file for the Lambda function
 ZIP_FILE=$(mktemp).zip
@@ -156,6 +162,9 @@ fi
 PGSTAT_LAMBDA_DIR=$(mktemp -d)
 echo "Creating PGStat Lambda package in $PGSTAT_LAMBDA_DIR"
 cp "$PGSTAT_PY_FILE" "$PGSTAT_LAMBDA_DIR/lambda_function.py"
+for module in $SHARED_MODULES; do
+    cp "$SCRIPT_DIR/$module" "$PGSTAT_LAMBDA_DIR/$module"
+done
 
 # Create a zip file for the Lambda function
 PGSTAT_ZIP_FILE=$(mktemp).zip
@@ -39,7 +39,8 @@ lambda_target_config = {
                             'properties': {
                                 'environment': {'type': 'string'},
                                 'action_type': {'type': 'string'},
-                                'query': {'type': 'string'}
+                                'query': {'type': 'string'},
+                                'refresh_plan': {'type': 'boolean'}
                             },
                             'required': ['environment', 'action_type', 'query']
                         }
@@ -59,6 +60,20 @@ lambda_target_config = {
                             'required': ['environment', 'action_type', 'object_type', 'object_name', 'object_schema']
                         }
                     },
+                    {
+                        'name': 'extract_schema_ddl',
+                        'description': 'Generates a DDL script for every object in a schema.',
+                        'inputSchema': {
+                            'type': 'object',
+                            'properties': {
+                                'environment': {'type': 'string'},
+                                'action_type': {'type': 'string'},
+                                'object_schema': {'type': 'string'},
+                                'object_types': {'type': 'string'}
+                            },
+                            'required': ['environment', 'action_type', 'object_schema']
+                        }
+                    },
                     {
                         'name': 'execute_query',
                         'description': 'Execute read-only queries safely and return results.',
@@ -190,6 +205,43 @@ pgstat_target_config = {
                             },
                             'required': ['environment', 'action_type']
                         }
+                    },
+                    {
+                        'name': 'full_health_sweep',
+                        'description': 'Runs every PostgreSQL diagnostic analysis in one call, executing independent queries concurrently.',
+                        'inputSchema': {
+                            'type': 'object',
+                            'properties': {
+                                'environment': {'type': 'string'},
+                                'action_type': {'type': 'string'}
+                            },
+                            'required': ['environment', 'action_type']
+                        }
+                    },
+                    {
+                        'name': 'query_rate_analysis',
+                        'description': 'Ranks queries by calls/s, execution ms/s, rows/s and shared block reads/s over a recent window using stored pg_stat_statements snapshots.',
+                        'inputSchema': {
+                            'type': 'object',
+                            'properties': {
+                                'environment': {'type': 'string'},
+                                'action_type': {'type': 'string'},
+                                'window_minutes': {'type': 'integer'}
+                            },
+                            'required': ['environment', 'action_type']
+                        }
+                    },
+                    {
+                        'name': 'capture_stat_snapshot',
+                        'description': 'Stores a snapshot of pg_stat_statements counters to use as a baseline for query_rate_analysis.',
+                        'inputSchema': {
+                            'type': 'object',
+                            'properties': {
+                                'environment': {'type': 'string'},
+                                'action_type': {'type': 'string'}
+                            },
+                            'required': ['environment', 'action_type']
+                        }
                     }
                 ]
             }
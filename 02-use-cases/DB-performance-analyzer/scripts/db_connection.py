@@ -0,0 +1,395 @@
+"""
+Connection and secret caching shared by the DB Performance Analyzer Lambdas.
+
+Lambda keeps module globals alive between warm invocations of the same
+execution environment, so the SSM lookup of the secret name, the Secrets
+Manager lookup of the credentials and the PostgreSQL connection itself only
+need to happen once per container instead of once per request.
+
+This file is packaged next to lambda_function.py by create_lambda.sh.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+import boto3
+import psycopg2
+import psycopg2.extensions
+from botocore.exceptions import ClientError
+
+logger = logging.getLogger(__name__)
+
+SECRET_CACHE_TTL_SECONDS = int(os.environ.get("SECRET_CACHE_TTL_SECONDS", "300"))
+CONNECTION_POOL_SIZE = int(os.environ.get("CONNECTION_POOL_SIZE", "4"))
+CONNECTION_MAX_IDLE_SECONDS = int(os.environ.get("CONNECTION_MAX_IDLE_SECONDS", "300"))
+CONNECTION_VALIDATE_AFTER_SECONDS = int(
+    os.environ.get("CONNECTION_VALIDATE_AFTER_SECONDS", "30")
+)
+CONNECT_TIMEOUT_SECONDS = int(os.environ.get("DB_CONNECT_TIMEOUT_SECONDS", "10"))
+
+VALID_ENVIRONMENTS = ("prod", "dev")
+
+# boto3 clients are expensive to build, so build them once per container
+_ssm_client = None
+_secrets_client = None
+
+
+def _get_ssm_client():
+    global _ssm_client
+    if _ssm_client is None:
+        _ssm_client = boto3.client("ssm")
+    return _ssm_client
+
+
+def _get_secrets_client():
+    global _secrets_client
+    if _secrets_client is None:
+        _secrets_client = boto3.session.Session().client(
+            service_name="secretsmanager", region_name=os.environ["REGION"]
+        )
+    return _secrets_client
+
+
+def load_secret_name_from_ssm(environment):
+    """Retrieve the secret name for the specified environment from Parameter Store"""
+    ssm_client = _get_ssm_client()
+    try:
+        response = ssm_client.get_parameter(Name=f"/AuroraOps/{environment}")
+        return response["Parameter"]["Value"]
+    except ssm_client.exceptions.ParameterNotFound:
+        raise Exception(f"Parameter not found: /AuroraOps/{environment}")
+    except Exception as e:
+        raise Exception(
+            f"Failed to get {environment} secret name from Parameter Store: {str(e)}"
+        )
+
+
+def load_secret_from_secrets_manager(secret_name):
+    """Get secret from AWS Secrets Manager"""
+    try:
+        secret_value = _get_secrets_client().get_secret_value(SecretId=secret_name)
+        return json.loads(secret_value["SecretString"])
+    except ClientError as e:
+        raise Exception(f"Failed to get secret: {str(e)}")
+
+
+def open_connection(secret):
+    """Open a new PostgreSQL connection from a secret payload"""
+    return psycopg2.connect(
+        host=secret["host"],
+        database=secret["dbname"],
+        user=secret["username"],
+        password=secret["password"],
+        port=secret["port"],
+        connect_timeout=CONNECT_TIMEOUT_SECONDS,
+    )
+
+
+def secret_fingerprint(secret):
+    """Hash the connection-relevant fields of a secret so rotations can be detected"""
+    material = "\x00".join(
+        str(secret.get(key, ""))
+        for key in ("host", "port", "dbname", "username", "password")
+    )
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+class TTLCache:
+    """Small thread-safe key/value cache whose entries expire after a fixed TTL"""
+
+    def __init__(self, ttl_seconds, clock=time.monotonic):
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if self._clock() >= expires_at:
+                del self._entries[key]
+                return None
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = (value, self._clock() + self.ttl_seconds)
+
+    def invalidate(self, key=None):
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+
+class ConnectionManager:
+    """
+    Keeps resolved secret names, secret payloads and validated connections
+    alive across warm Lambda invocations.
+
+    Connections are pooled per secret name. A pooled connection is handed out
+    again only if it is still open, has been used recently or answers a cheap
+    ``SELECT 1``, and was opened with the credentials currently stored in the
+    secret. Everything else is closed and replaced transparently.
+    """
+
+    def __init__(
+        self,
+        secret_name_loader=load_secret_name_from_ssm,
+        secret_loader=load_secret_from_secrets_manager,
+        connection_opener=open_connection,
+        secret_ttl=SECRET_CACHE_TTL_SECONDS,
+        pool_size=CONNECTION_POOL_SIZE,
+        max_idle_seconds=CONNECTION_MAX_IDLE_SECONDS,
+        validate_after_seconds=CONNECTION_VALIDATE_AFTER_SECONDS,
+        clock=time.monotonic,
+    ):
+        self._secret_name_loader = secret_name_loader
+        self._secret_loader = secret_loader
+        self._connection_opener = connection_opener
+        self._secret_names = TTLCache(secret_ttl, clock)
+        self._secrets = TTLCache(secret_ttl, clock)
+        self.pool_size = pool_size
+        self.max_idle_seconds = max_idle_seconds
+        self.validate_after_seconds = validate_after_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        # secret_name -> list of (connection, fingerprint, last_used)
+        self._idle = {}
+        # id(connection) -> (secret_name, fingerprint)
+        self._in_use = {}
+        self._stats = {
+            "secret_name_cache_hits": 0,
+            "secret_name_cache_misses": 0,
+            "secret_cache_hits": 0,
+            "secret_cache_misses": 0,
+            "connections_opened": 0,
+            "connections_reused": 0,
+            "connections_discarded": 0,
+            "secret_rotations_detected": 0,
+        }
+
+    def _bump(self, counter):
+        with self._lock:
+            self._stats[counter] += 1
+
+    def stats(self):
+        """Return a snapshot of cache and pool counters"""
+        with self._lock:
+            snapshot = dict(self._stats)
+            snapshot["idle_connections"] = sum(
+                len(entries) for entries in self._idle.values()
+            )
+            snapshot["in_use_connections"] = len(self._in_use)
+        return snapshot
+
+    def get_secret_name(self, environment):
+        """Resolve the secret name for an environment, using the TTL cache"""
+        secret_name = self._secret_names.get(environment)
+        if secret_name is not None:
+            self._bump("secret_name_cache_hits")
+            return secret_name
+        self._bump("secret_name_cache_misses")
+        secret_name = self._secret_name_loader(environment)
+        self._secret_names.set(environment, secret_name)
+        return secret_name
+
+    def get_secret(self, secret_name, refresh=False):
+        """Fetch a secret payload, using the TTL cache unless refresh is requested"""
+        if refresh:
+            self._secrets.invalidate(secret_name)
+        else:
+            secret = self._secrets.get(secret_name)
+            if secret is not None:
+                self._bump("secret_cache_hits")
+                return secret
+        self._bump("secret_cache_misses")
+        secret = self._secret_loader(secret_name)
+        self._secrets.set(secret_name, secret)
+        return secret
+
+    def _close_quietly(self, conn):
+        self._bump("connections_discarded")
+        try:
+            conn.close()
+        except Exception as e:
+            logger.debug(f"Ignoring error while closing connection: {str(e)}")
+
+    def _is_usable(self, conn, last_used):
+        """Check a pooled connection before handing it out again"""
+        if conn.closed:
+            return False
+        idle_for = self._clock() - last_used
+        if idle_for > self.max_idle_seconds:
+            return False
+        if idle_for <= self.validate_after_seconds:
+            return True
+        try:
+            with conn.cursor() as cur:
+                cur.execute("SELECT 1")
+                cur.fetchone()
+            conn.rollback()
+            return True
+        except (psycopg2.OperationalError, psycopg2.InterfaceError) as e:
+            logger.info(f"Dropping broken pooled connection: {str(e)}")
+            return False
+
+    def _take_idle(self, secret_name, fingerprint):
+        """Pop the most recently used idle connection that is still valid"""
+        while True:
+            with self._lock:
+                entries = self._idle.get(secret_name)
+                if not entries:
+                    return None
+                conn, conn_fingerprint, last_used = entries.pop()
+            if conn_fingerprint != fingerprint:
+                self._bump("secret_rotations_detected")
+                self._close_quietly(conn)
+                continue
+            if self._is_usable(conn, last_used):
+                return conn
+            self._close_quietly(conn)
+
+    def _register(self, conn, secret_name, fingerprint):
+        with self._lock:
+            self._in_use[id(conn)] = (secret_name, fingerprint)
+
+    def acquire(self, secret_name):
+        """Return a ready-to-use connection for the secret, reusing a pooled one if possible"""
+        secret = self.get_secret(secret_name)
+        fingerprint = secret_fingerprint(secret)
+
+        conn = self._take_idle(secret_name, fingerprint)
+        if conn is not None:
+            self._bump("connections_reused")
+            self._register(conn, secret_name, fingerprint)
+            return conn
+
+        try:
+            conn = self._connection_opener(secret)
+        except psycopg2.OperationalError as first_error:
+            # The cached credentials may have been rotated since they were
+            # fetched; re-read the secret once before giving up.
+            fresh_secret = self.get_secret(secret_name, refresh=True)
+            fresh_fingerprint = secret_fingerprint(fresh_secret)
+            if fresh_fingerprint == fingerprint:
+                raise first_error
+            self._bump("secret_rotations_detected")
+            self._drop_idle(secret_name)
+            secret, fingerprint = fresh_secret, fresh_fingerprint
+            conn = self._connection_opener(secret)
+
+        self._bump("connections_opened")
+        self._register(conn, secret_name, fingerprint)
+        return conn
+
+    def release(self, conn, discard=False):
+        """Return a connection to the pool, or close it if it is broken or the pool is full"""
+        if conn is None:
+            return
+        with self._lock:
+            owner = self._in_use.pop(id(conn), None)
+        if owner is None:
+            # Not handed out by this manager; keep the old close-on-release behaviour
+            conn.close()
+            return
+        secret_name, fingerprint = owner
+
+        if discard or conn.closed:
+            self._close_quietly(conn)
+            return
+        try:
+            # Rolling back also undoes any SET issued inside the transaction,
+            # so per-request settings such as statement_timeout never leak.
+            if (
+                conn.get_transaction_status()
+                != psycopg2.extensions.TRANSACTION_STATUS_IDLE
+            ):
+                conn.rollback()
+        except (psycopg2.OperationalError, psycopg2.InterfaceError):
+            self._close_quietly(conn)
+            return
+
+        with self._lock:
+            entries = self._idle.setdefault(secret_name, [])
+            if len(entries) < self.pool_size:
+                entries.append((conn, fingerprint, self._clock()))
+                return
+        self._close_quietly(conn)
+
+    @contextmanager
+    def connection(self, secret_name):
+        """Context manager form of acquire()/release()"""
+        conn = self.acquire(secret_name)
+        discard = False
+        try:
+            yield conn
+        except (psycopg2.OperationalError, psycopg2.InterfaceError):
+            discard = True
+            raise
+        finally:
+            self.release(conn, discard=discard)
+
+    def _drop_idle(self, secret_name):
+        with self._lock:
+            entries = self._idle.pop(secret_name, [])
+        for conn, _, _ in entries:
+            self._close_quietly(conn)
+
+    def close_all(self):
+        """Close every idle connection and forget all cached secrets"""
+        with self._lock:
+            secret_names = list(self._idle.keys())
+        for secret_name in secret_names:
+            self._drop_idle(secret_name)
+        self._secret_names.invalidate()
+        self._secrets.invalidate()
+
+
+# Module-level manager shared by every invocation served by this container
+connection_manager = ConnectionManager()
+
+
+def get_connection_manager():
+    return connection_manager
+
+
+def set_connection_manager(manager):
+    """Replace the module-level manager (used by the local benchmark harness)"""
+    global connection_manager
+    connection_manager = manager
+    return manager
+
+
+def get_env_secret(environment):
+    """Retrieve the secret name for the specified environment"""
+    if environment not in VALID_ENVIRONMENTS:
+        raise ValueError(f"Unknown environment: {environment}")
+    return connection_manager.get_secret_name(environment)
+
+
+def get_secret(secret_name):
+    """Get secret from AWS Secrets Manager, cached for SECRET_CACHE_TTL_SECONDS"""
+    return connection_manager.get_secret(secret_name)
+
+
+def connect_to_db(secret_name):
+    """Establish database connection, reusing a warm pooled connection when possible"""
+    try:
+        return connection_manager.acquire(secret_name)
+    except Exception as e:
+        raise Exception(f"Failed to connect to the database: {str(e)}")
+
+
+def release_connection(conn, discard=False):
+    """Hand a connection obtained from connect_to_db back to the pool"""
+    connection_manager.release(conn, discard=discard)
@@ -15,7 +15,7 @@ lambda_target_config = {
                 "inlinePayload": [
                     {
                         "name": "explain_query",
-                        "description": "Analyzes and explains the execution plan for a SQL query to help optimize database performance. Provide the database environment (dev/prod) and the SQL query to analyze. Use action_type default value as explain_query.",
+                        "description": "Analyzes and explains the execution plan for a SQL query to help optimize database performance. Provide the database environment (dev/prod) and the SQL query to analyze. Plans are cached for a few minutes; when a fresh plan replaces an earlier one, the node-level changes between the two runs are reported. Use action_type default value as explain_query.",
                         "inputSchema": {
                             "type": "object",
                             "properties": {
@@ -28,6 +28,10 @@ lambda_target_config = {
                                 },
                                  "query": {
                                     "type": "string"
+                                },
+                                "refresh_plan": {
+                                    "type": "boolean",
+                                    "description": "Set to true to ignore a cached plan and run EXPLAIN again, for example after a deploy or an index change."
                                 }
                             },
                             "required": ["environment","action_type","query"]
@@ -60,6 +64,30 @@ lambda_target_config = {
                             }
                         },
                         {
+                        "name": "extract_schema_ddl",
+                        "description": "Generates a DDL script for every object in a schema (sequences, tables with their constraints and indexes, views, functions, procedures and triggers) from a single catalog read. Provide the environment (dev/prod), object_schema, and optionally object_types as a comma-separated list to limit the script. Use action_type default value as extract_schema_ddl.",
+                        "inputSchema": {
+                            "type": "object",
+                            "properties": {
+                                "environment": {
+                                    "type": "string"
+                                },
+                                "action_type": {
+                                    "type": "string",
+                                    "description": "The type of action to perform. Use 'extract_schema_ddl' for this tool."
+                                },
+                                "object_schema": {
+                                    "type": "string"
+                                },
+                                "object_types": {
+                                    "type": "string",
+                                    "description": "Optional comma-separated object types to include, e.g. 'table,view'."
+                                }
+                            },
+                            "required": ["environment","action_type","object_schema"]
+                            }
+                        },
+                        {
                         "name": "execute_query",
                         "description": "Executes a read-only SQL query safely and returns the results with performance metrics. Provide the environment (dev/prod) and the SQL query to execute. Use action_type default value as execute_query.",
                         "inputSchema": {
@@ -199,6 +199,61 @@ lambda_target_config = {
                             },
                             "required": ["environment","action_type"]
                             }
+                        },
+                        {
+                        "name": "full_health_sweep",
+                        "description": "Runs every diagnostic analysis (slow queries, connections, indexes, autovacuum, I/O, replication, system health, vacuum progress, XID wraparound, bloat and long-running transactions) in a single call, executing the independent queries concurrently. Provide the environment (dev/prod) to analyze. Use action_type default value as full_health_sweep.",
+                        "inputSchema": {
+                            "type": "object",
+                            "properties": {
+                                "environment": {
+                                    "type": "string"
+                                },
+                                "action_type": {
+                                    "type": "string",
+                                    "description": "The type of action to perform. Use 'full_health_sweep' for this tool."
+                                }
+                            },
+                            "required": ["environment","action_type"]
+                            }
+                        },
+                        {
+                        "name": "query_rate_analysis",
+                        "description": "Ranks queries by what they cost recently rather than since the last statistics reset: calls per second, execution milliseconds per second, rows per second and shared block reads per second over the last window_minutes, computed from stored pg_stat_statements snapshots. The first call stores a baseline. Provide the environment (dev/prod) and optionally window_minutes (default 60). Use action_type default value as query_rate_analysis.",
+                        "inputSchema": {
+                            "type": "object",
+                            "properties": {
+                                "environment": {
+                                    "type": "string"
+                                },
+                                "action_type": {
+                                    "type": "string",
+                                    "description": "The type of action to perform. Use 'query_rate_analysis' for this tool."
+                                },
+                                "window_minutes": {
+                                    "type": "integer",
+                                    "description": "Length of the window to compare, in minutes. Defaults to 60."
+                                }
+                            },
+                            "required": ["environment","action_type"]
+                            }
+                        },
+                        {
+                        "name": "capture_stat_snapshot",
+                        "description": "Stores a snapshot of the current pg_stat_statements counters so later query_rate_analysis calls have a baseline. Provide the environment (dev/prod). Use action_type default value as capture_stat_snapshot.",
+                        "inputSchema": {
+                            "type": "object",
+                            "properties": {
+                                "environment": {
+                                    "type": "string"
+                                },
+                                "action_type": {
+                                    "type": "string",
+                                    "description": "The type of action to perform. Use 'capture_stat_snapshot' for this tool."
+                                }
+                            },
+                            "required": ["environment","action_type"]
+                            }
                         }
                 ]
             }
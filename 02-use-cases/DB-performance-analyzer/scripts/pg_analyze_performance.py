@@ -1,12 +1,15 @@
 import json
-import boto3
-import psycopg2
 import os
+import psycopg2
 import re
 import time
 import logging
 from datetime import datetime
-from botocore.exceptions import ClientError
+
+import catalog_loader
+import plan_cache
+import sql_lexer
+from db_connection import get_env_secret, connect_to_db, release_connection, get_connection_manager
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
@@ -33,54 +36,97 @@ def analyze_query_complexity(query):
     Raises:
         QueryComplexityError: If query is too complex
     """
-    query_lower = query.lower()
-    complexity_score = 0
-    warnings = []
-    
-    # Check for joins
-    join_count = sum(1 for join_type in ['join', 'inner join', 'left join', 'right join', 'full join'] 
-                    if join_type in query_lower)
-    complexity_score += join_count * 2
-    if join_count > 3:
-        warnings.append(f"Query contains {join_count} joins - consider simplifying")
-    
-    # Check for subqueries
-    subquery_count = query_lower.count('(select')
-    complexity_score += subquery_count * 3
-    if subquery_count > 2:
-        warnings.append(f"Query contains {subquery_count} subqueries - consider restructuring")
-    
-    # Check for aggregations
-    agg_functions = ['count(', 'sum(', 'avg(', 'max(', 'min(']
-    agg_count = sum(query_lower.count(func) for func in agg_functions)
-    complexity_score += agg_count
-    
-    # Check for window functions
-    if 'over(' in query_lower or 'partition by' in query_lower:
-        complexity_score += 3
-        warnings.append("Query uses window functions - monitor performance")
-    
-    # Check for complex WHERE conditions
-    where_pos = query_lower.find('where')
-    if where_pos != -1:
-        where_clause = query_lower[where_pos:]
-        and_count = where_clause.count(' and ')
-        or_count = where_clause.count(' or ')
-        complexity_score += (and_count + or_count)
-        if (and_count + or_count) > 5:
-            warnings.append(f"Complex WHERE clause with {and_count + or_count} conditions")
-    
-    return {
-        'complexity_score': complexity_score,
-        'warnings': warnings,
-        'join_count': join_count,
-        'subquery_count': subquery_count,
-        'aggregation_count': agg_count
+    # Scored from the token stream, so joins/subqueries inside strings,
+    # dollar-quoted bodies or comments are not counted; CTEs are scored separately
+    try:
+        return sql_lexer.analyze(query).complexity
+    except sql_lexer.SQLLexerError as e:
+        raise QueryComplexityError(f"Unable to parse query: {str(e)}")
+
+# Rows pulled from a server-side cursor per round trip
+FETCH_BATCH_SIZE = int(os.environ.get('FETCH_BATCH_SIZE', '100'))
+# Upper bound on result data returned by one invocation (Lambda responses are capped at 6 MB)
+MAX_RESULT_BYTES = int(os.environ.get('MAX_RESULT_BYTES', str(4 * 1024 * 1024)))
+
+def estimate_row_bytes(row):
+    """Approximate the transferred size of a row from its values' text length"""
+    size = 0
+    for value in row:
+        if value is None:
+            continue
+        if isinstance(value, (bytes, bytearray, memoryview)):
+            size += len(value)
+        else:
+            size += len(str(value))
+    return size
+
+def is_select_statement(stmt):
+    """True for statements that can run behind a server-side cursor"""
+    return sql_lexer.analyze(stmt).statements[0].first_keyword == 'select'
+
+def stream_statement_rows(conn, stmt, row_limit, byte_limit, cursor_name,
+                          batch_size=FETCH_BATCH_SIZE):
+    """
+    Execute a statement and fetch only the rows that will be returned
+
+    SELECT statements run behind a named (server-side) cursor and are fetched
+    in batches with fetchmany, so rows beyond the budget never leave the
+    database. One extra row is requested to tell whether the result was
+    truncated; the cursor is then closed, which stops the query.
+
+    Args:
+        conn: Open database connection inside a transaction
+        stmt (str): Statement to execute
+        row_limit (int): Maximum number of rows to return
+        byte_limit (int): Maximum estimated bytes of row data to return
+        cursor_name (str): Name for the server-side cursor (unique per transaction)
+        batch_size (int): Rows requested per round trip
+
+    Returns:
+        dict: columns, rows, rows_scanned, bytes_transferred, fetch_batches and
+              truncated_by ('rows', 'bytes' or None)
+    """
+    result = {
+        'columns': [],
+        'rows': [],
+        'rows_scanned': 0,
+        'bytes_transferred': 0,
+        'fetch_batches': 0,
+        'truncated_by': None
     }
+    server_side = is_select_statement(stmt)
+    cur = conn.cursor(name=cursor_name) if server_side else conn.cursor()
+    try:
+        cur.execute(stmt)
+        while True:
+            wanted = min(batch_size, row_limit + 1 - result['rows_scanned'])
+            batch = cur.fetchmany(wanted) if server_side else cur.fetchall()
+            result['fetch_batches'] += 1
+            if cur.description and not result['columns']:
+                result['columns'] = [desc[0] for desc in cur.description]
+
+            for row in batch:
+                result['rows_scanned'] += 1
+                if len(result['rows']) >= row_limit:
+                    result['truncated_by'] = 'rows'
+                    break
+                row_bytes = estimate_row_bytes(row)
+                if result['bytes_transferred'] + row_bytes > byte_limit:
+                    result['truncated_by'] = 'bytes'
+                    break
+                result['bytes_transferred'] += row_bytes
+                result['rows'].append(row)
+
+            if result['truncated_by'] or not server_side or len(batch) < wanted:
+                break
+    finally:
+        # Closing a server-side cursor early ends the query on the server
+        cur.close()
+    return result
 
 def validate_and_execute_queries(secret_name, query, max_rows=20, 
                                max_statements=5, max_total_rows=1000, 
-                               max_complexity=15):
+                               max_complexity=15, max_total_bytes=MAX_RESULT_BYTES):
     """
     Enhanced query validation and execution with additional controls
     """
@@ -94,6 +140,8 @@ def validate_and_execute_queries(secret_name, query, max_rows=20,
     start_time = time.time()
     conn = None
     total_rows = 0
+    rows_scanned = 0
+    bytes_transferred = 0
     
     try:
         # Validate and split queries
@@ -139,16 +187,17 @@ def validate_and_execute_queries(secret_name, query, max_rows=20,
                     'complexity_metrics': complexity_metrics
                 }
                 
-                stmt_lower = stmt.lower().strip()
+                stmt_analysis = sql_lexer.analyze(stmt).statements[0]
+                is_select_query = stmt_analysis.first_keyword == 'select'
+                remaining_rows = max_total_rows - total_rows
+                limit_rows = min(max_rows, remaining_rows)
                 
-                # Only add LIMIT for SELECT queries
-                if stmt_lower.startswith('select') and 'limit' not in stmt_lower:
-                    remaining_rows = max_total_rows - total_rows
-                    limit_rows = min(max_rows, remaining_rows)
-                    stmt = f"{stmt} LIMIT {limit_rows + 1}"
+                # Only add LIMIT for SELECT queries; the newline keeps it out of any trailing comment
+                if is_select_query and 'limit' not in stmt_analysis.words:
+                    stmt = f"{stmt}\nLIMIT {limit_rows + 1}"
                 
                 # Execute with explain plan first for SELECT queries
-                if stmt_lower.startswith('select'):
+                if is_select_query:
                     #cur.execute(f"EXPLAIN (FORMAT JSON) {stmt}")
                     #explain_plan = cur.fetchone()[0]
                     
@@ -160,36 +209,38 @@ def validate_and_execute_queries(secret_name, query, max_rows=20,
                             for suggestion in optimization_suggestions
                         )
                 
-                # Execute actual query
-                cur.execute(stmt)
-                
-                # Get column names
-                stmt_response['columns'] = [desc[0] for desc in cur.description]
-                
-                # Fetch results
-                rows = cur.fetchall()
-                row_count = len(rows)
+                # Execute actual query, streaming only the rows that fit the remaining budgets
+                fetched = stream_statement_rows(
+                    conn, stmt,
+                    row_limit=limit_rows,
+                    byte_limit=max_total_bytes - bytes_transferred,
+                    cursor_name=f"analyzer_stmt_{stmt_index}"
+                )
+                rows = fetched['rows']
+                stmt_response['columns'] = fetched['columns']
+                rows_scanned += fetched['rows_scanned']
+                bytes_transferred += fetched['bytes_transferred']
+                total_rows += len(rows)
                 
-                # Check total row limit
-                total_rows += row_count
-                if total_rows > max_total_rows:
+                if fetched['truncated_by'] == 'bytes':
                     stmt_response['truncated'] = True
-                    excess_rows = total_rows - max_total_rows
-                    rows = rows[:-excess_rows]
                     stmt_response['message'] = (
-                        f"Results truncated. Maximum total rows ({max_total_rows}) reached"
+                        f"Results truncated. Maximum result size ({max_total_bytes} bytes) reached"
                     )
-                    total_rows = max_total_rows
-                
-                # Check individual statement limit
-                elif row_count > max_rows:
+                elif fetched['truncated_by'] == 'rows':
                     stmt_response['truncated'] = True
-                    rows = rows[:max_rows]
-                    stmt_response['message'] = (
-                        f"Results truncated to {max_rows} rows"
-                    )
+                    if limit_rows < max_rows:
+                        stmt_response['message'] = (
+                            f"Results truncated. Maximum total rows ({max_total_rows}) reached"
+                        )
+                    else:
+                        stmt_response['message'] = (
+                            f"Results truncated to {max_rows} rows"
+                        )
                 
                 stmt_response['row_count'] = len(rows)
+                stmt_response['rows_scanned'] = fetched['rows_scanned']
+                stmt_response['bytes_transferred'] = fetched['bytes_transferred']
                 stmt_response['rows'] = [
                     dict(zip(stmt_response['columns'], row))
                     for row in rows
@@ -203,6 +254,9 @@ def validate_and_execute_queries(secret_name, query, max_rows=20,
                 'execution_time': total_time,
                 'statements_executed': len(statements),
                 'total_rows': total_rows,
+                'rows_scanned': rows_scanned,
+                'rows_returned': total_rows,
+                'bytes_transferred': bytes_transferred,
                 'timestamp': datetime.utcnow().isoformat(),
                 'needs_analysis': total_time > 5,
                 'performance_message': (
@@ -235,232 +289,7 @@ def validate_and_execute_queries(secret_name, query, max_rows=20,
     
     finally:
         if conn:
-            conn.close()
-
-def get_secret(secret_name):
-    """Get secret from AWS Secrets Manager """
-    secret_name = secret_name
-    region_name = os.environ['REGION']
-    session = boto3.session.Session()
-    client = session.client(
-        service_name='secretsmanager',
-        region_name=region_name
-    )
-    
-    try:
-        secret_value = client.get_secret_value(SecretId=secret_name)
-        secret = json.loads(secret_value['SecretString'])
-        return secret
-    except ClientError as e:
-        raise Exception(f"Failed to get secret: {str(e)}")
-
-def get_env_secret(environment):
-    ssm_client = boto3.client('ssm')
-    """Retrieve the secret name for the specified environment"""
-    if environment == 'prod':
-        try:
-            # Get the secret name from Parameter Store
-            response = ssm_client.get_parameter(
-                Name=f'/AuroraOps/{environment}'
-            )
-            print(response['Parameter']['Value'])
-            return response['Parameter']['Value']
-        except ssm_client.exceptions.ParameterNotFound:
-            error_message = f"Parameter not found: /AuroraOps/{environment}"
-            print(error_message)
-            raise Exception(error_message)
-    elif environment == 'dev':
-        try:
-            # Get the secret name from Parameter Store
-            response = ssm_client.get_parameter(
-                Name=f'/AuroraOps/{environment}'
-            )
-            return response['Parameter']['Value']
-        except Exception as e:
-            raise Exception(f"Failed to get dev secret name from Parameter Store: {str(e)}")
-    else:
-        print("environement does not exist")
-        raise ValueError(f"Unknown environment: {environment}")
-
-def connect_to_db(secret_name):
-    """Establish database connection"""
-    cur_secret = secret_name
-    secret = get_secret(cur_secret)
-    try:
-        conn = psycopg2.connect(
-            host=secret['host'],
-            database=secret['dbname'],
-            user=secret['username'],
-            password=secret['password'],
-            port=secret['port']
-        )
-        return conn
-    except Exception as e:
-        raise Exception(f"Failed to connect to the database: {str(e)}")
-
-# Define the queries dictionary for different object types
-queries = {
-    'table': """
-        WITH RECURSIVE columns AS (
-            SELECT 
-                t.schemaname,
-                t.tablename,
-                array_to_string(
-                    array_agg(
-                        '    ' || quote_ident(a.attname) || ' ' || 
-                        pg_catalog.format_type(a.atttypid, a.atttypmod) ||
-                        CASE WHEN a.attnotnull THEN ' NOT NULL' ELSE '' END ||
-                        CASE WHEN ad.adbin IS NOT NULL 
-                            THEN ' DEFAULT ' || pg_get_expr(ad.adbin, ad.adrelid) 
-                            ELSE '' 
-                        END
-                        ORDER BY a.attnum
-                    ),
-                    E',\n'
-                ) as column_definitions
-            FROM pg_catalog.pg_tables t
-            JOIN pg_catalog.pg_class c 
-                ON c.relname = t.tablename 
-                AND c.relnamespace = (
-                    SELECT oid 
-                    FROM pg_catalog.pg_namespace 
-                    WHERE nspname = t.schemaname
-                )
-            JOIN pg_catalog.pg_attribute a 
-                ON a.attrelid = c.oid 
-                AND a.attnum > 0 
-                AND NOT a.attisdropped
-            LEFT JOIN pg_catalog.pg_attrdef ad 
-                ON ad.adrelid = c.oid 
-                AND ad.adnum = a.attnum
-            WHERE t.schemaname NOT IN ('pg_catalog', 'information_schema')
-            GROUP BY t.schemaname, t.tablename
-        )
-        SELECT 
-            col.schemaname || '.' || col.tablename as object_name,
-            'TABLE' as object_type,
-            CASE 
-                WHEN col.column_definitions IS NOT NULL THEN
-                    format(
-                        'CREATE TABLE %I.%I (\n%s\n);',
-                        col.schemaname,
-                        col.tablename,
-                        col.column_definitions
-                    )
-                ELSE 'ERROR: No columns found for this table'
-            END as definition,
-            obj_description(
-                (col.schemaname || '.' || col.tablename)::regclass, 
-                'pg_class'
-            ) as description
-        FROM columns col
-        WHERE col.tablename ILIKE %s AND col.schemaname = %s
-    """,
-
-    'view': """
-        SELECT 
-            schemaname || '.' || viewname as object_name,
-            'VIEW' as object_type,
-            format(
-                'CREATE OR REPLACE VIEW %I.%I AS\n%s',
-                schemaname,
-                viewname,
-                pg_get_viewdef(format('%I.%I', schemaname, viewname)::regclass, true)
-            ) as definition,
-            obj_description(
-                (schemaname || '.' || viewname)::regclass, 
-                'pg_class'
-            ) as description
-        FROM pg_catalog.pg_views
-        WHERE viewname ILIKE %s 
-        AND schemaname = %s
-        AND schemaname NOT IN ('pg_catalog', 'information_schema')
-    """,
-
-    'function': """
-        SELECT 
-            n.nspname || '.' || p.proname as object_name,
-            'FUNCTION' as object_type,
-            pg_get_functiondef(p.oid) as definition,
-            obj_description(p.oid, 'pg_proc') as description,
-            p.prorettype::regtype as return_type,
-            p.provolatile,
-            p.proparallel
-        FROM pg_catalog.pg_proc p
-        JOIN pg_catalog.pg_namespace n ON n.oid = p.pronamespace
-        WHERE p.proname ILIKE %s
-        AND n.nspname = %s
-        AND n.nspname NOT IN ('pg_catalog', 'information_schema')
-        AND p.prokind = 'f'  -- 'f' for function
-    """,
-
-    'procedure': """
-        SELECT 
-            n.nspname || '.' || p.proname as object_name,
-            'PROCEDURE' as object_type,
-            pg_get_functiondef(p.oid) as definition,
-            obj_description(p.oid, 'pg_proc') as description
-        FROM pg_catalog.pg_proc p
-        JOIN pg_catalog.pg_namespace n ON n.oid = p.pronamespace
-        WHERE p.proname ILIKE %s
-        AND n.nspname = %s
-        AND n.nspname NOT IN ('pg_catalog', 'information_schema')
-        AND p.prokind = 'p'  -- 'p' for procedure
-    """,
-
-    'trigger': """
-        SELECT 
-            n.nspname || '.' || t.tgname as object_name,
-            'TRIGGER' as object_type,
-            pg_get_triggerdef(t.oid, true) as definition,
-            obj_description(t.oid, 'pg_trigger') as description
-        FROM pg_catalog.pg_trigger t
-        JOIN pg_catalog.pg_class c ON t.tgrelid = c.oid
-        JOIN pg_catalog.pg_namespace n ON c.relnamespace = n.oid
-        WHERE t.tgname ILIKE %s
-        AND n.nspname = %s
-        AND n.nspname NOT IN ('pg_catalog', 'information_schema')
-        AND NOT t.tgisinternal
-    """,
-
-    'sequence': """
-        SELECT 
-            n.nspname || '.' || c.relname as object_name,
-            'SEQUENCE' as object_type,
-            format(
-                'CREATE SEQUENCE %I.%I\n    INCREMENT %s\n    MINVALUE %s\n    MAXVALUE %s\n    START %s\n    CACHE %s%s;',
-                n.nspname,
-                c.relname,
-                s.seqincrement,
-                s.seqmin,
-                s.seqmax,
-                s.seqstart,
-                s.seqcache,
-                CASE WHEN s.seqcycle THEN '\n    CYCLE' ELSE '' END
-            ) as definition,
-            obj_description(c.oid, 'pg_class') as description
-        FROM pg_catalog.pg_sequence s
-        JOIN pg_catalog.pg_class c ON s.seqrelid = c.oid
-        JOIN pg_catalog.pg_namespace n ON c.relnamespace = n.oid
-        WHERE c.relname ILIKE %s
-        AND n.nspname = %s
-        AND n.nspname NOT IN ('pg_catalog', 'information_schema')
-    """,
-
-    'index': """
-        SELECT 
-            n.nspname || '.' || c.relname as object_name,
-            'INDEX' as object_type,
-            pg_get_indexdef(i.indexrelid) as definition,
-            obj_description(i.indexrelid, 'pg_class') as description
-        FROM pg_catalog.pg_index i
-        JOIN pg_catalog.pg_class c ON i.indexrelid = c.oid
-        JOIN pg_catalog.pg_namespace n ON c.relnamespace = n.oid
-        WHERE c.relname ILIKE %s
-        AND n.nspname = %s
-        AND n.nspname NOT IN ('pg_catalog', 'information_schema')
-    """
-}
+            release_connection(conn)
 
 def extract_database_object_ddl(secret_name, object_type, object_name=None, object_schema=None):
     """
@@ -476,6 +305,7 @@ def extract_database_object_ddl(secret_name, object_type, object_name=None, obje
         list: List of dictionaries containing object information
         str: Error message if no objects found
     """
+    conn = None
     try:
         # Input validation
         if not object_name or not object_schema:
@@ -483,8 +313,8 @@ def extract_database_object_ddl(secret_name, object_type, object_name=None, obje
 
         # Validate object_type
         object_type_lower = object_type.lower()
-        if object_type_lower not in queries:
-            valid_types = ', '.join(queries.keys())
+        if object_type_lower not in catalog_loader.OBJECT_TYPES:
+            valid_types = ', '.join(catalog_loader.OBJECT_TYPES)
             raise ValueError(f"Invalid object_type: {object_type}. Valid types are: {valid_types}")
 
         # Connect to database
@@ -494,66 +324,31 @@ def extract_database_object_ddl(secret_name, object_type, object_name=None, obje
 
         results = []
         with conn.cursor() as cur:
-            try:
-                # Debug information
-                print(f"\nExecuting query for {object_type_lower}")
-                print(f"Object name: {object_name}")
-                print(f"Schema: {object_schema}")
-
-                # Get query and execute
-                query = queries[object_type_lower]
-                params = [object_name, object_schema]
-                
-                print("\nExecuting query with parameters:")
-                print(f"Query: {query}")
-                print(f"Parameters: {params}")
-
-                cur.execute(query, params)
-                
-                # Fetch results
-                rows = cur.fetchall()
-                if not rows:
-                    print("No rows returned from query")
-                    return "No matching objects found"
-
-                # Get column names
-                columns = [desc[0] for desc in cur.description]
-                print(f"\nColumns returned: {columns}")
-                print(f"Number of rows: {len(rows)}")
-
-                # Process results
-                for row in rows:
-                    if not row:
-                        continue
-
-                    # Create result dictionary
-                    result = {}
-                    for i, column in enumerate(columns):
-                        result[column] = row[i] if i < len(row) else None
-
-                    # Add explanation based on object type
-                    if result.get('definition'):
-                        if object_type_lower == 'table':
-                            result['explanation'] = analyze_table_definition(result['definition'])
-                        elif object_type_lower == 'view':
-                            result['explanation'] = analyze_view_definition(result['definition'])
-                        elif object_type_lower in ('function', 'procedure'):
-                            result['explanation'] = analyze_routine_definition(result['definition'])
-                        elif object_type_lower == 'trigger':
-                            result['explanation'] = analyze_trigger_definition(result['definition'])
-                        else:
-                            result['explanation'] = f"DDL for {object_type_lower}"
-
-                    results.append(result)
-                    print(f"\nProcessed {object_type_lower}: {result.get('object_name', 'unknown')}")
+            # Debug information
+            print(f"\nLooking up {object_type_lower}")
+            print(f"Object name: {object_name}")
+            print(f"Schema: {object_schema}")
+
+            # The whole schema's catalog is loaded once and reused while its version is unchanged
+            catalog, source = catalog_loader.get_catalog_cache().get(cur, secret_name, object_schema)
+            print(f"Schema catalog {source}: {catalog.object_count} objects")
+
+            for result in catalog.find(object_type_lower, object_name):
+                # Add explanation based on object type
+                if result.get('definition'):
+                    if object_type_lower == 'table':
+                        result['explanation'] = analyze_table_definition(result['definition'])
+                    elif object_type_lower == 'view':
+                        result['explanation'] = analyze_view_definition(result['definition'])
+                    elif object_type_lower in ('function', 'procedure'):
+                        result['explanation'] = analyze_routine_definition(result['definition'])
+                    elif object_type_lower == 'trigger':
+                        result['explanation'] = analyze_trigger_definition(result['definition'])
+                    else:
+                        result['explanation'] = f"DDL for {object_type_lower}"
 
-            except Exception as e:
-                error_msg = f"Error executing query: {str(e)}"
-                print(f"\nError details:")
-                print(f"Query: {query}")
-                print(f"Parameters: {params}")
-                print(f"Error message: {error_msg}")
-                raise
+                results.append(result)
+                print(f"\nProcessed {object_type_lower}: {result.get('object_name', 'unknown')}")
 
         # Return results
         if not results:
@@ -570,12 +365,92 @@ def extract_database_object_ddl(secret_name, object_type, object_name=None, obje
     finally:
         if conn:
             try:
-                conn.close()
-                print("\nDatabase connection closed")
+                release_connection(conn)
+                print("\nDatabase connection released")
             except Exception as e:
                 print(f"\nError closing connection: {str(e)}")
 
 
+def extract_schema_ddl(secret_name, object_schema, object_types=None, max_bytes=MAX_RESULT_BYTES):
+    """
+    Generate a DDL script for every object in a schema
+    
+    Args:
+        secret_name (str): The name of the secret containing database credentials
+        object_schema (str): Schema to script
+        object_types (list, optional): Only include these object types
+        max_bytes (int): Stop adding objects once the script reaches this size
+    
+    Returns:
+        dict: script, object counts per type, whether the script was truncated
+              and where the catalog came from ('cache', 'revalidated' or 'loaded')
+    """
+    if not object_schema:
+        raise ValueError("object_schema is required")
+    if object_types:
+        object_types = [object_type.lower() for object_type in object_types]
+        invalid = [t for t in object_types if t not in catalog_loader.OBJECT_TYPES]
+        if invalid:
+            valid_types = ', '.join(catalog_loader.OBJECT_TYPES)
+            raise ValueError(f"Invalid object_type: {', '.join(invalid)}. Valid types are: {valid_types}")
+
+    conn = None
+    try:
+        conn = connect_to_db(secret_name)
+        with conn.cursor() as cur:
+            catalog, source = catalog_loader.get_catalog_cache().get(cur, secret_name, object_schema)
+    except Exception as e:
+        raise Exception(f"Failed to extract schema DDL: {str(e)}")
+    finally:
+        if conn:
+            release_connection(conn)
+
+    objects = catalog.render_schema(object_types)
+    parts = []
+    size = 0
+    counts = {}
+    truncated = False
+    for obj in objects:
+        block = f"-- {obj['object_type']}: {obj['object_name']}\n{obj['definition']}\n"
+        if obj.get('description'):
+            block = f"-- {obj['description']}\n" + block
+        if size + len(block) > max_bytes:
+            truncated = True
+            break
+        parts.append(block)
+        size += len(block)
+        counts[obj['object_type']] = counts.get(obj['object_type'], 0) + 1
+
+    return {
+        'schema': object_schema,
+        'script': '\n'.join(parts),
+        'object_counts': counts,
+        'objects_total': len(objects),
+        'truncated': truncated,
+        'catalog_source': source
+    }
+
+def format_schema_ddl(results):
+    """
+    Format schema DDL extraction results
+    """
+    output = [f"DDL for schema {results['schema']}:"]
+    if not results['objects_total']:
+        output.append("No objects found in this schema")
+        return "\n".join(output)
+    counts = ', '.join(f"{count} {object_type.lower()}" for object_type, count in results['object_counts'].items())
+    output.append(f"- Objects: {counts}")
+    if results['truncated']:
+        included = sum(results['object_counts'].values())
+        output.append(
+            f"- Truncated: {included} of {results['objects_total']} objects fit in the response. "
+            f"Request specific object types to see the rest"
+        )
+    output.append("")
+    output.append(results['script'])
+    return "\n".join(output)
+
+
 def analyze_table_definition(definition):
     """Analyze table DDL and return explanatory notes"""
     explanation = ["This table contains the following structure:"]
@@ -754,7 +629,7 @@ def clean_query_for_explain(query):
     
     return cleaned_query.strip()
 
-def analyze_query_performance(secret_name, query_or_object_name, parameters=None, object_type=None):
+def analyze_query_performance(secret_name, query_or_object_name, parameters=None, object_type=None, refresh=False):
     """
     Analyze query performance and provide optimization recommendations
     
@@ -763,7 +638,9 @@ def analyze_query_performance(secret_name, query_or_object_name, parameters=None
     - query_or_object_name: SQL query string or object name to analyze
     - parameters: Optional. List of parameter values for parameterized queries
     - object_type: Optional. If provided, will fetch definition from database object
+    - refresh: Optional. Ignore a cached plan and run EXPLAIN again
     """
+    cache = plan_cache.get_plan_cache()
     conn = connect_to_db(secret_name)
     try:
         with conn.cursor() as cur:
@@ -779,34 +656,41 @@ def analyze_query_performance(secret_name, query_or_object_name, parameters=None
             # Check if the query contains parameter placeholders
             has_parameters = any(f'${i}' in query_to_analyze for i in range(1, 21))
 
-            if has_parameters:
-                # Replace $n parameters with dummy placeholders
-                modified_query = query_to_analyze
-                param_count = 0
-                for i in range(1, 21):
-                    if f'${i}' in modified_query:
-                        param_count = max(param_count, i)
-                        modified_query = modified_query.replace(f'${i}', 'NULL')
-
-                # Use GENERIC_PLAN for parameterized queries
-                cur.execute(f"EXPLAIN (GENERIC_PLAN, BUFFERS, FORMAT JSON) {modified_query}")
-                plan = cur.fetchone()[0]
-
-                cur.execute(f"EXPLAIN (FORMAT JSON) {modified_query}")
-                estimated_plan = cur.fetchone()[0]
-                
-                # Pass True for is_generic_plan
-                analysis = analyze_execution_plan(plan[0], estimated_plan[0], True)
-            else:
-                # For non-parameterized queries, use ANALYZE
-                cur.execute(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {query_to_analyze}")
-                plan = cur.fetchone()[0]
-                
-                cur.execute(f"EXPLAIN (FORMAT JSON) {query_to_analyze}")
-                estimated_plan = cur.fetchone()[0]
-                
-                # Pass False for is_generic_plan
-                analysis = analyze_execution_plan(plan[0], estimated_plan[0], False)
+            settings_digest = plan_cache.server_settings_digest(cur, secret_name)
+            cache_key = cache.make_key(
+                secret_name, query_to_analyze, parameters, settings_digest,
+                'generic' if has_parameters else 'analyze'
+            )
+            entry = None if refresh else cache.get(cache_key)
+            cache_hit = entry is not None
+            previous = None
+
+            if not cache_hit:
+                if has_parameters:
+                    # Replace $n parameters with dummy placeholders
+                    modified_query = query_to_analyze
+                    for i in range(1, 21):
+                        if f'${i}' in modified_query:
+                            modified_query = modified_query.replace(f'${i}', 'NULL')
+
+                    # Use GENERIC_PLAN for parameterized queries
+                    cur.execute(f"EXPLAIN (GENERIC_PLAN, BUFFERS, FORMAT JSON) {modified_query}")
+                else:
+                    # For non-parameterized queries, use ANALYZE
+                    cur.execute(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {query_to_analyze}")
+                plan = cur.fetchone()[0][0]
+                entry, previous = cache.put(cache_key, plan)
+
+            # The JSON plan already carries the planner's row estimates for every
+            # node, so it doubles as the estimated plan
+            analysis = analyze_execution_plan(entry['plan'], entry['plan'], has_parameters)
+            analysis['plan_cache'] = {
+                'hit': cache_hit,
+                'age_seconds': round(time.time() - entry['captured_at'], 1),
+                'fingerprint': entry['fingerprint']
+            }
+            if previous is not None:
+                analysis['plan_diff'] = plan_cache.diff_plans(previous['plan'], entry['plan'])
 
             return analysis
 
@@ -814,7 +698,7 @@ def analyze_query_performance(secret_name, query_or_object_name, parameters=None
         raise Exception(f"Failed to analyze query performance: {str(e)}")
     finally:
         if conn:
-            conn.close()
+            release_connection(conn)
 
 def analyze_execution_plan(actual_plan, estimated_plan, is_generic_plan):
     """
@@ -1027,8 +911,21 @@ def format_analysis_output(analysis):
         output.append(f"- Actual Rows: {analysis['performance_stats'].get('actual_rows', 'N/A')}")
         output.append(f"- Estimated Rows: {analysis['performance_stats'].get('estimated_rows', 'N/A')}")
     
+    cache_info = analysis.get('plan_cache')
+    if cache_info:
+        if cache_info['hit']:
+            output.append(f"- Plan Source: cached plan from {cache_info['age_seconds']:.0f} seconds ago")
+        else:
+            output.append("- Plan Source: fresh EXPLAIN")
+    
     output.append("")
 
+    # Changes since the previous run of the same query
+    plan_diff = analysis.get('plan_diff')
+    if plan_diff:
+        output.extend(format_plan_diff(plan_diff))
+        output.append("")
+
     # Issues
     if analysis['issues']:
         output.append("Identified Issues:")
@@ -1046,6 +943,43 @@ def format_analysis_output(analysis):
 
     return "\n".join(output)
 
+def format_plan_diff(plan_diff):
+    """
+    Format a structured plan diff as report lines
+    """
+    summary = plan_diff['summary']
+    output = ["Plan Changes Since Previous Run:"]
+    if plan_diff['regression']:
+        output.append("- Possible regression: cost or execution time grew noticeably")
+    output.append(f"- Total Cost: {summary['old_total_cost']} -> {summary['new_total_cost']}")
+    if summary['new_execution_time_ms'] is not None and summary['old_execution_time_ms'] is not None:
+        output.append(
+            f"- Execution Time: {summary['old_execution_time_ms']:.2f} ms -> "
+            f"{summary['new_execution_time_ms']:.2f} ms"
+        )
+    if not plan_diff['changes']:
+        output.append("- No node-level changes")
+    for change in plan_diff['changes']:
+        kind = change['kind']
+        if kind in ('join_strategy', 'node_type', 'access_path'):
+            label = kind.replace('_', ' ').capitalize()
+            output.append(f"- {label} changed at node {change['path']}: {change['old']} -> {change['new']}")
+        elif kind == 'node_added':
+            output.append(f"- Node added at {change['path']}: {change['new']}")
+        elif kind == 'node_removed':
+            output.append(f"- Node removed at {change['path']}: {change['old']}")
+        elif kind == 'misestimate':
+            output.append(
+                f"- New row misestimate on {change['node']}: estimated {change['estimated_rows']}, "
+                f"actual {change['actual_rows']} (off by {change['factor']}x)"
+            )
+        elif kind == 'misestimate_resolved':
+            output.append(f"- Row estimate now accurate on {change['node']} (was off by {change['old_factor']}x)")
+        elif kind == 'buffers':
+            deltas = ', '.join(f"{name} {delta:+d}" for name, delta in change['deltas'].items())
+            output.append(f"- Buffer usage changed on {change['node']}: {deltas}")
+    return output
+
 def monitor_query_performance(query, start_time, rows_returned):
     """
     Monitor query performance and suggest analysis if needed
@@ -1112,115 +1046,37 @@ def validate_query(query):
     if not query or not isinstance(query, str):
         raise ValueError("Query must be a non-empty string")
 
-    def is_within_quotes(text, position):
-        """Check if a position in text is within quotes"""
-        single_quotes = False
-        double_quotes = False
-        for i in range(position):
-            if text[i] == "'" and not double_quotes:
-                single_quotes = not single_quotes
-            elif text[i] == '"' and not single_quotes:
-                double_quotes = not double_quotes
-        return single_quotes or double_quotes
-
-    def split_statements(query_text):
-        """Split query into individual statements, respecting quotes and comments"""
-        statements = []
-        current_stmt = []
-        i = 0
-        comment_block = False
-        line_comment = False
-        
-        while i < len(query_text):
-            char = query_text[i]
-            
-            # Handle comment blocks
-            if query_text[i:i+2] == '/*' and not line_comment:
-                comment_block = True
-                current_stmt.append(char)
-                i += 1
-            elif query_text[i:i+2] == '*/' and comment_block:
-                comment_block = False
-                current_stmt.append(char)
-                i += 1
-            # Handle line comments
-            elif query_text[i:i+2] == '--' and not comment_block:
-                line_comment = True
-                current_stmt.append(char)
-                i += 1
-            elif char == '\n' and line_comment:
-                line_comment = False
-                current_stmt.append(char)
-            # Handle semicolons
-            elif char == ';' and not comment_block and not line_comment and not is_within_quotes(query_text, i):
-                current_stmt.append(char)
-                stmt = ''.join(current_stmt).strip()
-                if stmt:
-                    statements.append(stmt)
-                current_stmt = []
-            else:
-                current_stmt.append(char)
-            i += 1
-        
-        # Add the last statement if exists
-        last_stmt = ''.join(current_stmt).strip()
-        if last_stmt:
-            statements.append(last_stmt)
-        
-        return [stmt for stmt in statements if stmt]
+    # Tokenize once; splitting and keyword checks both ignore text inside
+    # quotes, dollar-quoted strings, quoted identifiers and comments
+    try:
+        analysis = sql_lexer.analyze(query)
+    except sql_lexer.SQLLexerError as e:
+        raise ValueError(f"Unable to parse query: {str(e)}")
 
-    # Split into statements
-    statements = split_statements(query)
+    dangerous_operations = [
+        'insert', 'update', 'delete', 'drop', 'truncate', 'alter',
+        'create', 'grant', 'revoke', 'execute', 'copy'
+    ]
     validated_statements = []
 
     # Validate each statement
-    for stmt in statements:
-        stmt = stmt.strip()
-        if stmt.endswith(';'):
-            stmt = stmt[:-1]
-        
-        stmt_lower = stmt.lower().strip()
-        
-        # Get the command type
-        first_word = stmt_lower.split()[0] if stmt_lower.split() else ''
-        
+    for statement in analysis.statements:
+        first_word = statement.first_keyword
+
         if first_word not in ['select', 'show']:
             raise ValueError(f"Prohibited operation detected: {first_word}")
-        
+
         # For SELECT statements, check for dangerous operations
         if first_word == 'select':
-            dangerous_operations = [
-                r'\binsert\b', r'\bupdate\b', r'\bdelete\b', r'\bdrop\b', 
-                r'\btruncate\b', r'\balter\b', r'\bcreate\b', r'\bgrant\b', 
-                r'\brevoke\b', r'\bexecute\b', r'\bcopy\b'
-            ]
-            
-            # Remove content within quotes for checking
-            query_for_check = ''
-            in_quote = False
-            quote_char = None
-            
-            for char in stmt:
-                if char in ["'", '"'] and (not quote_char or char == quote_char):
-                    if not in_quote:
-                        quote_char = char
-                        in_quote = True
-                    else:
-                        quote_char = None
-                        in_quote = False
-                elif not in_quote:
-                    query_for_check += char
-            
-            # Check for dangerous operations
             for operation in dangerous_operations:
-                if re.search(operation, query_for_check.lower()):
+                if operation in statement.words:
                     raise ValueError(f"Statement contains prohibited operation: {operation}")
-        
-        validated_statements.append(stmt)
+
+        validated_statements.append(statement.text)
     
     return validated_statements
 
-def execute_read_query(secret_name, query, max_rows=20):
+def execute_read_query(secret_name, query, max_rows=20, max_total_bytes=MAX_RESULT_BYTES):
     """
     Execute read-only queries safely and return results with monitoring
     
@@ -1228,6 +1084,7 @@ def execute_read_query(secret_name, query, max_rows=20):
         secret_name (str): Secret containing database credentials
         query (str): SQL query to execute
         max_rows (int): Maximum number of rows to return (only for SELECT queries)
+        max_total_bytes (int): Maximum estimated bytes of row data across all statements
     
     Returns:
         dict: Query results and metadata
@@ -1242,6 +1099,9 @@ def execute_read_query(secret_name, query, max_rows=20):
     
     start_time = time.time()
     conn = None
+    total_rows = 0
+    rows_scanned = 0
+    bytes_transferred = 0
     
     try:
         # Validate and split queries
@@ -1266,41 +1126,48 @@ def execute_read_query(secret_name, query, max_rows=20):
                     'query': stmt
                 }
                 
-                # Determine if it's a SELECT query
-                stmt_lower = stmt.lower().strip()
-                is_select_query = stmt_lower.lstrip('(').startswith('select')
+                stmt_analysis = sql_lexer.analyze(stmt).statements[0]
+                is_select_query = stmt_analysis.first_keyword == 'select'
                 
-                # Prepare the final query
+                # Prepare the final query; the newline keeps LIMIT out of any trailing comment
                 final_query = stmt
-                if is_select_query and 'limit' not in stmt_lower:
-                    final_query = f"{stmt} LIMIT {max_rows + 1}"
+                if is_select_query and 'limit' not in stmt_analysis.words:
+                    final_query = f"{stmt}\nLIMIT {max_rows + 1}"
                 
-                # Execute query
+                # Execute query, streaming batches from a server-side cursor
                 try:
-                    cur.execute(final_query)
+                    fetched = stream_statement_rows(
+                        conn, final_query,
+                        row_limit=max_rows,
+                        byte_limit=max_total_bytes - bytes_transferred,
+                        cursor_name=f"analyzer_read_{stmt_index}"
+                    )
                 except psycopg2.Error as pe:
                     logger.error(f"Error executing query: {final_query}")
                     logger.error(f"Error details: {str(pe)}")
                     raise
                 
-                # Get column names
-                stmt_response['columns'] = [desc[0] for desc in cur.description]
+                stmt_response['columns'] = fetched['columns']
+                rows = fetched['rows']
+                rows_scanned += fetched['rows_scanned']
+                bytes_transferred += fetched['bytes_transferred']
+                total_rows += len(rows)
                 
-                # Fetch results
-                rows = cur.fetchall()
-                total_rows = len(rows)
-                
-                # Handle row limiting only for SELECT queries
-                if is_select_query and total_rows > max_rows:
+                if fetched['truncated_by'] == 'rows':
                     stmt_response['truncated'] = True
-                    rows = rows[:max_rows]
                     stmt_response['message'] = (
                         f"Results truncated to {max_rows} rows for performance reasons. "
-                        f"Total rows available: {total_rows}"
+                        f"More rows are available"
                     )
-                    stmt_response['row_count'] = max_rows
-                else:
-                    stmt_response['row_count'] = total_rows
+                elif fetched['truncated_by'] == 'bytes':
+                    stmt_response['truncated'] = True
+                    stmt_response['message'] = (
+                        f"Results truncated after {len(rows)} rows. "
+                        f"Maximum result size ({max_total_bytes} bytes) reached"
+                    )
+                stmt_response['row_count'] = len(rows)
+                stmt_response['rows_scanned'] = fetched['rows_scanned']
+                stmt_response['bytes_transferred'] = fetched['bytes_transferred']
                 
                 # Convert rows to list of dictionaries
                 stmt_response['rows'] = [
@@ -1329,6 +1196,9 @@ def execute_read_query(secret_name, query, max_rows=20):
             response['performance_metrics'] = {
                 'execution_time': total_time,
                 'statements_executed': len(statements),
+                'rows_scanned': rows_scanned,
+                'rows_returned': total_rows,
+                'bytes_transferred': bytes_transferred,
                 'timestamp': datetime.utcnow().isoformat(),
                 'needs_analysis': total_time > 5,
                 'performance_message': (
@@ -1355,7 +1225,7 @@ def execute_read_query(secret_name, query, max_rows=20):
     
     finally:
         if conn:
-            conn.close()
+            release_connection(conn)
 
 def format_enhanced_results(results):
     """
@@ -1619,7 +1489,7 @@ def execute_enhanced_query_diagnostics(secret_name, query):
         raise Exception(f"Failed to execute enhanced query diagnostics: {str(e)}")
     finally:
         if conn:
-            conn.close()
+            release_connection(conn)
 
 def execute_performance_insights_analysis(secret_name):
     """
@@ -1702,7 +1572,7 @@ def execute_performance_insights_analysis(secret_name):
         raise Exception(f"Failed to execute performance insights analysis: {str(e)}")
     finally:
         if conn:
-            conn.close()
+            release_connection(conn)
 
 def format_enhanced_diagnostics_output(results):
     """Format enhanced diagnostics results for display"""
@@ -1774,8 +1644,9 @@ def lambda_handler(event, context):
         # Get explain plan for a query
         if action_type == 'explain_query':
             query = event.get('query') if 'arguments' not in event else event['arguments'].get('query')
+            refresh_plan = event.get('refresh_plan') if 'arguments' not in event else event['arguments'].get('refresh_plan')
             print("Executing explain query scripts")
-            results = analyze_query_performance(secret_name, query)
+            results = analyze_query_performance(secret_name, query, refresh=str(refresh_plan).lower() == 'true')
             formatted_results = format_analysis_output(results)
         elif action_type == 'extract_ddl':
             if 'arguments' in event:
@@ -1791,6 +1662,14 @@ def lambda_handler(event, context):
             results = extract_database_object_ddl(secret_name, object_type=object_type, object_name=object_name, object_schema=object_schema)
             # Convert results to string if it's not already
             formatted_results = str(results) if results else "No results found"
+        elif action_type == 'extract_schema_ddl':
+            args = event['arguments'] if 'arguments' in event else event
+            object_types = args.get('object_types')
+            if isinstance(object_types, str):
+                object_types = [t.strip() for t in object_types.split(',') if t.strip()]
+            print("Generating the DDL script for the schema")
+            results = extract_schema_ddl(secret_name, args.get('object_schema'), object_types=object_types)
+            formatted_results = format_schema_ddl(results)
         elif action_type == 'execute_query':
             query = event.get('query') if 'arguments' not in event else event['arguments'].get('query')
             print("Executing read-only queries")
@@ -1816,10 +1695,14 @@ def lambda_handler(event, context):
             print("I'm inside else condition")
             return {
                 "functionResponse": {
-                    "content": f"Error: Unknown action_type '{action_type}'. Available actions: explain_query, extract_ddl, execute_query, enhanced_query_diagnostics, performance_insights_analysis"
+                    "content": f"Error: Unknown action_type '{action_type}'. Available actions: explain_query, extract_ddl, extract_schema_ddl, execute_query, enhanced_query_diagnostics, performance_insights_analysis"
                 }
             }
 
+        print(f"Connection manager stats: {get_connection_manager().stats()}")
+        print(f"Plan cache stats: {plan_cache.get_plan_cache().stats()}")
+        print(f"Catalog cache stats: {catalog_loader.get_catalog_cache().stats()}")
+
         # Format the response properly
         response_body = {
             'TEXT': {
@@ -1,29 +1,13 @@
 
 import json
-import boto3
-import psycopg2
-import os
-from botocore.exceptions import ClientError
+import time
+from concurrent.futures import ThreadPoolExecutor
 
-def get_secret(secret_name):
-    """Get secret from AWS Secrets Manager """
-    #secret_name = os.environ['SECRET_NAME']
-    region_name = os.environ['REGION']
-    
-    session = boto3.session.Session()
-    client = session.client(
-        service_name='secretsmanager',
-        region_name=region_name
-    )
-    
-    try:
-        secret_value = client.get_secret_value(SecretId=secret_name)
-        secret = json.loads(secret_value['SecretString'])
-        return secret
-    except ClientError as e:
-        raise Exception(f"Failed to get secret: {str(e)}")
+from db_connection import get_env_secret, get_connection_manager
+from query_fanout import QueryFanout
+from stat_snapshots import capture_snapshot, compute_deltas, get_snapshot_store, rank_deltas
 
-def execute_slow_query(secret_name, min_exec_time):
+def execute_slow_query(secret_name, min_exec_time, fanout=None):
     """Execute enhanced slow query analysis based on runbooks.py diagnostics"""
     queries = {
         "active_slow_queries": """
@@ -151,41 +135,15 @@ def execute_slow_query(secret_name, min_exec_time):
     }
     
     print("Connecting to the database...")
-    conn = None
+    fanout = fanout or QueryFanout(secret_name)
     try:
-        conn = connect_to_db(secret_name)
-        print("Connected to the database.")
-    
         # First, ensure pg_stat_statements is installed
-        print(" I am here 1")
-        with conn.cursor() as cur:
-            print(" I am here 2")
-            cur.execute("""
-                CREATE EXTENSION IF NOT EXISTS pg_stat_statements;
-            """)
-            conn.commit()
-        print(" I am here 3") 
-        # Execute the main query
-        
-        results = {}
-        # Execute each query and collect results
-        for query_name, query in queries.items():
-            print(" I am here 4")
-            with conn.cursor() as cur:
-                print(" I am here 5")
-                cur.execute(query)
-                print(" I am here 6")
-                columns = [desc[0] for desc in cur.description]
-                rows = cur.fetchall()
-                results[query_name] = [dict(zip(columns, row)) for row in rows]
-            print(" I am here 7")
-        return results
-            
+        fanout.ensure_extension('pg_stat_statements')
+
+        # Independent queries run concurrently on pooled read-only connections
+        return fanout.run(queries, params={'slow_queries_detailed': (min_exec_time,)}, prefix='slow_query')
     except Exception as e:
         raise Exception(f"Failed to retrieve slow queries: {str(e)}")
-    finally:
-        if conn:
-            conn.close()
 
 def format_results_for_slow_query(results):
     """Format results in a human-readable string"""
@@ -251,7 +209,7 @@ def format_results_for_slow_query(results):
         output += "No blocking queries found.\n"
     return output
 
-def execute_connect_issues(secret_name, min_exec_time):
+def execute_connect_issues(secret_name, min_exec_time, fanout=None):
     """Execute connection management related queries"""
     queries = {
         "current_connections": """
@@ -324,44 +282,15 @@ def execute_connect_issues(secret_name, min_exec_time):
         """
     }
     
-    conn = None
+    fanout = fanout or QueryFanout(secret_name)
     try:
-        conn = connect_to_db(secret_name)
         # First, ensure pg_stat_statements is installed
-        
-        with conn.cursor() as cur:
-            cur.execute("""
-                CREATE EXTENSION IF NOT EXISTS pg_stat_statements;
-            """)
-            conn.commit()
-            
-        # Execute the main query
-        
-        results = {}
-        
-        # Execute each query and collect results
-        for query_name, query in queries.items():
-            
-            try:
-                with conn.cursor() as cur:
-                    
-                    cur.execute(query)
-                   
-                    columns = [desc[0] for desc in cur.description]
-                    rows = cur.fetchall()
-                    results[query_name] = [dict(zip(columns, row)) for row in rows]
-                 
-            except Exception as e:
-                print(f"Error executing {query_name}: {str(e)}")
-                results[query_name] = []
-                
-        return results
-            
+        fanout.ensure_extension('pg_stat_statements')
+
+        # Independent queries run concurrently on pooled read-only connections
+        return fanout.run(queries, prefix='connection_management_issues')
     except Exception as e:
         raise Exception(f"Failed to retrieve connection metrics: {str(e)}")
-    finally:
-        if conn:
-            conn.close()
 
 def format_results_for_conn_issues(results):
     """Format connection management results in a human-readable string"""
@@ -435,7 +364,7 @@ def format_results_for_conn_issues(results):
     
     return output
 
-def execute_index_analysis(secret_name):
+def execute_index_analysis(secret_name, fanout=None):
     """Execute index-related analysis queries"""
     queries = {
         "unused_indexes": """
@@ -477,39 +406,15 @@ def execute_index_analysis(secret_name):
         """
     }
     
-    conn = None
+    fanout = fanout or QueryFanout(secret_name)
     try:
-        conn = connect_to_db(secret_name)
         # First, ensure pg_stat_statements is installed
-        
-        with conn.cursor() as cur:
-            cur.execute("""
-                CREATE EXTENSION IF NOT EXISTS pg_stat_statements;
-            """)
-            conn.commit()
-            
-        # Execute the main query    
-        results = {}
-        
-        # Execute each query and collect results
-        for query_name, query in queries.items():
-            try:
-                with conn.cursor() as cur:
-                    cur.execute(query)
-                    columns = [desc[0] for desc in cur.description]
-                    rows = cur.fetchall()
-                    results[query_name] = [dict(zip(columns, row)) for row in rows]
-            except Exception as e:
-                print(f"Error executing {query_name}: {str(e)}")
-                results[query_name] = []
-                
-        return results
-            
+        fanout.ensure_extension('pg_stat_statements')
+
+        # Independent queries run concurrently on pooled read-only connections
+        return fanout.run(queries, prefix='index_analysis')
     except Exception as e:
         raise Exception(f"Failed to retrieve index metrics: {str(e)}")
-    finally:
-        if conn:
-            conn.close()
     
 def format_results_for_index_analysis(results):
     """Format index analysis results in a human-readable string"""
@@ -562,7 +467,7 @@ def format_results_for_index_analysis(results):
     
     return output
 
-def execute_autovacuum_analysis(secret_name):
+def execute_autovacuum_analysis(secret_name, fanout=None):
     """Execute enhanced autovacuum-related analysis queries based on runbooks.py diagnostics"""
     queries = {
         "current_vacuum_progress": """
@@ -692,39 +597,15 @@ def execute_autovacuum_analysis(secret_name):
         """
     }
     
-    conn = None
+    fanout = fanout or QueryFanout(secret_name)
     try:
-        conn = connect_to_db(secret_name)
         # First, ensure pg_stat_statements is installed
-        
-        with conn.cursor() as cur:
-            cur.execute("""
-                CREATE EXTENSION IF NOT EXISTS pg_stat_statements;
-            """)
-            conn.commit()
-            
-        # Execute the main query    
-        results = {}
-        
-        # Execute each query and collect results
-        for query_name, query in queries.items():
-            try:
-                with conn.cursor() as cur:
-                    cur.execute(query)
-                    columns = [desc[0] for desc in cur.description]
-                    rows = cur.fetchall()
-                    results[query_name] = [dict(zip(columns, row)) for row in rows]
-            except Exception as e:
-                print(f"Error executing {query_name}: {str(e)}")
-                results[query_name] = []
-                
-        return results
-            
+        fanout.ensure_extension('pg_stat_statements')
+
+        # Independent queries run concurrently on pooled read-only connections
+        return fanout.run(queries, prefix='autovacuum_analysis')
     except Exception as e:
         raise Exception(f"Failed to retrieve autovacuum metrics: {str(e)}")
-    finally:
-        if conn:
-            conn.close()
 
 def format_results_for_autovacuum_analysis(results):
     """Format autovacuum analysis results in a human-readable string"""
@@ -794,7 +675,7 @@ def format_results_for_autovacuum_analysis(results):
     
     return output
 
-def execute_io_analysis(secret_name):
+def execute_io_analysis(secret_name, fanout=None):
     """Execute I/O-related analysis queries"""
     queries = {
         "buffer_usage": """
@@ -840,37 +721,15 @@ def execute_io_analysis(secret_name):
         """
     }
     
-    conn = connect_to_db(secret_name)
+    fanout = fanout or QueryFanout(secret_name)
     try:
         # First, ensure pg_stat_statements is installed
-        
-        with conn.cursor() as cur:
-            cur.execute("""
-                CREATE EXTENSION IF NOT EXISTS pg_stat_statements;
-            """)
-            conn.commit()
-        
-        results = {}
-        
-        # Execute each query and collect results
-        for query_name, query in queries.items():
-            try:
-                with conn.cursor() as cur:
-                    cur.execute(query)
-                    columns = [desc[0] for desc in cur.description]
-                    rows = cur.fetchall()
-                    results[query_name] = [dict(zip(columns, row)) for row in rows]
-            except Exception as e:
-                print(f"Error executing {query_name}: {str(e)}")
-                results[query_name] = []
-                
-        return results
-            
+        fanout.ensure_extension('pg_stat_statements')
+
+        # Independent queries run concurrently on pooled read-only connections
+        return fanout.run(queries, prefix='io_analysis')
     except Exception as e:
         raise Exception(f"Failed to retrieve I/O metrics: {str(e)}")
-    finally:
-        if conn:
-            conn.close()
 
 def format_results_for_io_analysis(results):
     """Format I/O analysis results in a human-readable string"""
@@ -942,7 +801,7 @@ def format_results_for_io_analysis(results):
     
     return output
 
-def execute_replication_analysis(secret_name):
+def execute_replication_analysis(secret_name, fanout=None):
     """Execute replication-related analysis queries"""
     queries = {
         "aurora_replica_status": """
@@ -981,36 +840,15 @@ def execute_replication_analysis(secret_name):
         """
     }
     
-    conn = connect_to_db(secret_name)
+    fanout = fanout or QueryFanout(secret_name)
     try:
         # First, ensure pg_stat_statements is installed
-        
-        with conn.cursor() as cur:
-            cur.execute("""
-                CREATE EXTENSION IF NOT EXISTS pg_stat_statements;
-            """)
-            conn.commit()
-        results = {}
-        
-        # Execute each query and collect results
-        for query_name, query in queries.items():
-            try:
-                with conn.cursor() as cur:
-                    cur.execute(query)
-                    columns = [desc[0] for desc in cur.description]
-                    rows = cur.fetchall()
-                    results[query_name] = [dict(zip(columns, row)) for row in rows]
-            except Exception as e:
-                print(f"Error executing {query_name}: {str(e)}")
-                results[query_name] = []
-                
-        return results
-            
+        fanout.ensure_extension('pg_stat_statements')
+
+        # Independent queries run concurrently on pooled read-only connections
+        return fanout.run(queries, prefix='replication_analysis')
     except Exception as e:
         raise Exception(f"Failed to retrieve replication metrics: {str(e)}")
-    finally:
-        if conn:
-            conn.close()
 
 def format_results_for_replication_analysis(results):
     """Format replication analysis results in a human-readable string"""
@@ -1078,7 +916,7 @@ def format_results_for_replication_analysis(results):
     
     return output
 
-def execute_system_health(secret_name):
+def execute_system_health(secret_name, fanout=None):
     """Execute system health-related analysis queries"""
     queries = {
         "database_statistics": """
@@ -1131,37 +969,15 @@ def execute_system_health(secret_name):
         """
     }
     
-    conn = connect_to_db(secret_name)
+    fanout = fanout or QueryFanout(secret_name)
     try:
         # First, ensure pg_stat_statements is installed
-        
-        with conn.cursor() as cur:
-            cur.execute("""
-                CREATE EXTENSION IF NOT EXISTS pg_stat_statements;
-            """)
-            conn.commit()
-        
-        results = {}
-        
-        # Execute each query and collect results
-        for query_name, query in queries.items():
-            try:
-                with conn.cursor() as cur:
-                    cur.execute(query)
-                    columns = [desc[0] for desc in cur.description]
-                    rows = cur.fetchall()
-                    results[query_name] = [dict(zip(columns, row)) for row in rows]
-            except Exception as e:
-                print(f"Error executing {query_name}: {str(e)}")
-                results[query_name] = []
-                
-        return results
-            
+        fanout.ensure_extension('pg_stat_statements')
+
+        # Independent queries run concurrently on pooled read-only connections
+        return fanout.run(queries, prefix='system_health')
     except Exception as e:
         raise Exception(f"Failed to retrieve system health metrics: {str(e)}")
-    finally:
-        if conn:
-            conn.close()
 
 def format_results_for_system_health(results):
     """Format system health analysis results in a human-readable string"""
@@ -1255,55 +1071,7 @@ def format_results_for_system_health(results):
     
     return output
 
-def connect_to_db(secret_name):
-    """Establish database connection"""
-    cur_secret = secret_name
-    secret = get_secret(cur_secret)
-    try:
-        print("in connect_to_db")
-        conn = psycopg2.connect(
-            host=secret['host'],
-            database=secret['dbname'],
-            user=secret['username'],
-            password=secret['password'],
-            port=secret['port']
-        )
-        return conn
-    except Exception as e:
-        raise Exception(f"Failed to connect to the database: {str(e)}")
-
-def get_env_secret(environment):
-    ssm_client = boto3.client('ssm')
-    print("in get_env_secret")
-    """Retrieve the secret name for the specified environment"""
-    if environment == 'prod':
-        print("in get_env_secret1")
-        try:
-            # Get the secret name from Parameter Store
-            print("in get_env_secret-try")
-            response = ssm_client.get_parameter(
-                Name=f'/AuroraOps/{environment}'
-            )
-            print(response['Parameter']['Value'])
-            return response['Parameter']['Value']
-        except ssm_client.exceptions.ParameterNotFound:
-            error_message = f"Parameter not found: /AuroraOps/{environment}"
-            print(error_message)
-            raise Exception(error_message)
-    elif environment == 'dev':
-        try:
-            # Get the secret name from Parameter Store
-            response = ssm_client.get_parameter(
-                Name=f'/AuroraOps/{environment}'
-            )
-            return response['Parameter']['Value']
-        except Exception as e:
-            raise Exception(f"Failed to get dev secret name from Parameter Store: {str(e)}")
-    else:
-        print("environement does not exist")
-        raise ValueError(f"Unknown environment: {environment}")
-
-def execute_vacuum_progress_analysis(secret_name):
+def execute_vacuum_progress_analysis(secret_name, fanout=None):
     """Execute current vacuum progress analysis based on runbooks.py"""
     query = """
         -- Current vacuum progress (from runbooks.py)
@@ -1326,21 +1094,13 @@ def execute_vacuum_progress_analysis(secret_name):
         ORDER BY now() - a.xact_start DESC;
     """
     
-    conn = None
+    fanout = fanout or QueryFanout(secret_name)
     try:
-        conn = connect_to_db(secret_name)
-        with conn.cursor() as cur:
-            cur.execute(query)
-            columns = [desc[0] for desc in cur.description]
-            rows = cur.fetchall()
-            return [dict(zip(columns, row)) for row in rows]
+        return fanout.fetch_all(query, name='vacuum_progress')
     except Exception as e:
         raise Exception(f"Failed to retrieve vacuum progress: {str(e)}")
-    finally:
-        if conn:
-            conn.close()
 
-def execute_xid_analysis(secret_name):
+def execute_xid_analysis(secret_name, fanout=None):
     """Execute XID wraparound analysis based on runbooks.py"""
     queries = {
         "oldest_xid_all_databases": """
@@ -1379,30 +1139,14 @@ def execute_xid_analysis(secret_name):
         """
     }
     
-    conn = None
+    fanout = fanout or QueryFanout(secret_name)
     try:
-        conn = connect_to_db(secret_name)
-        results = {}
-        
-        for query_name, query in queries.items():
-            try:
-                with conn.cursor() as cur:
-                    cur.execute(query)
-                    columns = [desc[0] for desc in cur.description]
-                    rows = cur.fetchall()
-                    results[query_name] = [dict(zip(columns, row)) for row in rows]
-            except Exception as e:
-                print(f"Error executing {query_name}: {str(e)}")
-                results[query_name] = []
-                
-        return results
+        # Independent queries run concurrently on pooled read-only connections
+        return fanout.run(queries, prefix='xid_analysis')
     except Exception as e:
         raise Exception(f"Failed to retrieve XID analysis: {str(e)}")
-    finally:
-        if conn:
-            conn.close()
 
-def execute_bloat_analysis(secret_name):
+def execute_bloat_analysis(secret_name, fanout=None):
     """Execute table and index bloat analysis based on runbooks.py"""
     query = """
         -- Table and index bloat analysis (from runbooks.py)
@@ -1462,21 +1206,13 @@ def execute_bloat_analysis(secret_name):
         LIMIT 20;
     """
     
-    conn = None
+    fanout = fanout or QueryFanout(secret_name)
     try:
-        conn = connect_to_db(secret_name)
-        with conn.cursor() as cur:
-            cur.execute(query)
-            columns = [desc[0] for desc in cur.description]
-            rows = cur.fetchall()
-            return [dict(zip(columns, row)) for row in rows]
+        return fanout.fetch_all(query, name='bloat_analysis')
     except Exception as e:
         raise Exception(f"Failed to retrieve bloat analysis: {str(e)}")
-    finally:
-        if conn:
-            conn.close()
 
-def execute_long_running_transactions(secret_name):
+def execute_long_running_transactions(secret_name, fanout=None):
     """Execute long-running transaction analysis based on runbooks.py"""
     query = """
         -- Long-running transactions (from runbooks.py)
@@ -1492,19 +1228,11 @@ def execute_long_running_transactions(secret_name):
         ORDER BY xact_start;
     """
     
-    conn = None
+    fanout = fanout or QueryFanout(secret_name)
     try:
-        conn = connect_to_db(secret_name)
-        with conn.cursor() as cur:
-            cur.execute(query)
-            columns = [desc[0] for desc in cur.description]
-            rows = cur.fetchall()
-            return [dict(zip(columns, row)) for row in rows]
+        return fanout.fetch_all(query, name='long_running_transactions')
     except Exception as e:
         raise Exception(f"Failed to retrieve long-running transactions: {str(e)}")
-    finally:
-        if conn:
-            conn.close()
 
 def format_results_for_vacuum_progress(results):
     """Format vacuum progress results for display"""
@@ -1596,6 +1324,199 @@ def format_results_for_long_running_transactions(results):
     
     return output
 
+def execute_full_health_sweep(secret_name, min_exec_time):
+    """
+    Run every analysis in one invocation, sharing one QueryFanout so the
+    total number of database connections stays bounded
+
+    Returns:
+        dict: analysis name -> results (None if the analysis failed), plus
+              a 'sweep_summary' entry with timings and errors
+    """
+    fanout = QueryFanout(secret_name)
+    try:
+        # Create the extension once up front instead of racing from every analysis
+        fanout.ensure_extension('pg_stat_statements')
+    except Exception as e:
+        print(f"Error creating pg_stat_statements extension: {str(e)}")
+
+    analyses = {
+        'slow_query': lambda: execute_slow_query(secret_name, min_exec_time, fanout),
+        'connection_management_issues': lambda: execute_connect_issues(secret_name, min_exec_time, fanout),
+        'index_analysis': lambda: execute_index_analysis(secret_name, fanout),
+        'autovacuum_analysis': lambda: execute_autovacuum_analysis(secret_name, fanout),
+        'io_analysis': lambda: execute_io_analysis(secret_name, fanout),
+        'replication_analysis': lambda: execute_replication_analysis(secret_name, fanout),
+        'system_health': lambda: execute_system_health(secret_name, fanout),
+        'vacuum_progress': lambda: execute_vacuum_progress_analysis(secret_name, fanout),
+        'xid_analysis': lambda: execute_xid_analysis(secret_name, fanout),
+        'bloat_analysis': lambda: execute_bloat_analysis(secret_name, fanout),
+        'long_running_transactions': lambda: execute_long_running_transactions(secret_name, fanout)
+    }
+
+    start_time = time.time()
+    results = {}
+    analysis_errors = {}
+    # Analyses only schedule queries; the fanout's semaphore limits how many hit the database
+    with ThreadPoolExecutor(max_workers=len(analyses)) as pool:
+        futures = {name: pool.submit(run) for name, run in analyses.items()}
+        for name, future in futures.items():
+            try:
+                results[name] = future.result()
+            except Exception as e:
+                print(f"Error executing {name}: {str(e)}")
+                results[name] = None
+                analysis_errors[name] = str(e)
+
+    summary = fanout.summary()
+    summary['analysis_errors'] = analysis_errors
+    summary['execution_time'] = time.time() - start_time
+    results['sweep_summary'] = summary
+    return results
+
+def format_results_for_full_health_sweep(results):
+    """Format full health sweep results by concatenating each analysis report"""
+    formatters = {
+        'slow_query': format_results_for_slow_query,
+        'connection_management_issues': format_results_for_conn_issues,
+        'index_analysis': format_results_for_index_analysis,
+        'autovacuum_analysis': format_results_for_autovacuum_analysis,
+        'io_analysis': format_results_for_io_analysis,
+        'replication_analysis': format_results_for_replication_analysis,
+        'system_health': format_results_for_system_health,
+        'vacuum_progress': format_results_for_vacuum_progress,
+        'xid_analysis': format_results_for_xid_analysis,
+        'bloat_analysis': format_results_for_bloat_analysis,
+        'long_running_transactions': format_results_for_long_running_transactions
+    }
+    summary = results.get('sweep_summary', {})
+    timings = summary.get('timings_ms', {})
+
+    output = "Full Database Health Sweep\n\n"
+    output += f"Completed {len(formatters)} analyses in {summary.get('execution_time', 0):.2f} seconds "
+    output += f"using up to {summary.get('max_concurrency')} concurrent connections\n"
+    if timings:
+        slowest = sorted(timings.items(), key=lambda item: item[1], reverse=True)[:5]
+        output += "Slowest queries: " + ", ".join(f"{name} ({ms:.0f} ms)" for name, ms in slowest) + "\n"
+
+    for name, formatter in formatters.items():
+        output += f"\n\n##### {name.upper()} #####\n"
+        if results.get(name) is None:
+            output += f"⚠️ Analysis failed: {summary.get('analysis_errors', {}).get(name, 'unknown error')}\n"
+            continue
+        try:
+            output += formatter(results[name])
+        except Exception as e:
+            output += f"⚠️ Could not format results: {str(e)}\n"
+
+    query_errors = summary.get('errors', {})
+    if query_errors:
+        output += "\n\n=== QUERIES WITH PARTIAL RESULTS ===\n"
+        for name, error in query_errors.items():
+            output += f"• {name}: {error}\n"
+    return output
+
+def execute_capture_stat_snapshot(secret_name, fanout=None):
+    """
+    Capture pg_stat_statements counters and append them to the snapshot store
+
+    Intended to be invoked on a schedule so query_rate_analysis always has a
+    baseline for the requested window.
+    """
+    fanout = fanout or QueryFanout(secret_name)
+    store = get_snapshot_store(secret_name)
+    snapshot = capture_snapshot(fanout)
+    key = store.append(snapshot)
+    return {
+        'snapshot_key': key,
+        'captured_at': snapshot.captured_at,
+        'statements': snapshot.row_count,
+        'snapshots_stored': len(store.list_snapshots())
+    }
+
+def execute_query_rate_analysis(secret_name, window_minutes=60, limit=10, fanout=None):
+    """
+    Rank statements by what they cost during the last window_minutes
+
+    Captures a fresh snapshot, compares it with the stored snapshot closest to
+    the start of the window and ranks statements by calls/s, execution ms/s,
+    rows/s and shared block reads/s instead of by lifetime totals.
+
+    Returns:
+        dict: rankings, the actual window compared and snapshot details. If no
+              earlier snapshot exists yet, rankings is empty and the fresh
+              snapshot becomes the baseline for the next call.
+    """
+    fanout = fanout or QueryFanout(secret_name)
+    store = get_snapshot_store(secret_name)
+    snapshot = capture_snapshot(fanout)
+    baseline = store.baseline_for(snapshot.captured_at, window_minutes * 60)
+    store.append(snapshot)
+
+    results = {
+        'requested_window_minutes': window_minutes,
+        'statements': snapshot.row_count,
+        'rankings': {}
+    }
+    if baseline is None:
+        results['message'] = (
+            "No earlier snapshot was available, so the current counters were stored "
+            "as a baseline. Run this analysis again later to see rates."
+        )
+        return results
+
+    deltas = compute_deltas(baseline, snapshot)
+    results['window_seconds'] = deltas['elapsed_seconds']
+    results['active_statements'] = len(deltas['deltas'])
+    results['reset_statements'] = sum(1 for delta in deltas['deltas'] if delta['reset'])
+    results['rankings'] = rank_deltas(deltas, snapshot, limit=limit)
+    return results
+
+def format_results_for_capture_stat_snapshot(results):
+    """Format snapshot capture results in a human-readable string"""
+    output = "pg_stat_statements Snapshot\n\n"
+    output += f"• Stored as: {results['snapshot_key']}\n"
+    output += f"• Statements captured: {results['statements']}\n"
+    output += f"• Snapshots in history: {results['snapshots_stored']}\n"
+    return output
+
+def format_results_for_query_rate_analysis(results):
+    """Format query rate analysis results in a human-readable string"""
+    output = "Query Rate Analysis Report\n\n"
+    if not results['rankings']:
+        output += results.get('message', 'No statements executed during the window.') + "\n"
+        return output
+
+    window_minutes = results['window_seconds'] / 60
+    output += f"Window: {window_minutes:.1f} minutes (requested {results['requested_window_minutes']})\n"
+    output += f"Statements active in window: {results['active_statements']}\n"
+    if results['reset_statements']:
+        output += (f"Statements with reset counters (counted since they reappeared): "
+                   f"{results['reset_statements']}\n")
+
+    titles = {
+        'exec_ms_per_sec': 'TOP QUERIES BY EXECUTION TIME (ms/s)',
+        'calls_per_sec': 'TOP QUERIES BY CALLS (calls/s)',
+        'rows_per_sec': 'TOP QUERIES BY ROWS (rows/s)',
+        'shared_blks_read_per_sec': 'TOP QUERIES BY SHARED BLOCK READS (blocks/s)'
+    }
+    for metric, title in titles.items():
+        output += f"\n=== {title} ===\n"
+        ranked = results['rankings'].get(metric) or []
+        if not ranked:
+            output += "No statements found.\n"
+            continue
+        for idx, query in enumerate(ranked, 1):
+            output += f"\nQuery #{idx} (queryid {query['queryid']}):\n"
+            output += f"• Calls: {query['calls']} ({query['calls_per_sec']}/s)\n"
+            output += f"• Execution Time: {query['exec_ms_per_sec']} ms/s, avg {query['avg_exec_ms']} ms/call\n"
+            output += f"• Rows: {query['rows_per_sec']}/s\n"
+            output += f"• Shared Blocks Read: {query['shared_blks_read_per_sec']}/s\n"
+            if query['cache_hit_ratio_pct'] is not None:
+                output += f"• Cache Hit Ratio: {query['cache_hit_ratio_pct']}%\n"
+            output += f"• Query: {query['query']}\n"
+    return output
+
 def lambda_handler(event, context):
     try:
         print(f"Received event: {json.dumps(event)}")
@@ -1608,6 +1529,7 @@ def lambda_handler(event, context):
             action_type = args.get('action_type')
         else:
             # Use the flat structure
+            args = event
             environment = event.get('environment')
             action_type = event.get('action_type')
         
@@ -1670,13 +1592,28 @@ def lambda_handler(event, context):
             print("Executing long-running transactions analysis")
             results = execute_long_running_transactions(secret_name)
             formatted_output = format_results_for_long_running_transactions(results)
+        elif action_type == 'full_health_sweep':
+            print("Executing full health sweep")
+            results = execute_full_health_sweep(secret_name, min_exec_time)
+            formatted_output = format_results_for_full_health_sweep(results)
+        elif action_type == 'query_rate_analysis':
+            print("Executing query rate analysis")
+            window_minutes = int(args.get('window_minutes') or 60)
+            results = execute_query_rate_analysis(secret_name, window_minutes)
+            formatted_output = format_results_for_query_rate_analysis(results)
+        elif action_type == 'capture_stat_snapshot':
+            print("Capturing pg_stat_statements snapshot")
+            results = execute_capture_stat_snapshot(secret_name)
+            formatted_output = format_results_for_capture_stat_snapshot(results)
         else:
             return {
                 "functionResponse": {
-                    "content": f"Error: Unknown action_type '{action_type}'. Available actions: slow_query, connection_management_issues, index_analysis, autovacuum_analysis, io_analysis, replication_analysis, system_health, vacuum_progress, xid_analysis, bloat_analysis, long_running_transactions"
+                    "content": f"Error: Unknown action_type '{action_type}'. Available actions: slow_query, connection_management_issues, index_analysis, autovacuum_analysis, io_analysis, replication_analysis, system_health, vacuum_progress, xid_analysis, bloat_analysis, long_running_transactions, full_health_sweep, query_rate_analysis, capture_stat_snapshot"
                 }
             }
 
+        print(f"Connection manager stats: {get_connection_manager().stats()}")
+
         response_body = {
         'TEXT': {
             'body': formatted_output
@@ -0,0 +1,398 @@
+"""
+EXPLAIN plan cache and structured plan diffing for analyze_query_performance.
+
+Agents often ask about the same query several times in a conversation, and
+every explain_query call used to run EXPLAIN ANALYZE against the database
+again. Plans are cached per container, keyed by:
+
+- the secret (database) the plan came from
+- a fingerprint of the query's tokens, so whitespace, comments and keyword
+  case do not matter
+- the types of any bound parameters
+- a digest of the planner settings, server version and the latest
+  ANALYZE time, so configuration or statistics changes invalidate the entry
+- the plan mode (generic or analyzed)
+
+Entries expire after PLAN_CACHE_TTL_SECONDS. The last plan seen for each
+query is kept separately so that a fresh plan can be diffed node by node
+against the previous run (join strategy changes, row misestimates, buffer
+deltas), which makes regressions after deploys or statistics changes visible.
+
+This file is packaged next to lambda_function.py by create_lambda.sh.
+"""
+
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import sql_lexer
+from db_connection import TTLCache
+
+PLAN_CACHE_TTL_SECONDS = int(os.environ.get("PLAN_CACHE_TTL_SECONDS", "300"))
+PLAN_CACHE_SIZE = int(os.environ.get("PLAN_CACHE_SIZE", "128"))
+PLAN_HISTORY_SIZE = int(os.environ.get("PLAN_HISTORY_SIZE", "256"))
+# Planner settings are re-read at most this often per database
+SETTINGS_CACHE_TTL_SECONDS = 60
+# Estimated vs actual row ratio at which a node counts as misestimated
+MISESTIMATE_FACTOR = 10
+# Execution time or cost growth at which a re-run is reported as a regression
+REGRESSION_FACTOR = 1.5
+
+PLANNER_SETTINGS = (
+    "cpu_index_tuple_cost",
+    "cpu_operator_cost",
+    "cpu_tuple_cost",
+    "default_statistics_target",
+    "effective_cache_size",
+    "enable_bitmapscan",
+    "enable_hashagg",
+    "enable_hashjoin",
+    "enable_indexonlyscan",
+    "enable_indexscan",
+    "enable_material",
+    "enable_mergejoin",
+    "enable_nestloop",
+    "enable_partition_pruning",
+    "enable_seqscan",
+    "enable_sort",
+    "from_collapse_limit",
+    "geqo_threshold",
+    "jit",
+    "join_collapse_limit",
+    "max_parallel_workers_per_gather",
+    "plan_cache_mode",
+    "random_page_cost",
+    "seq_page_cost",
+    "work_mem",
+)
+
+SETTINGS_QUERY = """
+    SELECT current_setting('server_version_num') AS server_version,
+           (SELECT string_agg(name || '=' || setting, ',' ORDER BY name)
+            FROM pg_settings WHERE name = ANY(%s)) AS settings,
+           (SELECT max(greatest(last_analyze, last_autoanalyze))::text
+            FROM pg_stat_user_tables) AS last_analyze
+"""
+
+JOIN_NODE_TYPES = {"Nested Loop", "Hash Join", "Merge Join"}
+
+_settings_cache = TTLCache(SETTINGS_CACHE_TTL_SECONDS)
+
+
+def query_fingerprint(query):
+    """
+    Hash of a query's significant tokens
+
+    Whitespace, comments, keyword case and trailing semicolons are ignored;
+    literals are kept because they change both the plan and its actual rows.
+    """
+    tokens = sql_lexer.significant(sql_lexer.tokenize(query))
+    while tokens and tokens[-1].value == ";":
+        tokens.pop()
+    material = "\x00".join(f"{token.type}:{token.value}" for token in tokens)
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+def parameter_types(parameters):
+    """Python type names of the bound parameters, in order"""
+    return tuple(type(value).__name__ for value in parameters or ())
+
+
+def server_settings_digest(cur, secret_name):
+    """Digest of the planner-relevant server state, cached briefly per secret"""
+    digest = _settings_cache.get(secret_name)
+    if digest is None:
+        cur.execute(SETTINGS_QUERY, (list(PLANNER_SETTINGS),))
+        server_version, settings, last_analyze = cur.fetchone()
+        material = f"{server_version}\x00{settings}\x00{last_analyze}"
+        digest = hashlib.sha256(material.encode("utf-8")).hexdigest()
+        _settings_cache.set(secret_name, digest)
+    return digest
+
+
+class PlanCache:
+    """
+    Thread-safe LRU cache of EXPLAIN output with TTL expiry
+
+    Alongside the cache it remembers the most recent plan per
+    (secret, fingerprint, mode), which outlives TTL expiry and settings
+    changes so that the next run can be compared with it.
+    """
+
+    def __init__(
+        self, ttl_seconds=None, maxsize=None, history_size=None, clock=time.time
+    ):
+        self.ttl_seconds = ttl_seconds or PLAN_CACHE_TTL_SECONDS
+        self.maxsize = maxsize or PLAN_CACHE_SIZE
+        self.history_size = history_size or PLAN_HISTORY_SIZE
+        self.hits = 0
+        self.misses = 0
+        self._clock = clock
+        self._entries = OrderedDict()
+        self._history = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(secret_name, query, parameters, settings_digest, mode):
+        return (
+            secret_name,
+            query_fingerprint(query),
+            parameter_types(parameters),
+            settings_digest,
+            mode,
+        )
+
+    @staticmethod
+    def _history_key(key):
+        secret_name, fingerprint, param_types, _, mode = key
+        return (secret_name, fingerprint, param_types, mode)
+
+    def get(self, key):
+        """Cached entry (plan, captured_at) or None if missing or expired"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if (
+                entry is not None
+                and self._clock() - entry["captured_at"] >= self.ttl_seconds
+            ):
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key, plan):
+        """
+        Store a freshly captured plan
+
+        Returns:
+            tuple: (new entry, previous entry for the same query or None)
+        """
+        entry = {"plan": plan, "captured_at": self._clock(), "fingerprint": key[1]}
+        history_key = self._history_key(key)
+        with self._lock:
+            previous = self._history.get(history_key)
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+            self._history[history_key] = entry
+            self._history.move_to_end(history_key)
+            while len(self._history) > self.history_size:
+                self._history.popitem(last=False)
+        return entry, previous
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._history.clear()
+            self.hits = self.misses = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "size": len(self._entries),
+                "history": len(self._history),
+                "ttl_seconds": self.ttl_seconds,
+            }
+
+
+plan_cache = PlanCache()
+
+
+def get_plan_cache():
+    return plan_cache
+
+
+def _misestimate(estimated, actual):
+    """How many times the estimate was off, in either direction"""
+    if estimated is None or actual is None:
+        return None
+    high, low = max(estimated, actual), min(estimated, actual)
+    return round(high / max(low, 1), 1)
+
+
+def flatten_plan(plan):
+    """
+    Flatten an EXPLAIN (FORMAT JSON) plan into per-node records
+
+    Args:
+        plan (dict): Top-level plan object (with a 'Plan' key)
+
+    Returns:
+        list: One dict per node in depth-first order. 'path' identifies the
+              node by child positions from the root ("0", "0.1", ...).
+    """
+    nodes = []
+
+    def walk(node, path, depth):
+        actual_rows = node.get("Actual Rows")
+        nodes.append(
+            {
+                "path": path,
+                "depth": depth,
+                "node_type": node.get("Node Type"),
+                "join_type": node.get("Join Type"),
+                "relation": node.get("Relation Name"),
+                "index": node.get("Index Name"),
+                "estimated_rows": node.get("Plan Rows"),
+                "actual_rows": actual_rows,
+                "loops": node.get("Actual Loops"),
+                "misestimate": _misestimate(node.get("Plan Rows"), actual_rows),
+                "total_cost": node.get("Total Cost"),
+                "actual_total_time": node.get("Actual Total Time"),
+                "shared_hit_blocks": node.get("Shared Hit Blocks"),
+                "shared_read_blocks": node.get("Shared Read Blocks"),
+                "temp_written_blocks": node.get("Temp Written Blocks"),
+            }
+        )
+        for index, child in enumerate(node.get("Plans", [])):
+            walk(child, f"{path}.{index}", depth + 1)
+
+    walk(plan["Plan"], "0", 0)
+    return nodes
+
+
+def _describe(node):
+    target = node["relation"] or node["index"]
+    return f"{node['node_type']} on {target}" if target else node["node_type"]
+
+
+def _growth(old, new):
+    if old in (None, 0) or new is None:
+        return None
+    return round(new / old, 2)
+
+
+def diff_plans(old_plan, new_plan):
+    """
+    Node-level comparison of two EXPLAIN (FORMAT JSON) runs of the same query
+
+    Nodes are matched by their position in the tree. Reported change kinds:
+    join_strategy, node_type, access_path, node_added, node_removed,
+    misestimate, misestimate_resolved and buffers.
+
+    Returns:
+        dict: summary totals for both runs, whether the plan shape changed,
+              whether it looks like a regression, and the list of changes
+    """
+    old_nodes = {node["path"]: node for node in flatten_plan(old_plan)}
+    new_nodes = {node["path"]: node for node in flatten_plan(new_plan)}
+    changes = []
+
+    def sort_key(path):
+        return [int(part) for part in path.split(".")]
+
+    for path in sorted(set(old_nodes) | set(new_nodes), key=sort_key):
+        old, new = old_nodes.get(path), new_nodes.get(path)
+        if old is None:
+            changes.append({"path": path, "kind": "node_added", "new": _describe(new)})
+            continue
+        if new is None:
+            changes.append(
+                {"path": path, "kind": "node_removed", "old": _describe(old)}
+            )
+            continue
+
+        if old["node_type"] != new["node_type"]:
+            both_joins = (
+                old["node_type"] in JOIN_NODE_TYPES
+                and new["node_type"] in JOIN_NODE_TYPES
+            )
+            changes.append(
+                {
+                    "path": path,
+                    "kind": "join_strategy" if both_joins else "node_type",
+                    "old": _describe(old),
+                    "new": _describe(new),
+                }
+            )
+        elif (old["relation"], old["index"]) != (new["relation"], new["index"]):
+            changes.append(
+                {
+                    "path": path,
+                    "kind": "access_path",
+                    "old": _describe(old),
+                    "new": _describe(new),
+                }
+            )
+
+        old_bad = (old["misestimate"] or 0) >= MISESTIMATE_FACTOR
+        new_bad = (new["misestimate"] or 0) >= MISESTIMATE_FACTOR
+        if new_bad and not old_bad:
+            changes.append(
+                {
+                    "path": path,
+                    "kind": "misestimate",
+                    "node": _describe(new),
+                    "estimated_rows": new["estimated_rows"],
+                    "actual_rows": new["actual_rows"],
+                    "factor": new["misestimate"],
+                }
+            )
+        elif old_bad and not new_bad:
+            changes.append(
+                {
+                    "path": path,
+                    "kind": "misestimate_resolved",
+                    "node": _describe(new),
+                    "old_factor": old["misestimate"],
+                    "factor": new["misestimate"],
+                }
+            )
+
+        buffer_deltas = {}
+        for name in ("shared_hit_blocks", "shared_read_blocks", "temp_written_blocks"):
+            if (
+                old[name] is not None
+                and new[name] is not None
+                and old[name] != new[name]
+            ):
+                buffer_deltas[name] = new[name] - old[name]
+        if buffer_deltas.get("shared_read_blocks") or buffer_deltas.get(
+            "temp_written_blocks"
+        ):
+            changes.append(
+                {
+                    "path": path,
+                    "kind": "buffers",
+                    "node": _describe(new),
+                    "deltas": buffer_deltas,
+                }
+            )
+
+    old_root, new_root = old_nodes["0"], new_nodes["0"]
+    summary = {
+        "old_total_cost": old_root["total_cost"],
+        "new_total_cost": new_root["total_cost"],
+        "cost_growth": _growth(old_root["total_cost"], new_root["total_cost"]),
+        "old_execution_time_ms": old_plan.get("Execution Time"),
+        "new_execution_time_ms": new_plan.get("Execution Time"),
+        "execution_time_growth": _growth(
+            old_plan.get("Execution Time"), new_plan.get("Execution Time")
+        ),
+        "old_shared_read_blocks": old_root["shared_read_blocks"],
+        "new_shared_read_blocks": new_root["shared_read_blocks"],
+    }
+    structure_changed = any(
+        change["kind"]
+        in ("join_strategy", "node_type", "access_path", "node_added", "node_removed")
+        for change in changes
+    )
+    regression = any(
+        growth is not None and growth >= REGRESSION_FACTOR
+        for growth in (summary["cost_growth"], summary["execution_time_growth"])
+    )
+    return {
+        "structure_changed": structure_changed,
+        "regression": regression,
+        "summary": summary,
+        "changes": changes,
+    }
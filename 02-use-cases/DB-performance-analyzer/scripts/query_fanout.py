@@ -0,0 +1,245 @@
+"""
+Concurrent execution of independent diagnostic queries.
+
+Each analysis in pgstat_analyse_database.py is a dict of catalog queries that
+do not depend on each other. QueryFanout runs them over several pooled,
+read-only connections at once, so an analysis takes roughly as long as its
+slowest query instead of the sum of all of them. A failing or timed-out query
+only empties its own entry; the rest of the analysis is still returned.
+
+This file is packaged next to lambda_function.py by create_lambda.sh.
+"""
+
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from db_connection import connect_to_db, release_connection
+
+FANOUT_MAX_CONCURRENCY = int(os.environ.get("FANOUT_MAX_CONCURRENCY", "4"))
+FANOUT_STATEMENT_TIMEOUT_MS = int(
+    os.environ.get("FANOUT_STATEMENT_TIMEOUT_MS", "30000")
+)
+# Extra wall-clock allowance on top of statement_timeout for connect/fetch
+FANOUT_GRACE_SECONDS = 5
+# How often run() checks running queries against their deadline
+FANOUT_POLL_SECONDS = 0.1
+
+# (secret_name, extension) pairs already created by this container
+_extensions_ready = set()
+_extensions_lock = threading.Lock()
+
+
+class QueryTimeoutError(Exception):
+    """Raised when a query is still running after its wall-clock deadline"""
+
+
+class QueryFanout:
+    """
+    Runs sets of independent read-only queries concurrently for one secret.
+
+    A single instance can be shared by several analyses (see the
+    full_health_sweep action): the semaphore bounds the number of database
+    connections in use across all of them, and per-query timings and errors
+    are collected in one place.
+    """
+
+    def __init__(self, secret_name, max_concurrency=None, statement_timeout_ms=None):
+        self.secret_name = secret_name
+        self.max_concurrency = max(1, max_concurrency or FANOUT_MAX_CONCURRENCY)
+        self.statement_timeout_ms = statement_timeout_ms or FANOUT_STATEMENT_TIMEOUT_MS
+        self.timings = {}
+        self.errors = {}
+        self._slots = threading.BoundedSemaphore(self.max_concurrency)
+        self._lock = threading.Lock()
+        self._running = {}
+        self._started = {}
+
+    def ensure_extension(self, extension):
+        """CREATE EXTENSION IF NOT EXISTS, once per container and secret"""
+        key = (self.secret_name, extension)
+        with _extensions_lock:
+            if key in _extensions_ready:
+                return
+        conn = connect_to_db(self.secret_name)
+        try:
+            with conn.cursor() as cur:
+                cur.execute(f"CREATE EXTENSION IF NOT EXISTS {extension};")
+            conn.commit()
+        finally:
+            release_connection(conn)
+        with _extensions_lock:
+            _extensions_ready.add(key)
+
+    def _record(self, key, elapsed_ms, error=None):
+        with self._lock:
+            self.timings[key] = round(elapsed_ms, 1)
+            if error is not None:
+                self.errors[key] = error
+
+    def _execute(self, key, query, params, abandoned=None):
+        with self._slots:
+            start = time.perf_counter()
+            if abandoned is not None and abandoned.is_set():
+                # run() already gave up on this query while it waited for a slot
+                raise QueryTimeoutError(
+                    f"{key} got no connection slot before the analysis ended"
+                )
+            with self._lock:
+                self._started[key] = start
+            conn = None
+            try:
+                conn = connect_to_db(self.secret_name)
+                with self._lock:
+                    self._running[key] = conn
+                with conn.cursor() as cur:
+                    cur.execute("SET TRANSACTION READ ONLY")
+                    cur.execute(
+                        f"SET LOCAL statement_timeout = {int(self.statement_timeout_ms)}"
+                    )
+                    cur.execute(query, params)
+                    columns = [desc[0] for desc in cur.description]
+                    rows = cur.fetchall()
+                self._record(key, (time.perf_counter() - start) * 1000)
+                return [dict(zip(columns, row)) for row in rows]
+            except Exception as e:
+                self._record(key, (time.perf_counter() - start) * 1000, str(e))
+                raise
+            finally:
+                with self._lock:
+                    self._running.pop(key, None)
+                    self._started.pop(key, None)
+                if conn is not None:
+                    release_connection(conn)
+
+    def _cancel(self, keys):
+        """Ask the server to cancel queries that overran their deadline"""
+        with self._lock:
+            conns = [self._running.get(key) for key in keys]
+        for conn in conns:
+            if conn is not None:
+                try:
+                    conn.cancel()
+                except Exception as e:
+                    print(f"Error cancelling query: {str(e)}")
+
+    def run(self, queries, params=None, prefix=None):
+        """
+        Execute a dict of named queries concurrently
+
+        Args:
+            queries (dict): query name -> SQL text
+            params (dict, optional): query name -> parameters for that query
+            prefix (str, optional): label used for the timings/errors keys
+
+        Returns:
+            dict: query name -> list of row dicts ([] if the query failed)
+        """
+        params = params or {}
+        results = {name: [] for name in queries}
+        if not queries:
+            return results
+
+        def key_for(name):
+            return f"{prefix}.{name}" if prefix else name
+
+        # A query's deadline starts when it gets a connection slot, so time spent
+        # queued behind other queries of a shared fanout does not count
+        deadline = self.statement_timeout_ms / 1000.0 + FANOUT_GRACE_SECONDS
+        abandoned = threading.Event()
+        pool = ThreadPoolExecutor(max_workers=min(self.max_concurrency, len(queries)))
+        try:
+            futures = {
+                pool.submit(
+                    self._execute, key_for(name), query, params.get(name), abandoned
+                ): name
+                for name, query in queries.items()
+            }
+            started = {}
+            cancelled = set()
+            timed_out = {}
+            pending = set(futures)
+            run_started = last_progress = time.perf_counter()
+            while pending:
+                done, pending = wait(
+                    pending, timeout=FANOUT_POLL_SECONDS, return_when=FIRST_COMPLETED
+                )
+                now = time.perf_counter()
+                if done:
+                    last_progress = now
+                with self._lock:
+                    for future in pending:
+                        start = self._started.get(key_for(futures[future]))
+                        if future not in started and start is not None:
+                            started[future] = start
+                            last_progress = now
+
+                overdue = [
+                    future
+                    for future in pending
+                    if future in started
+                    and future not in cancelled
+                    and now - started[future] > deadline
+                ]
+                if overdue:
+                    self._cancel([key_for(futures[future]) for future in overdue])
+                    cancelled.update(overdue)
+
+                # Stop waiting for queries that ignored the cancel request
+                for future in list(pending):
+                    if (
+                        future in cancelled
+                        and now - started[future] > deadline + FANOUT_GRACE_SECONDS
+                    ):
+                        timed_out[future] = f"exceeded {deadline:.0f}s"
+                        pending.discard(future)
+                # Nothing started or finished for a whole deadline: the slots are
+                # held by connections that no longer respond
+                if pending and now - last_progress > deadline + FANOUT_GRACE_SECONDS:
+                    for future in pending:
+                        timed_out[future] = (
+                            f"got no connection slot within {deadline + FANOUT_GRACE_SECONDS:.0f}s"
+                        )
+                    pending = set()
+
+            for future, name in futures.items():
+                key = key_for(name)
+                if future in timed_out:
+                    elapsed = time.perf_counter() - started.get(future, run_started)
+                    self._record(
+                        key,
+                        elapsed * 1000,
+                        str(QueryTimeoutError(f"{name} {timed_out[future]}")),
+                    )
+                    print(f"Error executing {name}: {timed_out[future]}")
+                    continue
+                try:
+                    results[name] = future.result()
+                except Exception as e:
+                    if future in cancelled and key not in self.errors:
+                        self._record(
+                            key,
+                            deadline * 1000,
+                            str(QueryTimeoutError(f"{name} exceeded {deadline:.0f}s")),
+                        )
+                    print(f"Error executing {name}: {str(e)}")
+                    results[name] = []
+        finally:
+            # Queries not started yet must not run after the analysis returned
+            abandoned.set()
+            pool.shutdown(wait=False, cancel_futures=True)
+        return results
+
+    def fetch_all(self, query, params=None, name="query"):
+        """Execute a single query through the shared slots; errors are raised"""
+        return self._execute(name, query, params)
+
+    def summary(self):
+        """Per-query timings and errors collected so far"""
+        with self._lock:
+            return {
+                "timings_ms": dict(self.timings),
+                "errors": dict(self.errors),
+                "max_concurrency": self.max_concurrency,
+            }
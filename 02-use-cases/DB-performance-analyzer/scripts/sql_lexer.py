@@ -0,0 +1,430 @@
+"""
+Single-pass SQL lexer used to validate and score agent-supplied queries.
+
+validate_query (statement splitting and the prohibited-operation check) and
+analyze_query_complexity in pg_analyze_performance.py both consume the token
+stream produced here, so quoting rules only have to be right in one place.
+The lexer understands the PostgreSQL constructs that substring matching gets
+wrong: '' escapes, E'' strings with backslash escapes, $$ and $tag$ dollar
+quoting, "quoted identifiers", -- line comments and nested /* */ comments.
+
+Every construct is consumed with a single forward scan, so lexing is linear
+in the length of the query. Results are memoised in an LRU cache keyed by the
+SHA-256 of the query text, because agents tend to send the same query again.
+
+This file is packaged next to lambda_function.py by create_lambda.sh.
+"""
+
+import hashlib
+import os
+import re
+import threading
+from collections import OrderedDict, namedtuple
+
+SQL_ANALYSIS_CACHE_SIZE = int(os.environ.get("SQL_ANALYSIS_CACHE_SIZE", "256"))
+
+# Token types
+WHITESPACE = "whitespace"
+COMMENT = "comment"
+STRING = "string"
+QUOTED_IDENTIFIER = "quoted_identifier"
+WORD = "word"  # keyword or unquoted identifier, value is lowercased
+NUMBER = "number"
+PARAMETER = "parameter"  # $1, $2, ...
+PUNCTUATION = "punctuation"
+OPERATOR = "operator"
+
+Token = namedtuple("Token", ["type", "value", "start", "end"])
+
+_WORD_RE = re.compile(r"[^\W\d]\w*(?:\$\w*)*", re.UNICODE)
+_NUMBER_RE = re.compile(r"(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?")
+_WHITESPACE_RE = re.compile(r"\s+")
+_PARAMETER_RE = re.compile(r"\$\d+")
+_DOLLAR_TAG_RE = re.compile(r"\$(?:[^\W\d]\w*)?\$", re.UNICODE)
+_OPERATOR_CHARS = set("+-*/<>=~!@#%^&|`?:")
+_PUNCTUATION_CHARS = set("(),;[].")
+
+_SKIPPED = (WHITESPACE, COMMENT)
+
+
+class SQLLexerError(ValueError):
+    """Raised for unterminated strings, identifiers or comments"""
+
+
+def _scan_quoted(text, pos, quote, backslash_escapes=False):
+    """Return the index just past the closing quote starting at text[pos] == quote"""
+    i = pos + 1
+    length = len(text)
+    close = -1
+    while True:
+        # Only search for the next quote once we have moved past the last one,
+        # so every character is examined a bounded number of times
+        if close < i:
+            close = text.find(quote, i)
+            if close == -1:
+                raise SQLLexerError(
+                    f"Unterminated quoted text starting at position {pos}"
+                )
+        if backslash_escapes:
+            backslash = text.find("\\", i, close)
+            if backslash != -1:
+                i = backslash + 2
+                continue
+        # A doubled quote is an escaped quote, not the end of the literal
+        if close + 1 < length and text[close + 1] == quote:
+            i = close + 2
+            continue
+        return close + 1
+
+
+def _scan_block_comment(text, pos):
+    """Return the index just past a (possibly nested) /* */ comment"""
+    depth = 0
+    i = pos
+    while True:
+        opening = text.find("/*", i)
+        closing = text.find("*/", i)
+        if closing == -1:
+            raise SQLLexerError(f"Unterminated comment starting at position {pos}")
+        if opening != -1 and opening < closing:
+            depth += 1
+            i = opening + 2
+        else:
+            depth -= 1
+            i = closing + 2
+            if depth == 0:
+                return i
+
+
+def tokenize(text):
+    """
+    Split SQL text into tokens in a single forward pass
+
+    Args:
+        text (str): SQL text, possibly containing several statements
+
+    Returns:
+        list: Token tuples (type, value, start, end); WORD values are lowercased
+
+    Raises:
+        SQLLexerError: If a string, identifier or comment is not terminated
+    """
+    tokens = []
+    append = tokens.append
+    pos = 0
+    length = len(text)
+
+    while pos < length:
+        char = text[pos]
+
+        if char.isspace():
+            end = _WHITESPACE_RE.match(text, pos).end()
+            append(Token(WHITESPACE, text[pos:end], pos, end))
+        elif char == "-" and text.startswith("--", pos):
+            end = text.find("\n", pos)
+            end = length if end == -1 else end + 1
+            append(Token(COMMENT, text[pos:end], pos, end))
+        elif char == "/" and text.startswith("/*", pos):
+            end = _scan_block_comment(text, pos)
+            append(Token(COMMENT, text[pos:end], pos, end))
+        elif char == "'":
+            end = _scan_quoted(text, pos, "'")
+            append(Token(STRING, text[pos:end], pos, end))
+        elif char in "eE" and text.startswith("'", pos + 1):
+            end = _scan_quoted(text, pos + 1, "'", backslash_escapes=True)
+            append(Token(STRING, text[pos:end], pos, end))
+        elif char == '"':
+            end = _scan_quoted(text, pos, '"')
+            append(Token(QUOTED_IDENTIFIER, text[pos:end], pos, end))
+        elif char == "$":
+            match = _PARAMETER_RE.match(text, pos)
+            if match:
+                end = match.end()
+                append(Token(PARAMETER, text[pos:end], pos, end))
+            else:
+                match = _DOLLAR_TAG_RE.match(text, pos)
+                if not match:
+                    end = pos + 1
+                    append(Token(OPERATOR, char, pos, end))
+                else:
+                    tag = match.group(0)
+                    close = text.find(tag, match.end())
+                    if close == -1:
+                        raise SQLLexerError(
+                            f"Unterminated dollar-quoted string starting at position {pos}"
+                        )
+                    end = close + len(tag)
+                    append(Token(STRING, text[pos:end], pos, end))
+        elif char.isdigit() or (
+            char == "." and pos + 1 < length and text[pos + 1].isdigit()
+        ):
+            end = _NUMBER_RE.match(text, pos).end()
+            append(Token(NUMBER, text[pos:end], pos, end))
+        elif char in _PUNCTUATION_CHARS:
+            end = pos + 1
+            append(Token(PUNCTUATION, char, pos, end))
+        elif char in _OPERATOR_CHARS:
+            end = pos + 1
+            while (
+                end < length
+                and text[end] in _OPERATOR_CHARS
+                and not text.startswith(("--", "/*"), end)
+            ):
+                end += 1
+            append(Token(OPERATOR, text[pos:end], pos, end))
+        else:
+            match = _WORD_RE.match(text, pos)
+            end = match.end() if match else pos + 1
+            append(
+                Token(
+                    WORD if match else OPERATOR,
+                    text[pos:end].lower() if match else char,
+                    pos,
+                    end,
+                )
+            )
+        pos = end
+
+    return tokens
+
+
+def significant(tokens):
+    """Drop whitespace and comments"""
+    return [token for token in tokens if token.type not in _SKIPPED]
+
+
+def split_statements(text, tokens=None):
+    """
+    Split SQL text on top-level semicolons
+
+    Returns:
+        list: (statement_text, significant_tokens) pairs; the statement text
+              keeps its comments but not the terminating semicolon
+    """
+    if tokens is None:
+        tokens = tokenize(text)
+    statements = []
+    current = []
+    start = None
+    for token in tokens:
+        if token.type == PUNCTUATION and token.value == ";":
+            if current:
+                statements.append((text[start : token.start].strip(), current))
+            current, start = [], None
+            continue
+        if start is None:
+            if token.type in _SKIPPED:
+                continue
+            start = token.start
+        if token.type not in _SKIPPED:
+            current.append(token)
+    if current:
+        statements.append((text[start:].strip(), current))
+    return statements
+
+
+def first_keyword(statement_tokens):
+    """First word of a statement, skipping leading parentheses"""
+    for token in statement_tokens:
+        if token.type == PUNCTUATION and token.value == "(":
+            continue
+        return token.value.lower() if token.type == WORD else token.value
+    return ""
+
+
+def words(statement_tokens):
+    """Set of keywords and unquoted identifiers used outside strings and comments"""
+    return {token.value for token in statement_tokens if token.type == WORD}
+
+
+AGGREGATE_FUNCTIONS = {"count", "sum", "avg", "max", "min"}
+
+
+def complexity_metrics(statement_tokens):
+    """
+    Score a statement's complexity from its significant tokens
+
+    Returns:
+        dict: complexity_score, warnings, join_count, subquery_count,
+              aggregation_count and cte_count
+    """
+    join_count = 0
+    subquery_count = 0
+    cte_count = 0
+    agg_count = 0
+    condition_count = 0
+    uses_window = False
+    seen_where = False
+    previous = None
+
+    for index, token in enumerate(statement_tokens):
+        nxt = statement_tokens[index + 1] if index + 1 < len(statement_tokens) else None
+        if token.type == WORD:
+            value = token.value
+            if value == "join":
+                join_count += 1
+            elif value == "where":
+                seen_where = True
+            elif value in ("and", "or") and seen_where:
+                condition_count += 1
+            elif nxt is not None and (
+                (value == "over" and nxt.value == "(")
+                or (value == "partition" and nxt.value == "by")
+            ):
+                uses_window = True
+            elif value in AGGREGATE_FUNCTIONS and nxt is not None and nxt.value == "(":
+                agg_count += 1
+        elif (
+            token.type == PUNCTUATION
+            and token.value == "("
+            and nxt is not None
+            and nxt.value == "select"
+        ):
+            # WITH name AS ( SELECT ... ) / AS MATERIALIZED ( SELECT ... ) defines a CTE
+            if (
+                previous is not None
+                and previous.type == WORD
+                and previous.value in ("as", "materialized")
+            ):
+                cte_count += 1
+            else:
+                subquery_count += 1
+        previous = token
+
+    warnings = []
+    complexity_score = (
+        join_count * 2
+        + subquery_count * 3
+        + cte_count * 2
+        + agg_count
+        + condition_count
+    )
+    if join_count > 3:
+        warnings.append(f"Query contains {join_count} joins - consider simplifying")
+    if subquery_count > 2:
+        warnings.append(
+            f"Query contains {subquery_count} subqueries - consider restructuring"
+        )
+    if cte_count > 3:
+        warnings.append(
+            f"Query contains {cte_count} CTEs - consider materializing intermediate results"
+        )
+    if uses_window:
+        complexity_score += 3
+        warnings.append("Query uses window functions - monitor performance")
+    if condition_count > 5:
+        warnings.append(f"Complex WHERE clause with {condition_count} conditions")
+
+    return {
+        "complexity_score": complexity_score,
+        "warnings": warnings,
+        "join_count": join_count,
+        "subquery_count": subquery_count,
+        "aggregation_count": agg_count,
+        "cte_count": cte_count,
+    }
+
+
+StatementInfo = namedtuple(
+    "StatementInfo", ["text", "first_keyword", "words", "complexity"]
+)
+SQLAnalysis = namedtuple("SQLAnalysis", ["statements", "complexity"])
+
+
+class LRUCache:
+    """Thread-safe least-recently-used cache"""
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = 0
+
+    def info(self):
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+            }
+
+
+_analysis_cache = LRUCache(SQL_ANALYSIS_CACHE_SIZE)
+
+
+def query_hash(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _copy_complexity(metrics):
+    copied = dict(metrics)
+    copied["warnings"] = list(metrics["warnings"])
+    return copied
+
+
+def analyze(text, use_cache=True):
+    """
+    Tokenize SQL text once and derive everything the validators need
+
+    Returns:
+        SQLAnalysis: per-statement info plus complexity metrics for the whole text.
+        Complexity dicts are copies, so callers may modify them freely.
+    """
+    key = query_hash(text)
+    analysis = _analysis_cache.get(key) if use_cache else None
+    if analysis is None:
+        tokens = tokenize(text)
+        statements = [
+            StatementInfo(
+                stmt_text,
+                first_keyword(stmt_tokens),
+                frozenset(words(stmt_tokens)),
+                complexity_metrics(stmt_tokens),
+            )
+            for stmt_text, stmt_tokens in split_statements(text, tokens)
+        ]
+        analysis = SQLAnalysis(
+            tuple(statements), complexity_metrics(significant(tokens))
+        )
+        if use_cache:
+            _analysis_cache.put(key, analysis)
+
+    return SQLAnalysis(
+        tuple(
+            stmt._replace(complexity=_copy_complexity(stmt.complexity))
+            for stmt in analysis.statements
+        ),
+        _copy_complexity(analysis.complexity),
+    )
+
+
+def cache_info():
+    return _analysis_cache.info()
+
+
+def clear_cache():
+    _analysis_cache.clear()
@@ -0,0 +1,480 @@
+"""
+Incremental pg_stat_statements snapshots and delta analysis.
+
+pg_stat_statements only exposes counters accumulated since the last stats
+reset, so rankings built directly on it describe history rather than what is
+expensive right now. This module captures compact per-statement counters,
+appends them to a snapshot store and ranks statements by their rates
+(calls/s, ms/s, rows/s, shared block reads/s) between two snapshots.
+
+Snapshots are immutable, append-only segment files named by capture time:
+
+    <prefix>/<source>/<captured_at_ms, 13 digits>-<random suffix>.pgss
+
+Listing a time range therefore needs no reads, and each segment stores its
+counters column by column (zlib-compressed typed arrays), so a scan that only
+needs two columns never decompresses the others or the query texts. The
+random suffix keeps snapshots taken in the same millisecond, e.g. by
+concurrent invocations, from overwriting each other.
+
+The store lives in a local directory (STAT_SNAPSHOT_DIR, /tmp by default,
+which only survives as long as the Lambda container) or in S3 when
+STAT_SNAPSHOT_BUCKET is set.
+
+This file is packaged next to lambda_function.py by create_lambda.sh.
+"""
+
+import json
+import os
+import re
+import struct
+import time
+import uuid
+import zlib
+from array import array
+
+import boto3
+
+STAT_SNAPSHOT_DIR = os.environ.get("STAT_SNAPSHOT_DIR", "/tmp/pg_stat_snapshots")
+STAT_SNAPSHOT_BUCKET = os.environ.get("STAT_SNAPSHOT_BUCKET")
+STAT_SNAPSHOT_PREFIX = os.environ.get("STAT_SNAPSHOT_PREFIX", "pg_stat_snapshots")
+# Query texts are only kept for display, so long statements are cut short
+QUERY_TEXT_MAX_CHARS = 1000
+
+SEGMENT_MAGIC = b"PGSS"
+SEGMENT_VERSION = 1
+SEGMENT_SUFFIX = ".pgss"
+_HEADER = struct.Struct("<4sBI")
+
+# Column name -> array typecode. queryid/userid/dbid identify a statement.
+KEY_COLUMNS = ("queryid", "userid", "dbid")
+COUNTER_COLUMNS = (
+    "calls",
+    "total_exec_time",
+    "rows",
+    "shared_blks_hit",
+    "shared_blks_read",
+    "temp_blks_written",
+    "blk_read_time",
+)
+COLUMN_TYPES = {
+    "queryid": "q",
+    "userid": "q",
+    "dbid": "q",
+    "calls": "q",
+    "total_exec_time": "d",
+    "rows": "q",
+    "shared_blks_hit": "q",
+    "shared_blks_read": "q",
+    "temp_blks_written": "q",
+    "blk_read_time": "d",
+}
+TEXT_COLUMN = "query"
+
+# Ranking name -> counter the rate is computed from
+RATE_METRICS = {
+    "calls_per_sec": "calls",
+    "exec_ms_per_sec": "total_exec_time",
+    "rows_per_sec": "rows",
+    "shared_blks_read_per_sec": "shared_blks_read",
+}
+
+
+class SnapshotError(Exception):
+    """Raised when a snapshot cannot be written, read or compared"""
+
+
+def snapshot_query(server_version_num):
+    """
+    pg_stat_statements query for the connected server version
+
+    Column names changed in PostgreSQL 13 (total_time -> total_exec_time) and
+    17 (blk_read_time -> shared_blk_read_time). Rows are grouped so statements
+    that only differ by the PG14+ toplevel flag collapse into one entry.
+    """
+    exec_time = "total_exec_time" if server_version_num >= 130000 else "total_time"
+    read_time = (
+        "shared_blk_read_time" if server_version_num >= 170000 else "blk_read_time"
+    )
+    return f"""
+        SELECT queryid, userid::bigint AS userid, dbid::bigint AS dbid,
+               sum(calls)::bigint AS calls,
+               sum({exec_time})::float8 AS total_exec_time,
+               sum(rows)::bigint AS rows,
+               sum(shared_blks_hit)::bigint AS shared_blks_hit,
+               sum(shared_blks_read)::bigint AS shared_blks_read,
+               sum(temp_blks_written)::bigint AS temp_blks_written,
+               sum({read_time})::float8 AS blk_read_time,
+               left(min(query), {QUERY_TEXT_MAX_CHARS}) AS query
+        FROM pg_stat_statements
+        WHERE queryid IS NOT NULL
+        GROUP BY queryid, userid, dbid
+    """
+
+
+class Snapshot:
+    """
+    One capture of pg_stat_statements, held column by column
+
+    Columns are typed arrays indexed by row; query texts are decoded lazily
+    because most comparisons only need the numbers.
+    """
+
+    def __init__(
+        self, captured_at, columns, query_texts=None, metadata=None, text_loader=None
+    ):
+        self.captured_at = captured_at
+        self.columns = columns
+        self.metadata = metadata or {}
+        self._query_texts = query_texts
+        self._text_loader = text_loader
+
+    @classmethod
+    def from_rows(cls, captured_at, rows, metadata=None):
+        """Build a snapshot from row dicts as returned by snapshot_query"""
+        columns = {name: array(typecode) for name, typecode in COLUMN_TYPES.items()}
+        texts = []
+        for row in rows:
+            for name, typecode in COLUMN_TYPES.items():
+                value = row.get(name) or 0
+                columns[name].append(float(value) if typecode == "d" else int(value))
+            texts.append((row.get(TEXT_COLUMN) or "")[:QUERY_TEXT_MAX_CHARS])
+        return cls(captured_at, columns, query_texts=texts, metadata=metadata)
+
+    @property
+    def row_count(self):
+        for values in self.columns.values():
+            return len(values)
+        return 0
+
+    @property
+    def query_texts(self):
+        if self._query_texts is None:
+            self._query_texts = self._text_loader() if self._text_loader else []
+        return self._query_texts
+
+    def keys(self):
+        """Statement identity (queryid, userid, dbid) per row"""
+        return zip(*(self.columns[name] for name in KEY_COLUMNS))
+
+
+def encode_segment(snapshot):
+    """Serialise a snapshot into the columnar segment format"""
+    blobs = []
+    layout = {}
+    offset = 0
+
+    def add(name, typecode, payload):
+        nonlocal offset
+        compressed = zlib.compress(payload, 1)
+        layout[name] = {"type": typecode, "offset": offset, "length": len(compressed)}
+        blobs.append(compressed)
+        offset += len(compressed)
+
+    for name, typecode in COLUMN_TYPES.items():
+        add(name, typecode, snapshot.columns[name].tobytes())
+    add(TEXT_COLUMN, "text", "\0".join(snapshot.query_texts).encode("utf-8"))
+
+    header = json.dumps(
+        {
+            "captured_at": snapshot.captured_at,
+            "row_count": snapshot.row_count,
+            "metadata": snapshot.metadata,
+            "columns": layout,
+        }
+    ).encode("utf-8")
+    return (
+        _HEADER.pack(SEGMENT_MAGIC, SEGMENT_VERSION, len(header))
+        + header
+        + b"".join(blobs)
+    )
+
+
+def decode_segment(blob, columns=None):
+    """
+    Read a segment, decompressing only the requested columns
+
+    Args:
+        blob (bytes): Segment contents
+        columns (iterable, optional): Counter/key columns to load (default all)
+
+    Returns:
+        Snapshot: Query texts are decoded on first access
+    """
+    magic, version, header_length = _HEADER.unpack_from(blob)
+    if magic != SEGMENT_MAGIC or version != SEGMENT_VERSION:
+        raise SnapshotError("Not a pg_stat_statements snapshot segment")
+    data_start = _HEADER.size + header_length
+    header = json.loads(blob[_HEADER.size : data_start])
+    layout = header["columns"]
+
+    def read_column(name):
+        entry = layout[name]
+        start = data_start + entry["offset"]
+        return zlib.decompress(blob[start : start + entry["length"]])
+
+    wanted = COLUMN_TYPES.keys() if columns is None else columns
+    loaded = {}
+    for name in wanted:
+        if name not in COLUMN_TYPES:
+            raise SnapshotError(f"Unknown snapshot column: {name}")
+        values = array(COLUMN_TYPES[name])
+        values.frombytes(read_column(name))
+        loaded[name] = values
+
+    def load_texts():
+        if not header["row_count"]:
+            return []
+        return read_column(TEXT_COLUMN).decode("utf-8").split("\0")
+
+    return Snapshot(
+        header["captured_at"],
+        loaded,
+        metadata=header.get("metadata"),
+        text_loader=load_texts,
+    )
+
+
+class LocalSnapshotBackend:
+    """Segments stored as files under a directory"""
+
+    def __init__(self, root):
+        self.root = root
+
+    def put(self, key, blob):
+        path = os.path.join(self.root, key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write then rename so readers never see a partial segment
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(blob)
+        os.replace(tmp_path, path)
+
+    def get(self, key):
+        with open(os.path.join(self.root, key), "rb") as f:
+            return f.read()
+
+    def list(self, prefix):
+        directory = os.path.join(self.root, prefix)
+        if not os.path.isdir(directory):
+            return []
+        return sorted(
+            f"{prefix}/{name}"
+            for name in os.listdir(directory)
+            if name.endswith(SEGMENT_SUFFIX)
+        )
+
+
+class S3SnapshotBackend:
+    """Segments stored as objects in an S3 (or S3-compatible) bucket"""
+
+    def __init__(self, bucket, prefix="", client=None):
+        self.bucket = bucket
+        self.prefix = prefix.strip("/")
+        self._client = client
+
+    @property
+    def client(self):
+        if self._client is None:
+            self._client = boto3.client("s3")
+        return self._client
+
+    def _object_key(self, key):
+        return f"{self.prefix}/{key}" if self.prefix else key
+
+    def put(self, key, blob):
+        self.client.put_object(Bucket=self.bucket, Key=self._object_key(key), Body=blob)
+
+    def get(self, key):
+        response = self.client.get_object(Bucket=self.bucket, Key=self._object_key(key))
+        return response["Body"].read()
+
+    def list(self, prefix):
+        object_prefix = self._object_key(prefix) + "/"
+        strip = len(self._object_key("")) if self.prefix else 0
+        keys = []
+        paginator = self.client.get_paginator("list_objects_v2")
+        for page in paginator.paginate(Bucket=self.bucket, Prefix=object_prefix):
+            for item in page.get("Contents", []):
+                if item["Key"].endswith(SEGMENT_SUFFIX):
+                    keys.append(item["Key"][strip:])
+        return sorted(keys)
+
+
+class SnapshotStore:
+    """
+    Append-only history of snapshots for one database (source)
+
+    Segment names encode the capture time, so time-range lookups are answered
+    from the listing alone and only the segments actually compared are read.
+    """
+
+    def __init__(self, backend, source):
+        self.backend = backend
+        self.source = re.sub(r"[^A-Za-z0-9_.-]+", "_", source)
+
+    def _key(self, captured_at):
+        return f"{self.source}/{int(captured_at * 1000):013d}-{uuid.uuid4().hex[:12]}{SEGMENT_SUFFIX}"
+
+    def append(self, snapshot):
+        """Persist a snapshot and return its key"""
+        key = self._key(snapshot.captured_at)
+        self.backend.put(key, encode_segment(snapshot))
+        return key
+
+    def list_snapshots(self, start=None, end=None):
+        """(captured_at, key) pairs in capture order, optionally bounded in time"""
+        entries = []
+        for key in self.backend.list(self.source):
+            stem = key.rsplit("/", 1)[-1][: -len(SEGMENT_SUFFIX)].split("-", 1)[0]
+            if not stem.isdigit():
+                continue
+            captured_at = int(stem) / 1000.0
+            if start is not None and captured_at < start:
+                continue
+            if end is not None and captured_at > end:
+                continue
+            entries.append((captured_at, key))
+        return entries
+
+    def load(self, key, columns=None):
+        return decode_segment(self.backend.get(key), columns)
+
+    def scan(self, start=None, end=None, columns=None):
+        """Yield snapshots in a time range, loading only the given columns"""
+        for _, key in self.list_snapshots(start, end):
+            yield self.load(key, columns)
+
+    def baseline_for(self, end_time, window_seconds):
+        """
+        Latest snapshot taken at least window_seconds before end_time
+
+        Falls back to the oldest snapshot before end_time when the history is
+        shorter than the window. Returns None if there is nothing earlier.
+        """
+        earlier = self.list_snapshots(end=end_time - 1e-3)
+        if not earlier:
+            return None
+        target = end_time - window_seconds
+        candidates = [entry for entry in earlier if entry[0] <= target]
+        _, key = candidates[-1] if candidates else earlier[0]
+        return self.load(key)
+
+
+def compute_deltas(older, newer):
+    """
+    Per-statement counter increases between two snapshots
+
+    A statement whose counters went backwards (stats reset, or evicted and
+    re-added) or that is missing from the older snapshot contributes its full
+    current counters and is flagged as reset.
+
+    Returns:
+        dict: elapsed_seconds, and deltas as a list of dicts with the key
+              columns, counter deltas, query text and reset flag
+    """
+    elapsed = newer.captured_at - older.captured_at
+    if elapsed <= 0:
+        raise SnapshotError("The newer snapshot must be captured after the older one")
+
+    previous = {key: index for index, key in enumerate(older.keys())}
+    deltas = []
+    for index, key in enumerate(newer.keys()):
+        current = {name: newer.columns[name][index] for name in COUNTER_COLUMNS}
+        reset = True
+        old_index = previous.get(key)
+        if old_index is not None:
+            before = {name: older.columns[name][old_index] for name in COUNTER_COLUMNS}
+            if all(current[name] >= before[name] for name in COUNTER_COLUMNS):
+                current = {
+                    name: current[name] - before[name] for name in COUNTER_COLUMNS
+                }
+                reset = False
+        if current["calls"] <= 0:
+            continue
+        entry = dict(zip(KEY_COLUMNS, key))
+        entry.update(current)
+        entry["row_index"] = index
+        entry["reset"] = reset
+        deltas.append(entry)
+    return {"elapsed_seconds": elapsed, "deltas": deltas}
+
+
+def rank_deltas(delta_result, newer, limit=10, metrics=None):
+    """
+    Rank statements by rate over the window
+
+    Returns:
+        dict: ranking name -> list of statements with their rates, most
+              expensive first
+    """
+    elapsed = delta_result["elapsed_seconds"]
+    metrics = metrics or list(RATE_METRICS)
+    texts = None
+    rankings = {}
+    for metric in metrics:
+        counter = RATE_METRICS[metric]
+        top = sorted(delta_result["deltas"], key=lambda d: d[counter], reverse=True)[
+            :limit
+        ]
+        if top and texts is None:
+            texts = newer.query_texts
+        ranked = []
+        for delta in top:
+            blocks = delta["shared_blks_hit"] + delta["shared_blks_read"]
+            ranked.append(
+                {
+                    "queryid": delta["queryid"],
+                    "query": texts[delta["row_index"]] if texts else "",
+                    "calls": delta["calls"],
+                    "calls_per_sec": round(delta["calls"] / elapsed, 3),
+                    "exec_ms_per_sec": round(delta["total_exec_time"] / elapsed, 3),
+                    "avg_exec_ms": round(delta["total_exec_time"] / delta["calls"], 3),
+                    "rows_per_sec": round(delta["rows"] / elapsed, 3),
+                    "shared_blks_read_per_sec": round(
+                        delta["shared_blks_read"] / elapsed, 3
+                    ),
+                    "cache_hit_ratio_pct": round(
+                        delta["shared_blks_hit"] / blocks * 100, 2
+                    )
+                    if blocks
+                    else None,
+                    "reset": delta["reset"],
+                }
+            )
+        rankings[metric] = ranked
+    return rankings
+
+
+def get_snapshot_store(source):
+    """Snapshot store configured from STAT_SNAPSHOT_BUCKET / STAT_SNAPSHOT_DIR"""
+    if STAT_SNAPSHOT_BUCKET:
+        backend = S3SnapshotBackend(STAT_SNAPSHOT_BUCKET, STAT_SNAPSHOT_PREFIX)
+    else:
+        backend = LocalSnapshotBackend(STAT_SNAPSHOT_DIR)
+    return SnapshotStore(backend, source)
+
+
+def capture_snapshot(fanout, clock=time.time):
+    """
+    Read pg_stat_statements through a QueryFanout and build a snapshot
+
+    Args:
+        fanout (QueryFanout): Fan-out bound to the target database
+        clock (callable): Source of the capture timestamp
+
+    Returns:
+        Snapshot
+    """
+    fanout.ensure_extension("pg_stat_statements")
+    version_rows = fanout.fetch_all(
+        "SELECT current_setting('server_version_num')::int AS version",
+        name="stat_snapshot.version",
+    )
+    server_version = version_rows[0]["version"]
+    rows = fanout.fetch_all(
+        snapshot_query(server_version), name="stat_snapshot.capture"
+    )
+    return Snapshot.from_rows(
+        clock(), rows, metadata={"server_version_num": server_version}
+    )
@@ -0,0 +1,8 @@
+import os
+import sys
+
+# The Lambda modules import each other as top-level modules, as they do when
+# packaged next to lambda_function.py by create_lambda.sh
+sys.path.insert(
+    0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "scripts")
+)
@@ -0,0 +1,282 @@
+import pytest
+from catalog_loader import (
+    CATALOG_QUERY,
+    CATALOG_VERSION_QUERY,
+    CatalogCache,
+    SchemaCatalog,
+    ilike_pattern,
+)
+
+PAYLOAD = {
+    "schema": "app",
+    "relations": [
+        {
+            "oid": 1,
+            "name": "orders",
+            "ident": "orders",
+            "kind": "r",
+            "description": "Customer orders",
+            "view_definition": None,
+        },
+        {
+            "oid": 2,
+            "name": "orders_id_seq",
+            "ident": "orders_id_seq",
+            "kind": "S",
+            "description": None,
+            "view_definition": None,
+        },
+        {
+            "oid": 3,
+            "name": "orders_pkey",
+            "ident": "orders_pkey",
+            "kind": "i",
+            "description": None,
+            "view_definition": None,
+        },
+        {
+            "oid": 4,
+            "name": "orders_created_idx",
+            "ident": "orders_created_idx",
+            "kind": "i",
+            "description": None,
+            "view_definition": None,
+        },
+        {
+            "oid": 5,
+            "name": "open_orders",
+            "ident": "open_orders",
+            "kind": "v",
+            "description": None,
+            "view_definition": " SELECT id FROM app.orders;",
+        },
+    ],
+    "attributes": [
+        {
+            "relid": 1,
+            "ident": "id",
+            "type": "bigint",
+            "not_null": True,
+            "default": "nextval('app.orders_id_seq'::regclass)",
+            "identity": "",
+            "generated": "",
+        },
+        {
+            "relid": 1,
+            "ident": "created_at",
+            "type": "timestamp with time zone",
+            "not_null": False,
+            "default": None,
+            "identity": "",
+            "generated": "",
+        },
+    ],
+    "constraints": [
+        {
+            "relid": 1,
+            "ident": "orders_pkey",
+            "type": "p",
+            "definition": "PRIMARY KEY (id)",
+            "index_oid": 3,
+        },
+    ],
+    "indexes": [
+        {
+            "oid": 3,
+            "relid": 1,
+            "definition": "CREATE UNIQUE INDEX orders_pkey ON app.orders USING btree (id)",
+        },
+        {
+            "oid": 4,
+            "relid": 1,
+            "definition": "CREATE INDEX orders_created_idx ON app.orders USING btree (created_at)",
+        },
+    ],
+    "sequences": [
+        {
+            "oid": 2,
+            "increment": 1,
+            "min": 1,
+            "max": 9223372036854775807,
+            "start": 1,
+            "cache": 1,
+            "cycle": False,
+        },
+    ],
+    "routines": [
+        {
+            "name": "order_total",
+            "kind": "f",
+            "definition": "CREATE FUNCTION app.order_total() ...",
+            "description": None,
+            "return_type": "numeric",
+            "provolatile": "s",
+            "proparallel": "s",
+        },
+        {
+            "name": "archive_orders",
+            "kind": "p",
+            "definition": "CREATE PROCEDURE app.archive_orders() ...",
+            "description": None,
+            "return_type": "void",
+            "provolatile": "v",
+            "proparallel": "u",
+        },
+    ],
+    "triggers": [],
+}
+
+
+class FakeCursor:
+    """Answers the version and catalog queries, counting each"""
+
+    def __init__(self, version="v1"):
+        self.version = version
+        self.queries = []
+        self._result = None
+
+    def execute(self, query, params):
+        assert query in (CATALOG_VERSION_QUERY, CATALOG_QUERY)
+        self.queries.append(query)
+        self._result = (self.version,) if query == CATALOG_VERSION_QUERY else (PAYLOAD,)
+
+    def fetchone(self):
+        return self._result
+
+    def count(self, query):
+        return self.queries.count(query)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+def test_ilike_pattern():
+    assert ilike_pattern("ord%").match("Orders")
+    assert ilike_pattern("order_").match("orders")
+    assert not ilike_pattern("order_").match("orders_x")
+    assert ilike_pattern(r"orders\_id%").match("orders_id_seq")
+    assert not ilike_pattern(r"orders\_id%").match("ordersXid_seq")
+
+
+def test_table_ddl_has_constraints_and_only_standalone_indexes():
+    catalog = SchemaCatalog("app", PAYLOAD)
+
+    [table] = catalog.find("table", "orders")
+
+    assert table["description"] == "Customer orders"
+    assert table["definition"] == (
+        "CREATE TABLE app.orders (\n"
+        "    id bigint NOT NULL DEFAULT nextval('app.orders_id_seq'::regclass),\n"
+        "    created_at timestamp with time zone,\n"
+        "    CONSTRAINT orders_pkey PRIMARY KEY (id)\n"
+        ");\n"
+        "CREATE INDEX orders_created_idx ON app.orders USING btree (created_at);"
+    )
+
+
+def test_find_by_object_type():
+    catalog = SchemaCatalog("app", PAYLOAD)
+
+    assert [result["object_name"] for result in catalog.find("index")] == [
+        "app.orders_created_idx",
+        "app.orders_pkey",
+    ]
+    assert catalog.find("view")[0]["definition"].startswith(
+        "CREATE OR REPLACE VIEW app.open_orders AS"
+    )
+    assert catalog.find("sequence")[0]["definition"].startswith(
+        "CREATE SEQUENCE app.orders_id_seq\n"
+    )
+    [function] = catalog.find("function")
+    assert (function["object_name"], function["return_type"]) == (
+        "app.order_total",
+        "numeric",
+    )
+    assert [result["object_name"] for result in catalog.find("procedure")] == [
+        "app.archive_orders"
+    ]
+    with pytest.raises(ValueError):
+        catalog.find("rule")
+
+
+def test_schema_ddl_puts_sequences_before_tables():
+    types = [
+        result["object_type"]
+        for result in SchemaCatalog("app", PAYLOAD).render_schema()
+    ]
+
+    assert types == ["SEQUENCE", "TABLE", "VIEW", "FUNCTION", "PROCEDURE"]
+
+
+def test_catalog_is_loaded_once_and_served_from_cache(clock):
+    cache = CatalogCache(check_seconds=30, clock=clock)
+    cur = FakeCursor()
+
+    first, source = cache.get(cur, "secret", "app")
+    assert source == "loaded"
+    second, source = cache.get(cur, "secret", "app")
+
+    assert (second, source) == (first, "cache")
+    assert (cur.count(CATALOG_VERSION_QUERY), cur.count(CATALOG_QUERY)) == (1, 1)
+    assert cache.stats()["loads"] == 1
+
+
+def test_unchanged_version_revalidates_without_reloading(clock):
+    cache = CatalogCache(check_seconds=30, clock=clock)
+    cur = FakeCursor()
+    first, _ = cache.get(cur, "secret", "app")
+
+    clock.now += 31
+    catalog, source = cache.get(cur, "secret", "app")
+    assert (catalog, source) == (first, "revalidated")
+    # The revalidation restarts the check interval
+    clock.now += 29
+    assert cache.get(cur, "secret", "app")[1] == "cache"
+    assert (cur.count(CATALOG_VERSION_QUERY), cur.count(CATALOG_QUERY)) == (2, 1)
+
+
+def test_changed_version_reloads_the_catalog(clock):
+    cache = CatalogCache(check_seconds=30, clock=clock)
+    cur = FakeCursor()
+    first, _ = cache.get(cur, "secret", "app")
+
+    cur.version = "v2"
+    clock.now += 31
+    catalog, source = cache.get(cur, "secret", "app")
+
+    assert source == "loaded"
+    assert catalog is not first and catalog.version == "v2"
+    assert cache.stats()["loads"] == 2
+
+
+def test_refresh_bypasses_the_cache(clock):
+    cache = CatalogCache(check_seconds=30, clock=clock)
+    cur = FakeCursor()
+    cache.get(cur, "secret", "app")
+
+    assert cache.get(cur, "secret", "app", refresh=True)[1] == "loaded"
+    assert cur.count(CATALOG_QUERY) == 2
+
+
+def test_entries_are_per_secret_and_schema(clock):
+    cache = CatalogCache(maxsize=2, check_seconds=30, clock=clock)
+    cur = FakeCursor()
+
+    cache.get(cur, "dev", "app")
+    cache.get(cur, "prod", "app")
+    cache.get(cur, "prod", "reporting")
+
+    # The least recently used entry made room for the third
+    assert cache.get(cur, "dev", "app")[1] == "loaded"
+    assert cache.get(cur, "prod", "reporting")[1] == "cache"
+    assert cache.stats()["loads"] == 4
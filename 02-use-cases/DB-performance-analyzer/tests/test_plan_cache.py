@@ -0,0 +1,229 @@
+import plan_cache
+from plan_cache import PlanCache, diff_plans, flatten_plan, query_fingerprint
+
+
+class FakeClock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def _key(
+    query="SELECT * FROM t WHERE id = 1",
+    parameters=None,
+    digest="settings-a",
+    mode="analyze",
+):
+    return PlanCache.make_key("secret", query, parameters, digest, mode)
+
+
+def _scan(
+    node_type,
+    relation=None,
+    index=None,
+    rows=100,
+    actual=100,
+    cost=10.0,
+    read=0,
+    **extra,
+):
+    node = {
+        "Node Type": node_type,
+        "Plan Rows": rows,
+        "Actual Rows": actual,
+        "Total Cost": cost,
+        "Shared Read Blocks": read,
+        "Shared Hit Blocks": 0,
+        "Temp Written Blocks": 0,
+    }
+    if relation:
+        node["Relation Name"] = relation
+    if index:
+        node["Index Name"] = index
+    node.update(extra)
+    return node
+
+
+def _plan(root, execution_time=None):
+    plan = {"Plan": root}
+    if execution_time is not None:
+        plan["Execution Time"] = execution_time
+    return plan
+
+
+def test_fingerprint_ignores_formatting_but_not_literals():
+    assert query_fingerprint(
+        "SELECT *\n  FROM t -- note\nWHERE id = 1;"
+    ) == query_fingerprint("select * /* x */ from T where ID = 1")
+    assert query_fingerprint("SELECT * FROM t WHERE id = 1") != query_fingerprint(
+        "SELECT * FROM t WHERE id = 2"
+    )
+
+
+def test_cache_miss_then_hit():
+    cache = PlanCache(clock=FakeClock())
+
+    assert cache.get(_key()) is None
+    entry, previous = cache.put(_key(), {"Plan": {}})
+    assert previous is None
+    assert cache.get(_key("select *  from t where id = 1")) is entry
+    assert (cache.stats()["hits"], cache.stats()["misses"]) == (1, 1)
+
+
+def test_entries_are_keyed_by_parameter_types_and_mode():
+    cache = PlanCache(clock=FakeClock())
+    cache.put(_key(parameters=(1,)), {"Plan": {}})
+
+    assert cache.get(_key(parameters=(2,))) is not None
+    assert cache.get(_key(parameters=("1",))) is None
+    assert cache.get(_key(parameters=(1,), mode="generic")) is None
+
+
+def test_entries_expire_after_the_ttl():
+    clock = FakeClock()
+    cache = PlanCache(ttl_seconds=60, clock=clock)
+    cache.put(_key(), {"Plan": {}})
+
+    clock.now += 59
+    assert cache.get(_key()) is not None
+    clock.now += 1
+    assert cache.get(_key()) is None
+    assert cache.stats()["size"] == 0
+
+
+def test_settings_change_invalidates_but_keeps_history_for_diffing():
+    clock = FakeClock()
+    cache = PlanCache(clock=clock)
+    first, _ = cache.put(_key(digest="settings-a"), {"Plan": {"Node Type": "Seq Scan"}})
+
+    # New statistics or planner settings give a new digest and so a miss
+    assert cache.get(_key(digest="settings-b")) is None
+    second, previous = cache.put(
+        _key(digest="settings-b"), {"Plan": {"Node Type": "Index Scan"}}
+    )
+
+    assert previous is first
+    assert cache.put(_key(digest="settings-b"), second["plan"])[1] is second
+
+
+def test_least_recently_used_entries_are_evicted():
+    cache = PlanCache(maxsize=2, clock=FakeClock())
+    for number in range(3):
+        cache.put(_key(f"SELECT {number}"), {"Plan": {}})
+
+    assert cache.get(_key("SELECT 0")) is None
+    assert cache.get(_key("SELECT 2")) is not None
+    assert cache.stats()["size"] == 2
+
+
+def test_settings_digest_is_cached_per_secret(monkeypatch):
+    monkeypatch.setattr(plan_cache, "_settings_cache", plan_cache.TTLCache(60))
+
+    class Cursor:
+        executed = 0
+
+        def execute(self, query, params):
+            Cursor.executed += 1
+
+        def fetchone(self):
+            return ("160002", "work_mem=4096", None)
+
+    cur = Cursor()
+    digest = plan_cache.server_settings_digest(cur, "secret")
+
+    assert plan_cache.server_settings_digest(cur, "secret") == digest
+    assert Cursor.executed == 1
+
+
+def test_flatten_plan_paths():
+    plan = _plan(
+        _scan(
+            "Hash Join",
+            Plans=[
+                _scan("Seq Scan", "a"),
+                _scan("Hash", Plans=[_scan("Seq Scan", "b")]),
+            ],
+        )
+    )
+
+    assert [
+        (node["path"], node["depth"], node["node_type"]) for node in flatten_plan(plan)
+    ] == [
+        ("0", 0, "Hash Join"),
+        ("0.0", 1, "Seq Scan"),
+        ("0.1", 1, "Hash"),
+        ("0.1.0", 2, "Seq Scan"),
+    ]
+
+
+def test_identical_plans_have_no_changes():
+    plan = _plan(_scan("Seq Scan", "orders"), execution_time=5.0)
+
+    result = diff_plans(plan, plan)
+
+    assert result["changes"] == []
+    assert result["structure_changed"] is False
+    assert result["regression"] is False
+
+
+def test_diff_reports_join_strategy_and_access_path_changes():
+    old = _plan(
+        _scan(
+            "Hash Join",
+            cost=100,
+            Plans=[_scan("Index Scan", "a", index="a_pkey"), _scan("Seq Scan", "b")],
+        ),
+        execution_time=10.0,
+    )
+    new = _plan(
+        _scan(
+            "Nested Loop",
+            cost=400,
+            Plans=[_scan("Seq Scan", "a"), _scan("Seq Scan", "b")],
+        ),
+        execution_time=12.0,
+    )
+
+    result = diff_plans(old, new)
+    changes = {change["path"]: change for change in result["changes"]}
+
+    assert changes["0"]["kind"] == "join_strategy"
+    assert (changes["0"]["old"], changes["0"]["new"]) == ("Hash Join", "Nested Loop")
+    assert changes["0.0"]["kind"] == "node_type"
+    assert changes["0.0"]["new"] == "Seq Scan on a"
+    assert "0.1" not in changes
+    assert result["structure_changed"] is True
+    assert result["summary"]["cost_growth"] == 4.0
+    assert result["regression"] is True
+
+
+def test_diff_reports_added_nodes_misestimates_and_buffers():
+    old = _plan(_scan("Seq Scan", "orders", rows=100, actual=120, read=10))
+    new = _plan(
+        _scan(
+            "Sort",
+            rows=100,
+            actual=5000,
+            read=10,
+            Plans=[_scan("Seq Scan", "orders", rows=100, actual=5000, read=900)],
+        )
+    )
+
+    kinds = {
+        (change["path"], change["kind"]) for change in diff_plans(old, new)["changes"]
+    }
+
+    assert ("0", "node_type") in kinds
+    assert ("0", "misestimate") in kinds
+    assert ("0.0", "node_added") in kinds
+    assert ("0.0", "buffers") not in kinds  # added nodes are not compared
+
+    later = _plan(_scan("Seq Scan", "orders", rows=100, actual=5000, read=900))
+    changes = diff_plans(old, later)["changes"]
+    assert {change["kind"] for change in changes} == {"misestimate", "buffers"}
+    assert next(change for change in changes if change["kind"] == "buffers")[
+        "deltas"
+    ] == {"shared_read_blocks": 890}
+    assert diff_plans(later, old)["changes"][0]["kind"] == "misestimate_resolved"
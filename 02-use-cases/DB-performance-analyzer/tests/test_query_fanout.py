@@ -0,0 +1,119 @@
+import threading
+import time
+
+import pytest
+import query_fanout
+from query_fanout import QueryFanout
+
+
+class FakeCursor:
+    def __init__(self, conn):
+        self.conn = conn
+        self.description = [("value",)]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, query, params=None):
+        if query.startswith("SET"):
+            return
+        # Queries are 'sleep <seconds>'; cancel() interrupts the sleep
+        if self.conn.cancelled.wait(float(query.split()[1])):
+            raise Exception("canceling statement due to user request")
+        self.rows = [(query,)]
+
+    def fetchall(self):
+        return self.rows
+
+
+class FakeConnection:
+    def __init__(self):
+        self.cancelled = threading.Event()
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def cancel(self):
+        self.cancelled.set()
+
+
+@pytest.fixture
+def connections(monkeypatch):
+    opened = []
+
+    def connect(secret_name):
+        conn = FakeConnection()
+        opened.append(conn)
+        return conn
+
+    monkeypatch.setattr(query_fanout, "connect_to_db", connect)
+    monkeypatch.setattr(query_fanout, "release_connection", lambda conn: None)
+    monkeypatch.setattr(query_fanout, "FANOUT_GRACE_SECONDS", 0.1)
+    return opened
+
+
+def test_queries_run_concurrently(connections):
+    fanout = QueryFanout("secret", max_concurrency=4)
+    queries = {f"q{i}": "sleep 0.2" for i in range(4)}
+
+    start = time.perf_counter()
+    results = fanout.run(queries, prefix="analysis")
+
+    assert time.perf_counter() - start < 0.6
+    assert results == {name: [{"value": "sleep 0.2"}] for name in queries}
+    assert set(fanout.summary()["timings_ms"]) == {f"analysis.q{i}" for i in range(4)}
+    assert fanout.summary()["errors"] == {}
+
+
+def test_time_waiting_for_a_slot_does_not_count_against_the_deadline(connections):
+    # As in full_health_sweep, two analyses share the fanout's single slot. The
+    # deadline is 0.2s statement_timeout + 0.1s grace and each query takes
+    # 0.2s, so the second analysis only gets the slot after its deadline
+    fanout = QueryFanout("secret", max_concurrency=1, statement_timeout_ms=200)
+    results = {}
+
+    first = threading.Thread(
+        target=lambda: results.update(
+            first=fanout.run({"q0": "sleep 0.2", "q1": "sleep 0.2"}, prefix="first")
+        )
+    )
+    first.start()
+    time.sleep(0.05)
+    results["second"] = fanout.run({"q0": "sleep 0.2"}, prefix="second")
+    first.join()
+
+    assert all(rows for analysis in results.values() for rows in analysis.values())
+    assert fanout.summary()["errors"] == {}
+
+
+def test_slow_query_is_cancelled_and_reported(connections):
+    fanout = QueryFanout("secret", max_concurrency=2, statement_timeout_ms=100)
+
+    results = fanout.run({"fast": "sleep 0", "slow": "sleep 5"})
+
+    assert results["fast"] == [{"value": "sleep 0"}]
+    assert results["slow"] == []
+    assert "slow" in fanout.summary()["errors"]
+    assert any(conn.cancelled.is_set() for conn in connections)
+
+
+def test_queued_queries_do_not_start_after_run_returns(connections, monkeypatch):
+    # A connection that ignores cancel() holds the only slot
+    monkeypatch.setattr(FakeConnection, "cancel", lambda self: None)
+    fanout = QueryFanout("secret", max_concurrency=1, statement_timeout_ms=100)
+    queries = {"hung": "sleep 1.5", "queued": "sleep 0"}
+
+    start = time.perf_counter()
+    results = fanout.run(queries)
+    elapsed = time.perf_counter() - start
+
+    assert elapsed < 1.2
+    assert results == {"hung": [], "queued": []}
+    assert set(fanout.summary()["errors"]) == {"hung", "queued"}
+
+    # Once the hung query frees its slot, the queued one is skipped
+    time.sleep(1.5)
+    assert len(connections) == 1
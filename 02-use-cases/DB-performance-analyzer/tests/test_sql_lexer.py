@@ -0,0 +1,153 @@
+import pytest
+import sql_lexer
+from sql_lexer import (
+    COMMENT,
+    PARAMETER,
+    QUOTED_IDENTIFIER,
+    STRING,
+    WORD,
+    SQLLexerError,
+    analyze,
+    split_statements,
+    tokenize,
+)
+
+
+def _types_and_values(text):
+    return [
+        (token.type, token.value) for token in sql_lexer.significant(tokenize(text))
+    ]
+
+
+def _statements(text):
+    return [statement_text for statement_text, _ in split_statements(text)]
+
+
+def test_tokens_cover_the_text_in_order():
+    text = "SELECT a, 'x' FROM t -- done\n/* end */"
+    tokens = tokenize(text)
+
+    assert "".join(text[token.start : token.end] for token in tokens) == text
+    assert all(left.end == right.start for left, right in zip(tokens, tokens[1:]))
+
+
+def test_line_comments_run_to_the_end_of_the_line():
+    tokens = tokenize("SELECT 1 -- drop table users; delete\nFROM t")
+
+    comments = [token.value for token in tokens if token.type == COMMENT]
+    assert comments == ["-- drop table users; delete\n"]
+    assert "drop" not in {token.value for token in tokens if token.type == WORD}
+
+
+def test_block_comments_nest():
+    tokens = tokenize("SELECT /* outer /* inner */ still; comment */ 1")
+
+    assert [token.value for token in tokens if token.type == COMMENT] == [
+        "/* outer /* inner */ still; comment */"
+    ]
+    assert _statements("SELECT /* a; /* b; */ c; */ 1") == [
+        "SELECT /* a; /* b; */ c; */ 1"
+    ]
+
+
+def test_strings_with_doubled_and_backslash_escapes():
+    assert _types_and_values("SELECT 'it''s; delete'") == [
+        (WORD, "select"),
+        (STRING, "'it''s; delete'"),
+    ]
+    assert _types_and_values(r"SELECT E'a\'b; drop'") == [
+        (WORD, "select"),
+        (STRING, r"E'a\'b; drop'"),
+    ]
+
+
+def test_quoted_identifiers_keep_case_and_hide_keywords():
+    values = _types_and_values('SELECT "Drop Table"."Delete" FROM "my""table"')
+
+    assert (QUOTED_IDENTIFIER, '"Drop Table"') in values
+    assert (QUOTED_IDENTIFIER, '"Delete"') in values
+    assert (QUOTED_IDENTIFIER, '"my""table"') in values
+    assert {value for kind, value in values if kind == WORD} == {"select", "from"}
+
+
+@pytest.mark.parametrize(
+    "literal",
+    [
+        "$$ delete from t; $$",
+        "$body$ it's $$ nested; $body$",
+        "$_x1$ drop $_x1$",
+    ],
+)
+def test_dollar_quoted_strings(literal):
+    assert _types_and_values(f"SELECT {literal} AS v") == [
+        (WORD, "select"),
+        (STRING, literal),
+        (WORD, "as"),
+        (WORD, "v"),
+    ]
+
+
+def test_parameters_and_dollar_identifiers():
+    values = _types_and_values("SELECT col$1 FROM t WHERE a = $1")
+
+    assert (WORD, "col$1") in values
+    assert values[-1] == (PARAMETER, "$1")
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "SELECT 'unterminated",
+        'SELECT "unterminated',
+        "SELECT /* unterminated /* */",
+        "SELECT $tag$ unterminated $other$",
+    ],
+)
+def test_unterminated_constructs_raise(text):
+    with pytest.raises(SQLLexerError):
+        tokenize(text)
+
+
+def test_statements_split_on_top_level_semicolons_only():
+    text = """
+        SELECT ';' AS a;
+        -- a comment; with a semicolon
+        SELECT $$;$$, "x;y" FROM t;;
+        SHOW work_mem
+    """
+
+    assert _statements(text) == [
+        "SELECT ';' AS a",
+        'SELECT $$;$$, "x;y" FROM t',
+        "SHOW work_mem",
+    ]
+
+
+def test_statement_text_keeps_inner_comments_but_not_leading_ones():
+    assert _statements("-- leading\nSELECT 1 /* inner */ FROM t; /* trailing */") == [
+        "SELECT 1 /* inner */ FROM t"
+    ]
+
+
+def test_analyze_reports_first_keyword_and_words():
+    analysis = analyze("(SELECT 1); WITH x AS (SELECT 1) SELECT * FROM x")
+
+    assert [statement.first_keyword for statement in analysis.statements] == [
+        "select",
+        "with",
+    ]
+    assert "from" in analysis.statements[1].words
+    assert analysis.statements[1].complexity["cte_count"] == 1
+
+
+def test_analyze_caches_results_and_returns_copies():
+    sql_lexer.clear_cache()
+    query = "SELECT count(*) FROM a JOIN b ON a.id = b.id"
+
+    first = analyze(query)
+    first.complexity["warnings"].append("modified by caller")
+    second = analyze(query)
+
+    assert sql_lexer.cache_info()["hits"] == 1
+    assert second.complexity["warnings"] == []
+    assert second.complexity["join_count"] == 1
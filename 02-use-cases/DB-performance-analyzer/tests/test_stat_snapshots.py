@@ -0,0 +1,150 @@
+import pytest
+from stat_snapshots import (
+    LocalSnapshotBackend,
+    Snapshot,
+    SnapshotError,
+    SnapshotStore,
+    compute_deltas,
+    decode_segment,
+    encode_segment,
+    rank_deltas,
+)
+
+
+def _row(queryid, calls, total_exec_time, rows=0, hit=0, read=0, query=None):
+    return {
+        "queryid": queryid,
+        "userid": 10,
+        "dbid": 5,
+        "calls": calls,
+        "total_exec_time": total_exec_time,
+        "rows": rows,
+        "shared_blks_hit": hit,
+        "shared_blks_read": read,
+        "temp_blks_written": 0,
+        "blk_read_time": 0.0,
+        "query": query or f"SELECT {queryid}",
+    }
+
+
+@pytest.fixture
+def store(tmp_path):
+    return SnapshotStore(LocalSnapshotBackend(str(tmp_path)), "prod/db-1")
+
+
+def test_segment_round_trip_loads_only_requested_columns():
+    snapshot = Snapshot.from_rows(
+        1700000000.5,
+        [_row(1, 3, 1.5), _row(2, 7, 9.25)],
+        metadata={"server_version_num": 160002},
+    )
+
+    decoded = decode_segment(encode_segment(snapshot), columns=["queryid", "calls"])
+
+    assert decoded.captured_at == 1700000000.5
+    assert decoded.metadata == {"server_version_num": 160002}
+    assert set(decoded.columns) == {"queryid", "calls"}
+    assert list(decoded.columns["calls"]) == [3, 7]
+    assert decoded.query_texts == ["SELECT 1", "SELECT 2"]
+
+
+def test_decode_rejects_other_data():
+    with pytest.raises(SnapshotError):
+        decode_segment(b"NOPE" + bytes(16))
+
+
+def test_snapshots_in_the_same_millisecond_do_not_overwrite_each_other(store):
+    first = store.append(Snapshot.from_rows(1700000000.0001, [_row(1, 1, 1.0)]))
+    second = store.append(Snapshot.from_rows(1700000000.0004, [_row(1, 2, 2.0)]))
+
+    assert first != second
+    assert sorted(key for _, key in store.list_snapshots()) == sorted([first, second])
+    assert sorted(list(snapshot.columns["calls"]) for snapshot in store.scan()) == [
+        [1],
+        [2],
+    ]
+
+
+def test_list_snapshots_filters_by_time(store):
+    for captured_at in (100.0, 200.0, 300.0):
+        store.append(Snapshot.from_rows(captured_at, [_row(1, 1, 1.0)]))
+
+    assert [
+        captured_at for captured_at, _ in store.list_snapshots(start=150, end=300)
+    ] == [200.0, 300.0]
+    assert all(key.startswith("prod_db-1/") for _, key in store.list_snapshots())
+
+
+def test_baseline_is_the_latest_snapshot_before_the_window(store):
+    for captured_at, calls in ((100.0, 1), (200.0, 2), (290.0, 3)):
+        store.append(Snapshot.from_rows(captured_at, [_row(1, calls, 1.0)]))
+
+    assert list(store.baseline_for(300.0, 60).columns["calls"]) == [2]
+    # History shorter than the window: the oldest snapshot is used
+    assert list(store.baseline_for(300.0, 3600).columns["calls"]) == [1]
+    assert store.baseline_for(100.0, 60) is None
+
+
+def test_deltas_are_counter_increases_between_snapshots():
+    older = Snapshot.from_rows(
+        100.0, [_row(1, 10, 100.0, rows=50, read=4), _row(2, 5, 10.0)]
+    )
+    newer = Snapshot.from_rows(
+        110.0, [_row(1, 30, 400.0, rows=150, read=24), _row(2, 5, 10.0)]
+    )
+
+    result = compute_deltas(older, newer)
+
+    assert result["elapsed_seconds"] == 10.0
+    # Statement 2 did not run in the window
+    assert len(result["deltas"]) == 1
+    delta = result["deltas"][0]
+    assert (delta["queryid"], delta["userid"], delta["dbid"]) == (1, 10, 5)
+    assert (
+        delta["calls"],
+        delta["total_exec_time"],
+        delta["rows"],
+        delta["shared_blks_read"],
+    ) == (20, 300.0, 100, 20)
+    assert delta["reset"] is False
+
+
+def test_new_and_reset_statements_contribute_their_full_counters():
+    older = Snapshot.from_rows(100.0, [_row(1, 50, 500.0)])
+    newer = Snapshot.from_rows(160.0, [_row(1, 4, 40.0), _row(2, 6, 12.0)])
+
+    deltas = {
+        delta["queryid"]: delta for delta in compute_deltas(older, newer)["deltas"]
+    }
+
+    assert (deltas[1]["calls"], deltas[1]["reset"]) == (4, True)
+    assert (deltas[2]["calls"], deltas[2]["reset"]) == (6, True)
+
+
+def test_deltas_require_a_newer_snapshot():
+    snapshot = Snapshot.from_rows(100.0, [_row(1, 1, 1.0)])
+
+    with pytest.raises(SnapshotError):
+        compute_deltas(snapshot, snapshot)
+
+
+def test_rankings_use_rates_over_the_window():
+    older = Snapshot.from_rows(100.0, [_row(1, 0, 0.0), _row(2, 0, 0.0)])
+    newer = Snapshot.from_rows(
+        110.0,
+        [
+            _row(1, 100, 50.0, hit=90, read=10, query="SELECT cheap"),
+            _row(2, 10, 2000.0, query="SELECT slow"),
+        ],
+    )
+
+    rankings = rank_deltas(compute_deltas(older, newer), newer, limit=1)
+
+    assert [entry["query"] for entry in rankings["calls_per_sec"]] == ["SELECT cheap"]
+    top = rankings["exec_ms_per_sec"][0]
+    assert (top["query"], top["exec_ms_per_sec"], top["avg_exec_ms"]) == (
+        "SELECT slow",
+        200.0,
+        200.0,
+    )
+    assert rankings["calls_per_sec"][0]["cache_hit_ratio_pct"] == 90.0
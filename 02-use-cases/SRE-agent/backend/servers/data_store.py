@@ -0,0 +1,317 @@
+"""
+In-memory data layer for the stub backend servers.
+
+Each data file is parsed once and kept in memory. Secondary indexes map field
+values to record positions, so filtered lookups (by namespace, pod name,
+service, severity, incident type, ...) cost O(1) per filter instead of a
+linear scan, and time-range filters use a sorted timestamp index (O(log n)).
+Files are watched by mtime and size: an edited data file is reloaded, and its
+indexes rebuilt, on the next access.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+# Configure logging with basicConfig
+logging.basicConfig(
+    level=logging.INFO,  # Set the log level to INFO
+    # Define log message format
+    format="%(asctime)s,p%(process)s,{%(filename)s:%(lineno)d},%(levelname)s,%(message)s",
+)
+
+logger = logging.getLogger(__name__)
+
+# Marks records whose timestamp could not be parsed; time filters keep them
+_UNPARSEABLE = object()
+
+
+def _extract_records(data: Any, records_key: Optional[str]) -> List[Dict[str, Any]]:
+    """Return the record list of a parsed data file.
+
+    With records_key the list is read from that key. Without it, a top-level
+    list is used as is, otherwise the first list value of a top-level object.
+    """
+    if records_key:
+        return data.get(records_key, []) if isinstance(data, dict) else []
+    if isinstance(data, list):
+        return data
+    if isinstance(data, dict):
+        for value in data.values():
+            if isinstance(value, list):
+                return value
+    return []
+
+
+def _as_utc(value: Optional[datetime]) -> Optional[datetime]:
+    if value is not None and value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+
+class _Snapshot:
+    """Parsed content and indexes of one version of a data file."""
+
+    def __init__(
+        self,
+        data: Any,
+        records: List[Dict[str, Any]],
+        index_fields: Iterable[str],
+        time_field: Optional[str],
+        time_parser: Optional[Callable[[str], datetime]],
+    ):
+        self.data = data
+        self.records = records
+        self.indexes: Dict[str, Dict[Any, List[int]]] = {}
+        for field in index_fields:
+            index: Dict[Any, List[int]] = {}
+            for position, record in enumerate(records):
+                value = record.get(field)
+                if value is not None:
+                    index.setdefault(value, []).append(position)
+            self.indexes[field] = index
+
+        # Per-record parsed time (None when missing) plus a sorted view of the
+        # parseable ones for range queries
+        self.times: List[Any] = []
+        self.sorted_times: List[datetime] = []
+        self.sorted_positions: List[int] = []
+        self.unparseable_positions: List[int] = []
+        if time_field:
+            parser = time_parser or datetime.fromisoformat
+            timed = []
+            for position, record in enumerate(records):
+                raw = record.get(time_field)
+                if not raw:
+                    self.times.append(None)
+                    continue
+                try:
+                    parsed = parser(raw)
+                    if parsed.tzinfo is None:
+                        raise ValueError(f"Timestamp without timezone: {raw}")
+                except Exception:
+                    self.times.append(_UNPARSEABLE)
+                    self.unparseable_positions.append(position)
+                    continue
+                self.times.append(parsed)
+                timed.append((parsed, position))
+            timed.sort(key=lambda item: item[0])
+            self.sorted_times = [parsed for parsed, _ in timed]
+            self.sorted_positions = [position for _, position in timed]
+
+
+class Dataset:
+    """One JSON data file held in memory with secondary indexes.
+
+    Args:
+        path: JSON file to load
+        records_key: Key of the record list in the file; see _extract_records
+        indexes: Record fields to build equality indexes on
+        time_field: Record field holding an ISO timestamp, for range queries
+        time_parser: Parser for time_field values (default fromisoformat)
+        check_interval: Minimum seconds between mtime checks of the file
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        records_key: Optional[str] = None,
+        indexes: Iterable[str] = (),
+        time_field: Optional[str] = None,
+        time_parser: Optional[Callable[[str], datetime]] = None,
+        check_interval: float = 1.0,
+    ):
+        self.path = Path(path)
+        self.records_key = records_key
+        self.index_fields = tuple(indexes)
+        self.time_field = time_field
+        self.time_parser = time_parser
+        self.check_interval = check_interval
+        self.loads = 0
+        self._snapshot: Optional[_Snapshot] = None
+        self._signature: Optional[Tuple[int, int]] = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def _current(self) -> _Snapshot:
+        """Return the loaded snapshot, reloading it if the file changed."""
+        now = time.monotonic()
+        snapshot = self._snapshot
+        if snapshot is not None and now - self._checked_at < self.check_interval:
+            return snapshot
+
+        with self._lock:
+            if (
+                self._snapshot is not None
+                and now - self._checked_at < self.check_interval
+            ):
+                return self._snapshot
+            stat = os.stat(self.path)
+            signature = (stat.st_mtime_ns, stat.st_size)
+            if self._snapshot is None or signature != self._signature:
+                start = time.perf_counter()
+                with open(self.path, "r") as f:
+                    data = json.load(f)
+                self._snapshot = _Snapshot(
+                    data,
+                    _extract_records(data, self.records_key),
+                    self.index_fields,
+                    self.time_field,
+                    self.time_parser,
+                )
+                self._signature = signature
+                self.loads += 1
+                logger.info(
+                    f"Loaded {self.path.name}: {len(self._snapshot.records)} records "
+                    f"in {time.perf_counter() - start:.3f}s"
+                )
+            self._checked_at = now
+            return self._snapshot
+
+    @property
+    def data(self) -> Any:
+        """The parsed file content."""
+        return self._current().data
+
+    def __len__(self) -> int:
+        return len(self._current().records)
+
+    def records(self) -> List[Dict[str, Any]]:
+        """All records, in file order."""
+        return list(self._current().records)
+
+    def timeline(self) -> Tuple[List[Dict[str, Any]], List[Optional[datetime]]]:
+        """All records in file order and the parsed time_field of each.
+
+        Times are None for records without a timestamp or whose timestamp
+        could not be parsed. Both lists come from the same version of the file.
+        """
+        snapshot = self._current()
+        times = [None if t is _UNPARSEABLE else t for t in snapshot.times]
+        return list(snapshot.records), times or [None] * len(snapshot.records)
+
+    def get(self, field: str, value: Any) -> Optional[Dict[str, Any]]:
+        """First record whose indexed field equals value, or None."""
+        snapshot = self._current()
+        positions = snapshot.indexes[field].get(value)
+        return snapshot.records[positions[0]] if positions else None
+
+    def select(
+        self,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        **filters: Any,
+    ) -> List[Dict[str, Any]]:
+        """Records matching all equality filters and the time range.
+
+        Filters with a None value are ignored. Every filtered field must be
+        indexed. The time range is inclusive, requires time_field, drops
+        records without a timestamp and keeps records whose timestamp could
+        not be parsed (or has no timezone). Naive bounds are taken as UTC.
+        Results are in file order.
+
+        Args:
+            since: Earliest timestamp to include
+            until: Latest timestamp to include
+            **filters: Field name to required value
+
+        Returns:
+            Matching records
+        """
+        snapshot = self._current()
+        filters = {
+            field: value for field, value in filters.items() if value is not None
+        }
+
+        since = _as_utc(since)
+        until = _as_utc(until)
+        timed = since is not None or until is not None
+
+        # Candidates come from the most selective source, either the smallest
+        # index bucket or the time slice; other conditions are checked per record
+        index_field = None
+        positions: List[int] = []
+        if filters:
+            index_field = min(
+                filters,
+                key=lambda field: len(snapshot.indexes[field].get(filters[field], ())),
+            )
+            positions = snapshot.indexes[index_field].get(filters[index_field], [])
+
+        check_time = timed
+        if timed:
+            low = bisect_left(snapshot.sorted_times, since) if since else 0
+            high = (
+                bisect_right(snapshot.sorted_times, until)
+                if until
+                else len(snapshot.sorted_times)
+            )
+            in_range = high - low + len(snapshot.unparseable_positions)
+            if index_field is None or in_range < len(positions):
+                positions = sorted(
+                    snapshot.sorted_positions[low:high] + snapshot.unparseable_positions
+                )
+                index_field = None
+                check_time = False
+        elif index_field is None:
+            return list(snapshot.records)
+
+        if check_time:
+            times = snapshot.times
+            positions = [p for p in positions if self._in_range(times[p], since, until)]
+        matches = [snapshot.records[p] for p in positions]
+        for field, value in filters.items():
+            if field != index_field:
+                matches = [r for r in matches if r.get(field) == value]
+        return matches
+
+    @staticmethod
+    def _in_range(
+        value: Any, since: Optional[datetime], until: Optional[datetime]
+    ) -> bool:
+        if value is None:
+            return False
+        if value is _UNPARSEABLE:
+            return True
+        if since is not None and value < since:
+            return False
+        if until is not None and value > until:
+            return False
+        return True
+
+
+class DataStore:
+    """Registry of the datasets one server reads from its data directory."""
+
+    def __init__(self, data_path: Path, check_interval: float = 1.0):
+        self.data_path = Path(data_path)
+        self.check_interval = check_interval
+        self._datasets: Dict[str, Dataset] = {}
+
+    def register(self, filename: str, **options: Any) -> Dataset:
+        """Declare a data file and its indexes; loading happens on first use.
+
+        Args:
+            filename: File name relative to the data directory
+            **options: Dataset options (records_key, indexes, time_field, ...)
+
+        Returns:
+            The Dataset for the file
+        """
+        options.setdefault("check_interval", self.check_interval)
+        dataset = Dataset(self.data_path / filename, **options)
+        self._datasets[filename] = dataset
+        return dataset
+
+    def exists(self, filename: str) -> bool:
+        """Whether a data file is present on disk."""
+        return (self.data_path / filename).exists()
+
+    def __getitem__(self, filename: str) -> Dataset:
+        return self._datasets[filename]
@@ -1,10 +1,10 @@
-import json
 import logging
 from datetime import datetime, timezone
 from enum import Enum
 from pathlib import Path
 from typing import List, Optional
 
+from data_store import DataStore
 from fastapi import (
     Depends,
     FastAPI,
@@ -27,6 +27,15 @@ app = FastAPI(title="Kubernetes Analysis API", version="1.0.0")
 # Base path for fake data
 DATA_PATH = Path(__file__).parent.parent / "data" / "k8s_data"
 
+# Data files are loaded once, indexed, and reloaded when they change on disk
+STORE = DataStore(DATA_PATH)
+PODS = STORE.register("pods.json", records_key="pods", indexes=("namespace", "name"))
+DEPLOYMENTS = STORE.register(
+    "deployments.json", records_key="deployments", indexes=("namespace", "name")
+)
+NODES = STORE.register("nodes.json", records_key="nodes", indexes=("name",))
+RESOURCE_USAGE = STORE.register("resource_usage.json")
+
 # API Key for authentication
 CREDENTIAL_PROVIDER_NAME = "sre-agent-api-key-credential-provider"
 
@@ -65,29 +74,13 @@ def _parse_timestamp(timestamp_str: str) -> datetime:
         return datetime.now(timezone.utc)
 
 
-def _filter_events_by_time(events: list, since: Optional[str] = None) -> list:
-    """Filter events by since timestamp"""
-    if not since:
-        return events
-
-    filtered_events = []
-    since_dt = _parse_timestamp(since)
-
-    for event in events:
-        event_timestamp = event.get("timestamp")
-        if not event_timestamp:
-            continue
-
-        try:
-            event_dt = _parse_timestamp(event_timestamp)
-
-            if event_dt >= since_dt:
-                filtered_events.append(event)
-        except:
-            # Include events with unparseable timestamps
-            filtered_events.append(event)
-
-    return filtered_events
+EVENTS = STORE.register(
+    "events.json",
+    records_key="events",
+    indexes=("type", "namespace"),
+    time_field="timestamp",
+    time_parser=_parse_timestamp,
+)
 
 
 # Pydantic Models
@@ -249,18 +242,8 @@ async def get_pod_status(
         HTTPException: 500 if data retrieval fails
     """
     try:
-        with open(DATA_PATH / "pods.json", "r") as f:
-            data = json.load(f)
-
-        pods = data.get("pods", [])
-
-        # Filter by namespace if provided
-        if namespace:
-            pods = [p for p in pods if p.get("namespace") == namespace]
-
-        # Filter by pod name if provided
-        if pod_name:
-            pods = [p for p in pods if p.get("name") == pod_name]
+        # Filter by namespace and pod name if provided
+        pods = PODS.select(namespace=namespace, name=pod_name)
 
         return PodStatusResponse(pods=pods)
     except Exception as e:
@@ -296,16 +279,7 @@ async def get_deployment_status(
         HTTPException: 500 if data retrieval fails
     """
     try:
-        with open(DATA_PATH / "deployments.json", "r") as f:
-            data = json.load(f)
-
-        deployments = data.get("deployments", [])
-
-        if namespace:
-            deployments = [d for d in deployments if d.get("namespace") == namespace]
-
-        if deployment_name:
-            deployments = [d for d in deployments if d.get("name") == deployment_name]
+        deployments = DEPLOYMENTS.select(namespace=namespace, name=deployment_name)
 
         return DeploymentStatusResponse(deployments=deployments)
     except Exception as e:
@@ -345,16 +319,10 @@ async def get_cluster_events(
         HTTPException: 500 if data retrieval fails
     """
     try:
-        with open(DATA_PATH / "events.json", "r") as f:
-            data = json.load(f)
-
-        events = data.get("events", [])
-
-        if severity:
-            events = [e for e in events if e.get("type") == severity]
-
-        # Filter by since timestamp
-        events = _filter_events_by_time(events, since)
+        # Filter by severity and since timestamp
+        events = EVENTS.select(
+            since=_parse_timestamp(since) if since else None, type=severity
+        )
 
         return EventsResponse(events=events)
     except Exception as e:
@@ -390,10 +358,7 @@ async def get_resource_usage(
         HTTPException: 500 if data retrieval fails
     """
     try:
-        with open(DATA_PATH / "resource_usage.json", "r") as f:
-            data = json.load(f)
-
-        resource_usage = data.get("resource_usage", {})
+        resource_usage = RESOURCE_USAGE.data.get("resource_usage", {})
 
         # Filter by namespace if provided
         if namespace and "namespace_usage" in resource_usage:
@@ -434,13 +399,7 @@ async def get_node_status(
         HTTPException: 500 if data retrieval fails
     """
     try:
-        with open(DATA_PATH / "nodes.json", "r") as f:
-            data = json.load(f)
-
-        nodes = data.get("nodes", [])
-
-        if node_name:
-            nodes = [n for n in nodes if n.get("name") == node_name]
+        nodes = NODES.select(name=node_name)
 
         return {"nodes": nodes}
     except Exception as e:
@@ -0,0 +1,369 @@
+"""
+Streaming, time-indexed reader for text log files.
+
+The file is memory-mapped rather than read into a list, so memory stays
+bounded for multi-GB logs. A sparse index records, for every ~64KB block of
+whole lines, its byte range and the earliest and latest timestamp in it.
+Time-range searches only read blocks that can overlap the range (found by
+binary search when blocks are in time order), pattern matches are located
+with a single find over each lowercased block, and results are produced by
+generators so callers can stop after the first N hits. Recent entries are
+read backwards from the end of the file.
+
+Lines use the format `TIMESTAMP [LEVEL] SERVICE MESSAGE`. The index is
+extended in place when the file grows and rebuilt when it is replaced or
+truncated.
+"""
+
+import logging
+import mmap
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from itertools import repeat
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+# Configure logging with basicConfig
+logging.basicConfig(
+    level=logging.INFO,  # Set the log level to INFO
+    # Define log message format
+    format="%(asctime)s,p%(process)s,{%(filename)s:%(lineno)d},%(levelname)s,%(message)s",
+)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BLOCK_SIZE = 64 * 1024
+
+
+def parse_log_line(line: str) -> Dict[str, Any]:
+    """Parse one `TIMESTAMP [LEVEL] SERVICE MESSAGE` line into a log entry"""
+    parts = line.strip().split(" ", 3)
+    if len(parts) < 4:
+        return {"message": line.strip()}
+
+    # Extract log level from [LEVEL] format
+    level = "INFO"
+    if "[" in parts[1] and "]" in parts[1]:
+        level = parts[1].strip("[]")
+
+    return {
+        "timestamp": parts[0],
+        "level": level,
+        "service": parts[2],
+        "message": parts[3],
+    }
+
+
+def _as_utc(value: Optional[datetime]) -> Optional[datetime]:
+    if value is not None and value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+
+def _split_lines(chunk: bytes) -> List[bytes]:
+    lines = chunk.split(b"\n")
+    if chunk.endswith(b"\n"):
+        lines.pop()
+    return lines
+
+
+class _Block(NamedTuple):
+    """Byte range of whole lines and the timestamps found in it.
+
+    min_time/max_time are None when no line carries a timestamp. Unbounded
+    blocks have lines whose first token is not a timestamp; time-range
+    searches always read them.
+    """
+
+    start: int
+    end: int
+    min_time: Optional[datetime]
+    max_time: Optional[datetime]
+    bounded: bool
+
+
+class _View(NamedTuple):
+    """One indexed version of the file."""
+
+    mm: Optional[mmap.mmap]
+    blocks: List[_Block]
+    ordered: bool
+    max_times: List[datetime]
+    timed_blocks: List[_Block]
+
+
+class LogFile:
+    """Memory-mapped log file with a sparse timestamp index.
+
+    Args:
+        path: Text log file
+        time_parser: Parser for line timestamps (default fromisoformat)
+        block_size: Approximate bytes per index block
+        check_interval: Minimum seconds between size/mtime checks of the file
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        time_parser: Optional[Callable[[str], datetime]] = None,
+        block_size: int = DEFAULT_BLOCK_SIZE,
+        check_interval: float = 1.0,
+    ):
+        self.path = Path(path)
+        self.time_parser = time_parser or datetime.fromisoformat
+        self.block_size = block_size
+        self.check_interval = check_interval
+        self.index_builds = 0
+        self._view: Optional[_View] = None
+        self._signature: Optional[Tuple[int, int, int, int]] = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+        # Mappings of superseded views, closed once no reader is using them
+        self._readers = 0
+        self._retired: List[mmap.mmap] = []
+
+    @contextmanager
+    def _reading(self) -> Iterator[_View]:
+        """Pin the current view so its mapping stays open while it is read."""
+        with self._lock:
+            view = self._current()
+            self._readers += 1
+        try:
+            yield view
+        finally:
+            with self._lock:
+                self._readers -= 1
+                if not self._readers:
+                    self._close_retired()
+
+    def _current(self) -> _View:
+        """Return the indexed view, extending or rebuilding it if the file changed.
+
+        Must be called with the lock held.
+        """
+        now = time.monotonic()
+        if self._view is not None and now - self._checked_at < self.check_interval:
+            return self._view
+
+        stat = os.stat(self.path)
+        signature = (stat.st_dev, stat.st_ino, stat.st_size, stat.st_mtime_ns)
+        if self._view is None or signature != self._signature:
+            previous = self._view
+            self._view = self._reindex(stat)
+            self._signature = signature
+            if previous is not None and previous.mm is not None:
+                self._retired.append(previous.mm)
+                if not self._readers:
+                    self._close_retired()
+        self._checked_at = now
+        return self._view
+
+    def _close_retired(self) -> None:
+        for mm in self._retired:
+            mm.close()
+        self._retired.clear()
+
+    def _reindex(self, stat: os.stat_result) -> _View:
+        start = time.perf_counter()
+        blocks: List[_Block] = []
+        old = self._signature
+        appended = (
+            self._view is not None
+            and old is not None
+            and old[:2] == (stat.st_dev, stat.st_ino)
+            and stat.st_size > old[2]
+        )
+        if appended:
+            # Keep the index of the unchanged prefix; the last block may have
+            # ended mid-line, so it is indexed again
+            blocks = self._view.blocks[:-1]
+
+        if stat.st_size == 0:
+            mm = None
+            blocks = []
+        else:
+            with open(self.path, "rb") as f:
+                mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            offset = blocks[-1].end if blocks else 0
+            while offset < len(mm):
+                end = mm.find(b"\n", min(offset + self.block_size, len(mm)) - 1)
+                end = len(mm) if end == -1 else end + 1
+                blocks.append(self._index_block(mm[offset:end], offset, end))
+                offset = end
+
+        timed_blocks = [b for b in blocks if b.bounded and b.min_time is not None]
+        ordered = all(b.bounded for b in blocks) and all(
+            later.min_time >= earlier.max_time
+            for earlier, later in zip(timed_blocks, timed_blocks[1:])
+        )
+        self.index_builds += 1
+        logger.info(
+            f"Indexed {self.path.name}: {len(blocks)} blocks, "
+            f"{'time ordered' if ordered else 'unordered'}, "
+            f"{'appended' if appended else 'full'} in "
+            f"{time.perf_counter() - start:.3f}s"
+        )
+        return _View(
+            mm, blocks, ordered, [b.max_time for b in timed_blocks], timed_blocks
+        )
+
+    def _index_block(self, chunk: bytes, start: int, end: int) -> _Block:
+        lines = list(filter(None, _split_lines(chunk)))
+        if not lines:
+            return _Block(start, end, None, None, True)
+
+        # Fast path: every line starts with a same-length UTC timestamp and a
+        # space. Such timestamps sort lexicographically, so only the smallest
+        # and largest are parsed.
+        width = lines[0].find(b" ") + 1
+        heads = [line[:width] for line in lines] if width > 1 else []
+        if (
+            heads
+            and all(map(bytes.endswith, heads, repeat(b"Z ")))
+            and b"".join(heads).count(b" ") == len(heads)
+        ):
+            tokens = [min(heads)[:-1], max(heads)[:-1]]
+        else:
+            tokens = [line.split(b" ", 1)[0] for line in lines]
+
+        if not all(token[:1].isdigit() for token in tokens):
+            return _Block(start, end, None, None, False)
+        try:
+            times = [self.time_parser(token.decode()) for token in tokens]
+            if any(t.tzinfo is None for t in times):
+                return _Block(start, end, None, None, False)
+            return _Block(start, end, min(times), max(times), True)
+        except Exception:
+            return _Block(start, end, None, None, False)
+
+    def _candidate_blocks(
+        self, view: _View, start: Optional[datetime], end: Optional[datetime]
+    ) -> Iterator[_Block]:
+        """Blocks that may hold entries in [start, end], in file order."""
+        if start is None and end is None:
+            yield from view.blocks
+            return
+
+        if view.ordered:
+            first = bisect_left(view.max_times, start) if start else 0
+            for block in view.timed_blocks[first:]:
+                if end is not None and block.min_time > end:
+                    return
+                yield block
+            return
+
+        for block in view.blocks:
+            if not block.bounded:
+                yield block
+            elif block.min_time is not None and not (
+                (start is not None and block.max_time < start)
+                or (end is not None and block.min_time > end)
+            ):
+                yield block
+
+    @staticmethod
+    def _matching_lines(chunk: bytes, pattern: Optional[str]) -> Iterator[bytes]:
+        """Lines of chunk containing pattern (case-insensitive), in order."""
+        if not pattern:
+            yield from _split_lines(chunk)
+            return
+
+        if not pattern.isascii():
+            needle = pattern.lower()
+            for line in _split_lines(chunk):
+                if needle in line.decode("utf-8", "replace").lower():
+                    yield line
+            return
+
+        # One find over the lowercased block instead of a check per line
+        needle = pattern.lower().encode()
+        lowered = chunk.lower()
+        position = lowered.find(needle)
+        while position != -1:
+            line_start = chunk.rfind(b"\n", 0, position) + 1
+            line_end = chunk.find(b"\n", position)
+            if line_end == -1:
+                line_end = len(chunk)
+            yield chunk[line_start:line_end]
+            position = lowered.find(needle, line_end + 1)
+
+    def _in_range(
+        self, entry: Dict[str, Any], start: Optional[datetime], end: Optional[datetime]
+    ) -> bool:
+        timestamp = entry.get("timestamp")
+        if not timestamp:
+            return False
+        try:
+            entry_time = self.time_parser(timestamp)
+            if start and entry_time < start:
+                return False
+            if end and entry_time > end:
+                return False
+        except Exception:
+            # Include logs with unparseable timestamps
+            pass
+        return True
+
+    def search(
+        self,
+        pattern: Optional[str] = None,
+        level: Optional[str] = None,
+        start_time: Optional[datetime] = None,
+        end_time: Optional[datetime] = None,
+    ) -> Iterator[Dict[str, Any]]:
+        """Stream entries matching all filters, in file order.
+
+        Args:
+            pattern: Case-insensitive substring the raw line must contain
+            level: Exact log level
+            start_time: Earliest timestamp to include (naive means UTC)
+            end_time: Latest timestamp to include (naive means UTC)
+
+        Returns:
+            Generator of parsed log entries; stop consuming it to stop reading
+        """
+        start, end = _as_utc(start_time), _as_utc(end_time)
+        timed = start is not None or end is not None
+
+        with self._reading() as view:
+            for block in self._candidate_blocks(view, start, end):
+                chunk = view.mm[block.start : block.end]
+                for line in self._matching_lines(chunk, pattern):
+                    entry = parse_log_line(line.decode("utf-8", "replace"))
+                    if level and entry.get("level") != level:
+                        continue
+                    if timed and not self._in_range(entry, start, end):
+                        continue
+                    yield entry
+
+    def recent(self, service: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        """Stream entries newest first, reading backwards from the end of the file.
+
+        Args:
+            service: Substring the entry's service name must contain
+
+        Returns:
+            Generator of parsed log entries, most recent first
+        """
+        with self._reading() as view:
+            for block in reversed(view.blocks):
+                chunk = view.mm[block.start : block.end]
+                for line in reversed(_split_lines(chunk)):
+                    entry = parse_log_line(line.decode("utf-8", "replace"))
+                    if service and service not in entry.get("service", ""):
+                        continue
+                    yield entry
+
+    def stats(self) -> Dict[str, Any]:
+        """Size and index shape of the current view of the file."""
+        with self._reading() as view:
+            return {
+                "bytes": len(view.mm) if view.mm is not None else 0,
+                "blocks": len(view.blocks),
+                "time_ordered": view.ordered,
+                "index_builds": self.index_builds,
+            }
@@ -1,9 +1,10 @@
-import json
 import logging
 from datetime import datetime, timezone
+from itertools import islice
 from pathlib import Path
 from typing import Optional
 
+from data_store import DataStore
 from fastapi import (
     Depends,
     FastAPI,
@@ -12,6 +13,7 @@ from fastapi import (
     Query,
 )
 from fastapi.responses import JSONResponse
+from log_engine import LogFile
 from retrieve_api_key import retrieve_api_key
 
 # Configure logging with basicConfig
@@ -63,85 +65,19 @@ def _parse_timestamp(timestamp_str: str) -> datetime:
         return datetime.now(timezone.utc)
 
 
-def _filter_by_time(
-    logs: list, start_time: Optional[str] = None, end_time: Optional[str] = None
-) -> list:
-    """Filter logs by time range"""
-    if not start_time and not end_time:
-        return logs
-
-    filtered_logs = []
-    start_dt = _parse_timestamp(start_time) if start_time else None
-    end_dt = _parse_timestamp(end_time) if end_time else None
-
-    for log in logs:
-        log_timestamp = log.get("timestamp")
-        if not log_timestamp:
-            continue
-
-        try:
-            log_dt = _parse_timestamp(log_timestamp)
-
-            if start_dt and log_dt < start_dt:
-                continue
-            if end_dt and log_dt > end_dt:
-                continue
-
-            filtered_logs.append(log)
-        except:
-            # Include logs with unparseable timestamps
-            filtered_logs.append(log)
-
-    return filtered_logs
-
-
-def _parse_log_file(file_path: Path, pattern: Optional[str] = None):
-    """Parse log file and filter by pattern"""
-    logs = []
-
-    if file_path.suffix == ".json":
-        with open(file_path, "r") as f:
-            data = json.load(f)
-            # Handle both array and object with array
-            if isinstance(data, list):
-                logs = data
-            elif isinstance(data, dict):
-                # Get the first array value in the dict
-                for key, value in data.items():
-                    if isinstance(value, list):
-                        logs = value
-                        break
-    else:
-        # Parse text log files
-        with open(file_path, "r") as f:
-            for line in f:
-                if pattern and pattern.lower() not in line.lower():
-                    continue
-                # Parse log line to extract timestamp, level, and message
-                parts = line.strip().split(" ", 3)
-                if len(parts) >= 4:
-                    timestamp = parts[0]
-                    level_part = parts[1]
-                    service = parts[2]
-                    message = parts[3] if len(parts) > 3 else ""
-
-                    # Extract log level from [LEVEL] format
-                    level = "INFO"
-                    if "[" in level_part and "]" in level_part:
-                        level = level_part.strip("[]")
-
-                    logs.append(
-                        {
-                            "timestamp": timestamp,
-                            "level": level,
-                            "service": service,
-                            "message": message,
-                        }
-                    )
-                else:
-                    logs.append({"message": line.strip()})
-
-    return logs
+# JSON data files are loaded once, indexed, and reloaded when they change on disk
+STORE = DataStore(DATA_PATH)
+ERROR_LOGS = STORE.register(
+    "error.log",
+    indexes=("service",),
+    time_field="timestamp",
+    time_parser=_parse_timestamp,
+)
+LOG_PATTERNS = STORE.register("log_patterns.json", records_key="patterns")
+LOG_COUNTS = STORE.register("log_counts.json")
+
+# Text logs are memory-mapped and searched through a sparse timestamp index
+APPLICATION_LOG = LogFile(DATA_PATH / "application.log", time_parser=_parse_timestamp)
 
 
 @app.get("/logs/search")
@@ -156,18 +92,15 @@ async def search_logs(
 ):
     """Search logs by pattern/timeframe"""
     try:
-        application_logs = _parse_log_file(DATA_PATH / "application.log", pattern)
-
-        # Filter by log level if provided
-        if log_level:
-            application_logs = [
-                log for log in application_logs if log.get("level") == log_level
-            ]
-
-        # Filter by time range
-        application_logs = _filter_by_time(application_logs, start_time, end_time)
+        # Filter by pattern, log level and time range, stopping at the limit
+        application_logs = APPLICATION_LOG.search(
+            pattern=pattern,
+            level=log_level,
+            start_time=_parse_timestamp(start_time) if start_time else None,
+            end_time=_parse_timestamp(end_time) if end_time else None,
+        )
 
-        return {"logs": application_logs[:100]}  # Limit results
+        return {"logs": list(islice(application_logs, 100))}  # Limit results
     except Exception as e:
         logging.error(f"Error searching logs: {str(e)}")
         return JSONResponse(status_code=500, content={"error": str(e)})
@@ -181,15 +114,10 @@ async def get_error_logs(
 ):
     """Retrieve error-specific entries"""
     try:
-        with open(DATA_PATH / "error.log", "r") as f:
-            error_logs = json.load(f)
-
-        if service:
-            error_logs = [log for log in error_logs if log.get("service") == service]
-
-        # Filter by since timestamp
-        if since:
-            error_logs = _filter_by_time(error_logs, start_time=since)
+        # Filter by service and since timestamp
+        error_logs = ERROR_LOGS.select(
+            since=_parse_timestamp(since) if since else None, service=service
+        )
 
         return {"errors": error_logs}
     except Exception as e:
@@ -212,14 +140,10 @@ async def analyze_log_patterns(
     """Identify recurring issues"""
     try:
         # Read patterns from actual data file
-        patterns_file = DATA_PATH / "log_patterns.json"
-        if not patterns_file.exists():
+        if not STORE.exists("log_patterns.json"):
             return {"patterns": []}
 
-        with open(patterns_file, "r") as f:
-            data = json.load(f)
-
-        patterns = data.get("patterns", [])
+        patterns = LOG_PATTERNS.records()
 
         # Filter by min_occurrences
         patterns = [p for p in patterns if p["count"] >= min_occurrences]
@@ -240,14 +164,8 @@ async def get_recent_logs(
 ):
     """Fetch latest log entries"""
     try:
-        all_logs = _parse_log_file(DATA_PATH / "application.log")
-
-        if service:
-            all_logs = [log for log in all_logs if service in log.get("service", "")]
-
-        # Return the most recent logs (last N entries)
-        recent_logs = all_logs[-limit:] if len(all_logs) > limit else all_logs
-        recent_logs.reverse()  # Most recent first
+        # Read the most recent logs (last N entries) backwards from the end
+        recent_logs = list(islice(APPLICATION_LOG.recent(service=service), limit))
 
         return {"logs": recent_logs}
     except Exception as e:
@@ -271,12 +189,10 @@ async def count_log_events(
     """Count occurrences of specific events"""
     try:
         # Read counts from actual data file
-        counts_file = DATA_PATH / "log_counts.json"
-        if not counts_file.exists():
+        if not STORE.exists("log_counts.json"):
             return {"total_count": 0, "counts": []}
 
-        with open(counts_file, "r") as f:
-            data = json.load(f)
+        data = LOG_COUNTS.data
 
         if event_type.lower() == "error":
             error_data = data.get("error_counts", {})
@@ -1,9 +1,9 @@
-import json
 import logging
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
-from typing import Optional
+from typing import Any, Callable, Dict, Literal, Optional
 
+from data_store import DataStore
 from fastapi import (
     Depends,
     FastAPI,
@@ -13,6 +13,7 @@ from fastapi import (
 )
 from fastapi.responses import JSONResponse
 from retrieve_api_key import retrieve_api_key
+from timeseries_store import TimeSeriesStore
 
 # Configure logging with basicConfig
 logging.basicConfig(
@@ -63,36 +64,126 @@ def _parse_timestamp(timestamp_str: str) -> datetime:
         return datetime.now(timezone.utc)
 
 
-def _filter_metrics_by_time(
-    metrics: list, start_time: Optional[str] = None, end_time: Optional[str] = None
-) -> list:
-    """Filter metrics by time range"""
-    if not start_time and not end_time:
-        return metrics
-
-    filtered_metrics = []
-    start_dt = _parse_timestamp(start_time) if start_time else None
-    end_dt = _parse_timestamp(end_time) if end_time else None
-
-    for metric in metrics:
-        metric_timestamp = metric.get("timestamp")
-        if not metric_timestamp:
-            continue
-
-        try:
-            metric_dt = _parse_timestamp(metric_timestamp)
+def _time_range(start_time: Optional[str], end_time: Optional[str]) -> dict:
+    """Parse optional start/end query values into Dataset.select bounds"""
+    return {
+        "since": _parse_timestamp(start_time) if start_time else None,
+        "until": _parse_timestamp(end_time) if end_time else None,
+    }
+
+
+# Data files are loaded once, indexed, and reloaded when they change on disk
+STORE = DataStore(DATA_PATH)
+_TIMED_METRICS = {
+    "records_key": "metrics",
+    "indexes": ("service",),
+    "time_field": "timestamp",
+    "time_parser": _parse_timestamp,
+}
+RESPONSE_TIMES = STORE.register("response_times.json", **_TIMED_METRICS)
+THROUGHPUT = STORE.register("throughput.json", **_TIMED_METRICS)
+RESOURCE_USAGE = STORE.register("resource_usage.json", **_TIMED_METRICS)
+ERROR_RATES = STORE.register(
+    "error_rates.json",
+    records_key="error_rates",
+    indexes=("service",),
+    time_field="timestamp",
+    time_parser=_parse_timestamp,
+)
+AVAILABILITY = STORE.register(
+    "availability.json", records_key="availability_metrics", indexes=("service",)
+)
+TRENDS = STORE.register("trends.json")
 
-            if start_dt and metric_dt < start_dt:
-                continue
-            if end_dt and metric_dt > end_dt:
-                continue
+# Columnar series over the timed datasets for range slicing and rollups
+RESPONSE_TIME_SERIES = TimeSeriesStore(
+    RESPONSE_TIMES, key_fields=("service", "endpoint")
+)
+THROUGHPUT_SERIES = TimeSeriesStore(THROUGHPUT)
+RESOURCE_SERIES = TimeSeriesStore(RESOURCE_USAGE)
+ERROR_RATE_SERIES = TimeSeriesStore(ERROR_RATES)
+
+TIME_WINDOWS = {
+    "1h": timedelta(hours=1),
+    "6h": timedelta(hours=6),
+    "24h": timedelta(hours=24),
+    "7d": timedelta(days=7),
+}
+# Windows accepted by the metrics endpoints; FastAPI answers 422 for any
+# other value
+WindowedTimeWindow = Literal["1h", "6h", "24h", "7d"]
+ResourceType = Literal["cpu", "memory", "disk", "network"]
+# Resource usage fields returned for each resource_type
+RESOURCE_FIELDS = {
+    "cpu": ["cpu_usage_percent"],
+    "memory": ["memory_usage_mb", "memory_usage_percent"],
+    "disk": ["disk_io_read_mb", "disk_io_write_mb"],
+    "network": ["network_in_mb", "network_out_mb"],
+}
+# Resource usage field and unit behind the cpu_usage/memory_usage metric types
+RESOURCE_METRIC_VALUES = {
+    "cpu_usage": ("cpu_usage_percent", "percent"),
+    "memory_usage": ("memory_usage_mb", "MB"),
+}
+# Series and field analyze_trends summarises for each trend in trends.json
+TREND_SERIES = {
+    "response_time_trends": (RESPONSE_TIME_SERIES, "response_time_ms"),
+    "error_rate_trends": (ERROR_RATE_SERIES, "error_rate"),
+    "cpu_trends": (RESOURCE_SERIES, "cpu_usage_percent"),
+    "memory_trends": (RESOURCE_SERIES, "memory_usage_percent"),
+}
+
+MAX_POINTS_DESCRIPTION = (
+    "Maximum points per series; longer series are returned as time buckets "
+    "with count and avg/p50/p95/p99/max per field"
+)
 
-            filtered_metrics.append(metric)
-        except:
-            # Include metrics with unparseable timestamps
-            filtered_metrics.append(metric)
 
-    return filtered_metrics
+def _window_range(
+    series: TimeSeriesStore, time_window: Optional[str], service: Optional[str]
+) -> dict:
+    """Bounds covering time_window up to the latest data point"""
+    latest = series.latest(service=service)
+    if not time_window or latest is None:
+        return {}
+    return {"since": latest - TIME_WINDOWS[time_window]}
+
+
+def _series_response(
+    series: TimeSeriesStore,
+    max_points: int,
+    service: Optional[str] = None,
+    fields: Optional[Dict[str, str]] = None,
+    transform: Optional[Callable[[Dict[str, Any]], Dict[str, Any]]] = None,
+    extra: Optional[Dict[str, Any]] = None,
+    **time_range,
+) -> Dict[str, Any]:
+    """Points (raw, or bucketed when a series exceeds max_points) and a summary.
+
+    Args:
+        series: Store to query
+        max_points: Points per series above which it is bucketed
+        service: Service filter
+        fields: Output name to record field of the values to aggregate
+        transform: Maps a raw record to the returned point
+        extra: Constant keys added to bucket and summary entries
+        **time_range: since/until bounds
+
+    Returns:
+        Dict with metrics (raw points in file order, then buckets of
+        downsampled series) and summary (per-series statistics)
+    """
+    result = series.query(
+        fields=fields, max_points=max_points, service=service, **time_range
+    )
+    points = series.records(result["positions"])
+    if transform:
+        points = [transform(point) for point in points]
+    rollups, summary = result["rollups"], result["summary"]
+    if extra:
+        rollups = [{**entry, **extra} for entry in rollups]
+        summary = [{**entry, **extra} for entry in summary]
+    return {"metrics": points + rollups, "summary": summary}
 
 
 @app.get("/metrics/performance")
@@ -105,58 +196,40 @@ async def get_performance_metrics(
     start_time: Optional[str] = Query(None, description="Start time for metrics"),
     end_time: Optional[str] = Query(None, description="End time for metrics"),
     service: Optional[str] = Query(None, description="Filter by service name"),
+    max_points: int = Query(100, ge=1, le=10000, description=MAX_POINTS_DESCRIPTION),
     api_key: str = Depends(_validate_api_key),
 ):
     """Retrieve performance data"""
     try:
-        metrics = []
+        time_range = _time_range(start_time, end_time)
 
         if metric_type == "response_time":
-            with open(DATA_PATH / "response_times.json", "r") as f:
-                data = json.load(f)
-                metrics = data.get("metrics", [])
-        elif metric_type == "throughput":
-            with open(DATA_PATH / "throughput.json", "r") as f:
-                data = json.load(f)
-                metrics = data.get("metrics", [])
-        elif metric_type in ["cpu_usage", "memory_usage"]:
-            with open(DATA_PATH / "resource_usage.json", "r") as f:
-                data = json.load(f)
-                raw_metrics = data.get("metrics", [])
-                # Transform resource metrics to match expected format
-                metrics = []
-                for m in raw_metrics:
-                    if metric_type == "cpu_usage":
-                        metrics.append(
-                            {
-                                "timestamp": m["timestamp"],
-                                "service": m["service"],
-                                "value": m["cpu_usage_percent"],
-                                "unit": "percent",
-                            }
-                        )
-                    else:  # memory_usage
-                        metrics.append(
-                            {
-                                "timestamp": m["timestamp"],
-                                "service": m["service"],
-                                "value": m["memory_usage_mb"],
-                                "unit": "MB",
-                            }
-                        )
-        else:
-            # Return combined metrics for demo
-            with open(DATA_PATH / "resource_usage.json", "r") as f:
-                data = json.load(f)
-                metrics = data.get("metrics", [])
-
-        if service:
-            metrics = [m for m in metrics if m.get("service") == service]
-
-        # Filter by time range
-        metrics = _filter_metrics_by_time(metrics, start_time, end_time)
-
-        return {"metrics": metrics}
+            return _series_response(
+                RESPONSE_TIME_SERIES, max_points, service, **time_range
+            )
+        if metric_type == "throughput":
+            return _series_response(
+                THROUGHPUT_SERIES, max_points, service, **time_range
+            )
+        if metric_type in RESOURCE_METRIC_VALUES:
+            # Resource metrics are returned as value/unit points
+            field, unit = RESOURCE_METRIC_VALUES[metric_type]
+            return _series_response(
+                RESOURCE_SERIES,
+                max_points,
+                service,
+                fields={"value": field},
+                transform=lambda m: {
+                    "timestamp": m["timestamp"],
+                    "service": m["service"],
+                    "value": m[field],
+                    "unit": unit,
+                },
+                extra={"unit": unit},
+                **time_range,
+            )
+        # Return combined metrics for demo
+        return _series_response(RESOURCE_SERIES, max_points, service, **time_range)
     except Exception as e:
         logging.error(f"Error retrieving performance metrics: {str(e)}")
         return JSONResponse(status_code=500, content={"error": str(e)})
@@ -172,13 +245,7 @@ async def get_error_rates(
 ):
     """Fetch error rate statistics"""
     try:
-        with open(DATA_PATH / "error_rates.json", "r") as f:
-            data = json.load(f)
-
-        error_rates = data.get("error_rates", [])
-
-        if service:
-            error_rates = [e for e in error_rates if e.get("service") == service]
+        error_rates = ERROR_RATES.select(service=service)
 
         # TODO: In real implementation, would filter by time window
 
@@ -190,47 +257,38 @@ async def get_error_rates(
 
 @app.get("/metrics/resources")
 async def get_resource_metrics(
-    resource_type: Optional[str] = Query(
-        None,
-        enum=["cpu", "memory", "disk", "network"],
-        description="Type of resource metric",
+    resource_type: Optional[ResourceType] = Query(
+        None, description="Type of resource metric"
     ),
     service: Optional[str] = Query(None, description="Filter by service name"),
-    time_window: Optional[str] = Query(
-        "24h", enum=["1h", "6h", "24h", "7d"], description="Time window for metrics"
+    time_window: Optional[WindowedTimeWindow] = Query(
+        "24h", description="Time window for metrics"
     ),
+    max_points: int = Query(100, ge=1, le=10000, description=MAX_POINTS_DESCRIPTION),
     api_key: str = Depends(_validate_api_key),
 ):
     """Monitor resource utilization"""
     try:
-        with open(DATA_PATH / "resource_usage.json", "r") as f:
-            data = json.load(f)
-
-        metrics = data.get("metrics", [])
-
-        if service:
-            metrics = [m for m in metrics if m.get("service") == service]
-
-        # Filter by resource type if specified
-        if resource_type:
-            filtered_metrics = []
-            for m in metrics:
-                filtered = {"timestamp": m["timestamp"], "service": m["service"]}
-                if resource_type == "cpu":
-                    filtered["cpu_usage_percent"] = m.get("cpu_usage_percent")
-                elif resource_type == "memory":
-                    filtered["memory_usage_mb"] = m.get("memory_usage_mb")
-                    filtered["memory_usage_percent"] = m.get("memory_usage_percent")
-                elif resource_type == "disk":
-                    filtered["disk_io_read_mb"] = m.get("disk_io_read_mb")
-                    filtered["disk_io_write_mb"] = m.get("disk_io_write_mb")
-                elif resource_type == "network":
-                    filtered["network_in_mb"] = m.get("network_in_mb")
-                    filtered["network_out_mb"] = m.get("network_out_mb")
-                filtered_metrics.append(filtered)
-            metrics = filtered_metrics
-
-        return {"metrics": metrics}
+        # The window ends at the latest sample, as the demo data is historical
+        time_range = _window_range(RESOURCE_SERIES, time_window, service)
+
+        if not resource_type:
+            return _series_response(RESOURCE_SERIES, max_points, service, **time_range)
+
+        # Filter by resource type
+        resource_fields = RESOURCE_FIELDS[resource_type]
+        return _series_response(
+            RESOURCE_SERIES,
+            max_points,
+            service,
+            fields={field: field for field in resource_fields},
+            transform=lambda m: {
+                "timestamp": m["timestamp"],
+                "service": m["service"],
+                **{field: m.get(field) for field in resource_fields},
+            },
+            **time_range,
+        )
     except Exception as e:
         logging.error(f"Error retrieving resource metrics: {str(e)}")
         return JSONResponse(status_code=500, content={"error": str(e)})
@@ -239,24 +297,14 @@ async def get_resource_metrics(
 @app.get("/metrics/availability")
 async def get_availability_metrics(
     service: Optional[str] = Query(None, description="Service name"),
-    time_window: Optional[str] = Query(
-        "24h",
-        enum=["1h", "6h", "24h", "7d", "30d"],
-        description="Time window for availability calculation",
+    time_window: Optional[WindowedTimeWindow] = Query(
+        "24h", description="Time window for availability calculation"
     ),
     api_key: str = Depends(_validate_api_key),
 ):
     """Check service availability"""
     try:
-        with open(DATA_PATH / "availability.json", "r") as f:
-            data = json.load(f)
-
-        availability_metrics = data.get("availability_metrics", [])
-
-        if service:
-            availability_metrics = [
-                a for a in availability_metrics if a.get("service") == service
-            ]
+        availability_metrics = AVAILABILITY.select(service=service)
 
         # TODO: In real implementation, would calculate based on time window
 
@@ -270,21 +318,19 @@ async def get_availability_metrics(
 async def analyze_trends(
     metric_name: str = Query(..., description="Name of the metric to analyze"),
     service: Optional[str] = Query(None, description="Filter by service name"),
-    time_window: Optional[str] = Query(
-        "24h",
-        enum=["1h", "6h", "24h", "7d"],
-        description="Time window for trend analysis",
+    time_window: Optional[WindowedTimeWindow] = Query(
+        "24h", description="Time window for trend analysis"
     ),
     anomaly_threshold: float = Query(
         95, ge=0, le=100, description="Percentile threshold for anomaly detection"
     ),
+    max_points: int = Query(24, ge=1, le=10000, description=MAX_POINTS_DESCRIPTION),
     api_key: str = Depends(_validate_api_key),
 ):
     """Identify metric trends and anomalies"""
     try:
         # Read trends from actual data file
-        trends_file = DATA_PATH / "trends.json"
-        if not trends_file.exists():
+        if not STORE.exists("trends.json"):
             return {
                 "trend": "no_data",
                 "average_value": 0,
@@ -292,20 +338,20 @@ async def analyze_trends(
                 "anomalies": [],
             }
 
-        with open(trends_file, "r") as f:
-            data = json.load(f)
+        data = TRENDS.data
 
         # Determine which trend data to use based on metric name
         if "response" in metric_name.lower():
-            trend_data = data.get("response_time_trends", {})
+            trend_key = "response_time_trends"
         elif "error" in metric_name.lower():
-            trend_data = data.get("error_rate_trends", {})
+            trend_key = "error_rate_trends"
         elif "cpu" in metric_name.lower():
-            trend_data = data.get("cpu_trends", {})
+            trend_key = "cpu_trends"
         elif "memory" in metric_name.lower():
-            trend_data = data.get("memory_trends", {})
+            trend_key = "memory_trends"
         else:
-            trend_data = {}
+            trend_key = None
+        trend_data = data.get(trend_key, {}) if trend_key else {}
 
         # Default values if no data found
         trend = trend_data.get("trend", "no_data")
@@ -313,12 +359,32 @@ async def analyze_trends(
         standard_deviation = trend_data.get("standard_deviation", 0)
         anomalies = trend_data.get("anomalies", [])
 
-        return {
+        response = {
             "trend": trend,
             "average_value": average_value,
             "standard_deviation": standard_deviation,
             "anomalies": anomalies,
         }
+
+        # Add statistics and a compact (downsampled) series of the metric
+        if trend_key in TREND_SERIES:
+            series, field = TREND_SERIES[trend_key]
+            values = _series_response(
+                series,
+                max_points,
+                service,
+                fields={"value": field},
+                transform=lambda m: {
+                    "timestamp": m["timestamp"],
+                    "service": m["service"],
+                    "value": m.get(field),
+                },
+                **_window_range(series, time_window, service),
+            )
+            response["summary"] = values["summary"]
+            response["points"] = values["metrics"]
+
+        return response
     except Exception as e:
         logging.error(f"Error analyzing trends: {str(e)}")
         return JSONResponse(status_code=500, content={"error": str(e)})
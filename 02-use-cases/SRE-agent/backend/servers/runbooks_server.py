@@ -3,6 +3,7 @@ import logging
 from pathlib import Path
 from typing import Optional
 
+from data_store import DataStore
 from fastapi import (
     Depends,
     FastAPI,
@@ -15,6 +16,7 @@ from fastapi import (
 )
 from fastapi.responses import JSONResponse
 from retrieve_api_key import retrieve_api_key
+from search_index import LiveSearchIndex, markdown_documents, record_document
 
 # Configure logging with basicConfig
 logging.basicConfig(
@@ -27,6 +29,52 @@ app = FastAPI(title="DevOps Runbooks API", version="1.0.0")
 
 DATA_PATH = Path(__file__).parent.parent / "data" / "runbooks_data"
 
+# Data files are loaded once, indexed, and reloaded when they change on disk
+STORE = DataStore(DATA_PATH)
+PLAYBOOKS = STORE.register(
+    "incident_playbooks.json",
+    records_key="playbooks",
+    indexes=("id", "incident_type", "severity"),
+)
+GUIDES = STORE.register(
+    "troubleshooting_guides.json", records_key="guides", indexes=("category",)
+)
+ESCALATION_PROCEDURES = STORE.register(
+    "escalation_procedures.json",
+    records_key="escalation_procedures",
+    indexes=("severity",),
+)
+RESOLUTIONS = STORE.register("common_resolutions.json", records_key="resolutions")
+
+MARKDOWN_PATH = DATA_PATH / "markdown"
+# Dataset, source name and title field of the records /runbooks/search ranks
+SEARCH_SOURCES = (
+    (PLAYBOOKS, "playbook", "title"),
+    (GUIDES, "troubleshooting_guide", "title"),
+    (ESCALATION_PROCEDURES, "escalation_procedure", "title"),
+    (RESOLUTIONS, "resolution", "issue"),
+)
+
+
+def _search_documents():
+    """JSON records first, then markdown sections not already covered by a record"""
+    for dataset, source, title_field in SEARCH_SOURCES:
+        for record in dataset.records():
+            yield record_document(record, source, title_field)
+    for path in sorted(MARKDOWN_PATH.glob("*.md")):
+        yield from markdown_documents(path, source="markdown")
+
+
+def _search_files():
+    return [dataset.path for dataset, _, _ in SEARCH_SOURCES] + list(
+        MARKDOWN_PATH.glob("*.md")
+    )
+
+
+# Keyword searches use an inverted index over all runbook content, rebuilt
+# when any source file changes
+SEARCH_INDEX = LiveSearchIndex(_search_documents, _search_files)
+
 # API Key for authentication
 CREDENTIAL_PROVIDER_NAME = "sre-agent-api-key-credential-provider"
 
@@ -65,64 +113,60 @@ async def search_runbooks(
         enum=["low", "medium", "high", "critical"],
         description="Incident severity level",
     ),
+    page: int = Query(1, ge=1, description="Page of results, starting at 1"),
+    page_size: int = Query(20, ge=1, le=100, description="Results per page"),
     api_key: str = Depends(_validate_api_key),
 ):
     """Search runbooks by incident type/keyword"""
     try:
         logging.info(
-            f"🔍 RUNBOOKS API: search_runbooks called - incident_type={incident_type}, keyword={keyword}, severity={severity}"
+            f"🔍 RUNBOOKS API: search_runbooks called - incident_type={incident_type}, keyword={keyword}, severity={severity}, page={page}, page_size={page_size}"
         )
 
-        with open(DATA_PATH / "incident_playbooks.json", "r") as f:
-            data = json.load(f)
-
-        runbooks = data.get("playbooks", [])
-        original_count = len(runbooks)
-
-        if incident_type:
-            runbooks = [r for r in runbooks if r.get("incident_type") == incident_type]
-            logging.info(
-                f"📋 RUNBOOKS API: Filtered by incident_type '{incident_type}': {len(runbooks)} runbooks"
-            )
-
-        if severity:
-            runbooks = [r for r in runbooks if r.get("severity") == severity]
-            logging.info(
-                f"📋 RUNBOOKS API: Filtered by severity '{severity}': {len(runbooks)} runbooks"
-            )
-
+        offset = (page - 1) * page_size
         if keyword:
+            # Ranked across playbooks, guides, escalation procedures,
+            # resolutions and markdown runbooks; any keyword may match
+            total, hits = SEARCH_INDEX.search(
+                keyword,
+                offset=offset,
+                limit=page_size,
+                incident_type=incident_type,
+                severity=severity,
+            )
             runbooks = [
-                r
-                for r in runbooks
-                if keyword.lower() in r.get("title", "").lower()
-                or keyword.lower() in r.get("description", "").lower()
-                or any(keyword.lower() in step.lower() for step in r.get("steps", []))
+                {
+                    **hit.document.payload,
+                    "source": hit.document.source,
+                    "score": round(hit.score, 3),
+                }
+                for hit in hits
             ]
-            logging.info(
-                f"📋 RUNBOOKS API: Filtered by keyword '{keyword}': {len(runbooks)} runbooks"
-            )
-
-        response_data = {"runbooks": runbooks}
+        else:
+            matches = PLAYBOOKS.select(incident_type=incident_type, severity=severity)
+            total = len(matches)
+            runbooks = matches[offset : offset + page_size]
+
+        response_data = {
+            "runbooks": runbooks,
+            "total": total,
+            "page": page,
+            "page_size": page_size,
+        }
 
-        # Log detailed response
         logging.info(
-            f"📤 RUNBOOKS API: Returning {len(runbooks)} runbooks out of {original_count} total"
+            f"📤 RUNBOOKS API: Returning {len(runbooks)} of {total} matching runbooks"
         )
-        for i, runbook in enumerate(runbooks):
-            logging.info(
-                f"  📖 Runbook {i + 1}: {runbook.get('title', 'No title')} (ID: {runbook.get('id', 'No ID')})"
+        # Per-runbook detail and the full response are costly to format, so
+        # they are only built when debug logging is enabled
+        if logging.getLogger().isEnabledFor(logging.DEBUG):
+            for i, runbook in enumerate(runbooks):
+                logging.debug(
+                    f"  📖 Runbook {offset + i + 1}: {runbook.get('title', 'No title')} (ID: {runbook.get('id', 'No ID')})"
+                )
+            logging.debug(
+                f"📋 RUNBOOKS API: Full response data: {json.dumps(response_data, indent=2)}"
             )
-            steps = runbook.get("steps", [])
-            logging.info(f"     Steps count: {len(steps)}")
-            for j, step in enumerate(steps[:3]):  # Show first 3 steps for brevity
-                logging.info(f"     Step {j + 1}: {step}")
-            if len(steps) > 3:
-                logging.info(f"     ... and {len(steps) - 3} more steps")
-
-        logging.info(
-            f"📋 RUNBOOKS API: Full response data: {json.dumps(response_data, indent=2)}"
-        )
         return response_data
     except Exception as e:
         logging.error(f"❌ Error searching runbooks: {str(e)}")
@@ -140,25 +184,21 @@ async def get_incident_playbook(
             f"🔍 RUNBOOKS API: get_incident_playbook called for playbook_id='{playbook_id}'"
         )
 
-        with open(DATA_PATH / "incident_playbooks.json", "r") as f:
-            data = json.load(f)
-
-        playbooks = data.get("playbooks", [])
+        playbook = PLAYBOOKS.get("id", playbook_id)
 
-        for playbook in playbooks:
-            if playbook.get("id") == playbook_id:
-                logging.info(
-                    f"📖 RUNBOOKS API: Found playbook '{playbook.get('title', 'No title')}'"
-                )
-                steps = playbook.get("steps", [])
-                logging.info(f"📝 RUNBOOKS API: Playbook has {len(steps)} steps:")
-                for i, step in enumerate(steps):
-                    logging.info(f"   Step {i + 1}: {step}")
+        if playbook is not None:
+            logging.info(
+                f"📖 RUNBOOKS API: Found playbook '{playbook.get('title', 'No title')}'"
+            )
+            steps = playbook.get("steps", [])
+            logging.info(f"📝 RUNBOOKS API: Playbook has {len(steps)} steps:")
+            for i, step in enumerate(steps):
+                logging.info(f"   Step {i + 1}: {step}")
 
-                logging.info(
-                    f"📤 RUNBOOKS API: Returning complete playbook data: {json.dumps(playbook, indent=2)}"
-                )
-                return playbook
+            logging.info(
+                f"📤 RUNBOOKS API: Returning complete playbook data: {json.dumps(playbook, indent=2)}"
+            )
+            return playbook
 
         logging.warning(f"❌ RUNBOOKS API: Playbook '{playbook_id}' not found")
         return JSONResponse(status_code=404, content={"error": "Playbook not found"})
@@ -183,14 +223,10 @@ async def get_troubleshooting_guide(
             f"🔍 RUNBOOKS API: get_troubleshooting_guide called - category={category}, issue_type={issue_type}"
         )
 
-        with open(DATA_PATH / "troubleshooting_guides.json", "r") as f:
-            data = json.load(f)
-
-        guides = data.get("guides", [])
-        original_count = len(guides)
+        guides = GUIDES.select(category=category)
+        original_count = len(GUIDES)
 
         if category:
-            guides = [g for g in guides if g.get("category") == category]
             logging.info(
                 f"📋 RUNBOOKS API: Filtered by category '{category}': {len(guides)} guides"
             )
@@ -244,13 +280,7 @@ async def get_escalation_procedures(
 ):
     """Retrieve escalation procedures"""
     try:
-        with open(DATA_PATH / "escalation_procedures.json", "r") as f:
-            data = json.load(f)
-
-        procedures = data.get("escalation_procedures", [])
-
-        if severity:
-            procedures = [p for p in procedures if p.get("severity") == severity]
+        procedures = ESCALATION_PROCEDURES.select(severity=severity)
 
         if incident_type:
             procedures = [
@@ -281,10 +311,7 @@ async def get_common_resolutions(
             f"🔍 RUNBOOKS API: get_common_resolutions called - issue='{issue}', service={service}"
         )
 
-        with open(DATA_PATH / "common_resolutions.json", "r") as f:
-            data = json.load(f)
-
-        resolutions = data.get("resolutions", [])
+        resolutions = RESOLUTIONS.records()
         original_count = len(resolutions)
 
         # Filter by issue
@@ -0,0 +1,362 @@
+"""
+Ranked full-text search over runbook content.
+
+Documents are tokenised once into an inverted index that maps each term to
+the documents containing it. The BM25 weight of every (term, document) pair
+is computed when the index is built, so a query only sums the precomputed
+weights of the postings of its terms. Query terms also match longer terms
+they are a prefix of ("crash" finds "crashloopbackoff"), using binary search
+over the sorted vocabulary.
+
+The index is rebuilt when any of the files it was built from changes.
+"""
+
+import heapq
+import logging
+import math
+import os
+import re
+import threading
+import time
+from bisect import bisect_left
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+# Configure logging with basicConfig
+logging.basicConfig(
+    level=logging.INFO,  # Set the log level to INFO
+    # Define log message format
+    format="%(asctime)s,p%(process)s,{%(filename)s:%(lineno)d},%(levelname)s,%(message)s",
+)
+
+logger = logging.getLogger(__name__)
+
+# BM25 parameters: term frequency saturation and document length normalisation
+K1 = 1.2
+B = 0.75
+# Title terms count as this many occurrences
+TITLE_BOOST = 3
+# Prefix matches score this fraction of an exact match
+PREFIX_WEIGHT = 0.5
+# Shorter query terms only match exactly
+MIN_PREFIX_LENGTH = 3
+# Prefix expansions kept per query term, most frequent first
+MAX_EXPANSIONS = 50
+
+STOP_WORDS = frozenset(
+    "a an and are as at be by for from if in into is it of on or the this to "
+    "with".split()
+)
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+_MARKDOWN_ID_RE = re.compile(r"^\*\*[\w ]*ID:\*\*\s*`([^`]+)`", re.MULTILINE)
+_MARKDOWN_FIELD_RE = re.compile(r"^\*\*([\w ]+):\*\*\s*(.+?)\s*$", re.MULTILINE)
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase alphanumeric terms of text, without stop words"""
+    return [t for t in _TOKEN_RE.findall(text.lower()) if t not in STOP_WORDS]
+
+
+def flatten_text(value: Any) -> str:
+    """Join every string and number nested in value into one text"""
+    if isinstance(value, str):
+        return value
+    if isinstance(value, dict):
+        return " ".join(flatten_text(v) for v in value.values())
+    if isinstance(value, (list, tuple)):
+        return " ".join(flatten_text(v) for v in value)
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return str(value)
+    return ""
+
+
+class Document(NamedTuple):
+    """One searchable unit.
+
+    Attributes:
+        id: Identifier, unique across sources
+        source: Kind of content (playbook, troubleshooting_guide, ...)
+        title: Title, weighted above the body
+        text: Body text
+        fields: Metadata that search filters compare by equality
+        payload: Object returned for a hit
+    """
+
+    id: str
+    source: str
+    title: str
+    text: str
+    fields: Dict[str, Any]
+    payload: Any
+
+
+class Hit(NamedTuple):
+    document: Document
+    score: float
+
+
+def record_document(
+    record: Dict[str, Any],
+    source: str,
+    title_field: str = "title",
+    filter_fields: Iterable[str] = ("incident_type", "severity"),
+) -> Document:
+    """Document for a JSON data record; every nested value is searchable.
+
+    Args:
+        record: Data record with an id
+        source: Kind of record
+        title_field: Record field holding its title
+        filter_fields: Record fields exposed as filterable metadata
+    """
+    title = record.get(title_field, "")
+    body = {key: value for key, value in record.items() if key != title_field}
+    return Document(
+        id=str(record.get("id", "")),
+        source=source,
+        title=title,
+        text=flatten_text(body),
+        fields={f: record[f] for f in filter_fields if record.get(f) is not None},
+        payload=record,
+    )
+
+
+def markdown_documents(path: Path, source: str = "markdown") -> List[Document]:
+    """One document per `## ` section of a markdown runbook.
+
+    The section id is taken from a `**... ID:** `value`` line when present.
+    `**Incident Type:**` and `**Severity:**` lines become lowercase filter
+    metadata. The payload holds the id, title, file name and section text.
+    """
+    documents = []
+    sections = re.split(r"^## ", Path(path).read_text(), flags=re.MULTILINE)[1:]
+    for section in sections:
+        heading, _, body = section.partition("\n")
+        title = heading.strip()
+        body = body.strip().removesuffix("---").strip()
+        match = _MARKDOWN_ID_RE.search(body)
+        section_id = (
+            match.group(1)
+            if match
+            else f"{Path(path).stem}#{'-'.join(tokenize(title)) or len(documents)}"
+        )
+        fields = {}
+        for name, value in _MARKDOWN_FIELD_RE.findall(body):
+            key = name.strip().lower().replace(" ", "_")
+            if key in ("incident_type", "severity"):
+                fields[key] = value.lower()
+        documents.append(
+            Document(
+                id=section_id,
+                source=source,
+                title=title,
+                text=body,
+                fields=fields,
+                payload={
+                    "id": section_id,
+                    "title": title,
+                    "file": Path(path).name,
+                    "content": body,
+                },
+            )
+        )
+    return documents
+
+
+class SearchIndex:
+    """Inverted index with precomputed BM25 weights.
+
+    Args:
+        documents: Documents to index; later duplicates of an id are dropped
+    """
+
+    def __init__(self, documents: Iterable[Document]):
+        self.documents: List[Document] = []
+        seen = set()
+        term_counts: List[Dict[str, int]] = []
+        lengths: List[int] = []
+        for document in documents:
+            if document.id in seen:
+                continue
+            seen.add(document.id)
+            counts: Dict[str, int] = {}
+            for term in tokenize(document.title):
+                counts[term] = counts.get(term, 0) + TITLE_BOOST
+            for term in tokenize(document.text):
+                counts[term] = counts.get(term, 0) + 1
+            self.documents.append(document)
+            term_counts.append(counts)
+            lengths.append(sum(counts.values()))
+
+        postings: Dict[str, Tuple[List[int], List[int]]] = {}
+        for doc_id, counts in enumerate(term_counts):
+            for term, count in counts.items():
+                docs, tfs = postings.setdefault(term, ([], []))
+                docs.append(doc_id)
+                tfs.append(count)
+
+        total = len(self.documents)
+        average_length = sum(lengths) / total if total else 0.0
+        norms = [
+            K1 * (1 - B + B * length / average_length) if average_length else K1
+            for length in lengths
+        ]
+        # term -> (document numbers, BM25 weight of the term in each)
+        self._postings: Dict[str, Tuple[List[int], List[float]]] = {}
+        for term, (docs, tfs) in postings.items():
+            idf = _idf(len(docs), total)
+            self._postings[term] = (
+                docs,
+                [idf * tf * (K1 + 1) / (tf + norms[d]) for d, tf in zip(docs, tfs)],
+            )
+        self._terms = sorted(self._postings)
+
+    def __len__(self) -> int:
+        return len(self.documents)
+
+    @property
+    def term_count(self) -> int:
+        """Number of distinct indexed terms."""
+        return len(self._terms)
+
+    def _expand(self, term: str) -> List[Tuple[str, float]]:
+        """Indexed terms a query term matches, with their weight multiplier."""
+        matches = [(term, 1.0)] if term in self._postings else []
+        if len(term) < MIN_PREFIX_LENGTH:
+            return matches
+
+        longer = []
+        position = bisect_left(self._terms, term)
+        while position < len(self._terms) and self._terms[position].startswith(term):
+            if self._terms[position] != term:
+                longer.append(self._terms[position])
+            position += 1
+        if len(longer) > MAX_EXPANSIONS:
+            longer = heapq.nlargest(
+                MAX_EXPANSIONS, longer, key=lambda t: len(self._postings[t][0])
+            )
+        return matches + [(t, PREFIX_WEIGHT) for t in longer]
+
+    def search(
+        self,
+        query: str,
+        offset: int = 0,
+        limit: Optional[int] = 10,
+        **filters: Any,
+    ) -> Tuple[int, List[Hit]]:
+        """Documents matching any query term, best first.
+
+        A document scores the sum, over query terms, of the BM25 weight of
+        its best match for that term (exact, or a prefix match scaled by
+        PREFIX_WEIGHT), so documents matching more terms rank higher. Ties
+        keep index order.
+
+        Args:
+            query: Free text; tokenised like the documents
+            offset: Number of ranked hits to skip
+            limit: Maximum hits to return (None for all)
+            **filters: Document field to required value; None is ignored
+
+        Returns:
+            Total number of matching documents and the requested page of hits
+        """
+        filters = {name: value for name, value in filters.items() if value is not None}
+        scores: Dict[int, float] = {}
+        for term in dict.fromkeys(tokenize(query)):
+            best: Dict[int, float] = {}
+            for indexed_term, multiplier in self._expand(term):
+                docs, weights = self._postings[indexed_term]
+                for doc_id, weight in zip(docs, weights):
+                    weight *= multiplier
+                    if weight > best.get(doc_id, 0.0):
+                        best[doc_id] = weight
+            for doc_id, weight in best.items():
+                scores[doc_id] = scores.get(doc_id, 0.0) + weight
+
+        if filters:
+            documents = self.documents
+            scores = {
+                doc_id: score
+                for doc_id, score in scores.items()
+                if all(
+                    documents[doc_id].fields.get(name) == value
+                    for name, value in filters.items()
+                )
+            }
+
+        ranked_count = len(scores) if limit is None else offset + limit
+        ranked = heapq.nsmallest(
+            ranked_count, scores.items(), key=lambda item: (-item[1], item[0])
+        )
+        return len(scores), [
+            Hit(self.documents[doc_id], score) for doc_id, score in ranked[offset:]
+        ]
+
+
+def _idf(document_frequency: int, total: int) -> float:
+    """BM25 inverse document frequency, kept positive for very common terms"""
+    return math.log(1 + (total - document_frequency + 0.5) / (document_frequency + 0.5))
+
+
+class LiveSearchIndex:
+    """SearchIndex rebuilt when the files it was built from change.
+
+    Args:
+        load: Returns the documents to index; called on every rebuild
+        watch: Returns the files load reads; their size and mtime are compared
+        check_interval: Minimum seconds between checks of the files
+    """
+
+    def __init__(
+        self,
+        load: Callable[[], Iterable[Document]],
+        watch: Callable[[], Iterable[Path]],
+        check_interval: float = 1.0,
+    ):
+        self.load = load
+        self.watch = watch
+        self.check_interval = check_interval
+        self.builds = 0
+        self._index: Optional[SearchIndex] = None
+        self._signature: Optional[Tuple] = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def _signature_now(self) -> Tuple:
+        signature = []
+        for path in sorted(self.watch()):
+            try:
+                stat = os.stat(path)
+                signature.append((str(path), stat.st_mtime_ns, stat.st_size))
+            except FileNotFoundError:
+                signature.append((str(path), None, None))
+        return tuple(signature)
+
+    def current(self) -> SearchIndex:
+        """Return the index, rebuilding it if a watched file changed."""
+        now = time.monotonic()
+        index = self._index
+        if index is not None and now - self._checked_at < self.check_interval:
+            return index
+
+        with self._lock:
+            if self._index is not None and now - self._checked_at < self.check_interval:
+                return self._index
+            signature = self._signature_now()
+            if self._index is None or signature != self._signature:
+                start = time.perf_counter()
+                self._index = SearchIndex(self.load())
+                self._signature = signature
+                self.builds += 1
+                logger.info(
+                    f"Built search index: {len(self._index)} documents, "
+                    f"{self._index.term_count} terms in "
+                    f"{time.perf_counter() - start:.3f}s"
+                )
+            self._checked_at = now
+            return self._index
+
+    def search(self, query: str, **options: Any) -> Tuple[int, List[Hit]]:
+        """SearchIndex.search on the current index."""
+        return self.current().search(query, **options)
@@ -0,0 +1,359 @@
+"""
+Columnar, in-memory time series for the metrics server.
+
+Records of a metrics Dataset are grouped into series (by service, and any
+other key fields) and stored as NumPy arrays: epoch-second timestamps in time
+order, the position of each point's source record, and one float column per
+numeric record field (NaN where a record lacks it). Time ranges are sliced
+with a binary search on the timestamp array, and rollups (count, avg, p50,
+p95, p99, max per time bucket) are computed with vectorised sorts and
+reductions instead of per-record Python loops.
+
+Series are rebuilt when the underlying Dataset reloads its file.
+"""
+
+import logging
+import threading
+import time
+from datetime import datetime, timezone
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from data_store import Dataset
+
+# Configure logging with basicConfig
+logging.basicConfig(
+    level=logging.INFO,  # Set the log level to INFO
+    # Define log message format
+    format="%(asctime)s,p%(process)s,{%(filename)s:%(lineno)d},%(levelname)s,%(message)s",
+)
+
+logger = logging.getLogger(__name__)
+
+# Percentiles reported for every rollup, by output name
+PERCENTILES = {"p50": 50, "p95": 95, "p99": 99}
+
+
+def to_epoch(value: datetime) -> float:
+    """Epoch seconds of a datetime; naive values are taken as UTC"""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+def format_epoch(seconds: float) -> str:
+    """ISO 8601 UTC timestamp in the format of the metrics data files"""
+    return datetime.fromtimestamp(seconds, timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+class SeriesWindow(NamedTuple):
+    """Points of one series inside a time range, oldest first.
+
+    Attributes:
+        key: Series key fields and values, e.g. {"service": "web-service"}
+        times: Epoch seconds of each point
+        positions: Position of each point's record in the Dataset
+        columns: Numeric record field to its value per point (NaN if missing)
+    """
+
+    key: Dict[str, Any]
+    times: np.ndarray
+    positions: np.ndarray
+    columns: Dict[str, np.ndarray]
+
+    def __len__(self) -> int:
+        return len(self.times)
+
+
+def _bucket_stats(
+    buckets: np.ndarray, values: np.ndarray
+) -> Dict[int, Dict[str, float]]:
+    """avg/percentiles/max of values per bucket id, skipping NaN values."""
+    present = ~np.isnan(values)
+    buckets, values = buckets[present], values[present]
+    if not len(values):
+        return {}
+
+    # Sort by bucket, then by value, so each bucket is a sorted run
+    order = np.lexsort((values, buckets))
+    buckets, values = buckets[order], values[order]
+    ids, starts, counts = np.unique(buckets, return_index=True, return_counts=True)
+
+    stats = {"avg": np.add.reduceat(values, starts) / counts}
+    for name, percentile in PERCENTILES.items():
+        # Linear interpolation between closest ranks, as numpy.percentile
+        rank = starts + (counts - 1) * (percentile / 100)
+        low = np.floor(rank).astype(np.int64)
+        high = np.ceil(rank).astype(np.int64)
+        stats[name] = values[low] + (values[high] - values[low]) * (rank - low)
+    stats["max"] = values[starts + counts - 1]
+
+    return {
+        int(bucket): {
+            name: round(float(column[i]), 3) for name, column in stats.items()
+        }
+        for i, bucket in enumerate(ids)
+    }
+
+
+def bucket_seconds(window: SeriesWindow, max_points: int) -> int:
+    """Smallest whole-second bucket width giving at most max_points buckets"""
+    if len(window) < 2:
+        return 1
+    span = float(window.times[-1] - window.times[0])
+    return int(span // max_points) + 1
+
+
+def rollup(
+    window: SeriesWindow,
+    fields: Dict[str, str],
+    width: Optional[int] = None,
+) -> List[Dict[str, Any]]:
+    """Aggregate a window into time buckets.
+
+    Args:
+        window: Points to aggregate
+        fields: Output name to column name of the fields to aggregate
+        width: Bucket width in seconds; None makes the whole window one bucket
+
+    Returns:
+        One dict per non-empty bucket, oldest first, with the bucket start
+        timestamp, the series key, the point count and, for every field,
+        avg/p50/p95/p99/max. Bucketed rollups also carry bucket_seconds; a
+        whole-window rollup carries the end_timestamp of its last point.
+    """
+    if not len(window):
+        return []
+
+    start = float(window.times[0])
+    if width is None:
+        buckets = np.zeros(len(window), dtype=np.int64)
+    else:
+        buckets = ((window.times - start) // width).astype(np.int64)
+    ids, counts = np.unique(buckets, return_counts=True)
+    stats = {
+        name: _bucket_stats(buckets, window.columns[column])
+        for name, column in fields.items()
+        if column in window.columns
+    }
+
+    results = []
+    for bucket, count in zip(ids.tolist(), counts.tolist()):
+        entry = {
+            "timestamp": format_epoch(
+                start if width is None else start + bucket * width
+            ),
+            **window.key,
+        }
+        if width is None:
+            entry["end_timestamp"] = format_epoch(float(window.times[-1]))
+        else:
+            entry["bucket_seconds"] = width
+        entry["count"] = count
+        for name, per_bucket in stats.items():
+            if bucket in per_bucket:
+                entry[name] = per_bucket[bucket]
+        results.append(entry)
+    return results
+
+
+class _Series:
+    """Arrays of one series, sorted by time."""
+
+    def __init__(
+        self,
+        key: Dict[str, Any],
+        positions: np.ndarray,
+        epochs: np.ndarray,
+        columns: Dict[str, np.ndarray],
+    ):
+        order = np.argsort(epochs[positions], kind="stable")
+        self.key = key
+        self.positions = positions[order]
+        self.times = epochs[self.positions]
+        self.columns = {
+            name: values[self.positions] for name, values in columns.items()
+        }
+
+    def window(self, since: Optional[float], until: Optional[float]) -> SeriesWindow:
+        low = np.searchsorted(self.times, since, "left") if since is not None else 0
+        high = (
+            np.searchsorted(self.times, until, "right")
+            if until is not None
+            else len(self.times)
+        )
+        return SeriesWindow(
+            self.key,
+            self.times[low:high],
+            self.positions[low:high],
+            {name: values[low:high] for name, values in self.columns.items()},
+        )
+
+
+def _numeric_column(values: List[Any]) -> Optional[np.ndarray]:
+    """Float array of values with NaN for non-numbers; None if none are numbers"""
+    column = np.array(
+        [v if type(v) in (int, float) else np.nan for v in values], dtype=np.float64
+    )
+    return None if np.isnan(column).all() else column
+
+
+class TimeSeriesStore:
+    """Columnar view of a metrics Dataset, one series per key.
+
+    Timestamps come from the dataset's time_field, which must be set.
+    Records without a timestamp, or whose timestamp cannot be parsed, are
+    left out of every series.
+
+    Args:
+        dataset: Dataset of metric records, with a time_field
+        key_fields: Record fields identifying a series
+    """
+
+    def __init__(self, dataset: "Dataset", key_fields: Tuple[str, ...] = ("service",)):
+        self.dataset = dataset
+        self.key_fields = tuple(key_fields)
+        self.builds = 0
+        self._series: List[_Series] = []
+        self._records: List[Dict[str, Any]] = []
+        self._built_loads: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def _current(self) -> Tuple[List[_Series], List[Dict[str, Any]]]:
+        """Series and records, rebuilt when the dataset has reloaded its file."""
+        len(self.dataset)  # lets the dataset pick up a changed file
+        if self._built_loads == self.dataset.loads:
+            return self._series, self._records
+
+        with self._lock:
+            loads = self.dataset.loads
+            if self._built_loads != loads:
+                start = time.perf_counter()
+                records, times = self.dataset.timeline()
+                self._series = self._build(records, times)
+                self._records = records
+                self._built_loads = loads
+                self.builds += 1
+                logger.info(
+                    f"Built {len(self._series)} series from "
+                    f"{self.dataset.path.name} in {time.perf_counter() - start:.3f}s"
+                )
+            return self._series, self._records
+
+    def _build(
+        self, records: List[Dict[str, Any]], times: List[Optional[datetime]]
+    ) -> List[_Series]:
+        epochs = np.array(
+            [np.nan if t is None else t.timestamp() for t in times], dtype=np.float64
+        )
+
+        # One column per numeric field over all records, shared by the series
+        skip = set(self.key_fields) | {self.dataset.time_field}
+        names = set().union(*records) - skip if records else set()
+        columns = {}
+        for name in sorted(names):
+            column = _numeric_column([record.get(name) for record in records])
+            if column is not None:
+                columns[name] = column
+
+        grouped: Dict[Tuple, List[int]] = {}
+        for position, key in enumerate(
+            zip(*([r.get(field) for r in records] for field in self.key_fields))
+        ):
+            if not np.isnan(epochs[position]):
+                grouped.setdefault(key, []).append(position)
+
+        return [
+            _Series(
+                {
+                    field: value
+                    for field, value in zip(self.key_fields, key)
+                    if value is not None
+                },
+                np.asarray(positions, dtype=np.int64),
+                epochs,
+                columns,
+            )
+            for key, positions in grouped.items()
+        ]
+
+    def records(self, positions: Iterable[int]) -> List[Dict[str, Any]]:
+        """Source records at the given positions."""
+        _, records = self._current()
+        return [records[p] for p in positions]
+
+    def windows(
+        self,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        **filters: Any,
+    ) -> List[SeriesWindow]:
+        """Points of every matching series inside [since, until].
+
+        Args:
+            since: Earliest timestamp to include (naive means UTC)
+            until: Latest timestamp to include (naive means UTC)
+            **filters: Key field to required value; None is ignored
+
+        Returns:
+            One window per series whose key matches, in first-seen order
+        """
+        series, _ = self._current()
+        filters = {name: value for name, value in filters.items() if value is not None}
+        low = to_epoch(since) if since is not None else None
+        high = to_epoch(until) if until is not None else None
+        return [
+            s.window(low, high)
+            for s in series
+            if all(s.key.get(name) == value for name, value in filters.items())
+        ]
+
+    def latest(self, **filters: Any) -> Optional[datetime]:
+        """Timestamp of the most recent point of the matching series."""
+        ends = [w.times[-1] for w in self.windows(**filters) if len(w)]
+        if not ends:
+            return None
+        return datetime.fromtimestamp(float(max(ends)), timezone.utc)
+
+    def query(
+        self,
+        fields: Optional[Dict[str, str]] = None,
+        max_points: Optional[int] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        **filters: Any,
+    ) -> Dict[str, Any]:
+        """Raw points of short series, rollups of long ones, and a summary.
+
+        Args:
+            fields: Output name to column name of the fields to aggregate
+                (default every numeric column under its own name)
+            max_points: Series with more points are downsampled into at most
+                this many buckets; None never downsamples
+            since: Earliest timestamp to include (naive means UTC)
+            until: Latest timestamp to include (naive means UTC)
+            **filters: Key field to required value; None is ignored
+
+        Returns:
+            Dict with positions (records to return as they are, in file
+            order), rollups (bucket dicts of downsampled series) and summary
+            (one whole-window rollup per non-empty series)
+        """
+        positions: List[int] = []
+        rollups: List[Dict[str, Any]] = []
+        summary: List[Dict[str, Any]] = []
+        for window in self.windows(since=since, until=until, **filters):
+            if not len(window):
+                continue
+            names = fields or {name: name for name in window.columns}
+            summary.extend(rollup(window, names))
+            if max_points is None or len(window) <= max_points:
+                positions.extend(window.positions.tolist())
+            else:
+                rollups.extend(
+                    rollup(window, names, bucket_seconds(window, max_points))
+                )
+        positions.sort()
+        return {"positions": positions, "rollups": rollups, "summary": summary}
@@ -69,6 +69,42 @@ def _get_session_from_env(mode: str) -> str:
         return auto_session_id
 
 
+def _print_event_stream(body) -> None:
+    """Print Server-Sent Events of a streamed invocation as they arrive.
+
+    Args:
+        body: botocore StreamingBody of the invoke_agent_runtime response
+    """
+    streamed_tokens = False
+    for line in body.iter_lines():
+        line = line.decode("utf-8")
+        if not line.startswith("data: "):
+            continue
+        event = json.loads(line[len("data: ") :])
+        event_type = event.get("type")
+
+        if event_type == "routing":
+            wave = ", ".join(event.get("wave") or []) or event.get("next", "")
+            print(f"🧭 Routing to {wave}: {event.get('reasoning', '')}")
+        elif event_type == "tool_call":
+            print(f"🔧 {event['agent']} → {event['tool']}({event['args']})")
+        elif event_type == "tool_result":
+            print(f"   {event['tool']} [{event['status']}]: {event['preview']}")
+        elif event_type == "agent_completed":
+            print(f"✅ {event['agent']} completed")
+        elif event_type == "token":
+            streamed_tokens = True
+            print(event["text"], end="", flush=True)
+        elif event_type == "error":
+            logging.error(event.get("detail", "Agent processing failed"))
+        elif event_type == "final":
+            if streamed_tokens:
+                print()
+            else:
+                print("\nMessage:")
+                print(event["output"]["message"])
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="Invoke SRE Agent Runtime via AgentCore"
@@ -79,13 +115,18 @@ def main():
         help="Agent Runtime ARN (reads from .sre_agent_uri if not provided)",
     )
     parser.add_argument(
-        "--region", 
-        default=os.environ.get("AWS_REGION", "us-east-1"), 
-        help="AWS region (default: AWS_REGION env var or us-east-1)"
+        "--region",
+        default=os.environ.get("AWS_REGION", "us-east-1"),
+        help="AWS region (default: AWS_REGION env var or us-east-1)",
     )
     parser.add_argument(
         "--session-id", help="Runtime session ID (generates one if not provided)"
     )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Stream routing decisions, tool calls and the response as they happen",
+    )
 
     args = parser.parse_args()
 
@@ -154,9 +195,14 @@ def main():
         session_id = env_session_id
 
     # Prepare payload with user_id and session_id
-    payload = json.dumps(
-        {"input": {"prompt": args.prompt, "user_id": user_id, "session_id": session_id}}
-    )
+    request_input = {
+        "prompt": args.prompt,
+        "user_id": user_id,
+        "session_id": session_id,
+    }
+    if args.stream:
+        request_input["stream"] = True
+    payload = json.dumps({"input": request_input})
 
     logging.info(f"Invoking agent runtime: {runtime_arn}")
     logging.info(f"Session ID: {session_id}")
@@ -170,6 +216,10 @@ def main():
             qualifier="DEFAULT",
         )
 
+        if args.stream:
+            _print_event_stream(response["response"])
+            return
+
         response_body = response["response"].read()
         response_data = json.loads(response_body)
 
@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Benchmark MCP tool loading at agent startup, with and without the schema cache.
+
+Serves the tools of sre_agent/config/agent_config.yaml from a local MCP
+server over streamable HTTP, with --gateway-latency seconds added to every
+HTTP request to stand in for the AgentCore Gateway round trip, and loads
+them the way create_multi_agent_system does:
+
+    no cache     list the tools from the gateway (the previous startup path,
+                 which also writes the schema cache)
+    cached       build the tools from the schema cache and revalidate in the
+                 background
+
+For each it reports the time until the tools are ready to build the agent
+graph, and the time of the first tool call, which opens the gateway session
+the cached path skipped at startup.
+
+Usage:
+    uv run python scripts/benchmark_cold_start.py
+    uv run python scripts/benchmark_cold_start.py --gateway-latency 0.5 --repeat 10
+"""
+
+import argparse
+import asyncio
+import logging
+import socket
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List
+
+import uvicorn
+import yaml
+from mcp.server.fastmcp import FastMCP
+
+# Add the project root to path so we can import sre_agent
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from sre_agent import multi_agent_langgraph, tool_discovery
+from sre_agent.constants import SREConstants
+
+# Configure logging
+logging.basicConfig(
+    level=logging.WARNING,
+    format="%(asctime)s,p%(process)s,{%(filename)s:%(lineno)d},%(levelname)s,%(message)s",
+)
+
+# sre_agent modules configure INFO logging on import; keep the report readable
+logging.getLogger().setLevel(logging.WARNING)
+
+logger = logging.getLogger(__name__)
+
+# Gateway target name per agent, prefixed to tool names as the gateway does
+TARGETS = {
+    "kubernetes_agent": "k8s-api",
+    "logs_agent": "logs-api",
+    "metrics_agent": "metrics-api",
+    "runbooks_agent": "runbooks-api",
+}
+
+
+class _Latency:
+    """ASGI wrapper delaying every HTTP request."""
+
+    def __init__(self, app, seconds: float):
+        self.app = app
+        self.seconds = seconds
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and self.seconds:
+            await asyncio.sleep(self.seconds)
+        await self.app(scope, receive, send)
+
+
+def _tool(name: str):
+    async def call(namespace: str = "production", service: str = "") -> str:
+        return f'{{"tool": "{name}", "namespace": "{namespace}", "status": "ok"}}'
+
+    return call
+
+
+def _gateway_app(latency: float):
+    """Streamable HTTP MCP app serving the configured agent tools."""
+    with open(project_root / "sre_agent" / "config" / "agent_config.yaml") as f:
+        config = yaml.safe_load(f)
+    server = FastMCP("benchmark-gateway", log_level="WARNING")
+    for agent, target in TARGETS.items():
+        for name in config["agents"][agent]["tools"]:
+            server.add_tool(
+                _tool(name),
+                name=f"{target}___{name}",
+                description=f"{name.replace('_', ' ').capitalize()} ({target})",
+            )
+    return _Latency(server.streamable_http_app(), latency)
+
+
+def _serve(app) -> str:
+    """Run an ASGI app on a free local port in a thread; returns its URL."""
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    server = uvicorn.Server(
+        uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning")
+    )
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.01)
+    return f"http://127.0.0.1:{port}"
+
+
+async def _startup(cache_path: Path, cached: bool) -> Dict[str, float]:
+    """Load the tools once and make a first tool call; returns the timings."""
+    if not cached:
+        cache_path.unlink(missing_ok=True)
+
+    start = time.perf_counter()
+    tools = await multi_agent_langgraph._load_mcp_tools()
+    ready = time.perf_counter() - start
+    if not tools:
+        raise RuntimeError("No tools loaded from the benchmark gateway")
+
+    start = time.perf_counter()
+    await tools[0].ainvoke({"namespace": "production"})
+    first_call = time.perf_counter() - start
+
+    # Let the background revalidation finish before the next run
+    await asyncio.gather(*tool_discovery._revalidations)
+    return {"ready": ready, "first_call": first_call, "tools": len(tools)}
+
+
+def _median(runs: List[Dict[str, float]], key: str) -> float:
+    return statistics.median(run[key] for run in runs)
+
+
+async def _benchmark(args) -> None:
+    url = _serve(_gateway_app(args.gateway_latency))
+
+    # Point the agent at the local gateway and a temporary schema cache
+    multi_agent_langgraph._read_gateway_config = lambda: (url, "token", "us-east-1")
+    with tempfile.TemporaryDirectory() as tmp:
+        cache_path = Path(tmp) / "tool_schemas.json"
+        SREConstants.tool_discovery.schema_cache_path = str(cache_path)
+
+        results = {"no cache": [], "cached": []}
+        for _ in range(args.repeat):
+            results["no cache"].append(await _startup(cache_path, cached=False))
+            results["cached"].append(await _startup(cache_path, cached=True))
+
+    tools = results["no cache"][0]["tools"]
+    print(
+        f"Gateway latency {args.gateway_latency * 1000:.0f}ms per request, "
+        f"{tools} tools, median of {args.repeat} runs\n"
+    )
+    print(f"{'Startup':<12} {'Tools ready':>12} {'First tool call':>16}")
+    for name, runs in results.items():
+        print(
+            f"{name:<12} {_median(runs, 'ready') * 1000:>10.1f}ms "
+            f"{_median(runs, 'first_call') * 1000:>14.1f}ms"
+        )
+    speedup = _median(results["no cache"], "ready") / max(
+        _median(results["cached"], "ready"), 1e-9
+    )
+    print(f"\nTools ready {speedup:.0f}x sooner with the schema cache")
+
+
+def main():
+    """Main entry point"""
+    parser = argparse.ArgumentParser(
+        description="Benchmark MCP tool loading at startup with the schema cache",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument(
+        "--gateway-latency",
+        type=float,
+        default=0.2,
+        help="Seconds added to every request to the local gateway",
+    )
+    parser.add_argument("--repeat", type=int, default=5, help="Runs of each startup")
+    args = parser.parse_args()
+
+    asyncio.run(_benchmark(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,364 @@
+#!/usr/bin/env python3
+"""
+Load-test the stub backend data layer against the per-request JSON loading it
+replaced.
+
+Generates synthetic pods, events and incident playbook files at increasing
+sizes (up to 1M records each) and drives them with a locust-style workload:
+a number of simulated users pick weighted tasks at random for a fixed
+duration, and per-task request rates and latency percentiles are reported.
+
+Two modes run the same tasks:
+
+    legacy   re-open and json.load the file, then filter with list
+             comprehensions (the previous endpoint implementation)
+    indexed  backend/servers/data_store.Dataset lookups (what the servers
+             use now); the one-off load and index build is reported apart
+
+The workload runs in-process so the numbers measure the data layer rather
+than HTTP or JSON response serialization.
+
+Usage:
+    uv run python scripts/benchmark_data_store.py
+    uv run python scripts/benchmark_data_store.py --sizes 10000 100000 --duration 5
+    uv run python scripts/benchmark_data_store.py --users 8 --legacy-max-records 1000000
+"""
+
+import argparse
+import json
+import logging
+import random
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# Add the project root to path so we can import backend
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from backend.servers.data_store import DataStore
+
+# Configure logging
+logging.basicConfig(
+    level=logging.WARNING,
+    format="%(asctime)s,p%(process)s,{%(filename)s:%(lineno)d},%(levelname)s,%(message)s",
+)
+
+# data_store configures INFO logging on import; keep the table readable
+logging.getLogger().setLevel(logging.WARNING)
+
+logger = logging.getLogger(__name__)
+
+NAMESPACES = [f"namespace-{i}" for i in range(50)]
+EVENT_TYPES = ["Normal", "Warning", "Error"]
+INCIDENT_TYPES = ["performance", "availability", "security", "deployment"]
+SEVERITIES = ["low", "medium", "high", "critical"]
+BASE_TIME = datetime(2024, 1, 15, tzinfo=timezone.utc)
+
+
+def _parse_timestamp(timestamp_str: str) -> datetime:
+    """Parse the ISO timestamps written by _generate"""
+    return datetime.fromisoformat(timestamp_str.replace("Z", "+00:00"))
+
+
+def _generate(data_path: Path, size: int) -> None:
+    """Write pods.json, events.json and incident_playbooks.json with size records."""
+    rng = random.Random(size)
+    pods = [
+        {
+            "name": f"pod-{i}",
+            "namespace": NAMESPACES[i % len(NAMESPACES)],
+            "status": rng.choice(["Running", "Pending", "CrashLoopBackOff"]),
+            "node": f"node-{i % 200}",
+            "created_at": (BASE_TIME + timedelta(seconds=i)).isoformat(),
+        }
+        for i in range(size)
+    ]
+    events = [
+        {
+            "type": rng.choice(EVENT_TYPES),
+            "reason": "BackOff",
+            "object": f"pod/pod-{i}",
+            "namespace": NAMESPACES[i % len(NAMESPACES)],
+            "timestamp": (BASE_TIME + timedelta(seconds=rng.randrange(86400))).strftime(
+                "%Y-%m-%dT%H:%M:%SZ"
+            ),
+        }
+        for i in range(size)
+    ]
+    playbooks = [
+        {
+            "id": f"playbook-{i}",
+            "title": f"Playbook {i}",
+            "incident_type": rng.choice(INCIDENT_TYPES),
+            "severity": rng.choice(SEVERITIES),
+            "steps": ["Check status", "Restart"],
+        }
+        for i in range(size)
+    ]
+    for filename, key, records in (
+        ("pods.json", "pods", pods),
+        ("events.json", "events", events),
+        ("incident_playbooks.json", "playbooks", playbooks),
+    ):
+        with open(data_path / filename, "w") as f:
+            json.dump({key: records}, f)
+
+
+def _legacy_tasks(data_path: Path) -> Dict[str, Callable[[random.Random, int], list]]:
+    """Tasks implemented the way the endpoints used to be."""
+
+    def load(filename: str, key: str) -> list:
+        with open(data_path / filename, "r") as f:
+            data = json.load(f)
+        return data.get(key, [])
+
+    def pods_by_namespace(rng, size):
+        namespace = rng.choice(NAMESPACES)
+        return [p for p in load("pods.json", "pods") if p.get("namespace") == namespace]
+
+    def pod_by_name(rng, size):
+        namespace, name = NAMESPACES[0], f"pod-{rng.randrange(0, size, 50)}"
+        pods = load("pods.json", "pods")
+        pods = [p for p in pods if p.get("namespace") == namespace]
+        return [p for p in pods if p.get("name") == name]
+
+    def events_since(rng, size):
+        severity = rng.choice(EVENT_TYPES)
+        since_dt = BASE_TIME + timedelta(hours=23, minutes=rng.randrange(60))
+        events = [e for e in load("events.json", "events") if e.get("type") == severity]
+        return [e for e in events if _parse_timestamp(e["timestamp"]) >= since_dt]
+
+    def playbooks_search(rng, size):
+        incident_type, severity = rng.choice(INCIDENT_TYPES), rng.choice(SEVERITIES)
+        runbooks = load("incident_playbooks.json", "playbooks")
+        runbooks = [r for r in runbooks if r.get("incident_type") == incident_type]
+        return [r for r in runbooks if r.get("severity") == severity]
+
+    def playbook_by_id(rng, size):
+        playbook_id = f"playbook-{rng.randrange(size)}"
+        for playbook in load("incident_playbooks.json", "playbooks"):
+            if playbook.get("id") == playbook_id:
+                return [playbook]
+        return []
+
+    return {
+        "pods_by_namespace": pods_by_namespace,
+        "pod_by_name": pod_by_name,
+        "events_since": events_since,
+        "playbooks_search": playbooks_search,
+        "playbook_by_id": playbook_by_id,
+    }
+
+
+def _indexed_tasks(
+    data_path: Path,
+) -> Tuple[Dict[str, Callable[[random.Random, int], list]], Callable[[], None]]:
+    """Tasks implemented with the indexed data store, plus its warm-up."""
+    store = DataStore(data_path)
+    pods = store.register(
+        "pods.json", records_key="pods", indexes=("namespace", "name")
+    )
+    events = store.register(
+        "events.json",
+        records_key="events",
+        indexes=("type",),
+        time_field="timestamp",
+        time_parser=_parse_timestamp,
+    )
+    playbooks = store.register(
+        "incident_playbooks.json",
+        records_key="playbooks",
+        indexes=("id", "incident_type", "severity"),
+    )
+
+    def warm_up():
+        for dataset in (pods, events, playbooks):
+            len(dataset)
+
+    def pods_by_namespace(rng, size):
+        return pods.select(namespace=rng.choice(NAMESPACES))
+
+    def pod_by_name(rng, size):
+        name = f"pod-{rng.randrange(0, size, 50)}"
+        return pods.select(namespace=NAMESPACES[0], name=name)
+
+    def events_since(rng, size):
+        since_dt = BASE_TIME + timedelta(hours=23, minutes=rng.randrange(60))
+        return events.select(since=since_dt, type=rng.choice(EVENT_TYPES))
+
+    def playbooks_search(rng, size):
+        return playbooks.select(
+            incident_type=rng.choice(INCIDENT_TYPES), severity=rng.choice(SEVERITIES)
+        )
+
+    def playbook_by_id(rng, size):
+        playbook = playbooks.get("id", f"playbook-{rng.randrange(size)}")
+        return [playbook] if playbook else []
+
+    return {
+        "pods_by_namespace": pods_by_namespace,
+        "pod_by_name": pod_by_name,
+        "events_since": events_since,
+        "playbooks_search": playbooks_search,
+        "playbook_by_id": playbook_by_id,
+    }, warm_up
+
+
+# Relative task weights, as in a locust TaskSet
+TASK_WEIGHTS = {
+    "pods_by_namespace": 3,
+    "pod_by_name": 3,
+    "events_since": 2,
+    "playbooks_search": 1,
+    "playbook_by_id": 1,
+}
+
+
+def _run_users(
+    tasks: Dict[str, Callable[[random.Random, int], list]],
+    size: int,
+    users: int,
+    duration: float,
+) -> Dict[str, List[float]]:
+    """Run simulated users for duration seconds and collect latencies per task."""
+    names = list(TASK_WEIGHTS)
+    weights = [TASK_WEIGHTS[name] for name in names]
+    latencies: Dict[str, List[float]] = {name: [] for name in names}
+    failures: List[str] = []
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+
+    def user(user_id: int):
+        rng = random.Random(user_id)
+        while time.perf_counter() < deadline:
+            name = rng.choices(names, weights)[0]
+            start = time.perf_counter()
+            try:
+                tasks[name](rng, size)
+            except Exception as e:
+                with lock:
+                    failures.append(f"{name}: {e}")
+                continue
+            elapsed = time.perf_counter() - start
+            with lock:
+                latencies[name].append(elapsed)
+
+    threads = [threading.Thread(target=user, args=(i,)) for i in range(users)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    if failures:
+        logger.warning(f"{len(failures)} failed requests, first: {failures[0]}")
+    return latencies
+
+
+def _percentile(values: List[float], percentile: float) -> float:
+    if len(values) < 2:
+        return values[0] if values else 0.0
+    return statistics.quantiles(values, n=100, method="inclusive")[percentile - 1]
+
+
+def _report(
+    size: int,
+    mode: str,
+    latencies: Dict[str, List[float]],
+    duration: float,
+    load_seconds: Optional[float] = None,
+) -> Dict[str, Any]:
+    rows = list(latencies.items()) + [
+        ("aggregated", [value for values in latencies.values() for value in values])
+    ]
+    for name, values in rows:
+        print(
+            f"{size:>9,} {mode:<8} {name:<18} {len(values):>8} "
+            f"{len(values) / duration:>9.1f} "
+            f"{_percentile(values, 50) * 1000:>9.2f} "
+            f"{_percentile(values, 95) * 1000:>9.2f} "
+            f"{_percentile(values, 99) * 1000:>9.2f}"
+        )
+    if load_seconds is not None:
+        print(f"{size:>9,} {mode:<8} {'(initial load)':<18} {load_seconds:>37.2f}s")
+    return {"requests_per_second": len(rows[-1][1]) / duration}
+
+
+def main():
+    """Main entry point"""
+    parser = argparse.ArgumentParser(
+        description="Load-test the stub backend data layer",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument(
+        "--sizes",
+        type=int,
+        nargs="+",
+        default=[10_000, 100_000, 1_000_000],
+        help="Records per dataset for each round",
+    )
+    parser.add_argument("--users", type=int, default=4, help="Simulated users")
+    parser.add_argument(
+        "--duration", type=float, default=10.0, help="Seconds per size and mode"
+    )
+    parser.add_argument(
+        "--legacy-max-records",
+        type=int,
+        default=200_000,
+        help="Skip the legacy mode above this size (each user holds a full copy)",
+    )
+    args = parser.parse_args()
+
+    header = (
+        f"{'records':>9} {'mode':<8} {'task':<18} {'requests':>8} "
+        f"{'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}"
+    )
+    print(header)
+    print("-" * len(header))
+
+    summary = []
+    for size in args.sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            data_path = Path(tmp)
+            _generate(data_path, size)
+
+            legacy_rps = None
+            if size <= args.legacy_max_records:
+                latencies = _run_users(
+                    _legacy_tasks(data_path), size, args.users, args.duration
+                )
+                legacy_rps = _report(size, "legacy", latencies, args.duration)[
+                    "requests_per_second"
+                ]
+            else:
+                print(f"{size:>9,} {'legacy':<8} skipped (--legacy-max-records)")
+
+            tasks, warm_up = _indexed_tasks(data_path)
+            start = time.perf_counter()
+            warm_up()
+            load_seconds = time.perf_counter() - start
+            latencies = _run_users(tasks, size, args.users, args.duration)
+            indexed_rps = _report(
+                size, "indexed", latencies, args.duration, load_seconds
+            )["requests_per_second"]
+            summary.append((size, legacy_rps, indexed_rps))
+        print("-" * len(header))
+
+    print("\nThroughput (aggregated req/s)")
+    for size, legacy_rps, indexed_rps in summary:
+        if legacy_rps:
+            print(
+                f"  {size:>9,} records: legacy {legacy_rps:>9.1f}  "
+                f"indexed {indexed_rps:>9.1f}  ({indexed_rps / legacy_rps:,.0f}x)"
+            )
+        else:
+            print(f"  {size:>9,} records: indexed {indexed_rps:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
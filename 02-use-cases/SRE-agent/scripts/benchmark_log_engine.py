@@ -0,0 +1,278 @@
+#!/usr/bin/env python3
+"""
+Benchmark /logs/search and /logs/recent query latency against log file size.
+
+Generates time-ordered application logs of increasing size in the format the
+logs server reads (`TIMESTAMP [LEVEL] SERVICE MESSAGE`) and runs the same
+queries two ways:
+
+    legacy   parse the whole file into a list of dicts, then filter (the
+             previous logs_server implementation)
+    engine   backend/servers/log_engine.LogFile (memory-mapped file, sparse
+             timestamp index, streaming filters that stop at the limit)
+
+Latency is the median of --repeat runs. Peak heap is the largest Python
+allocation during one run of the engine query (tracemalloc); memory-mapped
+pages are managed by the OS and not counted.
+
+Usage:
+    uv run python scripts/benchmark_log_engine.py
+    uv run python scripts/benchmark_log_engine.py --sizes-mb 10 100 1000 4000
+    uv run python scripts/benchmark_log_engine.py --legacy-max-mb 1000
+"""
+
+import argparse
+import logging
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+from itertools import islice
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+# Add the project root to path so we can import backend
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from backend.servers.log_engine import LogFile, parse_log_line
+
+# Configure logging
+logging.basicConfig(
+    level=logging.WARNING,
+    format="%(asctime)s,p%(process)s,{%(filename)s:%(lineno)d},%(levelname)s,%(message)s",
+)
+
+# log_engine configures INFO logging on import; keep the table readable
+logging.getLogger().setLevel(logging.WARNING)
+
+logger = logging.getLogger(__name__)
+
+BASE_TIME = datetime(2024, 1, 15, tzinfo=timezone.utc)
+SERVICES = ["web-service", "api-service", "database", "payment-service"]
+MESSAGES = [
+    ("INFO", "Processing request from 192.168.1.{n} - GET /api/users/{n}"),
+    ("INFO", "Request completed in {n}ms - Status: 200"),
+    ("WARN", "Slow query detected - Duration: {n}ms"),
+    ("INFO", "Cache hit ratio {n}%"),
+    ("ERROR", "Database connection timeout after {n}ms"),
+]
+# One line in RARE_EVERY carries a rare message that forces a full scan
+RARE_EVERY = 250_000
+RARE_MESSAGE = "Deadlock detected on table orders"
+
+
+def _parse_timestamp(timestamp_str: str) -> datetime:
+    """Parse the ISO timestamps written by _generate"""
+    return datetime.fromisoformat(timestamp_str.replace("Z", "+00:00"))
+
+
+def _generate(path: Path, size_mb: int) -> Dict[str, Any]:
+    """Write a time-ordered log of about size_mb megabytes; return its time span."""
+    target = size_mb * 1024 * 1024
+    written = 0
+    line_number = 0
+    with open(path, "w") as f:
+        while written < target:
+            lines = []
+            for _ in range(10_000):
+                timestamp = (
+                    BASE_TIME + timedelta(milliseconds=line_number * 10)
+                ).strftime("%Y-%m-%dT%H:%M:%S.%f")[:-3]
+                level, message = MESSAGES[line_number % len(MESSAGES)]
+                if line_number % RARE_EVERY == RARE_EVERY // 2:
+                    level, message = "ERROR", RARE_MESSAGE
+                lines.append(
+                    f"{timestamp}Z [{level}] {SERVICES[line_number % 7 % 4]} "
+                    f"{message.format(n=line_number % 1000)}\n"
+                )
+                line_number += 1
+            chunk = "".join(lines)
+            f.write(chunk)
+            written += len(chunk)
+    return {
+        "lines": line_number,
+        "end": BASE_TIME + timedelta(milliseconds=(line_number - 1) * 10),
+    }
+
+
+def _legacy_parse(path: Path, pattern: Optional[str] = None) -> List[Dict[str, Any]]:
+    """The previous _parse_log_file: read and parse every line"""
+    logs = []
+    with open(path, "r") as f:
+        for line in f:
+            if pattern and pattern.lower() not in line.lower():
+                continue
+            logs.append(parse_log_line(line))
+    return logs
+
+
+def _legacy_filter_by_time(logs, start_dt=None, end_dt=None):
+    """The previous _filter_by_time: parse every timestamp"""
+    if not start_dt and not end_dt:
+        return logs
+    filtered = []
+    for log in logs:
+        if not log.get("timestamp"):
+            continue
+        log_dt = _parse_timestamp(log["timestamp"])
+        if start_dt and log_dt < start_dt:
+            continue
+        if end_dt and log_dt > end_dt:
+            continue
+        filtered.append(log)
+    return filtered
+
+
+def _queries(span_end: datetime) -> List[Dict[str, Any]]:
+    """Query mix: name, legacy implementation and engine implementation."""
+    window_start = span_end - timedelta(minutes=5)
+
+    def legacy_search(path, pattern, level=None, start=None):
+        logs = _legacy_parse(path, pattern)
+        if level:
+            logs = [log for log in logs if log.get("level") == level]
+        return _legacy_filter_by_time(logs, start)[:100]
+
+    def legacy_recent(path, service=None):
+        logs = _legacy_parse(path)
+        if service:
+            logs = [log for log in logs if service in log.get("service", "")]
+        recent = logs[-100:]
+        recent.reverse()
+        return recent
+
+    return [
+        {
+            "name": "search common pattern",
+            "legacy": lambda path, log: legacy_search(path, "request"),
+            "engine": lambda path, log: list(
+                islice(log.search(pattern="request"), 100)
+            ),
+        },
+        {
+            "name": "search rare pattern",
+            "legacy": lambda path, log: legacy_search(path, "deadlock"),
+            "engine": lambda path, log: list(
+                islice(log.search(pattern="deadlock"), 100)
+            ),
+        },
+        {
+            "name": "search errors, last 5 min",
+            "legacy": lambda path, log: legacy_search(
+                path, "timeout", "ERROR", window_start
+            ),
+            "engine": lambda path, log: list(
+                islice(
+                    log.search(
+                        pattern="timeout", level="ERROR", start_time=window_start
+                    ),
+                    100,
+                )
+            ),
+        },
+        {
+            "name": "recent 100",
+            "legacy": lambda path, log: legacy_recent(path),
+            "engine": lambda path, log: list(islice(log.recent(), 100)),
+        },
+        {
+            "name": "recent 100, one service",
+            "legacy": lambda path, log: legacy_recent(path, "payment"),
+            "engine": lambda path, log: list(
+                islice(log.recent(service="payment"), 100)
+            ),
+        },
+    ]
+
+
+def _median_ms(run: Callable[[], Any], repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings) * 1000
+
+
+def _peak_heap_kb(run: Callable[[], Any]) -> float:
+    tracemalloc.start()
+    try:
+        run()
+        return tracemalloc.get_traced_memory()[1] / 1024
+    finally:
+        tracemalloc.stop()
+
+
+def main():
+    """Main entry point"""
+    parser = argparse.ArgumentParser(
+        description="Benchmark log query latency against file size",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument(
+        "--sizes-mb",
+        type=int,
+        nargs="+",
+        default=[10, 100, 1000],
+        help="Log file sizes to generate, in MB",
+    )
+    parser.add_argument(
+        "--repeat", type=int, default=5, help="Runs per query (median is reported)"
+    )
+    parser.add_argument(
+        "--legacy-max-mb",
+        type=int,
+        default=100,
+        help="Skip the legacy mode above this size (it holds the whole file as dicts)",
+    )
+    args = parser.parse_args()
+
+    header = (
+        f"{'size':>8} {'query':<26} {'legacy ms':>10} {'engine ms':>10} "
+        f"{'speedup':>8} {'engine peak heap':>17}"
+    )
+    print(header)
+    print("-" * len(header))
+
+    for size_mb in args.sizes_mb:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "application.log"
+            span = _generate(path, size_mb)
+
+            log = LogFile(path, time_parser=_parse_timestamp)
+            start = time.perf_counter()
+            stats = log.stats()
+            index_seconds = time.perf_counter() - start
+            print(
+                f"{size_mb:>6}MB {'(index build)':<26} {'':>10} "
+                f"{index_seconds * 1000:>10.1f} {'':>8} "
+                f"{stats['blocks']:>10} blocks"
+            )
+
+            legacy_enabled = size_mb <= args.legacy_max_mb
+            for query in _queries(span["end"]):
+                engine_ms = _median_ms(lambda: query["engine"](path, log), args.repeat)
+                peak_kb = _peak_heap_kb(lambda: query["engine"](path, log))
+                if legacy_enabled:
+                    expected = query["legacy"](path, log)
+                    if expected != query["engine"](path, log):
+                        print(f"⚠️  Results differ for: {query['name']}")
+                    legacy_ms = _median_ms(
+                        lambda: query["legacy"](path, log), max(1, args.repeat // 5)
+                    )
+                    legacy = f"{legacy_ms:>10.1f}"
+                    speedup = f"{legacy_ms / engine_ms:>7.0f}x"
+                else:
+                    legacy, speedup = f"{'skipped':>10}", f"{'':>8}"
+                print(
+                    f"{size_mb:>6}MB {query['name']:<26} {legacy} "
+                    f"{engine_ms:>10.2f} {speedup} {peak_kb:>14.0f} KB"
+                )
+        print("-" * len(header))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,325 @@
+#!/usr/bin/env python3
+"""
+Benchmark sequential vs DAG (parallel wave) execution of investigation plans.
+
+Runs a fixed set of incident plans through the real investigation graph
+(graph_builder.compile_investigation_graph, SupervisorAgent.route and the
+AgentState reducers) twice: once with no dependencies (every agent runs in
+turn, the previous behaviour) and once with the plan's dependency DAG, where
+independent agents in a wave run concurrently.
+
+The supervisor's planning step and the agents' LLM turns are replaced by
+fixed plans and a configurable think time per tool call, so the numbers are
+reproducible; every tool call is a real HTTP request to the stub backend
+servers, which must already be running:
+
+    cd backend && ./scripts/start_demo_backend.sh --host localhost
+
+Usage:
+    uv run python scripts/benchmark_plan_execution.py --api-key KEY
+    uv run python scripts/benchmark_plan_execution.py --api-key KEY --llm-latency 0.2 --repeat 3
+    uv run python scripts/benchmark_plan_execution.py --api-key KEY --protocol https --insecure
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import httpx
+
+# Add the project root to path so we can import sre_agent and backend
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+sys.path.insert(0, str(project_root / "backend"))
+
+from langchain_core.messages import HumanMessage
+
+from sre_agent.constants import SREConstants
+from sre_agent.graph_builder import compile_investigation_graph
+from sre_agent.supervisor import (
+    InvestigationPlan,
+    SupervisorAgent,
+    _order_agent_results,
+    plan_execution_waves,
+)
+
+# Configure logging
+logging.basicConfig(
+    level=logging.WARNING,
+    format="%(asctime)s,p%(process)s,{%(filename)s:%(lineno)d},%(levelname)s,%(message)s",
+)
+
+# sre_agent modules configure INFO logging on import; keep the table readable
+logging.getLogger().setLevel(logging.WARNING)
+
+logger = logging.getLogger(__name__)
+
+# Ports from the OpenAPI templates, used when the generated specs are missing
+DEFAULT_PORTS = {"k8s": 8011, "logs": 8012, "metrics": 8013, "runbooks": 8014}
+
+# Backend calls each agent makes, in order, as (backend, path, params)
+AGENT_CALLS = {
+    "kubernetes_agent": [
+        ("k8s", "/pods/status", {"namespace": "production"}),
+        ("k8s", "/events", {}),
+        ("k8s", "/deployments/status", {"namespace": "production"}),
+        ("k8s", "/resource_usage", {"namespace": "production"}),
+    ],
+    "logs_agent": [
+        ("logs", "/logs/patterns", {}),
+        ("logs", "/logs/count", {"event_type": "error"}),
+        ("logs", "/logs/patterns", {"min_occurrences": 5}),
+    ],
+    "metrics_agent": [
+        ("metrics", "/metrics/performance", {}),
+        ("metrics", "/metrics/resources", {}),
+        ("metrics", "/metrics/errors", {}),
+    ],
+    "runbooks_agent": [
+        ("runbooks", "/runbooks/search", {"incident_type": "performance"}),
+        ("runbooks", "/runbooks/troubleshooting", {}),
+    ],
+}
+
+# Fixed incident plans; dependencies are [upstream, downstream] pairs
+INCIDENTS = [
+    {
+        "query": "Pods in the production namespace are crash looping",
+        "agents_sequence": ["kubernetes_agent", "logs_agent", "runbooks_agent"],
+        "dependencies": [
+            ["kubernetes_agent", "runbooks_agent"],
+            ["logs_agent", "runbooks_agent"],
+        ],
+    },
+    {
+        "query": "API latency spiked for web-service in the last hour",
+        "agents_sequence": ["metrics_agent", "logs_agent"],
+        "dependencies": [],
+    },
+    {
+        "query": "database-pod keeps restarting with OOMKilled",
+        "agents_sequence": [
+            "kubernetes_agent",
+            "metrics_agent",
+            "logs_agent",
+            "runbooks_agent",
+        ],
+        "dependencies": [
+            ["kubernetes_agent", "runbooks_agent"],
+            ["metrics_agent", "runbooks_agent"],
+            ["logs_agent", "runbooks_agent"],
+        ],
+    },
+    {
+        "query": "Error rate increased on payment-service after the last deploy",
+        "agents_sequence": ["logs_agent", "metrics_agent", "runbooks_agent"],
+        "dependencies": [["logs_agent", "runbooks_agent"]],
+    },
+    {
+        "query": "Worker nodes report memory pressure",
+        "agents_sequence": ["kubernetes_agent", "metrics_agent"],
+        "dependencies": [],
+    },
+]
+
+
+def _backend_urls(protocol: str, host: str) -> Dict[str, str]:
+    """Base URL per backend, using the ports from the OpenAPI specs if present."""
+    ports = dict(DEFAULT_PORTS)
+    try:
+        from config_utils import get_server_ports
+
+        ports.update(get_server_ports())
+    except Exception as e:
+        logger.warning(f"Using default backend ports: {e}")
+    return {name: f"{protocol}://{host}:{port}" for name, port in ports.items()}
+
+
+class StubBackendAgent:
+    """Agent node that replays a fixed list of backend calls.
+
+    Each call is preceded by llm_latency seconds of simulated model time,
+    mirroring a ReAct loop that reasons before each tool call.
+    """
+
+    def __init__(
+        self,
+        node_name: str,
+        client: httpx.AsyncClient,
+        urls: Dict[str, str],
+        llm_latency: float,
+    ):
+        agent_type = node_name.replace("_agent", "")
+        self.name = SREConstants.agents.agents[agent_type].display_name
+        self.calls = AGENT_CALLS[node_name]
+        self.client = client
+        self.urls = urls
+        self.llm_latency = llm_latency
+        self.requests = 0
+        self.bytes_received = 0
+
+    async def __call__(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        findings = []
+        for backend, path, params in self.calls:
+            await asyncio.sleep(self.llm_latency)
+            response = await self.client.get(
+                f"{self.urls[backend]}{path}", params=params
+            )
+            response.raise_for_status()
+            self.requests += 1
+            self.bytes_received += len(response.content)
+            findings.append(f"{path}: {len(response.content)} bytes")
+        await asyncio.sleep(self.llm_latency)
+
+        return {
+            "agent_results": {self.name: "; ".join(findings)},
+            "agents_invoked": [self.name],
+        }
+
+
+class FixedPlanSupervisor(SupervisorAgent):
+    """SupervisorAgent whose planning and aggregation steps need no LLM."""
+
+    def __init__(self):
+        self.plan: Optional[InvestigationPlan] = None
+
+    async def create_investigation_plan(self, state) -> InvestigationPlan:
+        return self.plan
+
+    async def aggregate_responses(self, state) -> Dict[str, Any]:
+        plan = state.get("metadata", {}).get("investigation_plan")
+        ordered = _order_agent_results(state.get("agent_results", {}), plan)
+        return {"final_response": "\n".join(ordered)}
+
+
+async def _run_incident(graph, supervisor, incident, parallel: bool) -> Dict[str, Any]:
+    supervisor.plan = InvestigationPlan(
+        steps=[f"Run {agent}" for agent in incident["agents_sequence"]],
+        agents_sequence=incident["agents_sequence"],
+        complexity="simple",
+        auto_execute=True,
+        reasoning="Benchmark plan",
+        dependencies=incident["dependencies"] if parallel else None,
+    )
+    start = time.perf_counter()
+    result = await graph.ainvoke(
+        {
+            "messages": [HumanMessage(content=incident["query"])],
+            "next": "supervisor",
+            "agent_results": {},
+            "current_query": incident["query"],
+            "metadata": {},
+            "requires_collaboration": False,
+            "agents_invoked": [],
+            "final_response": None,
+            "auto_approve_plan": True,
+        },
+        {"recursion_limit": 50},
+    )
+    return {
+        "seconds": time.perf_counter() - start,
+        "waves": len(plan_execution_waves(supervisor.plan)),
+        "final_response": result["final_response"],
+    }
+
+
+async def _benchmark(args) -> None:
+    urls = _backend_urls(args.protocol, args.host)
+    headers = {"X-API-Key": args.api_key}
+    async with httpx.AsyncClient(
+        headers=headers, verify=not args.insecure, timeout=30
+    ) as client:
+        for name, url in urls.items():
+            try:
+                (await client.get(f"{url}/")).raise_for_status()
+            except Exception as e:
+                print(f"❌ {name} backend at {url} is not reachable: {e}")
+                sys.exit(1)
+
+        agents = {
+            node_name: StubBackendAgent(node_name, client, urls, args.llm_latency)
+            for node_name in AGENT_CALLS
+        }
+        supervisor = FixedPlanSupervisor()
+        graph = compile_investigation_graph(supervisor, agents)
+
+        header = f"{'incident':<58} {'agents':>6} {'waves':>5} {'sequential':>11} {'dag':>9} {'speedup':>8}"
+        print(header)
+        print("-" * len(header))
+        totals = {"sequential": 0.0, "dag": 0.0}
+        for incident in INCIDENTS:
+            timings = {}
+            responses = {}
+            for mode, parallel in (("sequential", False), ("dag", True)):
+                runs = [
+                    await _run_incident(graph, supervisor, incident, parallel)
+                    for _ in range(args.repeat)
+                ]
+                timings[mode] = min(run["seconds"] for run in runs)
+                responses[mode] = runs[0]["final_response"]
+                waves = runs[0]["waves"]
+                totals[mode] += timings[mode]
+
+            if responses["sequential"] != responses["dag"]:
+                print(f"⚠️  Results differ between modes for: {incident['query']}")
+            print(
+                f"{incident['query'][:58]:<58} {len(incident['agents_sequence']):>6} {waves:>5} "
+                f"{timings['sequential']:>10.2f}s {timings['dag']:>8.2f}s "
+                f"{timings['sequential'] / timings['dag']:>7.2f}x"
+            )
+
+        print("-" * len(header))
+        print(
+            f"{'total':<58} {'':>6} {'':>5} {totals['sequential']:>10.2f}s "
+            f"{totals['dag']:>8.2f}s {totals['sequential'] / totals['dag']:>7.2f}x"
+        )
+        requests = sum(agent.requests for agent in agents.values())
+        received = sum(agent.bytes_received for agent in agents.values())
+        print(
+            f"\nBackend requests: {requests} ({received / 1024:.1f} KB), "
+            f"simulated LLM latency per tool call: {args.llm_latency}s"
+        )
+
+
+def main():
+    """Main entry point"""
+    parser = argparse.ArgumentParser(
+        description="Benchmark sequential vs DAG investigation plan execution",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument(
+        "--api-key",
+        default=os.getenv("BACKEND_API_KEY"),
+        help="API key expected by the stub servers (default: $BACKEND_API_KEY)",
+    )
+    parser.add_argument("--host", default="localhost", help="Stub server host")
+    parser.add_argument("--protocol", default="http", choices=["http", "https"])
+    parser.add_argument(
+        "--insecure",
+        action="store_true",
+        help="Skip TLS verification (self-signed certificates)",
+    )
+    parser.add_argument(
+        "--llm-latency",
+        type=float,
+        default=0.5,
+        help="Simulated model seconds before each tool call and the final answer",
+    )
+    parser.add_argument(
+        "--repeat", type=int, default=1, help="Runs per mode (best is reported)"
+    )
+    args = parser.parse_args()
+
+    if not args.api_key:
+        parser.error("--api-key or BACKEND_API_KEY is required")
+
+    asyncio.run(_benchmark(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+"""
+Benchmark /runbooks/search keyword queries on a large synthetic runbook corpus.
+
+Generates incident playbooks with a total of --steps steps (100k by default)
+and runs the same queries two ways:
+
+    legacy   re-open and json.load incident_playbooks.json, lowercase the
+             title, description and every step for the keyword check, then
+             format the per-runbook and full json.dumps(indent=2) response
+             logs (the previous search_runbooks implementation)
+    indexed  backend/servers/search_index.SearchIndex (BM25-ranked inverted
+             index built once; first page of 20 results)
+
+The legacy search is a substring filter and returns every match unranked;
+the index returns a ranked page and the total match count. For single-word
+queries every legacy match must also be an index match, which is checked.
+
+Usage:
+    uv run python scripts/benchmark_runbook_search.py
+    uv run python scripts/benchmark_runbook_search.py --steps 1000000 --repeat 3
+"""
+
+import argparse
+import json
+import logging
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+# Add the project root to path so we can import backend
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from backend.servers.search_index import SearchIndex, record_document
+
+# Configure logging
+logging.basicConfig(
+    level=logging.WARNING,
+    format="%(asctime)s,p%(process)s,{%(filename)s:%(lineno)d},%(levelname)s,%(message)s",
+)
+
+# search_index configures INFO logging on import; keep the table readable
+logging.getLogger().setLevel(logging.WARNING)
+
+logger = logging.getLogger(__name__)
+
+INCIDENT_TYPES = ["performance", "availability", "security", "deployment"]
+SEVERITIES = ["low", "medium", "high", "critical"]
+COMPONENTS = [
+    "database",
+    "cache",
+    "ingress",
+    "payment-service",
+    "web-service",
+    "api-gateway",
+    "queue",
+    "scheduler",
+]
+SYMPTOMS = [
+    "memory pressure",
+    "connection pool exhaustion",
+    "CrashLoopBackOff",
+    "high latency",
+    "certificate expiry",
+    "disk saturation",
+    "OOMKilled",
+    "DNS resolution failure",
+]
+ACTIONS = [
+    "Check {component} pod status with kubectl get pods",
+    "Review {component} logs for {symptom}",
+    "Restart {component} deployment",
+    "Scale {component} replicas",
+    "Verify {component} configuration",
+    "Compare {component} metrics with the baseline",
+    "Roll back the latest {component} release",
+    "Notify the {component} owners",
+]
+# A rare word present in a handful of steps
+RARE_WORD = "quiescence"
+PAGE_SIZE = 20
+
+
+def _generate(path: Path, steps: int, steps_per_runbook: int) -> List[Dict[str, Any]]:
+    """Write incident_playbooks.json with the given number of steps in total."""
+    rng = random.Random(steps)
+    playbooks = []
+    for i in range(max(1, steps // steps_per_runbook)):
+        component, symptom = rng.choice(COMPONENTS), rng.choice(SYMPTOMS)
+        runbook_steps = [
+            rng.choice(ACTIONS).format(component=component, symptom=symptom)
+            + f" ({i}.{n})"
+            for n in range(steps_per_runbook)
+        ]
+        if i % 2000 == 1000:
+            runbook_steps.append(f"Wait for {RARE_WORD} before resuming traffic")
+        playbooks.append(
+            {
+                "id": f"playbook-{i}",
+                "title": f"{component} {symptom} response",
+                "incident_type": rng.choice(INCIDENT_TYPES),
+                "severity": rng.choice(SEVERITIES),
+                "description": f"Procedure for {symptom} on {component}",
+                "steps": runbook_steps,
+            }
+        )
+    with open(path, "w") as f:
+        json.dump({"playbooks": playbooks}, f)
+    return playbooks
+
+
+def _legacy_search(path: Path, keyword: str, severity: str = None) -> Dict[str, Any]:
+    """The previous search_runbooks body, including its response logging"""
+    with open(path, "r") as f:
+        runbooks = json.load(f).get("playbooks", [])
+    if severity:
+        runbooks = [r for r in runbooks if r.get("severity") == severity]
+    runbooks = [
+        r
+        for r in runbooks
+        if keyword.lower() in r.get("title", "").lower()
+        or keyword.lower() in r.get("description", "").lower()
+        or any(keyword.lower() in step.lower() for step in r.get("steps", []))
+    ]
+    response_data = {"runbooks": runbooks}
+    # The messages were formatted eagerly at INFO whether or not they were shown
+    messages = []
+    for i, runbook in enumerate(runbooks):
+        messages.append(f"  📖 Runbook {i + 1}: {runbook.get('title')}")
+        for j, step in enumerate(runbook.get("steps", [])[:3]):
+            messages.append(f"     Step {j + 1}: {step}")
+    messages.append(f"Full response data: {json.dumps(response_data, indent=2)}")
+    return response_data
+
+
+def _indexed_search(index: SearchIndex, keyword: str, severity: str = None):
+    total, hits = index.search(keyword, limit=PAGE_SIZE, severity=severity)
+    return {
+        "runbooks": [
+            {**hit.document.payload, "score": round(hit.score, 3)} for hit in hits
+        ],
+        "total": total,
+    }
+
+
+# Name, keyword, severity filter
+QUERIES = [
+    ("common word", "restart", None),
+    ("component", "database", None),
+    ("rare word", RARE_WORD, None),
+    ("word + severity", "certificate", "critical"),
+    ("prefix", "crashloop", None),
+    ("three keywords", "scheduler disk saturation", None),
+]
+
+
+def _median_ms(run: Callable[[], Any], repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings) * 1000
+
+
+def main():
+    """Main entry point"""
+    parser = argparse.ArgumentParser(
+        description="Benchmark runbook keyword search",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument(
+        "--steps", type=int, default=100_000, help="Runbook steps in the corpus"
+    )
+    parser.add_argument(
+        "--steps-per-runbook", type=int, default=10, help="Steps per playbook"
+    )
+    parser.add_argument(
+        "--repeat", type=int, default=5, help="Runs per query (median is reported)"
+    )
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "incident_playbooks.json"
+        playbooks = _generate(path, args.steps, args.steps_per_runbook)
+
+        start = time.perf_counter()
+        index = SearchIndex(record_document(p, "playbook") for p in playbooks)
+        build_seconds = time.perf_counter() - start
+        print(
+            f"Corpus: {len(playbooks):,} playbooks, {args.steps:,} steps, "
+            f"{path.stat().st_size / 1024 / 1024:.1f}MB; index: "
+            f"{index.term_count:,} terms, built in {build_seconds:.2f}s\n"
+        )
+
+        header = (
+            f"{'query':<16} {'legacy ms':>10} {'hits':>7} "
+            f"{'indexed ms':>11} {'total':>7} {'speedup':>8}"
+        )
+        print(header)
+        print("-" * len(header))
+        for name, keyword, severity in QUERIES:
+            legacy = _legacy_search(path, keyword, severity)
+            indexed = _indexed_search(index, keyword, severity)
+            if " " not in keyword:
+                _, all_hits = index.search(keyword, limit=None, severity=severity)
+                found = {hit.document.id for hit in all_hits}
+                if not {r["id"] for r in legacy["runbooks"]} <= found:
+                    print(f"⚠️  Index misses legacy matches for: {name}")
+
+            legacy_ms = _median_ms(
+                lambda: _legacy_search(path, keyword, severity),
+                max(1, args.repeat // 2),
+            )
+            indexed_ms = _median_ms(
+                lambda: _indexed_search(index, keyword, severity), args.repeat
+            )
+            print(
+                f"{name:<16} {legacy_ms:>10.1f} {len(legacy['runbooks']):>7} "
+                f"{indexed_ms:>11.2f} {indexed['total']:>7} "
+                f"{legacy_ms / indexed_ms:>7.0f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
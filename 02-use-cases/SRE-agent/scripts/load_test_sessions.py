@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+"""
+Load test the agent runtime with many concurrent multi-turn sessions.
+
+Drives --sessions sessions (200 by default), spread over --users users, each
+sending --turns invocations in a row, against the /invocations endpoint of
+sre_agent.agent_runtime served in-process. The investigation graph is the
+real one (graph_builder.compile_investigation_graph, SupervisorAgent.route
+and the AgentState reducers) with fixed plans, agents whose tool calls are
+real HTTP requests to the stub backend servers, and a fake aggregation LLM
+with a configurable latency. The backend servers must already be running:
+
+    cd backend && ./scripts/start_demo_backend.sh --host localhost
+
+Reports invocation latency, time in the admission queue, the queue depth
+reached and session spills, and checks that every session kept all of its
+turns.
+
+Usage:
+    uv run python scripts/load_test_sessions.py --api-key KEY
+    uv run python scripts/load_test_sessions.py --api-key KEY --sessions 500 --max-concurrent 32
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+import httpx
+
+# Add the project root to path so we can import sre_agent and backend
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+sys.path.insert(0, str(project_root / "backend"))
+
+from benchmark_plan_execution import (
+    AGENT_CALLS,
+    INCIDENTS,
+    FixedPlanSupervisor,
+    StubBackendAgent,
+    _backend_urls,
+)
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+from langchain_core.messages import HumanMessage, SystemMessage
+
+from sre_agent import agent_runtime
+from sre_agent.graph_builder import compile_investigation_graph
+from sre_agent.session_manager import (
+    InvocationScheduler,
+    SessionManager,
+    SessionStore,
+)
+from sre_agent.supervisor import InvestigationPlan, _order_agent_results
+
+# Configure logging
+logging.basicConfig(
+    level=logging.WARNING,
+    format="%(asctime)s,p%(process)s,{%(filename)s:%(lineno)d},%(levelname)s,%(message)s",
+)
+
+# sre_agent modules configure INFO logging on import; keep the report readable
+logging.getLogger().setLevel(logging.WARNING)
+
+logger = logging.getLogger(__name__)
+
+FOLLOW_UPS = [
+    "What changed right before this started?",
+    "Which runbook applies here?",
+    "Summarize the impact for the incident channel",
+]
+
+
+class FakeLLMSupervisor(FixedPlanSupervisor):
+    """Plans by query and aggregates with a fake chat model."""
+
+    def __init__(self, llm_latency: float):
+        super().__init__()
+        self.llm_latency = llm_latency
+        self.llm = FakeListChatModel(
+            responses=[f"Findings summary {i}" for i in range(10)]
+        )
+        self.plans = {
+            incident["query"]: InvestigationPlan(
+                steps=[f"Run {agent}" for agent in incident["agents_sequence"]],
+                agents_sequence=incident["agents_sequence"],
+                complexity="simple",
+                auto_execute=True,
+                reasoning="Load test plan",
+                dependencies=incident["dependencies"],
+            )
+            for incident in INCIDENTS
+        }
+
+    async def create_investigation_plan(self, state) -> InvestigationPlan:
+        query = state.get("current_query", "")
+        return self.plans.get(query, self.plans[INCIDENTS[0]["query"]])
+
+    async def aggregate_responses(self, state) -> Dict[str, Any]:
+        plan = state.get("metadata", {}).get("investigation_plan")
+        ordered = _order_agent_results(state.get("agent_results", {}), plan)
+        await asyncio.sleep(self.llm_latency)
+        response = await self.llm.ainvoke(
+            [
+                SystemMessage(content="Summarize the findings"),
+                HumanMessage(content="\n".join(ordered)),
+            ]
+        )
+        return {"final_response": response.content}
+
+
+async def _session(
+    client: httpx.AsyncClient, session: int, users: int, turns: int
+) -> List[Dict[str, Any]]:
+    """Run the turns of one session in a row; returns one result per turn."""
+    results = []
+    for turn in range(turns):
+        prompt = (
+            INCIDENTS[session % len(INCIDENTS)]["query"]
+            if turn == 0
+            else FOLLOW_UPS[(turn - 1) % len(FOLLOW_UPS)]
+        )
+        start = time.perf_counter()
+        response = await client.post(
+            "/invocations",
+            json={
+                "input": {
+                    "prompt": prompt,
+                    "session_id": f"load-test-session-{session:05d}",
+                    "user_id": f"user-{session % users}",
+                }
+            },
+        )
+        results.append(
+            {"status": response.status_code, "seconds": time.perf_counter() - start}
+        )
+    return results
+
+
+def _quantiles(values: List[float]) -> str:
+    values = sorted(values)
+    if not values:
+        return "n/a"
+    p95 = values[min(len(values) - 1, int(len(values) * 0.95))]
+    return (
+        f"p50 {statistics.median(values):.2f}s  p95 {p95:.2f}s  max {values[-1]:.2f}s"
+    )
+
+
+async def _load_test(args) -> None:
+    urls = _backend_urls(args.protocol, args.host)
+    async with httpx.AsyncClient(
+        headers={"X-API-Key": args.api_key},
+        verify=not args.insecure,
+        timeout=60,
+        limits=httpx.Limits(max_connections=args.max_concurrent * 4),
+    ) as backend_client:
+        for name, url in urls.items():
+            try:
+                (await backend_client.get(f"{url}/")).raise_for_status()
+            except Exception as e:
+                print(f"❌ {name} backend at {url} is not reachable: {e}")
+                sys.exit(1)
+
+        agents = {
+            node_name: StubBackendAgent(
+                node_name, backend_client, urls, args.llm_latency
+            )
+            for node_name in AGENT_CALLS
+        }
+        graph = compile_investigation_graph(FakeLLMSupervisor(args.llm_latency), agents)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            manager = SessionManager(
+                SessionStore(
+                    str(Path(tmp) / "sessions.db"),
+                    max_sessions=args.sessions_in_memory,
+                ),
+                InvocationScheduler(
+                    max_concurrent=args.max_concurrent,
+                    max_queued=args.sessions,
+                ),
+            )
+            agent_runtime.agent_graph = graph
+            agent_runtime.session_manager = manager
+
+            transport = httpx.ASGITransport(app=agent_runtime.app)
+            async with httpx.AsyncClient(
+                transport=transport, base_url="http://runtime", timeout=None
+            ) as client:
+                start = time.perf_counter()
+                sessions = await asyncio.gather(
+                    *(
+                        _session(client, session, args.users, args.turns)
+                        for session in range(args.sessions)
+                    )
+                )
+                elapsed = time.perf_counter() - start
+                metrics = (await client.get("/metrics")).json()
+
+            results = [result for session in sessions for result in session]
+            failed = [r for r in results if r["status"] != 200]
+            incomplete = [
+                session
+                for session in range(args.sessions)
+                if len(manager.store.get(f"load-test-session-{session:05d}"))
+                != 2 * args.turns
+            ]
+            manager.close()
+
+    requests = sum(agent.requests for agent in agents.values())
+    waits = metrics["queue_wait_seconds"]
+    print(
+        f"Sessions: {args.sessions} ({args.users} users, {args.turns} turns each), "
+        f"max concurrent investigations: {args.max_concurrent}\n"
+    )
+    print(
+        f"Invocations:       {len(results)} in {elapsed:.1f}s "
+        f"({len(results) / elapsed:.1f}/s), {len(failed)} failed"
+    )
+    print(f"Latency:           {_quantiles([r['seconds'] for r in results])}")
+    print(
+        f"Time in queue:     avg {waits['avg']:.2f}s  p50 {waits['p50']:.2f}s  "
+        f"p95 {waits['p95']:.2f}s  max {waits['max']:.2f}s"
+    )
+    print(
+        f"Queue depth:       max {metrics['max_queue_depth']}, "
+        f"rejected {metrics['rejected']}"
+    )
+    print(
+        f"Sessions:          {metrics['sessions']['in_memory']} in memory, "
+        f"{metrics['sessions']['spilled']} spills to SQLite"
+    )
+    print(f"Backend requests:  {requests}")
+    if incomplete:
+        print(f"⚠️  {len(incomplete)} sessions lost turns, e.g. {incomplete[:5]}")
+    else:
+        print("✅ Every session kept all of its turns")
+
+
+def main():
+    """Main entry point"""
+    parser = argparse.ArgumentParser(
+        description="Load test concurrent multi-turn sessions on the agent runtime",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument(
+        "--api-key",
+        default=os.getenv("BACKEND_API_KEY"),
+        help="API key expected by the stub servers (default: $BACKEND_API_KEY)",
+    )
+    parser.add_argument("--host", default="localhost", help="Stub server host")
+    parser.add_argument("--protocol", default="http", choices=["http", "https"])
+    parser.add_argument(
+        "--insecure",
+        action="store_true",
+        help="Skip TLS verification (self-signed certificates)",
+    )
+    parser.add_argument("--sessions", type=int, default=200, help="Sessions")
+    parser.add_argument("--users", type=int, default=20, help="Users sharing them")
+    parser.add_argument("--turns", type=int, default=3, help="Invocations per session")
+    parser.add_argument(
+        "--max-concurrent",
+        type=int,
+        default=16,
+        help="Graph executions allowed at once",
+    )
+    parser.add_argument(
+        "--sessions-in-memory",
+        type=int,
+        default=50,
+        help="Sessions kept in memory before spilling to SQLite",
+    )
+    parser.add_argument(
+        "--llm-latency",
+        type=float,
+        default=0.05,
+        help="Simulated model seconds before each tool call and the final answer",
+    )
+    args = parser.parse_args()
+
+    if not args.api_key:
+        parser.error("--api-key or BACKEND_API_KEY is required")
+
+    asyncio.run(_load_test(args))
+
+
+if __name__ == "__main__":
+    main()
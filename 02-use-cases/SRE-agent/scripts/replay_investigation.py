@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""
+Record an investigation and replay it through the agent graph as a benchmark.
+
+record   Runs a query through the agent system (create_multi_agent_system,
+         with the real LLM provider and gateway tools) and saves every LLM
+         response and tool result to a JSON fixture.
+
+bench    Replays a fixture through the same graph with the "replay" LLM
+         provider and recorded tool results, and reports the median wall
+         time per graph node and per phase (routing, agents, aggregation),
+         LLM calls and tokens per node, and memory allocated. Replays answer
+         at once, so the times are the graph's own overhead; --realtime
+         sleeps the recorded LLM and tool durations instead. --save writes
+         the report as a baseline and --compare prints the change against
+         one.
+
+The memory system is not recorded, so both run with MEMORY_ENABLED=false.
+tests/fixtures/replay/ has a sample fixture.
+
+Usage:
+    uv run python scripts/replay_investigation.py record "Why is web-service slow?" -o investigation.json
+    uv run python scripts/replay_investigation.py bench tests/fixtures/replay/api_latency_investigation.json
+    uv run python scripts/replay_investigation.py bench investigation.json --save baseline.json
+    uv run python scripts/replay_investigation.py bench investigation.json --compare baseline.json
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import statistics
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+# Replays need the memory system off; set before sre_agent reads its config
+os.environ["MEMORY_ENABLED"] = "false"
+
+# Add the project root to path so we can import sre_agent
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from sre_agent.multi_agent_langgraph import create_multi_agent_system
+from sre_agent.replay import (
+    InvestigationReplay,
+    load_fixture,
+    record_investigation,
+    save_fixture,
+)
+
+# Configure logging
+logging.basicConfig(
+    level=logging.WARNING,
+    format="%(asctime)s,p%(process)s,{%(filename)s:%(lineno)d},%(levelname)s,%(message)s",
+)
+
+# sre_agent modules configure INFO logging on import; keep the report readable
+logging.getLogger().setLevel(logging.WARNING)
+
+logger = logging.getLogger(__name__)
+
+
+async def _record(args) -> None:
+    graph, tools = await create_multi_agent_system(provider=args.provider)
+    fixture = await record_investigation(graph, tools, args.query)
+    save_fixture(args.output, fixture)
+    llm_calls = sum(len(calls) for calls in fixture["llm_calls"].values())
+    print(
+        f"Recorded {llm_calls} LLM calls and {len(fixture['tool_calls'])} tool calls "
+        f"to {args.output}"
+    )
+
+
+def _median_report(runs: List[Dict[str, Any]], allocations) -> Dict[str, Any]:
+    """Median times of replay runs, with the usage and allocations of one run."""
+    nodes = runs[0]["nodes"]
+    return {
+        "iterations": len(runs),
+        "wall_seconds": statistics.median(run["wall_seconds"] for run in runs),
+        "phases": {
+            phase: statistics.median(run["phases"][phase] for run in runs)
+            for phase in runs[0]["phases"]
+        },
+        "nodes": {
+            node: statistics.median(run["nodes"][node]["seconds"] for run in runs)
+            for node in nodes
+        },
+        "llm": runs[0]["llm"],
+        "tool_calls": runs[0]["tool_calls"],
+        "allocations": allocations,
+    }
+
+
+def _change(value: float, baseline: Optional[float]) -> str:
+    if not baseline:
+        return ""
+    return f" ({(value - baseline) / baseline:+.0%})"
+
+
+def _print_report(report: Dict[str, Any], baseline: Optional[Dict[str, Any]]) -> None:
+    baseline = baseline or {}
+    ms = 1000
+    print(
+        f"\nWall time {report['wall_seconds'] * ms:.1f}ms"
+        f"{_change(report['wall_seconds'], baseline.get('wall_seconds'))}, "
+        f"median of {report['iterations']} replays, "
+        f"{report['tool_calls']} tool calls\n"
+    )
+
+    print(f"{'Phase':<16} {'Time':>10}")
+    for phase, seconds in report["phases"].items():
+        before = baseline.get("phases", {}).get(phase)
+        print(f"{phase:<16} {seconds * ms:>8.1f}ms{_change(seconds, before)}")
+    print("(parallel agents overlap, so phases can add up to more than wall time)\n")
+
+    print(
+        f"{'Node':<16} {'Time':>10} {'LLM calls':>10} {'Sent':>8} "
+        f"{'Recorded in':>12} {'out':>6}"
+    )
+    for node, seconds in report["nodes"].items():
+        usage = report["llm"].get(node, {})
+        before = baseline.get("nodes", {}).get(node)
+        print(
+            f"{node:<16} {seconds * ms:>8.1f}ms {usage.get('calls', 0):>10} "
+            f"{usage.get('prompt_tokens', 0):>8} {usage.get('input_tokens', 0):>12} "
+            f"{usage.get('output_tokens', 0):>6}{_change(seconds, before)}"
+        )
+    print(
+        "(Sent: approximate prompt tokens of the replayed calls; Recorded: "
+        "tokens reported by the model when recording)"
+    )
+
+    allocations = report.get("allocations")
+    if allocations:
+        before = baseline.get("allocations") or {}
+        print(
+            f"\nAllocations: peak {allocations['peak_bytes'] / 1024:.0f}KiB"
+            f"{_change(allocations['peak_bytes'], before.get('peak_bytes'))}, "
+            f"retained {allocations['retained_bytes'] / 1024:.0f}KiB"
+        )
+
+
+async def _bench(args) -> int:
+    replay = InvestigationReplay(load_fixture(args.fixture), realtime=args.realtime)
+
+    # Warm up imports and caches outside the measured runs
+    first = await replay.run()
+    if first["divergences"]:
+        print("The graph no longer follows the recording:")
+        for divergence in first["divergences"]:
+            print(f"  {divergence}")
+
+    runs = [await replay.run() for _ in range(args.iterations)]
+    allocations = None
+    if not args.no_allocations:
+        allocations = (await replay.run(trace_allocations=True))["allocations"]
+    report = _median_report(runs, allocations)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, "r") as f:
+            baseline = json.load(f)
+    _print_report(report, baseline)
+    if not first["matches_recording"]:
+        print("\nThe final response differs from the recorded one")
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nSaved the report to {args.save}")
+    return 1 if first["divergences"] else 0
+
+
+def main():
+    """Main entry point"""
+    parser = argparse.ArgumentParser(
+        description="Record an investigation and replay it as a latency benchmark",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    record = subparsers.add_parser("record", help="Record an investigation")
+    record.add_argument("query", help="Query to investigate")
+    record.add_argument("-o", "--output", required=True, help="Fixture file to write")
+    record.add_argument(
+        "--provider",
+        choices=["anthropic", "bedrock"],
+        default=os.getenv("LLM_PROVIDER", "bedrock"),
+        help="LLM provider to record (default: bedrock)",
+    )
+
+    bench = subparsers.add_parser("bench", help="Replay a recorded investigation")
+    bench.add_argument("fixture", help="Fixture file written by record")
+    bench.add_argument(
+        "--iterations", type=int, default=20, help="Replays to take the median of"
+    )
+    bench.add_argument(
+        "--realtime",
+        action="store_true",
+        help="Sleep the recorded LLM and tool durations",
+    )
+    bench.add_argument(
+        "--no-allocations",
+        action="store_true",
+        help="Skip the replay traced with tracemalloc",
+    )
+    bench.add_argument("--save", help="Write the report as a JSON baseline")
+    bench.add_argument("--compare", help="Baseline JSON to compare against")
+    args = parser.parse_args()
+
+    if args.command == "record":
+        asyncio.run(_record(args))
+    else:
+        sys.exit(asyncio.run(_bench(args)))
+
+
+if __name__ == "__main__":
+    main()
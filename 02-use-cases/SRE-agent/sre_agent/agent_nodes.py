@@ -4,7 +4,7 @@ import asyncio
 import logging
 from functools import lru_cache
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
 
 import yaml
 from langchain_core.messages import HumanMessage, SystemMessage
@@ -13,9 +13,16 @@ from langgraph.prebuilt import create_react_agent
 
 from .agent_state import AgentState
 from .constants import AgentMetadata
+from .context_budget import create_context_compactor, start_usage
 from .llm_utils import create_llm_with_error_handling
-from .memory import SREMemoryClient, create_conversation_memory_manager
+from .memory import (
+    SREMemoryClient,
+    create_conversation_memory_manager,
+    get_memory_client_registry,
+)
+from .memory.config import _load_memory_config
 from .prompt_loader import prompt_loader
+from .tool_cache import start_tool_cache_scope
 
 # Logging will be configured by the main entry point
 logger = logging.getLogger(__name__)
@@ -88,6 +95,7 @@ class BaseAgentNode:
         tools: List[BaseTool],
         llm_provider: str = "bedrock",
         agent_metadata: AgentMetadata = None,
+        memory_client: Optional[SREMemoryClient] = None,
         **llm_kwargs,
     ):
         # Use agent_metadata if provided, otherwise fall back to individual parameters
@@ -107,13 +115,57 @@ class BaseAgentNode:
         self.llm_provider = llm_provider
         self.llm_kwargs = llm_kwargs  # Store for later use in memory client creation
 
+        # Shared memory client injected by the graph builder; resolved lazily
+        # from the process-wide registry when not provided
+        self.memory_client = memory_client
+        self._conversation_manager = None
+        self._memory_hooks = None
+
         logger.info(
             f"Initializing {self.name} with LLM provider: {llm_provider}, actor_id: {self.actor_id}, tools: {[tool.name for tool in tools]}"
         )
         self.llm = _create_llm(llm_provider, **llm_kwargs)
 
+        # Keep each LLM call within the agent's context budget
+        agent_config = (
+            _load_agent_config().get("agents", {}).get(f"{self.agent_type}_agent", {})
+        )
+        self.context = create_context_compactor(agent_config.get("max_context_tokens"))
+
         # Create the react agent
-        self.agent = create_react_agent(self.llm, self.tools)
+        self.agent = create_react_agent(
+            self.llm, self.tools, pre_model_hook=self.context.pre_model_hook
+        )
+
+    def _get_memory_client(self) -> SREMemoryClient:
+        """Get the shared memory client, resolving it from the registry once."""
+        if self.memory_client is None:
+            # Get region from llm_kwargs if available
+            region = (
+                self.llm_kwargs.get("region_name", "us-east-1")
+                if self.llm_provider == "bedrock"
+                else "us-east-1"
+            )
+            self.memory_client = get_memory_client_registry().get_or_create(
+                region=region, memory_name=_load_memory_config().memory_name
+            )
+        return self.memory_client
+
+    def _get_conversation_manager(self):
+        """Get the conversation memory manager, creating it on first use."""
+        if self._conversation_manager is None:
+            self._conversation_manager = create_conversation_memory_manager(
+                self._get_memory_client()
+            )
+        return self._conversation_manager
+
+    def _get_memory_hooks(self):
+        """Get the memory hook provider, creating it on first use."""
+        if self._memory_hooks is None:
+            from .memory.hooks import MemoryHookProvider
+
+            self._memory_hooks = MemoryHookProvider(self._get_memory_client())
+        return self._memory_hooks
 
     def _get_system_prompt(self) -> str:
         """Get system prompt for this agent using prompt loader."""
@@ -158,6 +210,8 @@ class BaseAgentNode:
         try:
             # Get the last user message
             messages = state["messages"]
+            context_usage = None
+            tool_cache_stats = None
 
             # Create a focused query for this agent
             agent_prompt = (
@@ -177,12 +231,7 @@ class BaseAgentNode:
             user_id = state.get("user_id")
             if user_id:
                 try:
-                    # Get region from llm_kwargs if available
-                    region = self.llm_kwargs.get("region_name", "us-east-1") if self.llm_provider == "bedrock" else "us-east-1"
-                    memory_client = SREMemoryClient(region=region)
-                    conversation_manager = create_conversation_memory_manager(
-                        memory_client
-                    )
+                    conversation_manager = self._get_conversation_manager()
                     logger.info(
                         f"{self.name} - Initialized conversation memory manager for user: {user_id}"
                     )
@@ -280,6 +329,11 @@ class BaseAgentNode:
                 logger.info(
                     f"{self.name} - Executing agent with timeout of {timeout_seconds} seconds"
                 )
+                context_usage = start_usage()
+                # Share identical tool calls with the other agents of this investigation
+                tool_cache_stats = start_tool_cache_scope(
+                    state.get("metadata", {}).get("investigation_id")
+                )
                 await asyncio.wait_for(execute_agent(), timeout=timeout_seconds)
                 logger.info(f"{self.name} - Agent execution completed")
 
@@ -373,14 +427,7 @@ class BaseAgentNode:
             # Process agent response for pattern extraction and memory capture
             if user_id and agent_response:
                 try:
-                    # Check if memory hooks are available through the memory client
-                    from .memory.hooks import MemoryHookProvider
-
-                    # Use the SREMemoryClient that's already imported at the top
-                    # Get region from llm_kwargs if available
-                    region = self.llm_kwargs.get("region_name", "us-east-1") if self.llm_provider == "bedrock" else "us-east-1"
-                    memory_client = SREMemoryClient(region=region)
-                    memory_hooks = MemoryHookProvider(memory_client)
+                    memory_hooks = self._get_memory_hooks()
 
                     # Create response object for hooks
                     response_obj = {
@@ -409,6 +456,22 @@ class BaseAgentNode:
                         f"{self.name} - Failed to process agent response for memory patterns: {e}"
                     )
 
+            metadata = {
+                **state.get("metadata", {}),
+                f"{self.name.replace(' ', '_')}_trace": all_messages,
+            }
+            if context_usage is not None:
+                usage = context_usage.as_dict()
+                metadata[f"{self.name.replace(' ', '_')}_context"] = usage
+                logger.info(
+                    f"{self.name} - Context budget: {usage['tokens_after']} of "
+                    f"{usage['tokens_before']} tokens sent over {usage['llm_calls']} LLM calls"
+                )
+            if tool_cache_stats is not None:
+                metadata[f"{self.name.replace(' ', '_')}_tool_cache"] = (
+                    tool_cache_stats.as_dict()
+                )
+
             # Update state with streaming info
             return {
                 "agent_results": {
@@ -417,10 +480,7 @@ class BaseAgentNode:
                 },
                 "agents_invoked": state.get("agents_invoked", []) + [self.name],
                 "messages": messages + all_messages,
-                "metadata": {
-                    **state.get("metadata", {}),
-                    f"{self.name.replace(' ', '_')}_trace": all_messages,
-                },
+                "metadata": metadata,
             }
 
         except Exception as e:
@@ -4,9 +4,10 @@ import asyncio
 import logging
 import os
 from datetime import datetime, timezone
-from typing import Any, Dict
+from typing import Any, Dict, Optional
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import StreamingResponse
 from langchain_core.messages import HumanMessage
 from langchain_core.tools import BaseTool
 from pydantic import BaseModel
@@ -17,6 +18,15 @@ from .constants import SREConstants
 # Import logging config
 from .logging_config import configure_logging
 from .multi_agent_langgraph import create_multi_agent_system
+from .session_manager import (
+    InvocationScheduler,
+    QueueFullError,
+    SessionManager,
+    SessionStore,
+    SessionTurn,
+)
+from .streaming import STREAM_FORMATS, graph_events, stream_events
+from .tool_cache import get_tool_cache
 
 # Configure logging based on DEBUG environment variable
 # This ensures debug mode works even when not run via __main__
@@ -59,6 +69,41 @@ class InvocationResponse(BaseModel):
 # Global variables for agent state
 agent_graph = None
 tools: list[BaseTool] = []
+session_manager: Optional[SessionManager] = None
+
+
+def get_session_manager() -> SessionManager:
+    """Session state and admission control shared by all invocations.
+
+    Limits come from SREConstants.runtime and can be overridden with the
+    MAX_CONCURRENT_INVESTIGATIONS, MAX_QUEUED_INVESTIGATIONS and
+    SESSION_STORE_PATH environment variables.
+    """
+    global session_manager
+
+    if session_manager is None:
+        config = SREConstants.runtime
+        session_manager = SessionManager(
+            SessionStore(
+                os.getenv("SESSION_STORE_PATH", config.session_store_path),
+                max_sessions=config.max_sessions_in_memory,
+                max_messages=config.max_session_messages,
+            ),
+            InvocationScheduler(
+                max_concurrent=int(
+                    os.getenv(
+                        "MAX_CONCURRENT_INVESTIGATIONS",
+                        config.max_concurrent_investigations,
+                    )
+                ),
+                max_queued=int(
+                    os.getenv(
+                        "MAX_QUEUED_INVESTIGATIONS", config.max_queued_investigations
+                    )
+                ),
+            ),
+        )
+    return session_manager
 
 
 async def initialize_agent():
@@ -111,9 +156,95 @@ async def startup_event():
     await initialize_agent()
 
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Persist in-memory session conversations."""
+    if session_manager is not None:
+        session_manager.close()
+
+
+def _stream_format(request_input: Dict[str, Any], accept: str) -> Optional[str]:
+    """Streaming format requested by the input "stream" key or the Accept header.
+
+    "stream": true (or "sse") selects Server-Sent Events and "stream": "ndjson"
+    newline-delimited JSON; without the key, an Accept header naming either
+    media type selects it. None means a single JSON response.
+    """
+    stream = request_input.get("stream")
+    if stream is True or stream == "sse":
+        return "sse"
+    if isinstance(stream, str) and stream in STREAM_FORMATS:
+        return stream
+    if stream is None:
+        for stream_format, media_type in STREAM_FORMATS.items():
+            if media_type in accept:
+                return stream_format
+    return None
+
+
+def _initial_state(user_prompt: str, turn: SessionTurn) -> AgentState:
+    """Create initial state exactly like the CLI does, with the session history."""
+    return {
+        "messages": turn.messages(user_prompt),
+        "next": "supervisor",
+        "agent_results": {},
+        "current_query": user_prompt,
+        "metadata": {},
+        "requires_collaboration": False,
+        "agents_invoked": [],
+        "final_response": None,
+        "auto_approve_plan": True,  # Always auto-approve plans in runtime mode
+        "session_id": turn.session_id,  # Required for memory retrieval
+        "user_id": turn.user_id,  # Required for user personalization
+    }
+
+
+def _response_data(final_response: str) -> Dict[str, Any]:
+    """Invocation output for the final response of the agent graph."""
+    if not final_response:
+        logger.warning("No final response received from agent graph")
+        final_response = (
+            "I encountered an issue processing your request. Please try again."
+        )
+    else:
+        logger.info(f"Final response length: {len(final_response)} characters")
+
+    # Simple response format
+    return {
+        "message": final_response,
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "model": SREConstants.app.agent_model_name,
+    }
+
+
+async def _investigation_events(user_prompt: str, session_id: str, user_id: str):
+    """Progress events of a session turn, ending with the invocation output."""
+    manager = get_session_manager()
+    if manager.scheduler.would_wait():
+        yield {"type": "queued", "queue_depth": manager.scheduler.queue_depth}
+
+    final_response = ""
+    async with manager.turn(session_id, user_id) as turn:
+        async for event in graph_events(agent_graph, _initial_state(user_prompt, turn)):
+            if event["type"] == "response":
+                final_response = event["message"]
+                continue
+            yield event
+        if final_response:
+            turn.record(user_prompt, final_response)
+    yield {"type": "final", "output": _response_data(final_response)}
+    logger.info("Successfully streamed agent response")
+
+
 @app.post("/invocations", response_model=InvocationResponse)
-async def invoke_agent(request: InvocationRequest):
-    """Main agent invocation endpoint."""
+async def invoke_agent(request: InvocationRequest, http_request: Request):
+    """Main agent invocation endpoint.
+
+    Returns one JSON body by default. With "stream" in the input, or an Accept
+    header of text/event-stream or application/x-ndjson, progress is streamed
+    as it happens (routing, tool calls, agent completions, response tokens)
+    and the last event carries the same output as the JSON response.
+    """
     global agent_graph, tools
 
     logger.info("Received invocation request")
@@ -138,68 +269,67 @@ async def invoke_agent(request: InvocationRequest):
 
         logger.info(f"Session ID: {session_id}, User ID: {user_id}")
 
-        # Create initial state exactly like the CLI does
-        initial_state: AgentState = {
-            "messages": [HumanMessage(content=user_prompt)],
-            "next": "supervisor",
-            "agent_results": {},
-            "current_query": user_prompt,
-            "metadata": {},
-            "requires_collaboration": False,
-            "agents_invoked": [],
-            "final_response": None,
-            "auto_approve_plan": True,  # Always auto-approve plans in runtime mode
-            "session_id": session_id,  # Required for memory retrieval
-            "user_id": user_id,  # Required for user personalization
-        }
+        # Reject up front rather than queue without bound
+        manager = get_session_manager()
+        if manager.scheduler.full:
+            raise QueueFullError(
+                f"{manager.scheduler.queue_depth} investigations are already queued"
+            )
+
+        stream_format = _stream_format(
+            request.input, http_request.headers.get("accept", "")
+        )
+        if stream_format:
+            logger.info(f"Streaming agent graph execution as {stream_format}")
+            return StreamingResponse(
+                stream_events(
+                    _investigation_events(user_prompt, session_id, user_id),
+                    stream_format,
+                    is_disconnected=http_request.is_disconnected,
+                ),
+                media_type=STREAM_FORMATS[stream_format],
+                headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+            )
 
         # Process through the agent graph exactly like the CLI
         final_response = ""
 
-        logger.info("Starting agent graph execution")
-
-        async for event in agent_graph.astream(initial_state):
-            for node_name, node_output in event.items():
-                logger.info(f"Processing node: {node_name}")
-
-                # Log key events from each node
-                if node_name == "supervisor":
-                    next_agent = node_output.get("next", "")
-                    metadata = node_output.get("metadata", {})
-                    logger.info(f"Supervisor routing to: {next_agent}")
-                    if metadata.get("routing_reasoning"):
-                        logger.info(
-                            f"Routing reasoning: {metadata['routing_reasoning']}"
-                        )
-
-                elif node_name in [
-                    "kubernetes_agent",
-                    "logs_agent",
-                    "metrics_agent",
-                    "runbooks_agent",
-                ]:
-                    agent_results = node_output.get("agent_results", {})
-                    logger.info(f"{node_name} completed with results")
-
-                # Capture final response from aggregate node
-                elif node_name == "aggregate":
-                    final_response = node_output.get("final_response", "")
-                    logger.info("Aggregate node completed, final response captured")
-
-        if not final_response:
-            logger.warning("No final response received from agent graph")
-            final_response = (
-                "I encountered an issue processing your request. Please try again."
-            )
-        else:
-            logger.info(f"Final response length: {len(final_response)} characters")
-
-        # Simple response format
-        response_data = {
-            "message": final_response,
-            "timestamp": datetime.now(timezone.utc).isoformat(),
-            "model": SREConstants.app.agent_model_name,
-        }
+        async with manager.turn(session_id, user_id) as turn:
+            logger.info("Starting agent graph execution")
+
+            initial_state = _initial_state(user_prompt, turn)
+            async for event in agent_graph.astream(initial_state):
+                for node_name, node_output in event.items():
+                    logger.info(f"Processing node: {node_name}")
+
+                    # Log key events from each node
+                    if node_name == "supervisor":
+                        next_agent = node_output.get("next", "")
+                        metadata = node_output.get("metadata", {})
+                        logger.info(f"Supervisor routing to: {next_agent}")
+                        if metadata.get("routing_reasoning"):
+                            logger.info(
+                                f"Routing reasoning: {metadata['routing_reasoning']}"
+                            )
+
+                    elif node_name in [
+                        "kubernetes_agent",
+                        "logs_agent",
+                        "metrics_agent",
+                        "runbooks_agent",
+                    ]:
+                        agent_results = node_output.get("agent_results", {})
+                        logger.info(f"{node_name} completed with results")
+
+                    # Capture final response from aggregate node
+                    elif node_name == "aggregate":
+                        final_response = node_output.get("final_response", "")
+                        logger.info("Aggregate node completed, final response captured")
+
+            if final_response:
+                turn.record(user_prompt, final_response)
+
+        response_data = _response_data(final_response)
 
         logger.info("Successfully processed agent request")
         logger.info("Returning invocation response")
@@ -207,6 +337,11 @@ async def invoke_agent(request: InvocationRequest):
 
     except HTTPException:
         raise
+    except QueueFullError as e:
+        logger.warning(f"Rejecting invocation: {e}")
+        raise HTTPException(
+            status_code=503, detail=f"Agent is at capacity, retry later: {e}"
+        )
     except Exception as e:
         logger.error(f"Agent processing failed: {e}")
         logger.exception("Full exception details:")
@@ -221,6 +356,12 @@ async def ping():
     return {"status": "healthy"}
 
 
+@app.get("/metrics")
+async def metrics():
+    """Admission queue, session and tool cache metrics."""
+    return {**get_session_manager().metrics(), "tool_cache": get_tool_cache().stats()}
+
+
 async def invoke_sre_agent_async(prompt: str, provider: str = "anthropic") -> str:
     """
     Programmatic interface to invoke SRE agent.
@@ -16,6 +16,22 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
+def _merge_dicts(
+    left: Optional[Dict[str, Any]], right: Optional[Dict[str, Any]]
+) -> Dict[str, Any]:
+    """Merge dict updates so agents running in the same step don't conflict."""
+    return {**(left or {}), **(right or {})}
+
+
+def _merge_unique(left: Optional[List[str]], right: Optional[List[str]]) -> List[str]:
+    """Append new entries in order, ignoring ones already present."""
+    merged = list(left or [])
+    for item in right or []:
+        if item not in merged:
+            merged.append(item)
+    return merged
+
+
 class AgentState(TypedDict):
     """State shared across all agents in the multi-agent system.
 
@@ -29,20 +45,23 @@ class AgentState(TypedDict):
     # Which agent should act next (set by supervisor)
     next: Literal["kubernetes", "logs", "metrics", "runbooks", "FINISH"]
 
-    # Intermediate results from each agent
-    agent_results: Dict[str, Any]
+    # Agents to run concurrently in the current plan wave (set by supervisor)
+    next_wave: Optional[List[str]]
+
+    # Intermediate results from each agent, merged across parallel agents
+    agent_results: Annotated[Dict[str, Any], _merge_dicts]
 
     # Current query being processed
     current_query: Optional[str]
 
     # Metadata about the conversation
-    metadata: Dict[str, Any]
+    metadata: Annotated[Dict[str, Any], _merge_dicts]
 
     # Flag to indicate if we need multiple agents
     requires_collaboration: bool
 
     # List of agents that have already responded
-    agents_invoked: List[str]
+    agents_invoked: Annotated[List[str], _merge_unique]
 
     # Final aggregated response (set by supervisor)
     final_response: Optional[str]
@@ -161,6 +161,112 @@ class ApplicationConfig(BaseModel):
     )
 
 
+class RuntimeConfig(BaseModel):
+    """Agent runtime serving constants."""
+
+    max_concurrent_investigations: int = Field(
+        default=8,
+        ge=1,
+        le=256,
+        description="Agent graph executions allowed to run at the same time",
+    )
+
+    max_queued_investigations: int = Field(
+        default=200,
+        ge=0,
+        le=10000,
+        description="Invocations allowed to wait for a free slot before new ones are rejected",
+    )
+
+    max_sessions_in_memory: int = Field(
+        default=500,
+        ge=1,
+        le=100000,
+        description="Session conversations kept in memory; older ones are spilled to SQLite",
+    )
+
+    max_session_messages: int = Field(
+        default=40,
+        ge=2,
+        le=1000,
+        description="Most recent messages of a session passed to the next turn",
+    )
+
+    session_store_path: str = Field(
+        default=".sre_agent_sessions.db",
+        description="SQLite file holding spilled and persisted session conversations",
+    )
+
+
+class ContextConfig(BaseModel):
+    """Context-window budget constants for agent LLM calls."""
+
+    max_context_tokens: int = Field(
+        default=24000,
+        ge=1000,
+        le=200000,
+        description="Default token budget for the messages of one agent LLM call (agents can override it with max_context_tokens in agent_config.yaml)",
+    )
+
+    tool_output_tokens: int = Field(
+        default=4000,
+        ge=100,
+        le=100000,
+        description="Tokens kept of each tool output from the agent's current run",
+    )
+
+    history_tool_output_tokens: int = Field(
+        default=500,
+        ge=50,
+        le=100000,
+        description="Tokens kept of each tool output from earlier agents and turns",
+    )
+
+    cache_size: int = Field(
+        default=1024,
+        ge=1,
+        le=100000,
+        description="Entries kept per agent in the token count, tool output and summary caches",
+    )
+
+
+class ToolCacheConfig(BaseModel):
+    """MCP tool result cache constants."""
+
+    enabled: bool = Field(
+        default=True,
+        description="Share MCP tool results between the agents of an investigation",
+    )
+
+    ttl_seconds: float = Field(
+        default=120.0,
+        ge=0,
+        le=3600,
+        description="Seconds a tool result is reused for identical calls",
+    )
+
+    max_entries: int = Field(
+        default=1024,
+        ge=1,
+        le=100000,
+        description="Tool results kept across all investigations",
+    )
+
+
+class ToolDiscoveryConfig(BaseModel):
+    """MCP gateway tool discovery constants."""
+
+    use_schema_cache: bool = Field(
+        default=True,
+        description="Build the gateway tools from cached schemas at startup and revalidate them in the background",
+    )
+
+    schema_cache_path: str = Field(
+        default=".tool_schema_cache.json",
+        description="JSON file holding the gateway tool schemas per gateway URL, relative to the sre_agent directory (copied into the agent container image)",
+    )
+
+
 class AgentMetadata(BaseModel):
     """Metadata for a single agent."""
 
@@ -201,6 +307,21 @@ class MemoryConfig(BaseModel):
         description="Maximum number of past investigation memories to retrieve",
     )
 
+    # Investigation-start retrieval settings
+    retrieval_timeout_seconds: float = Field(
+        default=10.0,
+        gt=0,
+        le=60,
+        description="Timeout for each memory lookup issued when an investigation starts",
+    )
+
+    preferences_cache_ttl_seconds: int = Field(
+        default=300,
+        ge=0,
+        le=3600,
+        description="Seconds to reuse a user's retrieved preferences across turns (0 disables)",
+    )
+
     # Content length limits for memory storage
     max_content_length: int = Field(
         default=9000,
@@ -307,6 +428,10 @@ class SREConstants:
     timeouts: TimeoutConfig = TimeoutConfig()
     prompts: PromptConfig = PromptConfig()
     app: ApplicationConfig = ApplicationConfig()
+    runtime: RuntimeConfig = RuntimeConfig()
+    context: ContextConfig = ContextConfig()
+    tool_cache: ToolCacheConfig = ToolCacheConfig()
+    tool_discovery: ToolDiscoveryConfig = ToolDiscoveryConfig()
     agents: AgentsConstant = AgentsConstant()
     memory: MemoryConfig = MemoryConfig()
 
@@ -315,7 +440,7 @@ class SREConstants:
         """Get model configuration for a specific provider.
 
         Args:
-            provider: LLM provider ("anthropic" or "bedrock")
+            provider: LLM provider ("anthropic", "bedrock" or "replay")
             **kwargs: Additional configuration overrides
 
         Returns:
@@ -334,6 +459,12 @@ class SREConstants:
                 "max_tokens": kwargs.get("max_tokens", cls.model.default_max_tokens),
                 "temperature": kwargs.get("temperature", cls.model.default_temperature),
             }
+        elif provider == "replay":
+            # Recorded responses, see sre_agent.replay; no model to configure
+            return {
+                "max_tokens": kwargs.get("max_tokens", cls.model.default_max_tokens),
+                "temperature": kwargs.get("temperature", cls.model.default_temperature),
+            }
         else:
             raise ValueError(f"Unsupported provider: {provider}")
 
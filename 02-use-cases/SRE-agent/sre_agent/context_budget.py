@@ -0,0 +1,374 @@
+#!/usr/bin/env python3
+"""
+Context-window budgeting for the LLM calls of agent nodes.
+
+Every step of an agent's ReAct loop used to send the whole conversation to
+the model: the system prompt, every earlier turn of the session, the tool
+calls and verbatim tool outputs of the agents that ran before, and this
+agent's own tool outputs. ContextCompactor runs as the agent's
+pre_model_hook and rewrites only what the model sees (the graph state keeps
+the full messages):
+
+1. Tool outputs are capped: outputs of earlier agents and turns at a small
+   budget, outputs of this agent's current run at a larger one. JSON
+   payloads keep their structure with long lists shortened and an item count
+   of what was left out; other text keeps its beginning and end.
+2. If the messages still exceed the agent's token budget, the oldest session
+   turns are condensed into short summaries appended to the system prompt,
+   newest turns kept first.
+3. If that is still not enough, every tool output but the latest is cut to
+   the small budget.
+
+Token counts, compacted tool outputs and turn summaries are cached by message
+id, so the steps of a ReAct loop do not recompute them. Each agent run
+records the tokens before and after compaction in a ContextUsage, and
+context_report() sums them per investigation.
+"""
+
+import json
+import logging
+from collections import OrderedDict
+from contextvars import ContextVar
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+from langchain_core.messages import (
+    AIMessage,
+    BaseMessage,
+    HumanMessage,
+    SystemMessage,
+    ToolMessage,
+)
+from langchain_core.messages.utils import count_tokens_approximately
+
+from .constants import SREConstants
+
+logger = logging.getLogger(__name__)
+
+# Approximate characters per token, as count_tokens_approximately assumes
+CHARS_PER_TOKEN = 4
+
+# Characters of the user and assistant side kept in a condensed turn
+SUMMARY_QUERY_CHARS = 200
+SUMMARY_RESPONSE_CHARS = 400
+
+# Longest string kept whole when shrinking a JSON payload
+_STRING_LIMIT = 200
+
+# ContextUsage of the agent run in progress in the current task
+_current_usage: ContextVar[Optional["ContextUsage"]] = ContextVar(
+    "context_usage", default=None
+)
+
+
+class ContextUsage:
+    """Tokens sent to the model by one agent run, before and after compaction."""
+
+    def __init__(self):
+        self.calls = 0
+        self.tokens_before = 0
+        self.tokens_after = 0
+
+    def add(self, tokens_before: int, tokens_after: int) -> None:
+        self.calls += 1
+        self.tokens_before += tokens_before
+        self.tokens_after += tokens_after
+
+    def as_dict(self) -> Dict[str, int]:
+        return {
+            "llm_calls": self.calls,
+            "tokens_before": self.tokens_before,
+            "tokens_after": self.tokens_after,
+            "tokens_saved": self.tokens_before - self.tokens_after,
+        }
+
+
+def start_usage() -> ContextUsage:
+    """Record the LLM calls made from the current task into a new ContextUsage.
+
+    Tasks started afterwards from this task (such as the ReAct loop run by an
+    agent node) record into it as well.
+    """
+    usage = ContextUsage()
+    _current_usage.set(usage)
+    return usage
+
+
+def context_report(metadata: Dict[str, Any]) -> Dict[str, int]:
+    """Sum of the per-agent context usage recorded in investigation metadata."""
+    totals = {"llm_calls": 0, "tokens_before": 0, "tokens_after": 0}
+    for key, value in metadata.items():
+        if key.endswith("_context") and isinstance(value, dict):
+            for name in totals:
+                totals[name] += value.get(name, 0)
+    totals["tokens_saved"] = totals["tokens_before"] - totals["tokens_after"]
+    return totals
+
+
+def _text(content: Any) -> str:
+    """Text of message content given as a string or content blocks."""
+    if isinstance(content, str):
+        return content
+    if isinstance(content, list):
+        return "".join(
+            block.get("text", "") if isinstance(block, dict) else str(block)
+            for block in content
+        )
+    return str(content)
+
+
+def _shrink(value: Any, list_limit: int) -> Any:
+    """Copy of a JSON value with lists cut to list_limit items and long strings cut."""
+    if isinstance(value, dict):
+        return {key: _shrink(item, list_limit) for key, item in value.items()}
+    if isinstance(value, list):
+        kept = [_shrink(item, list_limit) for item in value[:list_limit]]
+        if len(value) > list_limit:
+            kept.append(f"... {len(value) - list_limit} more items")
+        return kept
+    if isinstance(value, str) and len(value) > _STRING_LIMIT:
+        return value[:_STRING_LIMIT] + "..."
+    return value
+
+
+def summarize_payload(text: str, max_tokens: int) -> str:
+    """Text of a tool output cut down to about max_tokens.
+
+    JSON keeps its keys, with lists shortened; other text keeps its start
+    and end around a note of how much was omitted.
+    """
+    max_chars = max_tokens * CHARS_PER_TOKEN
+    if len(text) <= max_chars:
+        return text
+
+    header = f"[Tool output compacted from ~{len(text) // CHARS_PER_TOKEN} tokens]\n"
+    try:
+        data = json.loads(text)
+    except ValueError:
+        data = None
+    if isinstance(data, (dict, list)):
+        # Longest list length that fits, by binary search
+        best = None
+        low, high = 1, len(text)
+        while low <= high:
+            list_limit = (low + high) // 2
+            compacted = json.dumps(_shrink(data, list_limit), separators=(",", ":"))
+            if len(header) + len(compacted) <= max_chars:
+                best, low = compacted, list_limit + 1
+            else:
+                high = list_limit - 1
+        if best is not None:
+            return header + best
+
+    keep = max(0, max_chars - len(header) - 60) // 2
+    omitted = len(text) - 2 * keep
+    return (
+        f"{header}{text[:keep]}\n... [{omitted} characters omitted] ...\n"
+        f"{text[len(text) - keep :] if keep else ''}"
+    )
+
+
+class ContextCompactor:
+    """Keeps the messages of an agent's LLM calls within a token budget.
+
+    Args:
+        max_tokens: Budget for all messages of one LLM call
+        tool_output_tokens: Cap per tool output of the agent's current run
+        history_tool_output_tokens: Cap per tool output of earlier agents and turns
+        cache_size: Entries kept in each of the count, tool output and summary caches
+    """
+
+    def __init__(
+        self,
+        max_tokens: int,
+        tool_output_tokens: int,
+        history_tool_output_tokens: int,
+        cache_size: int = 1024,
+    ):
+        self.max_tokens = max_tokens
+        self.tool_output_tokens = tool_output_tokens
+        self.history_tool_output_tokens = history_tool_output_tokens
+        self.cache_size = cache_size
+        self._counts: "OrderedDict[Hashable, int]" = OrderedDict()
+        self._tool_outputs: "OrderedDict[Hashable, ToolMessage]" = OrderedDict()
+        self._summaries: "OrderedDict[Hashable, str]" = OrderedDict()
+
+    def _cached(self, cache: OrderedDict, key: Optional[Hashable], compute):
+        """Value for key from an LRU cache, computing it on a miss."""
+        if key is None:
+            return compute()
+        if key in cache:
+            cache.move_to_end(key)
+            return cache[key]
+        value = cache[key] = compute()
+        if len(cache) > self.cache_size:
+            cache.popitem(last=False)
+        return value
+
+    def count(self, message: BaseMessage) -> int:
+        """Approximate tokens of a message."""
+        key = (message.id, len(_text(message.content))) if message.id else None
+        return self._cached(
+            self._counts, key, lambda: count_tokens_approximately([message])
+        )
+
+    def total(self, messages: List[BaseMessage]) -> int:
+        return sum(self.count(message) for message in messages)
+
+    def _compact_tool_output(
+        self, message: ToolMessage, max_tokens: int
+    ) -> BaseMessage:
+        if self.count(message) <= max_tokens:
+            return message
+
+        def compute():
+            return message.model_copy(
+                update={
+                    "content": summarize_payload(_text(message.content), max_tokens)
+                }
+            )
+
+        key = (message.id, max_tokens) if message.id else None
+        return self._cached(self._tool_outputs, key, compute)
+
+    def _summarize_turn(self, turn: List[BaseMessage]) -> str:
+        """One-line summary of an earlier turn: the ask, tools used and the answer."""
+
+        def compute():
+            query = _text(turn[0].content).strip()
+            tools = []
+            answer = ""
+            for message in turn[1:]:
+                if isinstance(message, ToolMessage) and message.name not in tools:
+                    tools.append(message.name)
+                elif isinstance(message, AIMessage) and _text(message.content).strip():
+                    answer = _text(message.content).strip()
+            summary = f"- User: {query[:SUMMARY_QUERY_CHARS]}"
+            if tools:
+                summary += f"\n  Tools used: {', '.join(t for t in tools if t)}"
+            if answer:
+                summary += f"\n  Answer: {answer[:SUMMARY_RESPONSE_CHARS]}"
+            return summary
+
+        ids = tuple(message.id for message in turn)
+        return self._cached(self._summaries, ids if all(ids) else None, compute)
+
+    def compact(self, messages: List[BaseMessage]) -> List[BaseMessage]:
+        """Messages to send to the model in place of messages.
+
+        Expects the layout agent nodes use: system prompt(s), earlier
+        conversation, the agent's prompt as the last user message, then the
+        tool calls and outputs of the agent's current run.
+        """
+        messages = list(messages)
+        current = max(
+            (i for i, m in enumerate(messages) if isinstance(m, HumanMessage)),
+            default=0,
+        )
+
+        # 1. Cap tool outputs
+        for i, message in enumerate(messages):
+            if isinstance(message, ToolMessage):
+                limit = (
+                    self.tool_output_tokens
+                    if i > current
+                    else self.history_tool_output_tokens
+                )
+                messages[i] = self._compact_tool_output(message, limit)
+        if self.total(messages) <= self.max_tokens:
+            return messages
+
+        # 2. Condense the oldest turns, keeping the newest that fit
+        system = []
+        while len(system) < current and isinstance(
+            messages[len(system)], SystemMessage
+        ):
+            system.append(messages[len(system)])
+        history = messages[len(system) : current]
+        tail = messages[current:]
+        turns: List[List[BaseMessage]] = []
+        for message in history:
+            if isinstance(message, HumanMessage) or not turns:
+                turns.append([])
+            turns[-1].append(message)
+
+        budget = self.max_tokens - self.total(system) - self.total(tail)
+        kept: List[List[BaseMessage]] = []
+        for turn in reversed(turns):
+            tokens = self.total(turn)
+            if tokens > budget:
+                break
+            kept.insert(0, turn)
+            budget -= tokens
+
+        condensed = turns[: len(turns) - len(kept)]
+        if condensed:
+            summaries = [self._summarize_turn(turn) for turn in condensed]
+            # The newest summaries that fit in what is left of the budget
+            lines: List[str] = []
+            for summary in reversed(summaries):
+                if (len(summary) + 1) // CHARS_PER_TOKEN > budget:
+                    break
+                lines.insert(0, summary)
+                budget -= (len(summary) + 1) // CHARS_PER_TOKEN
+            note = (
+                f"\n\nEarlier conversation ({len(condensed)} turns condensed"
+                f"{', oldest omitted' if len(lines) < len(summaries) else ''}):\n"
+                + "\n".join(lines)
+            )
+            if system:
+                system[-1] = system[-1].model_copy(
+                    update={"content": _text(system[-1].content) + note}
+                )
+            else:
+                system = [SystemMessage(content=note.strip())]
+        messages = system + [m for turn in kept for m in turn] + tail
+        if self.total(messages) <= self.max_tokens:
+            return messages
+
+        # 3. Cut every tool output but the latest to the small budget
+        last_tool = max(
+            (i for i, m in enumerate(messages) if isinstance(m, ToolMessage)),
+            default=-1,
+        )
+        return [
+            (
+                self._compact_tool_output(m, self.history_tool_output_tokens)
+                if isinstance(m, ToolMessage) and i != last_tool
+                else m
+            )
+            for i, m in enumerate(messages)
+        ]
+
+    def compact_with_usage(
+        self, messages: List[BaseMessage]
+    ) -> Tuple[List[BaseMessage], int, int]:
+        """compact() and the token totals before and after."""
+        before = self.total(messages)
+        compacted = self.compact(messages)
+        after = self.total(compacted)
+        usage = _current_usage.get()
+        if usage is not None:
+            usage.add(before, after)
+        if after < before:
+            logger.debug(f"Compacted LLM input from {before} to {after} tokens")
+        return compacted, before, after
+
+    async def pre_model_hook(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        """ReAct agent hook: the model sees the compacted messages only."""
+        compacted, _, _ = self.compact_with_usage(state["messages"])
+        return {"llm_input_messages": compacted}
+
+
+def create_context_compactor(max_tokens: Optional[int] = None) -> ContextCompactor:
+    """ContextCompactor with the budgets of SREConstants.context.
+
+    Args:
+        max_tokens: Budget per LLM call overriding the default
+    """
+    config = SREConstants.context
+    return ContextCompactor(
+        max_tokens=max_tokens or config.max_context_tokens,
+        tool_output_tokens=config.tool_output_tokens,
+        history_tool_output_tokens=config.history_tool_output_tokens,
+        cache_size=config.cache_size,
+    )
@@ -1,7 +1,7 @@
 #!/usr/bin/env python3
 
 import logging
-from typing import Any, Dict, List, Literal
+from typing import Any, Dict, List, Literal, Optional, Union
 
 from langchain_core.messages import HumanMessage
 from langchain_core.tools import BaseTool
@@ -15,6 +15,7 @@ from .agent_nodes import (
 )
 from .agent_state import AgentState
 from .constants import SREConstants
+from .memory.client import SREMemoryClient
 from .supervisor import SupervisorAgent
 
 # Configure logging with basicConfig
@@ -43,8 +44,13 @@ def _should_continue(state: AgentState) -> Literal["supervisor", "FINISH"]:
     return "supervisor"
 
 
-def _route_supervisor(state: AgentState) -> str:
-    """Route from supervisor to the appropriate agent or finish."""
+def _route_supervisor(state: AgentState) -> Union[str, List[str]]:
+    """Route from supervisor to the appropriate agent(s) or finish.
+
+    When the supervisor dispatches a plan wave with several independent
+    agents, all of their nodes are returned so LangGraph runs them in the
+    same step; their results are merged by the AgentState reducers.
+    """
     next_agent = state.get("next", "FINISH")
 
     if next_agent == "FINISH":
@@ -63,6 +69,12 @@ def _route_supervisor(state: AgentState) -> str:
         "runbooks_agent": "runbooks_agent",
     }
 
+    next_wave = state.get("next_wave") or []
+    if len(next_wave) > 1:
+        nodes = [agent_map[agent] for agent in next_wave if agent in agent_map]
+        if nodes:
+            return nodes
+
     return agent_map.get(next_agent, "aggregate")
 
 
@@ -86,12 +98,61 @@ async def _prepare_initial_state(state: AgentState) -> Dict[str, Any]:
     }
 
 
+def compile_investigation_graph(supervisor: Any, agent_nodes: Dict[str, Any]):
+    """Wire the supervisor and agent nodes into the investigation graph.
+
+    Args:
+        supervisor: Object providing the route and aggregate_responses nodes
+        agent_nodes: Agent node callables keyed by node name (kubernetes_agent, ...)
+
+    Returns:
+        Compiled StateGraph
+    """
+    # Create the state graph
+    workflow = StateGraph(AgentState)
+
+    # Add nodes to the graph
+    workflow.add_node("prepare", _prepare_initial_state)
+    workflow.add_node("supervisor", supervisor.route)
+    for node_name, agent_node in agent_nodes.items():
+        workflow.add_node(node_name, agent_node)
+    workflow.add_node("aggregate", supervisor.aggregate_responses)
+
+    # Set entry point
+    workflow.set_entry_point("prepare")
+
+    # Add edges from prepare to supervisor
+    workflow.add_edge("prepare", "supervisor")
+
+    # Add conditional edges from supervisor; a plan wave may fan out to
+    # several agents at once
+    workflow.add_conditional_edges(
+        "supervisor",
+        _route_supervisor,
+        {
+            **{node_name: node_name for node_name in agent_nodes},
+            "aggregate": "aggregate",
+        },
+    )
+
+    # Add edges from agents back to supervisor; parallel agents join there
+    for node_name in agent_nodes:
+        workflow.add_edge(node_name, "supervisor")
+
+    # Add edge from aggregate to END
+    workflow.add_edge("aggregate", END)
+
+    # Compile the graph
+    return workflow.compile()
+
+
 def build_multi_agent_graph(
     tools: List[BaseTool],
     llm_provider: str = "bedrock",
     force_delete_memory: bool = False,
     export_graph: bool = False,
     graph_output_path: str = "./docs/sre_agent_architecture.md",
+    memory_client: Optional[SREMemoryClient] = None,
     **llm_kwargs,
 ) -> StateGraph:
     """Build the multi-agent collaboration graph.
@@ -102,6 +163,7 @@ def build_multi_agent_graph(
         force_delete_memory: Whether to force delete existing memory
         export_graph: Whether to export the graph as a Mermaid diagram
         graph_output_path: Path to save the exported Mermaid diagram (default: ./docs/sre_agent_architecture.md)
+        memory_client: Shared memory client for the supervisor and all agent nodes
         **llm_kwargs: Additional arguments for LLM
 
     Returns:
@@ -109,12 +171,12 @@ def build_multi_agent_graph(
     """
     logger.info("Building multi-agent collaboration graph")
 
-    # Create the state graph
-    workflow = StateGraph(AgentState)
-
     # Create supervisor
     supervisor = SupervisorAgent(
-        llm_provider=llm_provider, force_delete_memory=force_delete_memory, **llm_kwargs
+        llm_provider=llm_provider,
+        force_delete_memory=force_delete_memory,
+        memory_client=memory_client,
+        **llm_kwargs,
     )
 
     # Create agent nodes with filtered tools and metadata from constants
@@ -122,87 +184,66 @@ def build_multi_agent_graph(
         tools,
         agent_metadata=SREConstants.agents.agents["kubernetes"],
         llm_provider=llm_provider,
+        memory_client=memory_client,
         **llm_kwargs,
     )
     logs_agent = create_logs_agent(
         tools,
         agent_metadata=SREConstants.agents.agents["logs"],
         llm_provider=llm_provider,
+        memory_client=memory_client,
         **llm_kwargs,
     )
     metrics_agent = create_metrics_agent(
         tools,
         agent_metadata=SREConstants.agents.agents["metrics"],
         llm_provider=llm_provider,
+        memory_client=memory_client,
         **llm_kwargs,
     )
     runbooks_agent = create_runbooks_agent(
         tools,
         agent_metadata=SREConstants.agents.agents["runbooks"],
         llm_provider=llm_provider,
+        memory_client=memory_client,
         **llm_kwargs,
     )
 
-    # Add nodes to the graph
-    workflow.add_node("prepare", _prepare_initial_state)
-    workflow.add_node("supervisor", supervisor.route)
-    workflow.add_node("kubernetes_agent", kubernetes_agent)
-    workflow.add_node("logs_agent", logs_agent)
-    workflow.add_node("metrics_agent", metrics_agent)
-    workflow.add_node("runbooks_agent", runbooks_agent)
-    workflow.add_node("aggregate", supervisor.aggregate_responses)
-
-    # Set entry point
-    workflow.set_entry_point("prepare")
-
-    # Add edges from prepare to supervisor
-    workflow.add_edge("prepare", "supervisor")
-
-    # Add conditional edges from supervisor
-    workflow.add_conditional_edges(
-        "supervisor",
-        _route_supervisor,
+    compiled_graph = compile_investigation_graph(
+        supervisor,
         {
-            "kubernetes_agent": "kubernetes_agent",
-            "logs_agent": "logs_agent",
-            "metrics_agent": "metrics_agent",
-            "runbooks_agent": "runbooks_agent",
-            "aggregate": "aggregate",
+            "kubernetes_agent": kubernetes_agent,
+            "logs_agent": logs_agent,
+            "metrics_agent": metrics_agent,
+            "runbooks_agent": runbooks_agent,
         },
     )
 
-    # Add edges from agents back to supervisor
-    workflow.add_edge("kubernetes_agent", "supervisor")
-    workflow.add_edge("logs_agent", "supervisor")
-    workflow.add_edge("metrics_agent", "supervisor")
-    workflow.add_edge("runbooks_agent", "supervisor")
-
-    # Add edge from aggregate to END
-    workflow.add_edge("aggregate", END)
-
-    # Compile the graph
-    compiled_graph = workflow.compile()
-
     # Export graph visualization if requested
     if export_graph:
         try:
             # Create docs directory if it doesn't exist
             from pathlib import Path
+
             output_path = Path(graph_output_path)
             output_path.parent.mkdir(parents=True, exist_ok=True)
-            
+
             # Get the Mermaid representation of the graph
             mermaid_diagram = compiled_graph.get_graph().draw_mermaid()
-            
+
             # Save to file
             with open(graph_output_path, "w") as f:
                 f.write("# SRE Agent Architecture\n\n")
                 f.write("```mermaid\n")
                 f.write(mermaid_diagram)
                 f.write("\n```\n")
-            
-            logger.info(f"Graph architecture (Mermaid) exported to: {graph_output_path}")
-            print(f"✅ Graph architecture (Mermaid diagram) exported to: {graph_output_path}")
+
+            logger.info(
+                f"Graph architecture (Mermaid) exported to: {graph_output_path}"
+            )
+            print(
+                f"✅ Graph architecture (Mermaid diagram) exported to: {graph_output_path}"
+            )
         except Exception as e:
             logger.error(f"Failed to export graph: {e}")
             print(f"❌ Failed to export graph: {e}")
@@ -39,7 +39,8 @@ def create_llm_with_error_handling(provider: str = "bedrock", **kwargs):
     """Create LLM instance with proper error handling and helpful error messages.
 
     Args:
-        provider: LLM provider ("anthropic" or "bedrock")
+        provider: LLM provider ("anthropic" or "bedrock"; "replay" serves the
+            responses of a recorded investigation, see sre_agent.replay)
         **kwargs: Additional configuration overrides
 
     Returns:
@@ -51,6 +52,11 @@ def create_llm_with_error_handling(provider: str = "bedrock", **kwargs):
         LLMAccessError: For access/permission failures
         ValueError: For unsupported providers
     """
+    if provider == "replay":
+        from .replay import get_replay_llm
+
+        return get_replay_llm()
+
     if provider not in ["anthropic", "bedrock"]:
         raise ValueError(
             f"Unsupported provider: {provider}. Use 'anthropic' or 'bedrock'"
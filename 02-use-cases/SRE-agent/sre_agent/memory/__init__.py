@@ -7,6 +7,7 @@ from .conversation_manager import (
     ConversationMessage,
     create_conversation_memory_manager,
 )
+from .registry import MemoryClientRegistry, get_memory_client_registry
 from .strategies import (
     InfrastructureKnowledge,
     InvestigationSummary,
@@ -32,4 +33,6 @@ __all__ = [
     "ConversationMemoryManager",
     "ConversationMessage",
     "create_conversation_memory_manager",
+    "MemoryClientRegistry",
+    "get_memory_client_registry",
 ]
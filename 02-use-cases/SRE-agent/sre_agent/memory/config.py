@@ -1,4 +1,5 @@
 import logging
+import os
 
 from pydantic import BaseModel, Field
 
@@ -47,9 +48,18 @@ class MemoryConfig(BaseModel):
 
 
 def _load_memory_config() -> MemoryConfig:
-    """Load memory configuration with defaults."""
+    """Load memory configuration with defaults.
+
+    MEMORY_ENABLED=false turns the memory system off, e.g. to record or replay
+    investigations without AgentCore Memory.
+    """
     try:
-        return MemoryConfig()
+        config = MemoryConfig()
     except Exception as e:
         logger.warning(f"Failed to load memory config: {e}, using defaults")
-        return MemoryConfig()
+        config = MemoryConfig()
+
+    enabled = os.getenv("MEMORY_ENABLED")
+    if enabled is not None:
+        config.enabled = enabled.strip().lower() not in ("false", "0", "no", "off")
+    return config
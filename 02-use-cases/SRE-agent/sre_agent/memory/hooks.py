@@ -1,6 +1,8 @@
+import asyncio
 import json
 import logging
 import re
+import time
 from datetime import datetime
 from typing import Any, Dict, List, Optional
 
@@ -10,6 +12,7 @@ from .strategies import (
     InfrastructureKnowledge,
     InvestigationSummary,
     UserPreference,
+    _preferences_cache,
     _save_infrastructure_knowledge,
     _save_investigation_summary,
     _save_user_preference,
@@ -31,7 +34,7 @@ class MemoryHookProvider:
     def __init__(self, memory_client: SREMemoryClient):
         self.memory_client = memory_client
 
-    def on_investigation_start(
+    async def on_investigation_start(
         self,
         query: str,
         user_id: str,
@@ -39,28 +42,43 @@ class MemoryHookProvider:
         session_id: str,
         incident_id: Optional[str] = None,
     ) -> Dict[str, Any]:
-        """Hook called when investigation starts."""
+        """Hook called when investigation starts.
+
+        The preference, infrastructure and investigation lookups run
+        concurrently, each bounded by the configured retrieval timeout. A
+        lookup that fails or times out contributes no records instead of
+        failing the investigation. Per-lookup timings are returned under
+        "retrieval_timings".
+        """
         try:
             # Retrieve relevant memories to provide context
-            # Use comprehensive query to get all user preference types
-            preferences = self.memory_client.retrieve_memories(
-                memory_type="preferences",
-                actor_id=user_id,
-                query=SREConstants.memory.user_preferences_query,
-                max_results=SREConstants.memory.max_preferences_results,
-            )
-
-            # Get infrastructure knowledge for specific user only
             logger.info(
-                f"Retrieving infrastructure knowledge for user '{user_id}' for query: '{query}'"
+                f"Retrieving memory context for user '{user_id}' for query: '{query}'"
             )
-            all_knowledge = self.memory_client.retrieve_memories(
-                memory_type="infrastructure",
-                actor_id=user_id,  # Only retrieve memories for the current user
-                query=query,
-                max_results=SREConstants.memory.max_infrastructure_results,
-                session_id=None,  # Cross-session search for planning purposes
+            timings: Dict[str, Dict[str, Any]] = {}
+            preferences, all_knowledge, investigations = await asyncio.gather(
+                # Use comprehensive query to get all user preference types
+                self._retrieve_preferences(user_id, timings),
+                # Get infrastructure knowledge for specific user only
+                self._timed_retrieval(
+                    timings,
+                    memory_type="infrastructure",
+                    actor_id=user_id,  # Only retrieve memories for the current user
+                    query=query,
+                    max_results=SREConstants.memory.max_infrastructure_results,
+                    session_id=None,  # Cross-session search for planning purposes
+                ),
+                # Get past investigation summaries for similar issues
+                self._timed_retrieval(
+                    timings,
+                    memory_type="investigations",
+                    actor_id=user_id,  # Use user_id to retrieve only user-specific investigations
+                    query=query,
+                    max_results=SREConstants.memory.max_investigation_results,
+                    session_id=None,  # Cross-session search for planning purposes
+                ),
             )
+            logger.info(f"Memory retrieval timings for user '{user_id}': {timings}")
 
             # Organize knowledge by agent for later distribution
             knowledge_by_agent = self._organize_memories_by_agent(all_knowledge)
@@ -78,18 +96,6 @@ class MemoryHookProvider:
             else:
                 logger.info(f"No infrastructure knowledge found for user '{user_id}'")
 
-            # Get past investigation summaries for similar issues (cross-session search for planning)
-            logger.info(
-                f"Retrieving investigation summaries for user '{user_id}' for query: '{query}'"
-            )
-            investigations = self.memory_client.retrieve_memories(
-                memory_type="investigations",
-                actor_id=user_id,  # Use user_id to retrieve only user-specific investigations
-                query=query,
-                max_results=SREConstants.memory.max_investigation_results,
-                session_id=None,  # Cross-session search for planning purposes
-            )
-
             if investigations:
                 logger.info(
                     f"Retrieved {len(investigations)} past investigation summaries for user '{user_id}'"
@@ -116,6 +122,7 @@ class MemoryHookProvider:
                 "user_preferences": preference_contents,
                 "infrastructure_by_agent": knowledge_by_agent,
                 "past_investigations": investigations,
+                "retrieval_timings": timings,
             }
 
             total_knowledge = sum(
@@ -135,8 +142,77 @@ class MemoryHookProvider:
                 "user_preferences": [],
                 "infrastructure_knowledge": [],
                 "past_investigations": [],
+                "retrieval_timings": {},
             }
 
+    async def _timed_retrieval(
+        self, timings: Dict[str, Dict[str, Any]], **retrieve_kwargs
+    ) -> List[Dict[str, Any]]:
+        """Run one blocking retrieve_memories call in a worker thread with a timeout.
+
+        Args:
+            timings: Dict that receives the lookup's duration, status and record count
+            **retrieve_kwargs: Arguments for SREMemoryClient.retrieve_memories
+
+        Returns:
+            Retrieved records, or an empty list if the lookup failed or timed out
+        """
+        memory_type = retrieve_kwargs["memory_type"]
+        timeout = SREConstants.memory.retrieval_timeout_seconds
+        start = time.perf_counter()
+        try:
+            records = await asyncio.wait_for(
+                asyncio.to_thread(
+                    self.memory_client.retrieve_memories, **retrieve_kwargs
+                ),
+                timeout=timeout,
+            )
+            status = "ok"
+        except asyncio.TimeoutError:
+            logger.warning(
+                f"Timed out retrieving {memory_type} memories after {timeout}s, continuing without them"
+            )
+            records, status = [], "timeout"
+        except Exception as e:
+            logger.warning(
+                f"Failed to retrieve {memory_type} memories, continuing without them: {e}"
+            )
+            records, status = [], "error"
+
+        timings[memory_type] = {
+            "seconds": round(time.perf_counter() - start, 3),
+            "status": status,
+            "records": len(records),
+        }
+        return records
+
+    async def _retrieve_preferences(
+        self, user_id: str, timings: Dict[str, Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
+        """Retrieve user preferences, reusing a recent retrieval for the same user."""
+        ttl_seconds = SREConstants.memory.preferences_cache_ttl_seconds
+        cache_key = (getattr(self.memory_client, "memory_id", None), user_id)
+        if ttl_seconds:
+            cached = _preferences_cache.get(cache_key, ttl_seconds)
+            if cached is not None:
+                timings["preferences"] = {
+                    "seconds": 0.0,
+                    "status": "cached",
+                    "records": len(cached),
+                }
+                return cached
+
+        preferences = await self._timed_retrieval(
+            timings,
+            memory_type="preferences",
+            actor_id=user_id,
+            query=SREConstants.memory.user_preferences_query,
+            max_results=SREConstants.memory.max_preferences_results,
+        )
+        if ttl_seconds and timings["preferences"]["status"] == "ok":
+            _preferences_cache.set(cache_key, preferences)
+        return preferences
+
     def on_agent_response(
         self, agent_name: str, response: Dict[str, Any], state: Dict[str, Any]
     ):
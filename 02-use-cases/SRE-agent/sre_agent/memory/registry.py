@@ -0,0 +1,138 @@
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from .client import SREMemoryClient
+
+# Configure logging with basicConfig
+logging.basicConfig(
+    level=logging.INFO,  # Set the log level to INFO
+    # Define log message format
+    format="%(asctime)s,p%(process)s,{%(filename)s:%(lineno)d},%(levelname)s,%(message)s",
+)
+
+logger = logging.getLogger(__name__)
+
+
+class MemoryClientRegistry:
+    """Process-wide registry of initialized SREMemoryClient instances.
+
+    Creating an SREMemoryClient runs control-plane lookups (list and get memory,
+    possibly strategy creation), so the registry creates one client per
+    (region, memory name) and hands the same instance to every agent node,
+    the supervisor and every later turn. Once initialized, a client is also
+    reachable by (region, memory id).
+
+    Lookups are thread-safe. Initialization of a given key happens at most
+    once, under a per-key lock, so concurrent callers for the same key wait
+    for the first one instead of repeating the control-plane calls, while
+    different keys can initialize in parallel.
+    """
+
+    def __init__(self, client_factory: Optional[Callable[..., SREMemoryClient]] = None):
+        self._client_factory = client_factory or SREMemoryClient
+        self._clients: Dict[Tuple[str, str], SREMemoryClient] = {}
+        self._clients_by_id: Dict[Tuple[str, str], SREMemoryClient] = {}
+        self._key_locks: Dict[Tuple[str, str], threading.Lock] = {}
+        self._lock = threading.Lock()
+        self._created = 0
+        self._reused = 0
+        self._init_seconds = 0.0
+
+    def _key_lock(self, key: Tuple[str, str]) -> threading.Lock:
+        with self._lock:
+            return self._key_locks.setdefault(key, threading.Lock())
+
+    def get_or_create(
+        self,
+        region: str,
+        memory_name: str = "sre_agent_memory",
+        force_delete: bool = False,
+    ) -> SREMemoryClient:
+        """Return the shared client for a region and memory name.
+
+        Args:
+            region: AWS region of the memory resource
+            memory_name: Name of the memory resource
+            force_delete: Recreate the memory resource; only applies when the
+                client is created, never to an already shared client
+
+        Returns:
+            Initialized SREMemoryClient shared across the process
+        """
+        key = (region, memory_name)
+        with self._lock:
+            client = self._clients.get(key)
+            if client is not None:
+                self._reused += 1
+                return client
+
+        with self._key_lock(key):
+            with self._lock:
+                client = self._clients.get(key)
+                if client is not None:
+                    self._reused += 1
+                    return client
+
+            start = time.perf_counter()
+            client = self._client_factory(
+                memory_name=memory_name, region=region, force_delete=force_delete
+            )
+            elapsed = time.perf_counter() - start
+
+            with self._lock:
+                self._clients[key] = client
+                memory_id = getattr(client, "memory_id", None)
+                if memory_id:
+                    self._clients_by_id[(region, memory_id)] = client
+                self._created += 1
+                self._init_seconds += elapsed
+
+        logger.info(
+            f"Initialized shared memory client for {memory_name} in {region} "
+            f"in {elapsed:.2f}s"
+        )
+        return client
+
+    def get_by_memory_id(
+        self, region: str, memory_id: str
+    ) -> Optional[SREMemoryClient]:
+        """Return the shared client for an initialized memory id, if any."""
+        with self._lock:
+            return self._clients_by_id.get((region, memory_id))
+
+    def stats(self) -> Dict[str, Any]:
+        """Client counts and the initialization time saved by reuse.
+
+        Time saved is estimated as reuse count times the average measured
+        initialization time.
+        """
+        with self._lock:
+            average = self._init_seconds / self._created if self._created else 0.0
+            return {
+                "clients": len(self._clients),
+                "created": self._created,
+                "reused": self._reused,
+                "init_seconds_total": round(self._init_seconds, 3),
+                "init_seconds_average": round(average, 3),
+                "init_seconds_saved": round(self._reused * average, 3),
+            }
+
+    def clear(self) -> None:
+        """Drop all shared clients and reset the counters."""
+        with self._lock:
+            self._clients.clear()
+            self._clients_by_id.clear()
+            self._key_locks.clear()
+            self._created = 0
+            self._reused = 0
+            self._init_seconds = 0.0
+
+
+_registry = MemoryClientRegistry()
+
+
+def get_memory_client_registry() -> MemoryClientRegistry:
+    """Return the process-wide memory client registry."""
+    return _registry
@@ -1,5 +1,7 @@
 import json
 import logging
+import threading
+import time
 from datetime import datetime
 from typing import Any, Dict, List, Optional
 
@@ -105,6 +107,47 @@ class InvestigationSummary(BaseModel):
     )
 
 
+class _PreferencesCache:
+    """Short-lived per-user cache of retrieved preference records.
+
+    Preferences only change when one is saved, so a save drops the user's
+    entry and follow-up turns in between can reuse the last retrieval.
+    """
+
+    def __init__(self):
+        self._entries: Dict[tuple, tuple] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: tuple, ttl_seconds: float) -> Optional[List[Dict[str, Any]]]:
+        """Return cached records for a (memory_id, user_id) key if still fresh."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            stored_at, records = entry
+            if time.monotonic() - stored_at >= ttl_seconds:
+                del self._entries[key]
+                return None
+            return records
+
+    def set(self, key: tuple, records: List[Dict[str, Any]]) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic(), records)
+
+    def invalidate(self, user_id: str) -> None:
+        """Drop every cached entry for a user."""
+        with self._lock:
+            for key in [key for key in self._entries if key[1] == user_id]:
+                del self._entries[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+_preferences_cache = _PreferencesCache()
+
+
 def _save_user_preference(client, user_id: str, preference: UserPreference) -> bool:
     """Save user preference to memory."""
     try:
@@ -117,6 +160,7 @@ def _save_user_preference(client, user_id: str, preference: UserPreference) -> b
             event_data=preference.model_dump(),
         )
         if success:
+            _preferences_cache.invalidate(user_id)
             logger.info(
                 f"Saved {preference.preference_type} preference for user {user_id}"
             )
@@ -5,7 +5,6 @@ import asyncio
 import json
 import logging
 import os
-import random
 import re
 import shutil
 import sys
@@ -13,12 +12,12 @@ import threading
 import time
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional
 
 import yaml
 from dotenv import load_dotenv
 from langchain_core.messages import AIMessage, HumanMessage
-from langchain_core.tools import tool
+from langchain_core.tools import BaseTool, tool
 from langchain_mcp_adapters.client import MultiServerMCPClient
 from langgraph.errors import GraphRecursionError
 
@@ -26,6 +25,14 @@ from .agent_state import AgentState
 from .constants import SREConstants
 from .graph_builder import build_multi_agent_graph
 from .logging_config import configure_logging, should_show_debug_traces
+from .tool_cache import cache_tools
+from .tool_discovery import (
+    ToolSchemaCache,
+    list_gateway_tools,
+    revalidate_in_background,
+    tools_from_schemas,
+    with_rate_limit_retry,
+)
 
 # Configure logging if not already configured (e.g., when imported by agent_runtime)
 if not logging.getLogger().handlers:
@@ -325,7 +332,9 @@ def _read_gateway_config() -> tuple[str, str]:
 
         # Handle case where 'gateway' key might be None
         gateway_config = config.get("gateway") or {}
-        gateway_uri = gateway_config.get("uri") if isinstance(gateway_config, dict) else None
+        gateway_uri = (
+            gateway_config.get("uri") if isinstance(gateway_config, dict) else None
+        )
         if not gateway_uri:
             raise ValueError(
                 "Gateway URI not found in agent_config.yaml under 'gateway.uri'"
@@ -367,6 +376,74 @@ def create_mcp_client() -> MultiServerMCPClient:
     return client
 
 
+async def _load_mcp_tools() -> List[BaseTool]:
+    """Load the gateway's MCP tools, from the schema cache when possible."""
+    try:
+        client = create_mcp_client()
+    except Exception as e:
+        logger.warning(f"Failed to load MCP tools: {e}")
+        return []
+    gateway_url = client.connections["gateway"]["url"]
+    discovery = SREConstants.tool_discovery
+    schema_cache = ToolSchemaCache(
+        str(Path(__file__).parent / discovery.schema_cache_path)
+    )
+
+    # Build the tools from cached schemas; they connect on their first call
+    cached = schema_cache.load(gateway_url) if discovery.use_schema_cache else None
+    if cached is not None:
+        mcp_tools = tools_from_schemas(cached["tools"], client)
+        logger.info(
+            f"Loaded {len(mcp_tools)} MCP tools from {schema_cache.path} "
+            f"(version {cached['version']}), revalidating in the background"
+        )
+        revalidate_in_background(
+            client,
+            schema_cache,
+            gateway_url,
+            cached["version"],
+            SREConstants.timeouts.mcp_tools_timeout_seconds,
+        )
+        return mcp_tools
+
+    # Otherwise list them from the gateway, backing off while rate limited
+    try:
+        # Add timeout for MCP tool loading to prevent hanging
+        schemas = await with_rate_limit_retry(
+            lambda: asyncio.wait_for(
+                list_gateway_tools(client),
+                timeout=SREConstants.timeouts.mcp_tools_timeout_seconds,
+            )
+        )
+    except asyncio.TimeoutError:
+        logger.warning("MCP tool loading timed out after 30 seconds")
+        return []
+    except Exception as e:
+        logger.warning(f"Failed to load MCP tools: {e}")
+        return []
+
+    if discovery.use_schema_cache:
+        version = schema_cache.save(gateway_url, schemas)
+        logger.info(f"Cached MCP tool schemas (version {version})")
+
+    # Don't filter out x-amz-agentcore-search as it's a global tool
+    mcp_tools = tools_from_schemas(schemas, client)
+
+    logger.info(f"Retrieved {len(mcp_tools)} tools from MCP")
+
+    # Print tool information (only in debug mode)
+    logger.info(f"MCP tools loaded: {len(mcp_tools)}")
+    if should_show_debug_traces():
+        print(f"\nMCP tools loaded: {len(mcp_tools)}")
+        for tool in mcp_tools:
+            tool_name = getattr(tool, "name", "unknown")
+            tool_desc = getattr(tool, "description", "No description")
+            print(f"  - {tool_name}: {tool_desc[:80]}...")
+            logger.info(f"  - {tool_name}: {tool_desc[:80]}...")
+
+    return mcp_tools
+
+
 async def create_multi_agent_system(
     provider: str = "bedrock",
     checkpointer=None,
@@ -388,80 +465,26 @@ async def create_multi_agent_system(
         llm_kwargs["region_name"] = region_name
         logger.info(f"Using AWS region for Bedrock: {region_name}")
 
-    # Create MCP client and get tools with retry logic
-    mcp_tools = []
-    max_retries = 3
-    retry_count = 0
+    # Create MCP client and get tools, from cached schemas when available
+    mcp_tools = await _load_mcp_tools()
 
-    while retry_count < max_retries:
-        try:
-            client = create_mcp_client()
-            # Add timeout for MCP tool loading to prevent hanging
-            all_mcp_tools = await asyncio.wait_for(
-                client.get_tools(),
-                timeout=SREConstants.timeouts.mcp_tools_timeout_seconds,
-            )
-
-            # Don't filter out x-amz-agentcore-search as it's a global tool
-            mcp_tools = all_mcp_tools
-
-            logger.info(f"Retrieved {len(mcp_tools)} tools from MCP")
-
-            # Print tool information (only in debug mode)
-            logger.info(f"MCP tools loaded: {len(mcp_tools)}")
-            if should_show_debug_traces():
-                print(f"\nMCP tools loaded: {len(mcp_tools)}")
-                for tool in mcp_tools:
-                    tool_name = getattr(tool, "name", "unknown")
-                    tool_desc = getattr(tool, "description", "No description")
-                    print(f"  - {tool_name}: {tool_desc[:80]}...")
-                    logger.info(f"  - {tool_name}: {tool_desc[:80]}...")
-
-            # Success - break out of retry loop
-            break
-
-        except asyncio.TimeoutError:
-            logger.warning("MCP tool loading timed out after 30 seconds")
-            mcp_tools = []
-            break  # Don't retry on timeout
-
-        except Exception as e:
-            retry_count += 1
-            error_msg = str(e)
-
-            # Check if it's a rate limiting error (429)
-            if "429" in error_msg or "Too Many Requests" in error_msg:
-                if retry_count < max_retries:
-                    # Exponential backoff with jitter
-                    base_delay = 2**retry_count  # 2, 4, 8 seconds
-                    jitter = random.uniform(0, 1)  # Add 0-1 second random jitter
-                    wait_time = base_delay + jitter
-
-                    logger.warning(
-                        f"Rate limited by MCP server (attempt {retry_count}/{max_retries}). "
-                        f"Waiting {wait_time:.1f} seconds before retry..."
-                    )
-                    await asyncio.sleep(wait_time)
-                    continue
-                else:
-                    logger.error(
-                        f"Failed to load MCP tools after {max_retries} retries: {e}"
-                    )
-                    mcp_tools = []
-            else:
-                # For other errors, don't retry
-                logger.warning(f"Failed to load MCP tools: {e}")
-                mcp_tools = []
-                break
+    # Let agents of the same investigation share identical MCP tool calls
+    if mcp_tools and SREConstants.tool_cache.enabled:
+        mcp_tools = cache_tools(mcp_tools)
+        logger.info(
+            f"MCP tool results cached per investigation for "
+            f"{SREConstants.tool_cache.ttl_seconds:.0f}s"
+        )
 
     # Combine local tools with MCP tools
     local_tools = [get_current_time]
 
     # Add memory tools if memory system is enabled
     memory_tools = []
+    memory_client = None
     try:
-        from .memory.client import SREMemoryClient
         from .memory.config import _load_memory_config
+        from .memory.registry import get_memory_client_registry
         from .memory.tools import create_memory_tools
 
         memory_config = _load_memory_config()
@@ -469,9 +492,10 @@ async def create_multi_agent_system(
             logger.debug("Adding memory tools to agent tool list")
             # Use the region from parameter if provided, otherwise use config default
             memory_region = region_name if region_name else memory_config.region
-            memory_client = SREMemoryClient(
-                memory_name=memory_config.memory_name,
+            # One client per process, shared by the supervisor and all agent nodes
+            memory_client = get_memory_client_registry().get_or_create(
                 region=memory_region,
+                memory_name=memory_config.memory_name,
                 force_delete=force_delete_memory,
             )
             logger.info(f"Using AWS region for memory: {memory_region}")
@@ -482,6 +506,7 @@ async def create_multi_agent_system(
     except Exception as e:
         logger.warning(f"Failed to add memory tools: {e}")
         memory_tools = []
+        memory_client = None
 
     all_tools = local_tools + mcp_tools + memory_tools
 
@@ -577,9 +602,15 @@ async def create_multi_agent_system(
         force_delete_memory=force_delete_memory,
         export_graph=export_graph,
         graph_output_path=graph_output_path,
+        memory_client=memory_client,
         **llm_kwargs,
     )
 
+    if memory_client:
+        from .memory.registry import get_memory_client_registry
+
+        logger.info(f"Memory client registry: {get_memory_client_registry().stats()}")
+
     return graph, all_tools
 
 
@@ -1180,7 +1211,9 @@ async def main():
             # Fallback to AWS_REGION environment variable
             aws_region = os.environ.get("AWS_REGION")
             if aws_region:
-                logger.info(f"Using AWS region from AWS_REGION environment variable: {aws_region}")
+                logger.info(
+                    f"Using AWS region from AWS_REGION environment variable: {aws_region}"
+                )
             else:
                 # Final fallback to us-east-1
                 aws_region = "us-east-1"
@@ -0,0 +1,519 @@
+#!/usr/bin/env python3
+"""
+Deterministic record and replay of investigations through the agent graph.
+
+InvestigationRecorder is a LangChain callback handler passed in the config of
+a real investigation. It records every LLM response and tool result, with
+their durations, under the graph node that made the call. The node is the
+first segment of LangGraph's checkpoint namespace, so the calls of an agent's
+ReAct subgraph are recorded under the agent node. The recording and the tool
+schemas are saved as a JSON fixture.
+
+InvestigationReplay builds the same graph (build_multi_agent_graph, with the
+real SupervisorAgent, agent nodes and output formatter) on top of the
+fixture. The "replay" LLM provider returns a ReplayChatModel that answers
+each node with its recorded responses in order. Replay tools built from the
+recorded schemas return the recorded results for the same tool and
+arguments. Parallel agents therefore replay the same way however their
+calls interleave.
+
+Each run reports:
+- wall time per graph node and per phase (routing, agents, aggregation)
+- LLM calls and tokens per node: the recorded usage, and the approximate
+  prompt tokens of the messages actually sent on replay
+- divergences, meaning calls the recording has no answer for because the
+  supervisor or agent logic now calls something different
+- optionally, memory allocated, traced with tracemalloc
+
+By default responses are returned at once, so the wall time is the graph's
+own overhead. With realtime, the recorded LLM and tool durations are slept.
+
+The memory system is not recorded. Record and replay with MEMORY_ENABLED=false.
+"""
+
+import asyncio
+import json
+import time
+import tracemalloc
+from collections import defaultdict
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import (
+    AIMessage,
+    AIMessageChunk,
+    BaseMessage,
+    HumanMessage,
+    message_chunk_to_message,
+    message_to_dict,
+    messages_from_dict,
+)
+from langchain_core.messages.utils import count_tokens_approximately
+from langchain_core.outputs import ChatGeneration, ChatResult, LLMResult
+from langchain_core.tools import BaseTool, StructuredTool
+from pydantic import PrivateAttr
+
+from .agent_state import AgentState
+from .constants import SREConstants
+from .graph_builder import build_multi_agent_graph
+from .memory.config import _load_memory_config
+from .tool_cache import ToolResultCache, cache_tools, canonical_args
+
+# Layout of fixture files; fixtures with another layout are rejected
+FIXTURE_FORMAT = 1
+
+# Graph nodes per phase; every other node is an agent
+PHASES = {"prepare": "routing", "supervisor": "routing", "aggregate": "aggregation"}
+
+NO_RECORDED_RESPONSE = "[replay] No recorded response for this call."
+
+_replay_llm: Optional["ReplayChatModel"] = None
+
+
+def _node(metadata: Optional[Dict[str, Any]]) -> str:
+    """Top-level graph node a call was made from."""
+    metadata = metadata or {}
+    namespace = metadata.get("langgraph_checkpoint_ns", "")
+    if namespace:
+        return namespace.split("|")[0].split(":")[0]
+    return metadata.get("langgraph_node", "unknown")
+
+
+def investigation_state(query: str) -> AgentState:
+    """Initial graph state for an investigation without a user or session."""
+    return {
+        "messages": [HumanMessage(content=query)],
+        "next": "supervisor",
+        "agent_results": {},
+        "current_query": query,
+        "metadata": {},
+        "requires_collaboration": False,
+        "agents_invoked": [],
+        "final_response": None,
+        "auto_approve_plan": True,
+    }
+
+
+def tool_specs(tools: List[BaseTool]) -> List[Dict[str, Any]]:
+    """Name, description and JSON argument schema of each tool."""
+    specs = []
+    for tool in tools:
+        schema = tool.tool_call_schema
+        if not isinstance(schema, dict):
+            schema = schema.model_json_schema()
+        specs.append(
+            {"name": tool.name, "description": tool.description, "args_schema": schema}
+        )
+    return specs
+
+
+def _tool_output(output: Any) -> Any:
+    """JSON-serialisable content of a tool result."""
+    content = getattr(output, "content", output)
+    try:
+        json.dumps(content)
+        return content
+    except TypeError:
+        return str(content)
+
+
+class InvestigationRecorder(BaseCallbackHandler):
+    """Records the LLM responses and tool results of an investigation by node."""
+
+    run_inline = True
+
+    def __init__(self):
+        self.llm_calls: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        self.tool_calls: List[Dict[str, Any]] = []
+        self._started: Dict[UUID, Tuple[str, float, Dict[str, Any]]] = {}
+
+    def on_chat_model_start(
+        self,
+        serialized: Dict[str, Any],
+        messages: List[List[BaseMessage]],
+        *,
+        run_id: UUID,
+        metadata: Optional[Dict[str, Any]] = None,
+        **kwargs: Any,
+    ) -> None:
+        self._started[run_id] = (_node(metadata), time.perf_counter(), {})
+
+    def on_llm_end(self, response: LLMResult, *, run_id: UUID, **kwargs: Any) -> None:
+        if run_id not in self._started:
+            return
+        node, start, _ = self._started.pop(run_id)
+        message = response.generations[0][0].message
+        if isinstance(message, AIMessageChunk):
+            message = message_chunk_to_message(message)
+        self.llm_calls[node].append(
+            {
+                "message": message_to_dict(message),
+                "seconds": round(time.perf_counter() - start, 4),
+            }
+        )
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs) -> None:
+        self._started.pop(run_id, None)
+
+    def on_tool_start(
+        self,
+        serialized: Dict[str, Any],
+        input_str: str,
+        *,
+        run_id: UUID,
+        metadata: Optional[Dict[str, Any]] = None,
+        inputs: Optional[Dict[str, Any]] = None,
+        **kwargs: Any,
+    ) -> None:
+        name = (serialized or {}).get("name") or kwargs.get("name", "unknown")
+        self._started[run_id] = (
+            _node(metadata),
+            time.perf_counter(),
+            {"name": name, "args": inputs or {}},
+        )
+
+    def on_tool_end(self, output: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        if run_id not in self._started:
+            return
+        node, start, call = self._started.pop(run_id)
+        self.tool_calls.append(
+            {
+                "node": node,
+                **call,
+                "output": _tool_output(output),
+                "seconds": round(time.perf_counter() - start, 4),
+            }
+        )
+
+    def on_tool_error(self, error: BaseException, *, run_id: UUID, **kwargs) -> None:
+        self._started.pop(run_id, None)
+
+    def fixture(
+        self,
+        query: str,
+        tools: List[BaseTool],
+        final_response: Optional[str],
+        source: str = "recorded",
+    ) -> Dict[str, Any]:
+        """The recording as a fixture dict, see save_fixture()."""
+        return {
+            "format": FIXTURE_FORMAT,
+            "source": source,
+            "recorded_at": datetime.now(timezone.utc).isoformat(),
+            "query": query,
+            "tools": tool_specs(tools),
+            "llm_calls": dict(self.llm_calls),
+            "tool_calls": self.tool_calls,
+            "final_response": final_response,
+        }
+
+
+async def record_investigation(
+    graph, tools: List[BaseTool], query: str, source: str = "recorded"
+) -> Dict[str, Any]:
+    """Run an investigation through a graph and record it as a fixture.
+
+    Args:
+        graph: Compiled agent graph, e.g. from create_multi_agent_system
+        tools: Tools the graph was built with
+        query: User query to investigate
+        source: Description of where the responses came from
+    """
+    recorder = InvestigationRecorder()
+    result = await graph.ainvoke(
+        investigation_state(query), config={"callbacks": [recorder]}
+    )
+    return recorder.fixture(query, tools, result.get("final_response"), source)
+
+
+def save_fixture(path: str, fixture: Dict[str, Any]) -> None:
+    """Write a fixture as JSON."""
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(fixture, f, indent=1)
+
+
+def load_fixture(path: str) -> Dict[str, Any]:
+    """Read a fixture written by save_fixture().
+
+    Raises:
+        ValueError: If the file is not a fixture of the supported format
+    """
+    with open(path, "r") as f:
+        fixture = json.load(f)
+    if not isinstance(fixture, dict) or fixture.get("format") != FIXTURE_FORMAT:
+        raise ValueError(f"{path} is not a format {FIXTURE_FORMAT} replay fixture")
+    return fixture
+
+
+class ReplayChatModel(BaseChatModel):
+    """Chat model answering each graph node with its recorded responses in order."""
+
+    responses: Dict[str, List[Dict[str, Any]]]
+    realtime: bool = False
+
+    _cursor: Dict[str, int] = PrivateAttr(default_factory=dict)
+    _usage: Dict[str, Dict[str, int]] = PrivateAttr(default_factory=dict)
+    _divergences: List[str] = PrivateAttr(default_factory=list)
+
+    @property
+    def _llm_type(self) -> str:
+        return "replay"
+
+    def bind_tools(self, tools: Any, **kwargs: Any) -> "ReplayChatModel":
+        # Recorded responses already carry the tool calls the model made
+        return self
+
+    def reset(self) -> None:
+        """Start again from the first recorded response of every node."""
+        self._cursor = {}
+        self._usage = {}
+        self._divergences = []
+
+    @property
+    def divergences(self) -> List[str]:
+        return list(self._divergences)
+
+    def usage(self) -> Dict[str, Dict[str, int]]:
+        """LLM calls and tokens per node since the last reset."""
+        return {node: dict(usage) for node, usage in self._usage.items()}
+
+    def _next(
+        self, messages: List[BaseMessage], run_manager
+    ) -> Tuple[AIMessage, float]:
+        node = _node(getattr(run_manager, "metadata", None))
+        index = self._cursor.get(node, 0)
+        self._cursor[node] = index + 1
+        usage = self._usage.setdefault(
+            node,
+            {"calls": 0, "prompt_tokens": 0, "input_tokens": 0, "output_tokens": 0},
+        )
+        usage["calls"] += 1
+        usage["prompt_tokens"] += count_tokens_approximately(messages)
+
+        recorded = self.responses.get(node, [])
+        if index >= len(recorded):
+            self._divergences.append(f"{node}: unrecorded LLM call {index + 1}")
+            return AIMessage(content=NO_RECORDED_RESPONSE), 0.0
+
+        entry = recorded[index]
+        message = messages_from_dict([entry["message"]])[0]
+        if message.usage_metadata:
+            usage["input_tokens"] += message.usage_metadata.get("input_tokens", 0)
+            usage["output_tokens"] += message.usage_metadata.get("output_tokens", 0)
+        return message, entry.get("seconds", 0.0) if self.realtime else 0.0
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        message, delay = self._next(messages, run_manager)
+        if delay:
+            time.sleep(delay)
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    async def _agenerate(
+        self, messages, stop=None, run_manager=None, **kwargs
+    ) -> ChatResult:
+        message, delay = self._next(messages, run_manager)
+        if delay:
+            await asyncio.sleep(delay)
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+
+def get_replay_llm() -> ReplayChatModel:
+    """Model of the replay in progress, for the "replay" LLM provider.
+
+    Raises:
+        ValueError: If no InvestigationReplay has been created
+    """
+    if _replay_llm is None:
+        raise ValueError(
+            "The replay LLM provider needs an InvestigationReplay (sre_agent.replay)"
+        )
+    return _replay_llm
+
+
+class ReplayTools:
+    """Recorded tool results by tool name and arguments.
+
+    Args:
+        tool_calls: Recorded tool calls of a fixture
+        realtime: Sleep the recorded duration of each call
+    """
+
+    def __init__(self, tool_calls: List[Dict[str, Any]], realtime: bool = False):
+        self.realtime = realtime
+        self._results: Dict[Tuple[str, str], List[Dict[str, Any]]] = defaultdict(list)
+        for call in tool_calls:
+            self._results[(call["name"], canonical_args(call["args"]))].append(call)
+        self.reset()
+
+    def reset(self) -> None:
+        """Start again from the first recorded result of every call."""
+        self.calls = 0
+        self.divergences: List[str] = []
+        self._cursor: Dict[Tuple[str, str], int] = {}
+
+    async def call(self, name: str, args: Dict[str, Any]) -> Any:
+        """Recorded result of a call; repeats the last one when calls outnumber it."""
+        self.calls += 1
+        key = (name, canonical_args(args))
+        recorded = self._results.get(key)
+        if not recorded:
+            self.divergences.append(f"unrecorded tool call {name}({key[1]})")
+            return f"[replay] No recorded result for {name} with these arguments."
+        index = self._cursor.get(key, 0)
+        self._cursor[key] = index + 1
+        entry = recorded[min(index, len(recorded) - 1)]
+        if self.realtime and entry.get("seconds"):
+            await asyncio.sleep(entry["seconds"])
+        return entry["output"]
+
+    def tools(self, specs: List[Dict[str, Any]]) -> List[BaseTool]:
+        """Tools with the recorded names and schemas, answering from the recording."""
+
+        def tool(spec: Dict[str, Any]) -> BaseTool:
+            async def call(**kwargs: Any) -> Any:
+                return await self.call(spec["name"], kwargs)
+
+            return StructuredTool(
+                name=spec["name"],
+                description=spec["description"],
+                args_schema=spec["args_schema"],
+                coroutine=call,
+            )
+
+        return [tool(spec) for spec in specs]
+
+
+class NodeTimer(BaseCallbackHandler):
+    """Wall time of each top-level graph node run."""
+
+    run_inline = True
+
+    def __init__(self):
+        self.seconds: Dict[str, float] = defaultdict(float)
+        self.runs: Dict[str, int] = defaultdict(int)
+        self._started: Dict[UUID, Tuple[str, float]] = {}
+
+    def on_chain_start(
+        self,
+        serialized: Dict[str, Any],
+        inputs: Any,
+        *,
+        run_id: UUID,
+        metadata: Optional[Dict[str, Any]] = None,
+        **kwargs: Any,
+    ) -> None:
+        metadata = metadata or {}
+        node = metadata.get("langgraph_node")
+        namespace = metadata.get("langgraph_checkpoint_ns", "")
+        # The node's own run, not the runs nested in it or in its subgraphs
+        if node and kwargs.get("name") == node and "|" not in namespace:
+            self._started[run_id] = (node, time.perf_counter())
+
+    def _finish(self, run_id: UUID) -> None:
+        if run_id in self._started:
+            node, start = self._started.pop(run_id)
+            self.seconds[node] += time.perf_counter() - start
+            self.runs[node] += 1
+
+    def on_chain_end(self, outputs: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        self._finish(run_id)
+
+    def on_chain_error(self, error: BaseException, *, run_id: UUID, **kwargs) -> None:
+        self._finish(run_id)
+
+    def phases(self) -> Dict[str, float]:
+        """Node time summed by phase; parallel agents overlap in wall time."""
+        totals = {"routing": 0.0, "agents": 0.0, "aggregation": 0.0}
+        for node, seconds in self.seconds.items():
+            totals[PHASES.get(node, "agents")] += seconds
+        return totals
+
+
+class InvestigationReplay:
+    """Replays a recorded investigation through the agent graph.
+
+    Args:
+        fixture: Fixture from load_fixture() or record_investigation()
+        realtime: Sleep the recorded LLM and tool durations
+
+    Raises:
+        ValueError: If the memory system is enabled
+    """
+
+    def __init__(self, fixture: Dict[str, Any], realtime: bool = False):
+        global _replay_llm
+        if _load_memory_config().enabled:
+            raise ValueError("Replay needs the memory system off: MEMORY_ENABLED=false")
+
+        self.fixture = fixture
+        self.model = ReplayChatModel(responses=fixture["llm_calls"], realtime=realtime)
+        self.tools = ReplayTools(fixture["tool_calls"], realtime=realtime)
+        tools = self.tools.tools(fixture["tools"])
+        if SREConstants.tool_cache.enabled:
+            # Same tool result sharing as create_multi_agent_system
+            tools = cache_tools(
+                tools,
+                ToolResultCache(
+                    ttl_seconds=SREConstants.tool_cache.ttl_seconds,
+                    max_entries=SREConstants.tool_cache.max_entries,
+                ),
+            )
+
+        _replay_llm = self.model
+        self.graph = build_multi_agent_graph(tools, llm_provider="replay")
+
+    async def run(self, trace_allocations: bool = False) -> Dict[str, Any]:
+        """Replay the investigation once.
+
+        Args:
+            trace_allocations: Trace memory allocations with tracemalloc, which
+                slows the run down; time it separately
+
+        Returns:
+            Wall time, node and phase times, LLM usage per node, tool calls,
+            divergences, the final response and whether it matches the recording
+        """
+        global _replay_llm
+        _replay_llm = self.model
+        self.model.reset()
+        self.tools.reset()
+        timer = NodeTimer()
+
+        if trace_allocations:
+            tracemalloc.start()
+            baseline = tracemalloc.get_traced_memory()[0]
+        start = time.perf_counter()
+        result = await self.graph.ainvoke(
+            investigation_state(self.fixture["query"]),
+            config={"callbacks": [timer]},
+        )
+        wall_seconds = time.perf_counter() - start
+        allocations = None
+        if trace_allocations:
+            current, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            allocations = {
+                "peak_bytes": peak - baseline,
+                "retained_bytes": current - baseline,
+            }
+
+        final_response = result.get("final_response")
+        return {
+            "wall_seconds": wall_seconds,
+            "nodes": {
+                node: {"seconds": seconds, "runs": timer.runs[node]}
+                for node, seconds in timer.seconds.items()
+            },
+            "phases": timer.phases(),
+            "llm": self.model.usage(),
+            "tool_calls": self.tools.calls,
+            "divergences": self.model.divergences + self.tools.divergences,
+            "final_response": final_response,
+            "matches_recording": final_response == self.fixture.get("final_response"),
+            "allocations": allocations,
+        }
@@ -0,0 +1,398 @@
+#!/usr/bin/env python3
+"""
+Per-session conversation state and admission control for the agent runtime.
+
+SessionStore keeps the conversation of each session_id (the same user and
+assistant messages the interactive CLI accumulates between turns) in an LRU
+in memory. Sessions pushed out of memory are spilled to a local SQLite file
+and read back on their next turn; flush() writes every in-memory session
+there on shutdown.
+
+InvocationScheduler bounds how many agent graph executions run at once.
+Invocations beyond the limit wait in per-user queues that are served round
+robin, so one user submitting many investigations does not starve the
+others, and are rejected once the total queue is full.
+
+SessionManager combines the two: turns of the same session run one at a
+time, in order, and each turn starts from the session's stored messages.
+"""
+
+import asyncio
+import json
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import Any, AsyncIterator, Deque, Dict, List, Optional, Tuple
+
+from langchain_core.messages import (
+    AIMessage,
+    BaseMessage,
+    HumanMessage,
+    messages_from_dict,
+    messages_to_dict,
+)
+
+logger = logging.getLogger(__name__)
+
+# Recent queue waits kept for the time-in-queue percentiles
+WAIT_SAMPLES = 1000
+
+
+class QueueFullError(Exception):
+    """Raised when an invocation arrives while the admission queue is full."""
+
+    pass
+
+
+class SessionStore:
+    """Conversation messages per session: LRU in memory, spilled to SQLite.
+
+    Args:
+        path: SQLite file for spilled sessions; created on the first spill
+        max_sessions: Sessions kept in memory
+        max_messages: Most recent messages kept per session
+    """
+
+    def __init__(self, path: str, max_sessions: int = 500, max_messages: int = 40):
+        self.path = Path(path)
+        self.max_sessions = max_sessions
+        self.max_messages = max_messages
+        self.spills = 0
+        self._sessions: "OrderedDict[str, Tuple[str, List[BaseMessage]]]" = (
+            OrderedDict()
+        )
+        self._connection: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def _db(self, create: bool) -> Optional[sqlite3.Connection]:
+        """SQLite connection, or None if the file does not exist and create is False."""
+        if self._connection is None:
+            if not create and not self.path.exists():
+                return None
+            self._connection = sqlite3.connect(str(self.path), check_same_thread=False)
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS sessions ("
+                "session_id TEXT PRIMARY KEY, user_id TEXT, messages TEXT, "
+                "updated_at REAL)"
+            )
+        return self._connection
+
+    def _write(self, rows: List[Tuple[str, str, List[BaseMessage]]]) -> None:
+        connection = self._db(create=True)
+        connection.executemany(
+            "INSERT OR REPLACE INTO sessions VALUES (?, ?, ?, ?)",
+            [
+                (
+                    session_id,
+                    user_id,
+                    json.dumps(messages_to_dict(messages)),
+                    time.time(),
+                )
+                for session_id, user_id, messages in rows
+            ],
+        )
+        connection.commit()
+
+    def _trim(self, messages: List[BaseMessage]) -> List[BaseMessage]:
+        """Last max_messages messages, starting at a user message."""
+        messages = messages[-self.max_messages :]
+        while messages and not isinstance(messages[0], HumanMessage):
+            messages = messages[1:]
+        return messages
+
+    def _remember(self, session_id: str, user_id: str, messages: List[BaseMessage]):
+        """Put a session in memory as most recent, spilling the least recent."""
+        self._sessions[session_id] = (user_id, messages)
+        self._sessions.move_to_end(session_id)
+        evicted = []
+        while len(self._sessions) > self.max_sessions:
+            evicted_id, (evicted_user, evicted_messages) = self._sessions.popitem(
+                last=False
+            )
+            evicted.append((evicted_id, evicted_user, evicted_messages))
+        if evicted:
+            self._write(evicted)
+            self.spills += len(evicted)
+            logger.debug(f"Spilled {len(evicted)} sessions to {self.path}")
+
+    def get(self, session_id: str) -> List[BaseMessage]:
+        """Messages of a session, oldest first; empty for an unknown session."""
+        with self._lock:
+            if session_id in self._sessions:
+                self._sessions.move_to_end(session_id)
+                return list(self._sessions[session_id][1])
+
+            connection = self._db(create=False)
+            if connection is None:
+                return []
+            row = connection.execute(
+                "SELECT user_id, messages FROM sessions WHERE session_id = ?",
+                (session_id,),
+            ).fetchone()
+            if row is None:
+                return []
+            messages = messages_from_dict(json.loads(row[1]))
+            self._remember(session_id, row[0], messages)
+            return list(messages)
+
+    def put(self, session_id: str, user_id: str, messages: List[BaseMessage]) -> None:
+        """Replace the messages of a session."""
+        with self._lock:
+            self._remember(session_id, user_id, self._trim(list(messages)))
+
+    def flush(self) -> None:
+        """Write every in-memory session to SQLite."""
+        with self._lock:
+            if self._sessions:
+                self._write(
+                    [
+                        (session_id, user_id, messages)
+                        for session_id, (user_id, messages) in self._sessions.items()
+                    ]
+                )
+
+    def stats(self) -> Dict[str, int]:
+        """Sessions in memory, in SQLite and spilled so far."""
+        with self._lock:
+            connection = self._db(create=False)
+            stored = (
+                connection.execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+                if connection is not None
+                else 0
+            )
+            return {
+                "in_memory": len(self._sessions),
+                "stored": stored,
+                "spilled": self.spills,
+            }
+
+    def close(self) -> None:
+        """Flush and close the SQLite connection."""
+        self.flush()
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+
+def _percentile(values: List[float], percentile: float) -> float:
+    """Nearest-rank percentile of sorted values"""
+    if not values:
+        return 0.0
+    rank = max(0, min(len(values) - 1, round(percentile / 100 * len(values)) - 1))
+    return values[rank]
+
+
+class InvocationScheduler:
+    """Bounded concurrent executions with fair, per-user queueing.
+
+    Args:
+        max_concurrent: Executions allowed to run at the same time
+        max_queued: Waiting invocations allowed before acquire() rejects
+    """
+
+    def __init__(self, max_concurrent: int = 8, max_queued: int = 200):
+        self.max_concurrent = max_concurrent
+        self.max_queued = max_queued
+        self.running = 0
+        self.queue_depth = 0
+        self.max_queue_depth = 0
+        self.admitted = 0
+        self.rejected = 0
+        # user_id -> waiters of that user; users are served in rotation
+        self._waiting: "OrderedDict[str, Deque[asyncio.Future]]" = OrderedDict()
+        self._waits: Deque[float] = deque(maxlen=WAIT_SAMPLES)
+
+    @property
+    def full(self) -> bool:
+        """True if a new invocation would be rejected."""
+        return self.would_wait() and self.queue_depth >= self.max_queued
+
+    def would_wait(self) -> bool:
+        """True if a new invocation would have to queue."""
+        return self.running >= self.max_concurrent or self.queue_depth > 0
+
+    async def acquire(self, user_id: str) -> float:
+        """Wait for an execution slot.
+
+        Args:
+            user_id: Queue the invocation is fair-shared under
+
+        Returns:
+            Seconds spent waiting in the queue
+
+        Raises:
+            QueueFullError: If the invocation would queue and the queue is full
+        """
+        start = time.monotonic()
+        if not self.would_wait():
+            self.running += 1
+        else:
+            if self.queue_depth >= self.max_queued:
+                self.rejected += 1
+                raise QueueFullError(
+                    f"{self.queue_depth} investigations are already queued"
+                )
+            future = asyncio.get_running_loop().create_future()
+            self._waiting.setdefault(user_id, deque()).append(future)
+            self.queue_depth += 1
+            self.max_queue_depth = max(self.max_queue_depth, self.queue_depth)
+            try:
+                await future
+            except asyncio.CancelledError:
+                if future.done() and not future.cancelled():
+                    # The slot was handed over just before the cancellation
+                    self.release()
+                else:
+                    self._discard(user_id, future)
+                raise
+
+        waited = time.monotonic() - start
+        self._waits.append(waited)
+        self.admitted += 1
+        return waited
+
+    def _discard(self, user_id: str, future: asyncio.Future) -> None:
+        waiters = self._waiting.get(user_id)
+        if waiters and future in waiters:
+            waiters.remove(future)
+            self.queue_depth -= 1
+            if not waiters:
+                del self._waiting[user_id]
+
+    def release(self) -> None:
+        """Free a slot, handing it to the next user's oldest waiter."""
+        while self._waiting:
+            user_id, waiters = next(iter(self._waiting.items()))
+            future = waiters.popleft()
+            self.queue_depth -= 1
+            if waiters:
+                self._waiting.move_to_end(user_id)
+            else:
+                del self._waiting[user_id]
+            if not future.done():
+                # The slot passes to the waiter; running stays the same
+                future.set_result(None)
+                return
+        self.running -= 1
+
+    @asynccontextmanager
+    async def slot(self, user_id: str) -> AsyncIterator[float]:
+        """Hold an execution slot for the duration of the block."""
+        waited = await self.acquire(user_id)
+        try:
+            yield waited
+        finally:
+            self.release()
+
+    def metrics(self) -> Dict[str, Any]:
+        """Queue depth, running executions and time-in-queue statistics."""
+        waits = sorted(self._waits)
+        return {
+            "running": self.running,
+            "max_concurrent": self.max_concurrent,
+            "queue_depth": self.queue_depth,
+            "max_queue_depth": self.max_queue_depth,
+            "queued_users": len(self._waiting),
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "queue_wait_seconds": {
+                "avg": round(sum(waits) / len(waits), 4) if waits else 0.0,
+                "p50": round(_percentile(waits, 50), 4),
+                "p95": round(_percentile(waits, 95), 4),
+                "max": round(waits[-1], 4) if waits else 0.0,
+            },
+        }
+
+
+class SessionTurn:
+    """One turn of a session: its prior messages and, once done, its outcome."""
+
+    def __init__(self, session_id: str, user_id: str, history: List[BaseMessage]):
+        self.session_id = session_id
+        self.user_id = user_id
+        self.history = history
+        self.queue_seconds = 0.0
+        self._exchange: Optional[Tuple[str, str]] = None
+
+    def messages(self, prompt: str) -> List[BaseMessage]:
+        """Conversation to start the graph with: the history and the new prompt."""
+        return self.history + [HumanMessage(content=prompt)]
+
+    def record(self, prompt: str, response: str) -> None:
+        """Keep the prompt and final response for the session's next turn."""
+        self._exchange = (prompt, response)
+
+
+class SessionManager:
+    """Runs session turns in order, within the scheduler's limits.
+
+    Args:
+        store: Conversation storage
+        scheduler: Admission control for graph executions
+    """
+
+    def __init__(self, store: SessionStore, scheduler: InvocationScheduler):
+        self.store = store
+        self.scheduler = scheduler
+        # session_id -> (lock serialising its turns, turns holding or awaiting it)
+        self._locks: Dict[str, Tuple[asyncio.Lock, int]] = {}
+
+    @asynccontextmanager
+    async def turn(self, session_id: str, user_id: str) -> AsyncIterator[SessionTurn]:
+        """Run a turn of a session.
+
+        Waits for earlier turns of the same session, then for an execution
+        slot. A turn whose outcome was recorded is appended to the session.
+        Turns without a session_id are admission-controlled but not kept.
+
+        Raises:
+            QueueFullError: If the admission queue is full
+        """
+        if not session_id:
+            async with self.scheduler.slot(user_id) as waited:
+                turn = SessionTurn(session_id, user_id, [])
+                turn.queue_seconds = waited
+                yield turn
+            return
+
+        lock, users = self._locks.get(session_id, (asyncio.Lock(), 0))
+        self._locks[session_id] = (lock, users + 1)
+        try:
+            async with lock:
+                async with self.scheduler.slot(user_id) as waited:
+                    turn = SessionTurn(session_id, user_id, self.store.get(session_id))
+                    turn.queue_seconds = waited
+                    if waited > 1:
+                        logger.info(
+                            f"Session {session_id} waited {waited:.1f}s for a slot"
+                        )
+                    yield turn
+                    if turn._exchange is not None:
+                        prompt, response = turn._exchange
+                        self.store.put(
+                            session_id,
+                            user_id,
+                            turn.messages(prompt) + [AIMessage(content=response)],
+                        )
+        finally:
+            lock, users = self._locks[session_id]
+            if users == 1:
+                del self._locks[session_id]
+            else:
+                self._locks[session_id] = (lock, users - 1)
+
+    def metrics(self) -> Dict[str, Any]:
+        """Scheduler metrics and session counts."""
+        return {
+            **self.scheduler.metrics(),
+            "sessions": {**self.store.stats(), "active": len(self._locks)},
+        }
+
+    def close(self) -> None:
+        """Persist in-memory sessions."""
+        self.store.close()
@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+"""
+Streaming of investigation progress from the agent graph.
+
+The graph is run with LangGraph's "updates" and "messages" stream modes,
+including subgraphs, and every chunk is turned into a small JSON-serialisable
+event:
+
+    routing         supervisor decision: next agent, plan wave and reasoning
+    tool_call       a tool an agent is calling, with its arguments abbreviated
+    tool_result     tool status and the start of its output
+    agent_completed an agent finished, with the start of its findings
+    token           text of the final response as the LLM generates it
+    response        the complete final response (consumed by the caller)
+
+stream_events() runs the graph in a producer task feeding a bounded queue and
+encodes the events as Server-Sent Events or newline-delimited JSON. When the
+client reads slower than tokens arrive, queued tokens are merged instead of
+buffered without bound; other events wait for room in the queue. When the
+client disconnects the producer task is cancelled, which cancels the graph
+and its in-flight LLM and tool calls.
+"""
+
+import asyncio
+import json
+import logging
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Optional
+
+from langchain_core.messages import AIMessage, ToolMessage
+
+logger = logging.getLogger(__name__)
+
+AGENT_NODES = ("kubernetes_agent", "logs_agent", "metrics_agent", "runbooks_agent")
+
+# Characters of tool arguments, tool output and agent findings sent to clients
+PREVIEW_CHARS = 200
+
+# Seconds without events before a keep-alive is sent
+HEARTBEAT_SECONDS = 15.0
+
+# Events buffered between the graph and a slow client
+QUEUE_SIZE = 64
+
+STREAM_FORMATS = {
+    "sse": "text/event-stream",
+    "ndjson": "application/x-ndjson",
+}
+
+_HEARTBEATS = {
+    "sse": ": keep-alive\n\n",
+    "ndjson": json.dumps({"type": "heartbeat"}) + "\n",
+}
+
+# Marks the end of the producer's events in the queue
+_DONE = object()
+
+
+def _preview(value: Any, limit: int = PREVIEW_CHARS) -> str:
+    """First limit characters of value as text, with an ellipsis if cut."""
+    if not isinstance(value, str):
+        try:
+            value = json.dumps(value, default=str)
+        except (TypeError, ValueError):
+            value = str(value)
+    return value if len(value) <= limit else value[:limit] + "..."
+
+
+def _message_text(content: Any) -> str:
+    """Text of a message or message chunk content (string or content blocks)."""
+    if isinstance(content, str):
+        return content
+    if isinstance(content, list):
+        return "".join(
+            block.get("text", "") if isinstance(block, dict) else str(block)
+            for block in content
+            if not isinstance(block, dict) or block.get("type", "text") == "text"
+        )
+    return ""
+
+
+def _node_events(node_name: str, output: Dict[str, Any]) -> list:
+    """Events for a completed node of the investigation graph."""
+    if node_name == "supervisor":
+        metadata = output.get("metadata") or {}
+        logger.info(f"Supervisor routing to: {output.get('next', '')}")
+        if metadata.get("routing_reasoning"):
+            logger.info(f"Routing reasoning: {metadata['routing_reasoning']}")
+        return [
+            {
+                "type": "routing",
+                "next": output.get("next", ""),
+                "wave": output.get("next_wave") or [],
+                "reasoning": metadata.get("routing_reasoning", ""),
+            }
+        ]
+
+    if node_name in AGENT_NODES:
+        logger.info(f"{node_name} completed with results")
+        # Agents return every result so far with their own added last
+        results = list((output.get("agent_results") or {}).values())
+        return [
+            {
+                "type": "agent_completed",
+                "agent": node_name,
+                "summary": _preview(results[-1]) if results else "",
+            }
+        ]
+
+    if node_name == "aggregate":
+        logger.info("Aggregate node completed, final response captured")
+        return [{"type": "response", "message": output.get("final_response") or ""}]
+
+    return []
+
+
+def _subgraph_events(agent: str, output: Dict[str, Any]) -> list:
+    """tool_call and tool_result events for a step of an agent's tool loop."""
+    events = []
+    for message in output.get("messages") or []:
+        if isinstance(message, AIMessage):
+            for call in message.tool_calls:
+                events.append(
+                    {
+                        "type": "tool_call",
+                        "agent": agent,
+                        "tool": call.get("name", ""),
+                        "args": _preview(call.get("args", {})),
+                    }
+                )
+        elif isinstance(message, ToolMessage):
+            events.append(
+                {
+                    "type": "tool_result",
+                    "agent": agent,
+                    "tool": message.name or "",
+                    "status": getattr(message, "status", "success"),
+                    "preview": _preview(_message_text(message.content)),
+                }
+            )
+    return events
+
+
+async def graph_events(graph: Any, state: Dict[str, Any]) -> AsyncIterator[Dict]:
+    """Run the investigation graph and yield its progress as events.
+
+    Args:
+        graph: Compiled investigation graph
+        state: Initial AgentState
+
+    Yields:
+        Event dicts, see the module docstring; the last one is the response
+        event when the aggregate node ran
+    """
+    async for namespace, mode, chunk in graph.astream(
+        state, stream_mode=["updates", "messages"], subgraphs=True
+    ):
+        if mode == "messages":
+            # Only the aggregation LLM's tokens are the user-facing answer
+            message, metadata = chunk
+            if not namespace and metadata.get("langgraph_node") == "aggregate":
+                text = _message_text(message.content)
+                if text:
+                    yield {"type": "token", "text": text}
+            continue
+
+        for node_name, output in chunk.items():
+            if not isinstance(output, dict):
+                continue
+            if namespace:
+                # Namespaces look like ("logs_agent:<task id>", ...)
+                agent = namespace[0].split(":", 1)[0]
+                for event in _subgraph_events(agent, output):
+                    yield event
+            else:
+                logger.info(f"Processing node: {node_name}")
+                for event in _node_events(node_name, output):
+                    yield event
+
+
+def encode_event(event: Dict[str, Any], stream_format: str) -> str:
+    """Wire encoding of an event: an SSE message or one NDJSON line."""
+    data = json.dumps(event, default=str)
+    if stream_format == "sse":
+        return f"event: {event['type']}\ndata: {data}\n\n"
+    return data + "\n"
+
+
+async def _produce(events: AsyncIterator[Dict], queue: asyncio.Queue):
+    """Move events into the queue, merging tokens while the queue is full."""
+    pending = ""
+    try:
+        async for event in events:
+            if event["type"] == "token":
+                pending += event["text"]
+                if queue.full():
+                    continue
+                event = {"type": "token", "text": pending}
+            elif pending:
+                await queue.put({"type": "token", "text": pending})
+            pending = ""
+            await queue.put(event)
+        if pending:
+            await queue.put({"type": "token", "text": pending})
+    except Exception as e:
+        logger.exception("Streaming investigation failed")
+        await queue.put({"type": "error", "detail": f"Agent processing failed: {e}"})
+    await queue.put(_DONE)
+
+
+async def stream_events(
+    events: AsyncIterator[Dict],
+    stream_format: str,
+    is_disconnected: Optional[Callable[[], Awaitable[bool]]] = None,
+    heartbeat_seconds: float = HEARTBEAT_SECONDS,
+    queue_size: int = QUEUE_SIZE,
+) -> AsyncIterator[str]:
+    """Encode events for a streaming response, with backpressure and cancellation.
+
+    Args:
+        events: Event source, run in its own task
+        stream_format: "sse" or "ndjson"
+        is_disconnected: Checked when no event arrived for heartbeat_seconds;
+            True stops the stream
+        heartbeat_seconds: Idle time before a keep-alive is sent
+        queue_size: Events buffered while the client is slow to read
+
+    Yields:
+        Encoded events and keep-alives. Closing the iterator (as the server
+        does when the client goes away) cancels the event source.
+    """
+    queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+    producer = asyncio.create_task(_produce(events, queue))
+    try:
+        while True:
+            try:
+                event = await asyncio.wait_for(queue.get(), heartbeat_seconds)
+            except asyncio.TimeoutError:
+                if is_disconnected is not None and await is_disconnected():
+                    logger.info("Client disconnected, stopping investigation")
+                    return
+                yield _HEARTBEATS[stream_format]
+                continue
+            if event is _DONE:
+                return
+            yield encode_event(event, stream_format)
+    finally:
+        if not producer.done():
+            producer.cancel()
+            try:
+                await producer
+            except asyncio.CancelledError:
+                pass
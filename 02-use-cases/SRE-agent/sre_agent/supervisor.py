@@ -3,6 +3,7 @@
 import json
 import logging
 import os
+import uuid
 from datetime import datetime
 from pathlib import Path
 from typing import Any, Dict, List, Literal, Optional
@@ -13,14 +14,17 @@ from pydantic import BaseModel, Field, field_validator
 
 from .agent_state import AgentState
 from .constants import SREConstants
+from .context_budget import context_report
 from .llm_utils import create_llm_with_error_handling
 from .memory import create_conversation_memory_manager
 from .memory.client import SREMemoryClient
 from .memory.config import _load_memory_config
 from .memory.hooks import MemoryHookProvider
+from .memory.registry import get_memory_client_registry
 from .memory.tools import create_memory_tools
 from .output_formatter import create_formatter
 from .prompt_loader import prompt_loader
+from .tool_cache import tool_cache_report
 
 
 def _get_user_from_env() -> str:
@@ -128,6 +132,73 @@ class InvestigationPlan(BaseModel):
     reasoning: str = Field(
         description="Brief explanation of the investigation approach"
     )
+    dependencies: Optional[List[List[str]]] = Field(
+        default=None,
+        description="Pairs [upstream, downstream] meaning the downstream agent needs the upstream agent's results. Agents with no path between them run in parallel; omit to run agents_sequence in order",
+    )
+
+
+def plan_execution_waves(plan: InvestigationPlan) -> List[List[str]]:
+    """Group the plan's agents into waves that can run concurrently.
+
+    Each wave contains the agents whose dependencies all ran in earlier waves,
+    in agents_sequence order. Without dependencies every agent gets its own
+    wave, which is the original sequential behaviour. Plans that repeat an
+    agent or contain a dependency cycle also fall back to sequential waves.
+    """
+    agents = list(plan.agents_sequence)
+    if plan.dependencies is None:
+        return [[agent] for agent in agents]
+    if len(set(agents)) != len(agents):
+        logger.warning(f"Plan repeats agents {agents}, running them sequentially")
+        return [[agent] for agent in agents]
+
+    upstream: Dict[str, set] = {agent: set() for agent in agents}
+    for edge in plan.dependencies:
+        if len(edge) != 2:
+            logger.warning(f"Ignoring malformed plan dependency: {edge}")
+            continue
+        before, after = edge
+        if before in upstream and after in upstream and before != after:
+            upstream[after].add(before)
+
+    waves = []
+    done: set = set()
+    remaining = agents
+    while remaining:
+        wave = [agent for agent in remaining if upstream[agent] <= done]
+        if not wave:
+            logger.warning(
+                f"Plan dependencies contain a cycle among {remaining}, running them sequentially"
+            )
+            waves.extend([agent] for agent in remaining)
+            break
+        waves.append(wave)
+        done.update(wave)
+        remaining = [agent for agent in remaining if agent not in done]
+    return waves
+
+
+def _order_agent_results(
+    agent_results: Dict[str, Any], plan: Optional[Dict[str, Any]]
+) -> Dict[str, Any]:
+    """Order agent results by the plan's agent sequence.
+
+    Agents in the same wave finish in any order, so results are re-keyed in
+    plan order (then any remaining agents by name) before aggregation.
+    """
+    display_names = {
+        f"{agent_type}_agent": metadata.display_name
+        for agent_type, metadata in SREConstants.agents.agents.items()
+    }
+    order = [
+        display_names.get(agent, agent)
+        for agent in (plan or {}).get("agents_sequence", [])
+    ]
+    ordered = {name: agent_results[name] for name in order if name in agent_results}
+    for name in sorted(agent_results):
+        ordered.setdefault(name, agent_results[name])
+    return ordered
 
 
 class RouteDecision(BaseModel):
@@ -195,7 +266,8 @@ Create the plan in JSON format with these fields:
 - agents_sequence: List of agents to invoke (kubernetes_agent, logs_agent, metrics_agent, runbooks_agent)
 - complexity: "simple" or "complex"
 - auto_execute: true or false
-- reasoning: Brief explanation of the investigation approach"""
+- reasoning: Brief explanation of the investigation approach
+- dependencies: List of [upstream, downstream] agent pairs; agents without dependencies run in parallel"""
 
 
 class SupervisorAgent:
@@ -205,6 +277,7 @@ class SupervisorAgent:
         self,
         llm_provider: str = "bedrock",
         force_delete_memory: bool = False,
+        memory_client: Optional[SREMemoryClient] = None,
         **llm_kwargs,
     ):
         self.llm_provider = llm_provider
@@ -216,12 +289,19 @@ class SupervisorAgent:
         self.memory_config = _load_memory_config()
         if self.memory_config.enabled:
             # Use region from llm_kwargs if provided for bedrock
-            memory_region = llm_kwargs.get("region_name", self.memory_config.region) if llm_provider == "bedrock" else self.memory_config.region
-            self.memory_client = SREMemoryClient(
-                memory_name=self.memory_config.memory_name,
-                region=memory_region,
-                force_delete=force_delete_memory,
+            memory_region = (
+                llm_kwargs.get("region_name", self.memory_config.region)
+                if llm_provider == "bedrock"
+                else self.memory_config.region
             )
+            # Reuse the client shared by the rest of the graph when available
+            if memory_client is None:
+                memory_client = get_memory_client_registry().get_or_create(
+                    region=memory_region,
+                    memory_name=self.memory_config.memory_name,
+                    force_delete=force_delete_memory,
+                )
+            self.memory_client = memory_client
             self.memory_hooks = MemoryHookProvider(self.memory_client)
             self.conversation_manager = create_conversation_memory_manager(
                 self.memory_client
@@ -317,7 +397,7 @@ class SupervisorAgent:
                         "session_id is required for memory retrieval but not found in state"
                     )
 
-                memory_context = self.memory_hooks.on_investigation_start(
+                memory_context = await self.memory_hooks.on_investigation_start(
                     query=current_query,
                     user_id=user_id,
                     actor_id=actor_id,
@@ -587,7 +667,12 @@ User's query: {current_query}
         return plan_text
 
     async def route(self, state: AgentState) -> Dict[str, Any]:
-        """Determine which agent should handle the query next."""
+        """Determine which agent(s) should handle the query next.
+
+        The plan is executed wave by wave (see plan_execution_waves); all
+        agents in a wave are dispatched together through next_wave and run
+        concurrently before control returns here.
+        """
         agents_invoked = state.get("agents_invoked", [])
 
         # Check if we have an existing plan
@@ -596,6 +681,9 @@ User's query: {current_query}
         if not existing_plan:
             # First time - create investigation plan
             plan = await self.create_investigation_plan(state)
+            waves = plan_execution_waves(plan)
+            # Scopes the tool results the plan's agents share
+            investigation_id = uuid.uuid4().hex
 
             # Check if we should auto-approve the plan (defaults to False if not set)
             auto_approve = state.get("auto_approve_plan", False)
@@ -605,10 +693,16 @@ User's query: {current_query}
                 plan_text = self._format_plan_markdown(plan)
                 return {
                     "next": "FINISH",
+                    "next_wave": [],
                     "metadata": {
                         **state.get("metadata", {}),
                         "investigation_plan": plan.model_dump(),
+                        "investigation_id": investigation_id,
                         "routing_reasoning": f"Created investigation plan. Complexity: {plan.complexity}",
+                        "memory_retrieval_timings": state.get("memory_context", {}).get(
+                            "retrieval_timings", {}
+                        ),
+                        "plan_waves": waves,
                         "plan_pending_approval": True,
                         "plan_text": plan_text,
                     },
@@ -617,17 +711,22 @@ User's query: {current_query}
                 }
             else:
                 # Simple plan - start execution
-                next_agent = (
-                    plan.agents_sequence[0] if plan.agents_sequence else "FINISH"
-                )
+                first_wave = waves[0] if waves else []
                 plan_text = self._format_plan_markdown(plan)
                 return {
-                    "next": next_agent,
+                    "next": first_wave[0] if first_wave else "FINISH",
+                    "next_wave": first_wave,
                     "metadata": {
                         **state.get("metadata", {}),
                         "investigation_plan": plan.model_dump(),
-                        "routing_reasoning": f"Executing plan step 1: {plan.steps[0] if plan.steps else 'Start'}",
-                        "plan_step": 0,
+                        "investigation_id": investigation_id,
+                        "routing_reasoning": self._wave_reasoning(plan, waves, 0),
+                        "memory_retrieval_timings": state.get("memory_context", {}).get(
+                            "retrieval_timings", {}
+                        ),
+                        "plan_waves": waves,
+                        "plan_wave": 0,
+                        "plan_step": len(first_wave) - 1,
                         "plan_text": plan_text,
                         "show_plan": True,
                     },
@@ -637,46 +736,65 @@ User's query: {current_query}
         else:
             # Continue executing existing plan
             plan = InvestigationPlan(**existing_plan)
-            current_step = state.get("metadata", {}).get("plan_step", 0)
+            metadata = state.get("metadata", {})
+            waves = metadata.get("plan_waves") or plan_execution_waves(plan)
+            current_wave = metadata.get("plan_wave", 0)
 
             # Check if plan is complete
-            if current_step >= len(plan.agents_sequence) or not agents_invoked:
-                next_step = current_step
+            if current_wave >= len(waves) or not agents_invoked:
+                next_wave = current_wave
             else:
-                next_step = current_step + 1
+                next_wave = current_wave + 1
 
-            if next_step >= len(plan.agents_sequence):
+            if next_wave >= len(waves):
                 # Plan complete
                 return {
                     "next": "FINISH",
+                    "next_wave": [],
                     "metadata": {
-                        **state.get("metadata", {}),
+                        **metadata,
                         "routing_reasoning": "Investigation plan completed. Presenting results.",
-                        "plan_step": next_step,
+                        "plan_wave": next_wave,
+                        "plan_step": len(plan.agents_sequence),
                     },
                     # Preserve memory context in state
                     "memory_context": state.get("memory_context", {}),
                 }
             else:
-                # Continue with next agent in plan
-                next_agent = plan.agents_sequence[next_step]
-                step_description = (
-                    plan.steps[next_step]
-                    if next_step < len(plan.steps)
-                    else f"Execute {next_agent}"
-                )
-
+                # Continue with the next wave in the plan
+                wave = waves[next_wave]
                 return {
-                    "next": next_agent,
+                    "next": wave[0],
+                    "next_wave": wave,
                     "metadata": {
-                        **state.get("metadata", {}),
-                        "routing_reasoning": f"Executing plan step {next_step + 1}: {step_description}",
-                        "plan_step": next_step,
+                        **metadata,
+                        "routing_reasoning": self._wave_reasoning(
+                            plan, waves, next_wave
+                        ),
+                        "plan_wave": next_wave,
+                        "plan_step": sum(len(w) for w in waves[: next_wave + 1]) - 1,
                     },
                     # Preserve memory context in state
                     "memory_context": state.get("memory_context", {}),
                 }
 
+    def _wave_reasoning(
+        self, plan: InvestigationPlan, waves: List[List[str]], wave_index: int
+    ) -> str:
+        """Describe the plan wave being dispatched for routing metadata."""
+        wave = waves[wave_index] if wave_index < len(waves) else []
+        if len(wave) > 1:
+            return (
+                f"Executing plan wave {wave_index + 1} in parallel: {', '.join(wave)}"
+            )
+        step_index = sum(len(w) for w in waves[:wave_index])
+        step_description = (
+            plan.steps[step_index]
+            if step_index < len(plan.steps)
+            else f"Execute {wave[0] if wave else 'Start'}"
+        )
+        return f"Executing plan step {step_index + 1}: {step_description}"
+
     async def aggregate_responses(self, state: AgentState) -> Dict[str, Any]:
         """Aggregate responses from multiple agents into a final response."""
         agent_results = state.get("agent_results", {})
@@ -720,6 +838,9 @@ You can:
         query = state.get("current_query", "Investigation") or "Investigation"
         plan = metadata.get("investigation_plan")
 
+        # Parallel agents finish in any order; present results in plan order
+        agent_results = _order_agent_results(agent_results, plan)
+
         # Get user preferences from memory_context (not directly from state)
         user_preferences = []
         if "memory_context" in state:
@@ -822,6 +943,24 @@ You can:
 
             final_response = response.content
 
+        report = context_report(metadata)
+        if report["llm_calls"]:
+            saved = report["tokens_saved"]
+            logger.info(
+                f"Context budget report: {report['tokens_after']} tokens sent to agent "
+                f"LLMs over {report['llm_calls']} calls, {saved} saved "
+                f"({saved / max(report['tokens_before'], 1):.0%})"
+            )
+
+        tool_cache = tool_cache_report(metadata)
+        if tool_cache["calls"]:
+            logger.info(
+                f"Tool cache report: {tool_cache['calls']} tool calls, "
+                f"{tool_cache['hits']} cached, {tool_cache['coalesced']} shared in "
+                f"flight, {tool_cache['misses']} requests ({tool_cache['hit_rate']:.0%} "
+                f"served without a request)"
+            )
+
         # Store final response conversation in memory
         user_id = state.get("user_id")
         session_id = state.get("session_id")
@@ -894,4 +1033,12 @@ You can:
                     f"Failed to save investigation summary: {e}", exc_info=True
                 )
 
-        return {"final_response": final_response, "next": "FINISH"}
+        result = {"final_response": final_response, "next": "FINISH"}
+        reports = {}
+        if report["llm_calls"]:
+            reports["context_budget"] = report
+        if tool_cache["calls"]:
+            reports["tool_cache"] = tool_cache
+        if reports:
+            result["metadata"] = reports
+        return result
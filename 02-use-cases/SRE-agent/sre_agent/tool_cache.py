@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+"""
+Sharing of MCP tool results between the agents of an investigation.
+
+The kubernetes, logs and metrics agents of one investigation often call the
+same gateway tool with the same arguments (pod status of the same namespace,
+error rates of the same service), and each call is a round trip through
+MultiServerMCPClient to the backend. cache_tools() wraps the MCP tools so
+that, within one cache scope:
+
+- a result is reused for identical calls (same tool, same arguments in any
+  key order) until it is ttl_seconds old
+- concurrent identical calls, such as two agents of the same plan wave
+  asking for the same pod status, share one request instead of racing
+
+The scope is the investigation the calling agent works on, set by the agent
+node with start_tool_cache_scope(), so results never cross investigations.
+Calls made outside a scope go straight to the tool. Failed calls are not
+cached. Each agent run counts its hits, coalesced calls and misses in a
+ToolCacheStats, and tool_cache_report() sums them per investigation.
+"""
+
+import asyncio
+import json
+import logging
+import time
+from collections import OrderedDict
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from langchain_core.tools import BaseTool, StructuredTool
+
+from .constants import SREConstants
+
+logger = logging.getLogger(__name__)
+
+# Scope and ToolCacheStats of the agent run in progress in the current task
+_current_scope: ContextVar[Optional[Tuple[Optional[str], "ToolCacheStats"]]] = (
+    ContextVar("tool_cache_scope", default=None)
+)
+
+_tool_cache: Optional["ToolResultCache"] = None
+
+
+class ToolCacheStats:
+    """Tool calls made by one agent run and how they were served."""
+
+    def __init__(self):
+        self.hits = 0
+        self.coalesced = 0
+        self.misses = 0
+        self.errors = 0
+
+    def record(self, outcome: str) -> None:
+        setattr(self, outcome, getattr(self, outcome) + 1)
+
+    def as_dict(self) -> Dict[str, int]:
+        return {
+            "calls": self.hits + self.coalesced + self.misses + self.errors,
+            "hits": self.hits,
+            "coalesced": self.coalesced,
+            "misses": self.misses,
+            "errors": self.errors,
+        }
+
+
+def start_tool_cache_scope(scope: Optional[str]) -> ToolCacheStats:
+    """Share tool results of the current task with other tasks of the same scope.
+
+    Tasks started afterwards from this task (such as the ReAct loop run by an
+    agent node) use the scope as well. With scope None, tool calls are not
+    cached.
+
+    Args:
+        scope: Investigation the tool calls belong to
+
+    Returns:
+        Statistics of the tool calls made in the scope from this task
+    """
+    stats = ToolCacheStats()
+    _current_scope.set((scope, stats))
+    return stats
+
+
+def tool_cache_report(metadata: Dict[str, Any]) -> Dict[str, Any]:
+    """Sum of the per-agent tool cache statistics recorded in investigation metadata."""
+    totals = {"calls": 0, "hits": 0, "coalesced": 0, "misses": 0, "errors": 0}
+    for key, value in metadata.items():
+        if key.endswith("_tool_cache") and isinstance(value, dict):
+            for name in totals:
+                totals[name] += value.get(name, 0)
+    saved = totals["hits"] + totals["coalesced"]
+    totals["hit_rate"] = round(saved / totals["calls"], 3) if totals["calls"] else 0.0
+    return totals
+
+
+def canonical_args(args: Dict[str, Any]) -> str:
+    """Arguments as a string that is the same for the same arguments in any order."""
+    return json.dumps(args, sort_keys=True, separators=(",", ":"), default=str)
+
+
+class ToolResultCache:
+    """Tool results by scope, tool and arguments, with in-flight call sharing.
+
+    Args:
+        ttl_seconds: Seconds a result is reused; 0 only shares in-flight calls
+        max_entries: Results kept, least recently used dropped first
+    """
+
+    def __init__(self, ttl_seconds: float = 120.0, max_entries: int = 1024):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.hits = 0
+        self.coalesced = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Tuple[str, str, str], Tuple[float, Any]]" = (
+            OrderedDict()
+        )
+        self._inflight: Dict[Tuple[str, str, str], asyncio.Future] = {}
+
+    def _lookup(self, key: Tuple[str, str, str]) -> Tuple[bool, Any]:
+        """(True, result) for a fresh cached result, else (False, None)."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return False, None
+        expires_at, result = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return False, None
+        self._entries.move_to_end(key)
+        return True, result
+
+    def _store(self, key: Tuple[str, str, str], result: Any) -> None:
+        if self.ttl_seconds <= 0:
+            return
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, result)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def call(
+        self,
+        scope: str,
+        tool_name: str,
+        args: Dict[str, Any],
+        fetch: Callable[[], Awaitable[Any]],
+    ) -> Tuple[Any, str]:
+        """Result of a tool call, from the cache, a call in flight or fetch().
+
+        Args:
+            scope: Investigation the call belongs to
+            tool_name: Name of the tool
+            args: Arguments of the call
+            fetch: Makes the call when no result can be shared
+
+        Returns:
+            The result and how it was served: "hits", "coalesced" or "misses"
+
+        Raises:
+            Exception: Whatever fetch() raised, for every caller sharing it
+        """
+        key = (scope, tool_name, canonical_args(args))
+        while True:
+            found, result = self._lookup(key)
+            if found:
+                self.hits += 1
+                return result, "hits"
+
+            future = self._inflight.get(key)
+            if future is None:
+                break
+            try:
+                result = await asyncio.shield(future)
+            except asyncio.CancelledError:
+                if not future.cancelled():
+                    raise
+                # The caller making the request was cancelled; make it ourselves
+                continue
+            self.coalesced += 1
+            return result, "coalesced"
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        self.misses += 1
+        try:
+            result = await fetch()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Mark the exception retrieved in case no other caller is waiting
+            future.exception()
+            raise
+        else:
+            self._store(key, result)
+            future.set_result(result)
+        finally:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+        return result, "misses"
+
+    def stats(self) -> Dict[str, int]:
+        """Results cached, calls in flight and how calls were served so far."""
+        return {
+            "entries": len(self._entries),
+            "in_flight": len(self._inflight),
+            "hits": self.hits,
+            "coalesced": self.coalesced,
+            "misses": self.misses,
+        }
+
+    def clear(self) -> None:
+        """Drop all cached results."""
+        self._entries.clear()
+
+
+def cache_tool(tool: BaseTool, cache: ToolResultCache) -> BaseTool:
+    """Copy of an async structured tool whose calls go through the cache.
+
+    Tools without a coroutine are returned unchanged.
+    """
+    if not isinstance(tool, StructuredTool) or tool.coroutine is None:
+        return tool
+    coroutine = tool.coroutine
+
+    async def call(**kwargs: Any) -> Any:
+        scope, stats = _current_scope.get() or (None, None)
+        if scope is None:
+            return await coroutine(**kwargs)
+        try:
+            result, outcome = await cache.call(
+                scope, tool.name, kwargs, lambda: coroutine(**kwargs)
+            )
+        except Exception:
+            stats.record("errors")
+            raise
+        stats.record(outcome)
+        return result
+
+    return StructuredTool(
+        name=tool.name,
+        description=tool.description,
+        args_schema=tool.args_schema,
+        coroutine=call,
+        response_format=tool.response_format,
+        metadata=tool.metadata,
+        tags=tool.tags,
+        handle_tool_error=tool.handle_tool_error,
+        handle_validation_error=tool.handle_validation_error,
+    )
+
+
+def cache_tools(
+    tools: List[BaseTool], cache: Optional[ToolResultCache] = None
+) -> List[BaseTool]:
+    """Tools whose calls share results within an investigation.
+
+    Args:
+        tools: Tools to wrap, typically the MCP gateway tools
+        cache: Cache to use; defaults to the process-wide one
+    """
+    cache = cache or get_tool_cache()
+    return [cache_tool(tool, cache) for tool in tools]
+
+
+def get_tool_cache() -> ToolResultCache:
+    """Process-wide tool result cache, configured from SREConstants.tool_cache."""
+    global _tool_cache
+    if _tool_cache is None:
+        config = SREConstants.tool_cache
+        _tool_cache = ToolResultCache(
+            ttl_seconds=config.ttl_seconds, max_entries=config.max_entries
+        )
+    return _tool_cache
@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+"""
+Cached discovery of the MCP gateway tools.
+
+Listing the gateway's tools connects to it, authenticates and pages through
+the tool schemas of every target, and the agent graph used to wait for it on
+every process start. ToolSchemaCache keeps the listed schemas in a local JSON
+file, keyed by gateway URL, together with a schema version: a hash of the
+schemas, since MCP has no ETag for tool lists. When the cache has schemas for
+the gateway, startup builds the tools from them without contacting the
+gateway. Those tools open their gateway session on their first call, and
+revalidate_in_background() lists the tools again off the startup path,
+writing the cache when the version changed so the next start uses the new
+schemas.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import random
+import time
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, TypeVar
+
+from langchain_core.tools import BaseTool, StructuredTool
+from langchain_mcp_adapters.client import MultiServerMCPClient
+from langchain_mcp_adapters.tools import convert_mcp_tool_to_langchain_tool
+from mcp.types import Tool as MCPTool
+
+logger = logging.getLogger(__name__)
+
+# Layout of the cache file; files written with another layout are ignored
+CACHE_FORMAT = 1
+
+# Pages of tools listed before giving up, as langchain_mcp_adapters does
+MAX_TOOL_PAGES = 1000
+
+# Attempts at a gateway request while it answers 429 Too Many Requests
+MAX_RATE_LIMIT_ATTEMPTS = 3
+
+# Background revalidations in progress; referenced so they are not collected
+_revalidations: Set[asyncio.Task] = set()
+
+T = TypeVar("T")
+
+
+def schema_version(schemas: List[Dict[str, Any]]) -> str:
+    """Version of a tool list: a hash of its schemas, independent of their order."""
+    canonical = json.dumps(
+        sorted(schemas, key=lambda schema: schema.get("name", "")),
+        sort_keys=True,
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:16]
+
+
+def tool_schemas(tools: List[MCPTool]) -> List[Dict[str, Any]]:
+    """JSON-serialisable schemas of MCP tools."""
+    return [tool.model_dump(mode="json", exclude_none=True) for tool in tools]
+
+
+class ToolSchemaCache:
+    """Tool schemas per gateway URL, kept in a JSON file.
+
+    Args:
+        path: JSON file; created on the first save
+    """
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+
+    def _read(self) -> Dict[str, Any]:
+        try:
+            with open(self.path, "r") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable tool schema cache {self.path}: {e}")
+            return {}
+        if not isinstance(data, dict) or data.get("format") != CACHE_FORMAT:
+            return {}
+        return data.get("gateways", {})
+
+    def load(self, gateway_url: str) -> Optional[Dict[str, Any]]:
+        """Cached entry of a gateway: version, fetched_at and tools; None if absent."""
+        entry = self._read().get(gateway_url)
+        if not entry or not isinstance(entry.get("tools"), list):
+            return None
+        return entry
+
+    def save(self, gateway_url: str, schemas: List[Dict[str, Any]]) -> str:
+        """Store the tool schemas of a gateway.
+
+        Returns:
+            The schema version stored
+        """
+        gateways = self._read()
+        version = schema_version(schemas)
+        gateways[gateway_url] = {
+            "version": version,
+            "fetched_at": time.time(),
+            "tools": schemas,
+        }
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        temporary = self.path.with_suffix(self.path.suffix + ".tmp")
+        with open(temporary, "w") as f:
+            json.dump({"format": CACHE_FORMAT, "gateways": gateways}, f)
+        temporary.replace(self.path)
+        return version
+
+
+async def list_gateway_tools(
+    client: MultiServerMCPClient, server_name: str = "gateway"
+) -> List[Dict[str, Any]]:
+    """Schemas of every tool of an MCP server, following pagination."""
+    tools: List[MCPTool] = []
+    async with client.session(server_name) as session:
+        cursor = None
+        for _ in range(MAX_TOOL_PAGES):
+            page = await session.list_tools(cursor=cursor)
+            tools.extend(page.tools)
+            if not page.nextCursor:
+                break
+            cursor = page.nextCursor
+        else:
+            raise RuntimeError(f"Gave up listing tools after {MAX_TOOL_PAGES} pages")
+    return tool_schemas(tools)
+
+
+def _rate_limited(error: BaseException) -> bool:
+    """Whether an error, or one grouped in it, is a 429 from the gateway."""
+    if isinstance(error, BaseExceptionGroup):
+        return any(_rate_limited(inner) for inner in error.exceptions)
+    message = str(error)
+    return "429" in message or "Too Many Requests" in message
+
+
+def _backoff_seconds(attempt: int) -> float:
+    """Exponential backoff with 0-1 second jitter: 2, 4, 8... seconds."""
+    return 2**attempt + random.uniform(0, 1)
+
+
+async def with_rate_limit_retry(
+    operation: Callable[[], Awaitable[T]],
+    max_attempts: int = MAX_RATE_LIMIT_ATTEMPTS,
+) -> T:
+    """Await operation(), retrying with backoff while the gateway answers 429.
+
+    Other errors, including timeouts, are raised without retrying.
+    """
+    attempt = 1
+    while True:
+        try:
+            return await operation()
+        except Exception as e:
+            if attempt >= max_attempts or not _rate_limited(e):
+                raise
+            wait_time = _backoff_seconds(attempt)
+            logger.warning(
+                f"Rate limited by MCP server (attempt {attempt}/{max_attempts}). "
+                f"Waiting {wait_time:.1f} seconds before retry..."
+            )
+            await asyncio.sleep(wait_time)
+            attempt += 1
+
+
+def retry_rate_limited(tool: BaseTool) -> BaseTool:
+    """Tool whose calls are retried with backoff while the gateway answers 429.
+
+    Tools without a coroutine are returned unchanged.
+    """
+    if not isinstance(tool, StructuredTool) or tool.coroutine is None:
+        return tool
+    coroutine = tool.coroutine
+
+    async def call(**kwargs: Any) -> Any:
+        return await with_rate_limit_retry(lambda: coroutine(**kwargs))
+
+    tool.coroutine = call
+    return tool
+
+
+def tools_from_schemas(
+    schemas: List[Dict[str, Any]],
+    client: MultiServerMCPClient,
+    server_name: str = "gateway",
+) -> List[BaseTool]:
+    """LangChain tools for MCP tool schemas; each call opens its own session.
+
+    No connection is made until a tool is called. Since that first call is
+    also the first contact with the gateway, calls are retried with backoff
+    when the gateway rate-limits them.
+    """
+    connection = client.connections[server_name]
+    return [
+        retry_rate_limited(
+            convert_mcp_tool_to_langchain_tool(
+                None, MCPTool.model_validate(schema), connection=connection
+            )
+        )
+        for schema in schemas
+    ]
+
+
+async def _revalidate(
+    client: MultiServerMCPClient,
+    cache: ToolSchemaCache,
+    gateway_url: str,
+    cached_version: str,
+    timeout_seconds: float,
+) -> bool:
+    try:
+        schemas = await asyncio.wait_for(
+            list_gateway_tools(client), timeout=timeout_seconds
+        )
+    except asyncio.CancelledError:
+        raise
+    except Exception as e:
+        logger.warning(f"Could not revalidate cached gateway tools: {e}")
+        return False
+
+    version = cache.save(gateway_url, schemas)
+    if version == cached_version:
+        logger.info(f"Cached gateway tools are current (version {version})")
+        return False
+    logger.warning(
+        f"Gateway tools changed (version {cached_version} -> {version}, "
+        f"{len(schemas)} tools); the cache is updated and the new tools are "
+        f"used from the next start"
+    )
+    return True
+
+
+def revalidate_in_background(
+    client: MultiServerMCPClient,
+    cache: ToolSchemaCache,
+    gateway_url: str,
+    cached_version: str,
+    timeout_seconds: float,
+) -> asyncio.Task:
+    """List the gateway tools again without blocking, updating the cache.
+
+    Returns:
+        Task resolving to True if the schemas changed
+    """
+    task = asyncio.create_task(
+        _revalidate(client, cache, gateway_url, cached_version, timeout_seconds)
+    )
+    _revalidations.add(task)
+    task.add_done_callback(_revalidations.discard)
+    return task
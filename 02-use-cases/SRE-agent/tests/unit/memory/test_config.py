@@ -49,6 +49,14 @@ class TestMemoryConfig:
         assert isinstance(config, MemoryConfig)
         assert config.enabled is True  # Default value
 
+    def test_memory_can_be_disabled_from_environment(self, monkeypatch):
+        """Test that MEMORY_ENABLED=false turns the memory system off."""
+        monkeypatch.setenv("MEMORY_ENABLED", "false")
+        assert _load_memory_config().enabled is False
+
+        monkeypatch.setenv("MEMORY_ENABLED", "true")
+        assert _load_memory_config().enabled is True
+
     def test_memory_config_validation(self):
         """Test memory config field validation."""
         # Test that retention days are positive integers
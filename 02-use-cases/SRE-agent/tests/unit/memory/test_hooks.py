@@ -0,0 +1,159 @@
+import threading
+import time
+from unittest.mock import Mock, patch
+
+import pytest
+
+from sre_agent.memory.client import SREMemoryClient
+from sre_agent.memory.hooks import MemoryHookProvider
+from sre_agent.memory.strategies import (
+    UserPreference,
+    _preferences_cache,
+    _save_user_preference,
+)
+
+
+class TestOnInvestigationStart:
+    """Tests for MemoryHookProvider.on_investigation_start."""
+
+    @pytest.fixture(autouse=True)
+    def clear_preferences_cache(self):
+        """Start every test with an empty preferences cache."""
+        _preferences_cache.clear()
+        yield
+        _preferences_cache.clear()
+
+    @pytest.fixture
+    def mock_client(self):
+        """Create a mock memory client returning one record per memory type."""
+        mock = Mock(spec=SREMemoryClient)
+        mock.memory_id = "memory-123"
+
+        def retrieve(memory_type, **kwargs):
+            if memory_type == "preferences":
+                return [{"content": {"text": '{"preference_type": "escalation"}'}}]
+            return [{"content": {"text": f"{memory_type} record"}}]
+
+        mock.retrieve_memories.side_effect = retrieve
+        return mock
+
+    @pytest.fixture
+    def hooks(self, mock_client):
+        """Create MemoryHookProvider with mock client."""
+        return MemoryHookProvider(mock_client)
+
+    async def _start(self, hooks, user_id="user123"):
+        return await hooks.on_investigation_start(
+            query="pods crashing",
+            user_id=user_id,
+            actor_id="sre-agent",
+            session_id="session-1",
+        )
+
+    @pytest.mark.asyncio
+    async def test_lookups_run_concurrently(self, hooks, mock_client):
+        """Test that the three lookups overlap instead of running in sequence."""
+        active = 0
+        peak = 0
+        lock = threading.Lock()
+
+        def slow_retrieve(memory_type, **kwargs):
+            nonlocal active, peak
+            with lock:
+                active += 1
+                peak = max(peak, active)
+            time.sleep(0.1)
+            with lock:
+                active -= 1
+            return []
+
+        mock_client.retrieve_memories.side_effect = slow_retrieve
+
+        await self._start(hooks)
+
+        assert mock_client.retrieve_memories.call_count == 3
+        assert peak == 3
+
+    @pytest.mark.asyncio
+    async def test_context_includes_timings(self, hooks):
+        """Test that every lookup reports timing, status and record count."""
+        context = await self._start(hooks)
+
+        assert context["user_preferences"] == ['{"preference_type": "escalation"}']
+        assert len(context["past_investigations"]) == 1
+        timings = context["retrieval_timings"]
+        assert set(timings) == {"preferences", "infrastructure", "investigations"}
+        assert all(timing["status"] == "ok" for timing in timings.values())
+        assert all(timing["records"] == 1 for timing in timings.values())
+
+    @pytest.mark.asyncio
+    async def test_timed_out_lookup_degrades_gracefully(self, hooks, mock_client):
+        """Test that a slow lookup is dropped while the others still return."""
+
+        def retrieve(memory_type, **kwargs):
+            if memory_type == "investigations":
+                time.sleep(0.5)
+            return [{"content": {"text": memory_type}}]
+
+        mock_client.retrieve_memories.side_effect = retrieve
+
+        with patch(
+            "sre_agent.memory.hooks.SREConstants.memory.retrieval_timeout_seconds",
+            0.05,
+        ):
+            context = await self._start(hooks)
+
+        assert context["past_investigations"] == []
+        assert context["user_preferences"] == ["preferences"]
+        assert context["retrieval_timings"]["investigations"]["status"] == "timeout"
+        assert context["retrieval_timings"]["preferences"]["status"] == "ok"
+
+    @pytest.mark.asyncio
+    async def test_failed_lookup_degrades_gracefully(self, hooks, mock_client):
+        """Test that a failing lookup contributes no records."""
+
+        def retrieve(memory_type, **kwargs):
+            if memory_type == "infrastructure":
+                raise RuntimeError("throttled")
+            return []
+
+        mock_client.retrieve_memories.side_effect = retrieve
+
+        context = await self._start(hooks)
+
+        assert context["infrastructure_by_agent"] == {}
+        assert context["retrieval_timings"]["infrastructure"]["status"] == "error"
+
+    @pytest.mark.asyncio
+    async def test_preferences_reused_across_turns(self, hooks, mock_client):
+        """Test that a follow-up turn serves preferences from the cache."""
+        await self._start(hooks)
+        context = await self._start(hooks)
+
+        preference_calls = [
+            call
+            for call in mock_client.retrieve_memories.call_args_list
+            if call.kwargs["memory_type"] == "preferences"
+        ]
+        assert len(preference_calls) == 1
+        assert context["retrieval_timings"]["preferences"]["status"] == "cached"
+        assert context["user_preferences"] == ['{"preference_type": "escalation"}']
+
+    @pytest.mark.asyncio
+    async def test_saving_preference_invalidates_cache(self, hooks, mock_client):
+        """Test that saving a preference forces the next turn to re-query."""
+        await self._start(hooks)
+
+        mock_client.save_event.return_value = True
+        _save_user_preference(
+            mock_client,
+            "user123",
+            UserPreference(
+                user_id="user123",
+                preference_type="notification",
+                preference_value={"channel": "#alerts"},
+            ),
+        )
+        context = await self._start(hooks)
+
+        assert context["retrieval_timings"]["preferences"]["status"] == "ok"
@@ -0,0 +1,112 @@
+import threading
+import time
+from unittest.mock import Mock
+
+import pytest
+
+from sre_agent.memory.client import SREMemoryClient
+from sre_agent.memory.registry import MemoryClientRegistry
+
+
+class TestMemoryClientRegistry:
+    """Tests for MemoryClientRegistry."""
+
+    @pytest.fixture
+    def client_factory(self):
+        """Create a factory that returns distinct mock memory clients."""
+
+        def create(memory_name, region, force_delete):
+            client = Mock(spec=SREMemoryClient)
+            client.memory_name = memory_name
+            client.memory_id = f"{memory_name}-{region}-id"
+            return client
+
+        return Mock(side_effect=create)
+
+    @pytest.fixture
+    def registry(self, client_factory):
+        """Create a registry backed by the mock factory."""
+        return MemoryClientRegistry(client_factory=client_factory)
+
+    def test_reuses_client_for_same_key(self, registry, client_factory):
+        """Test that the same region and memory name share one client."""
+        first = registry.get_or_create(region="us-east-1", memory_name="sre")
+        second = registry.get_or_create(region="us-east-1", memory_name="sre")
+
+        assert first is second
+        client_factory.assert_called_once_with(
+            memory_name="sre", region="us-east-1", force_delete=False
+        )
+
+    def test_separate_clients_per_region(self, registry, client_factory):
+        """Test that different regions get different clients."""
+        east = registry.get_or_create(region="us-east-1", memory_name="sre")
+        west = registry.get_or_create(region="us-west-2", memory_name="sre")
+
+        assert east is not west
+        assert client_factory.call_count == 2
+
+    def test_lookup_by_memory_id(self, registry):
+        """Test that initialized clients are reachable by memory id."""
+        client = registry.get_or_create(region="us-east-1", memory_name="sre")
+
+        assert registry.get_by_memory_id("us-east-1", "sre-us-east-1-id") is client
+        assert registry.get_by_memory_id("us-west-2", "sre-us-east-1-id") is None
+
+    def test_force_delete_only_applies_on_creation(self, registry, client_factory):
+        """Test that force_delete does not recreate an already shared client."""
+        first = registry.get_or_create(
+            region="us-east-1", memory_name="sre", force_delete=True
+        )
+        second = registry.get_or_create(
+            region="us-east-1", memory_name="sre", force_delete=True
+        )
+
+        assert first is second
+        client_factory.assert_called_once_with(
+            memory_name="sre", region="us-east-1", force_delete=True
+        )
+
+    def test_concurrent_callers_initialize_once(self):
+        """Test that concurrent first calls share a single initialization."""
+        factory = Mock(
+            side_effect=lambda **kwargs: time.sleep(0.05) or Mock(memory_id="id")
+        )
+        registry = MemoryClientRegistry(client_factory=factory)
+        results = []
+
+        def worker():
+            results.append(registry.get_or_create(region="us-east-1"))
+
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert factory.call_count == 1
+        assert all(result is results[0] for result in results)
+        assert registry.stats()["reused"] == 7
+
+    def test_stats_report_init_time_saved(self, registry):
+        """Test that stats estimate time saved from reuse."""
+        registry.get_or_create(region="us-east-1", memory_name="sre")
+        registry.get_or_create(region="us-east-1", memory_name="sre")
+        registry.get_or_create(region="us-east-1", memory_name="sre")
+
+        stats = registry.stats()
+        assert stats["clients"] == 1
+        assert stats["created"] == 1
+        assert stats["reused"] == 2
+        assert stats["init_seconds_saved"] == pytest.approx(
+            2 * stats["init_seconds_average"], abs=0.002
+        )
+
+    def test_clear_resets_registry(self, registry, client_factory):
+        """Test that clear drops clients and counters."""
+        registry.get_or_create(region="us-east-1", memory_name="sre")
+        registry.clear()
+
+        assert registry.stats()["clients"] == 0
+        registry.get_or_create(region="us-east-1", memory_name="sre")
+        assert client_factory.call_count == 2
@@ -0,0 +1,166 @@
+import asyncio
+import json
+
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage, ToolMessage
+
+from sre_agent.context_budget import (
+    ContextCompactor,
+    context_report,
+    start_usage,
+    summarize_payload,
+)
+
+PODS = json.dumps(
+    {
+        "pods": [
+            {"name": f"web-app-{i}", "status": "Running", "restarts": i}
+            for i in range(500)
+        ]
+    }
+)
+
+
+def _tool_exchange(call_id: str, output: str, name: str = "get_pod_status"):
+    return [
+        AIMessage(
+            content="",
+            tool_calls=[{"name": name, "args": {}, "id": call_id}],
+            id=f"ai-{call_id}",
+        ),
+        ToolMessage(content=output, name=name, tool_call_id=call_id, id=call_id),
+    ]
+
+
+def _turn(n: int, answer_chars: int = 2000):
+    return [
+        HumanMessage(content=f"Question {n}", id=f"q{n}"),
+        AIMessage(content=f"Answer {n} " + "x" * answer_chars, id=f"a{n}"),
+    ]
+
+
+def _compactor(max_tokens=20000):
+    return ContextCompactor(
+        max_tokens=max_tokens, tool_output_tokens=2000, history_tool_output_tokens=200
+    )
+
+
+def _tool_call_ids(messages):
+    calls = [
+        c["id"] for m in messages if isinstance(m, AIMessage) for c in m.tool_calls
+    ]
+    results = [m.tool_call_id for m in messages if isinstance(m, ToolMessage)]
+    return calls, results
+
+
+class TestSummarizePayload:
+    """Tests for cutting tool outputs down to a token budget."""
+
+    def test_json_keeps_structure_within_budget(self):
+        """Test that long JSON lists are shortened with a count of the rest."""
+        text = summarize_payload(PODS, 200)
+
+        assert len(text) <= 200 * 4
+        body = json.loads(text.split("\n", 1)[1])
+        assert body["pods"][0] == {
+            "name": "web-app-0",
+            "status": "Running",
+            "restarts": 0,
+        }
+        assert body["pods"][-1].endswith("more items")
+
+    def test_text_keeps_start_and_end(self):
+        """Test that non-JSON text keeps its beginning and end."""
+        text = summarize_payload("start " + "y" * 10000 + " end", 100)
+
+        assert len(text) <= 100 * 4
+        assert "start" in text and text.endswith(" end")
+        assert "characters omitted" in text
+
+    def test_short_output_unchanged(self):
+        """Test that outputs within budget are returned as they are."""
+        assert summarize_payload('{"pods": []}', 10) == '{"pods": []}'
+
+
+class TestContextCompactor:
+    """Tests for keeping agent LLM input within budget."""
+
+    def test_within_budget_messages_pass_through(self):
+        """Test that small conversations are sent unchanged."""
+        messages = [SystemMessage(content="You are an agent")] + _turn(1, 100)
+        messages.append(HumanMessage(content="Help"))
+
+        assert _compactor().compact(messages) == messages
+
+    def test_earlier_tool_outputs_get_the_smaller_cap(self):
+        """Test history vs current-run tool output caps and tool pairing."""
+        messages = (
+            [SystemMessage(content="You are an agent"), HumanMessage(content="q")]
+            + _tool_exchange("old", PODS)
+            + [HumanMessage(content="As the agent, help with: q")]
+            + _tool_exchange("new", PODS)
+        )
+        compactor = _compactor()
+
+        compacted = compactor.compact(messages)
+
+        old, new = [m for m in compacted if isinstance(m, ToolMessage)]
+        assert compactor.count(old) < 300 < compactor.count(new) <= 2100
+        assert compactor.total(compacted) < compactor.total(messages) / 5
+        calls, results = _tool_call_ids(compacted)
+        assert calls == results == ["old", "new"]
+
+    def test_old_turns_are_condensed_into_the_system_prompt(self):
+        """Test that the newest turns are kept and older ones summarised."""
+        history = [m for n in range(20) for m in _turn(n)]
+        messages = (
+            [SystemMessage(content="You are an agent")]
+            + history
+            + [HumanMessage(content="As the agent, help with: Question 20")]
+        )
+        compactor = _compactor(max_tokens=3000)
+
+        compacted = compactor.compact(messages)
+
+        assert compactor.total(compacted) <= 3000
+        assert "turns condensed" in compacted[0].content
+        assert "- User: Question 14" in compacted[0].content
+        assert compacted[-3:] == history[-2:] + messages[-1:]
+        assert all(not isinstance(m, SystemMessage) for m in compacted[1:])
+
+    def test_summaries_and_tool_outputs_are_cached(self):
+        """Test that repeated steps reuse earlier compaction results."""
+        messages = (
+            [SystemMessage(content="s")]
+            + [m for n in range(20) for m in _turn(n)]
+            + [HumanMessage(content="help")]
+            + _tool_exchange("t1", PODS)
+        )
+        compactor = _compactor(max_tokens=4000)
+
+        first = compactor.compact(messages)
+        second = compactor.compact(messages)
+
+        assert first == second
+        assert first[-1] is second[-1]
+        assert len(compactor._summaries) > 0
+
+    def test_usage_is_recorded_per_run_and_reported(self):
+        """Test that hook calls add up into the investigation report."""
+        compactor = _compactor()
+        messages = [HumanMessage(content="help")] + _tool_exchange("t1", PODS)
+
+        async def run():
+            usage = start_usage()
+            await compactor.pre_model_hook({"messages": messages})
+            await compactor.pre_model_hook({"messages": messages})
+            return usage.as_dict()
+
+        usage = asyncio.run(run())
+
+        assert usage["llm_calls"] == 2
+        assert usage["tokens_saved"] > 0
+        report = context_report(
+            {"Logs_Agent_context": usage, "Metrics_Agent_context": usage, "plan": {}}
+        )
+        assert report["llm_calls"] == 4
+        assert report["tokens_saved"] == 2 * usage["tokens_saved"]
@@ -0,0 +1,169 @@
+import json
+import os
+import threading
+from datetime import datetime, timezone
+
+import pytest
+
+from backend.servers.data_store import Dataset, DataStore
+
+EVENTS = [
+    {"type": "Warning", "namespace": "production", "timestamp": "2024-01-15T14:20:00Z"},
+    {"type": "Normal", "namespace": "staging", "timestamp": "2024-01-15T14:25:00Z"},
+    {"type": "Warning", "namespace": "staging", "timestamp": "2024-01-15T14:22:00Z"},
+    {"type": "Error", "namespace": "production"},
+    {"type": "Warning", "namespace": "production", "timestamp": "not-a-time"},
+]
+
+
+def _utc(minute: int) -> datetime:
+    return datetime(2024, 1, 15, 14, minute, tzinfo=timezone.utc)
+
+
+def _parse(value: str) -> datetime:
+    return datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+
+def _write(path, payload, mtime=None):
+    path.write_text(json.dumps(payload))
+    if mtime is not None:
+        os.utime(path, (mtime, mtime))
+
+
+class TestDataset:
+    """Tests for Dataset lookups."""
+
+    @pytest.fixture
+    def events(self, tmp_path):
+        """Create an indexed events dataset."""
+        path = tmp_path / "events.json"
+        _write(path, {"events": EVENTS})
+        return Dataset(
+            path,
+            records_key="events",
+            indexes=("type", "namespace"),
+            time_field="timestamp",
+            time_parser=_parse,
+        )
+
+    def test_select_without_filters_returns_all(self, events):
+        """Test that no filters returns every record in file order."""
+        assert events.select() == EVENTS
+        assert len(events) == len(EVENTS)
+
+    def test_select_matches_linear_filter(self, events):
+        """Test that indexed filters match the list comprehension they replace."""
+        expected = [
+            e
+            for e in EVENTS
+            if e.get("type") == "Warning" and e.get("namespace") == "production"
+        ]
+
+        assert events.select(type="Warning", namespace="production") == expected
+        assert events.select(type="Warning", namespace=None) == [
+            e for e in EVENTS if e["type"] == "Warning"
+        ]
+        assert events.select(type="Critical") == []
+
+    def test_time_range_keeps_file_order(self, events):
+        """Test since/until filtering drops untimed and keeps unparseable records."""
+        selected = events.select(since=_utc(21))
+
+        assert selected == [EVENTS[1], EVENTS[2], EVENTS[4]]
+        assert events.select(since=_utc(21), until=_utc(22)) == [EVENTS[2], EVENTS[4]]
+
+    def test_time_range_combined_with_index(self, events):
+        """Test that a time range applies on top of equality filters."""
+        assert events.select(since=_utc(21), type="Warning") == [EVENTS[2], EVENTS[4]]
+        # Narrower time slice than the index bucket
+        assert events.select(since=_utc(24), type="Warning") == [EVENTS[4]]
+        assert events.select(since=_utc(24), type="Normal") == [EVENTS[1]]
+
+    def test_naive_bounds_are_utc(self, events):
+        """Test that a bound without timezone is compared as UTC."""
+        assert events.select(since=datetime(2024, 1, 15, 14, 24)) == [
+            EVENTS[1],
+            EVENTS[4],
+        ]
+
+    def test_get_by_unique_field(self, tmp_path):
+        """Test single-record lookup by an indexed id."""
+        path = tmp_path / "playbooks.json"
+        _write(path, {"playbooks": [{"id": "a"}, {"id": "b", "title": "B"}]})
+        playbooks = Dataset(path, records_key="playbooks", indexes=("id",))
+
+        assert playbooks.get("id", "b") == {"id": "b", "title": "B"}
+        assert playbooks.get("id", "missing") is None
+
+    def test_records_extracted_without_key(self, tmp_path):
+        """Test top-level lists and first list values are used as records."""
+        top_level = tmp_path / "list.json"
+        _write(top_level, [{"service": "web"}])
+        nested = tmp_path / "nested.json"
+        _write(nested, {"meta": {}, "entries": [{"service": "api"}]})
+
+        assert Dataset(top_level, indexes=("service",)).select(service="web") == [
+            {"service": "web"}
+        ]
+        assert Dataset(nested).records() == [{"service": "api"}]
+
+    def test_loads_file_once(self, events):
+        """Test that repeated lookups reuse the parsed file."""
+        for _ in range(10):
+            events.select(type="Warning")
+
+        assert events.loads == 1
+
+    def test_reloads_when_file_changes(self, tmp_path):
+        """Test that an edited data file is picked up with fresh indexes."""
+        path = tmp_path / "pods.json"
+        _write(path, {"pods": [{"name": "a", "namespace": "prod"}]}, mtime=1000)
+        pods = Dataset(
+            path, records_key="pods", indexes=("namespace",), check_interval=0
+        )
+        assert len(pods.select(namespace="prod")) == 1
+
+        _write(
+            path,
+            {
+                "pods": [
+                    {"name": "a", "namespace": "prod"},
+                    {"name": "b", "namespace": "prod"},
+                ]
+            },
+            mtime=2000,
+        )
+
+        assert [p["name"] for p in pods.select(namespace="prod")] == ["a", "b"]
+        assert pods.loads == 2
+
+    def test_concurrent_first_access_loads_once(self, events):
+        """Test that concurrent first lookups share a single load."""
+        results = []
+
+        def worker():
+            results.append(len(events.select(type="Warning")))
+
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert results == [3] * 8
+        assert events.loads == 1
+
+
+class TestDataStore:
+    """Tests for DataStore registration."""
+
+    def test_register_resolves_relative_to_data_path(self, tmp_path):
+        """Test that datasets are registered and looked up by file name."""
+        _write(tmp_path / "nodes.json", {"nodes": [{"name": "node-1"}]})
+        store = DataStore(tmp_path)
+        nodes = store.register("nodes.json", records_key="nodes", indexes=("name",))
+
+        assert store["nodes.json"] is nodes
+        assert nodes.select(name="node-1") == [{"name": "node-1"}]
+        assert store.exists("nodes.json")
+        assert not store.exists("missing.json")
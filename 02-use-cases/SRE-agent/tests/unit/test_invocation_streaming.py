@@ -0,0 +1,229 @@
+import asyncio
+import json
+from typing import TypedDict
+
+import pytest
+from fastapi.testclient import TestClient
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage, ToolMessage
+from langgraph.graph import END, StateGraph
+
+from sre_agent import agent_runtime
+from sre_agent.agent_state import AgentState
+from sre_agent.graph_builder import compile_investigation_graph
+from sre_agent.streaming import stream_events
+
+
+class _ToolLoopState(TypedDict, total=False):
+    messages: list
+
+
+def _tool_loop():
+    """Stand-in for a react agent: one tool call and its result."""
+
+    def agent(state):
+        call = {"name": "get_pod_status", "args": {"namespace": "prod"}, "id": "1"}
+        return {"messages": [AIMessage(content="", tool_calls=[call])]}
+
+    def tools(state):
+        return {
+            "messages": [
+                ToolMessage(
+                    content="web-app-1 CrashLoopBackOff",
+                    name="get_pod_status",
+                    tool_call_id="1",
+                )
+            ]
+        }
+
+    graph = StateGraph(_ToolLoopState)
+    graph.add_node("agent", agent)
+    graph.add_node("tools", tools)
+    graph.set_entry_point("agent")
+    graph.add_edge("agent", "tools")
+    graph.add_edge("tools", END)
+    return graph.compile()
+
+
+class _FakeSupervisor:
+    """Routes to the kubernetes agent once, then aggregates with an LLM."""
+
+    def __init__(self):
+        self.llm = GenericFakeChatModel(
+            messages=iter([AIMessage(content="Pod web-app-1 is crash looping")])
+        )
+
+    async def route(self, state: AgentState):
+        if state.get("agents_invoked"):
+            return {"next": "FINISH", "next_wave": []}
+        return {
+            "next": "kubernetes_agent",
+            "next_wave": ["kubernetes_agent"],
+            "metadata": {"routing_reasoning": "Pod issue"},
+        }
+
+    async def aggregate_responses(self, state: AgentState):
+        response = await self.llm.ainvoke("Summarize")
+        return {"final_response": response.content}
+
+
+async def _kubernetes_agent(state: AgentState):
+    await _tool_loop().ainvoke({"messages": []})
+    return {
+        "agent_results": {"Kubernetes Agent": "web-app-1 is in CrashLoopBackOff"},
+        "agents_invoked": ["kubernetes_agent"],
+    }
+
+
+@pytest.fixture
+def client(monkeypatch):
+    graph = compile_investigation_graph(
+        _FakeSupervisor(), {"kubernetes_agent": _kubernetes_agent}
+    )
+    monkeypatch.setattr(agent_runtime, "agent_graph", graph)
+    with TestClient(agent_runtime.app) as test_client:
+        yield test_client
+
+
+def _sse_events(body: str):
+    events = []
+    for message in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in message.splitlines())
+        event = json.loads(lines["data"])
+        assert lines["event"] == event["type"]
+        events.append(event)
+    return events
+
+
+async def _collect(stream):
+    return [chunk async for chunk in stream]
+
+
+class TestInvocationStreaming:
+    """Tests for streamed /invocations responses."""
+
+    def test_stream_format_selection(self):
+        """Test that the input key takes precedence over the Accept header."""
+        select = agent_runtime._stream_format
+
+        assert select({"stream": True}, "") == "sse"
+        assert select({"stream": "ndjson"}, "text/event-stream") == "ndjson"
+        assert select({}, "application/x-ndjson") == "ndjson"
+        assert select({"stream": False}, "text/event-stream") is None
+        assert select({}, "application/json") is None
+
+    def test_sse_stream_reports_progress_then_output(self, client):
+        """Test routing, tool, agent and token events precede the final output."""
+        response = client.post(
+            "/invocations", json={"input": {"prompt": "pods?", "stream": True}}
+        )
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/event-stream")
+        events = _sse_events(response.text)
+        types = [event["type"] for event in events]
+        assert types[0] == "routing"
+        assert events[0]["reasoning"] == "Pod issue"
+        assert types.index("tool_call") < types.index("tool_result")
+        assert types.index("tool_result") < types.index("agent_completed")
+        assert types[-1] == "final"
+        assert events[types.index("tool_call")] == {
+            "type": "tool_call",
+            "agent": "kubernetes_agent",
+            "tool": "get_pod_status",
+            "args": '{"namespace": "prod"}',
+        }
+        tokens = "".join(e["text"] for e in events if e["type"] == "token")
+        assert tokens == "Pod web-app-1 is crash looping"
+        assert events[-1]["output"]["message"] == tokens
+
+    def test_ndjson_stream_from_accept_header(self, client):
+        """Test that an NDJSON Accept header streams one event per line."""
+        response = client.post(
+            "/invocations",
+            json={"input": {"prompt": "pods?"}},
+            headers={"Accept": "application/x-ndjson"},
+        )
+
+        events = [json.loads(line) for line in response.text.splitlines()]
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        assert events[-1]["type"] == "final"
+
+    def test_json_response_unchanged(self, client):
+        """Test that requests without streaming get a single JSON body."""
+        response = client.post("/invocations", json={"input": {"prompt": "pods?"}})
+
+        assert response.json()["output"]["message"] == "Pod web-app-1 is crash looping"
+
+    def test_tokens_merge_while_client_is_slow(self):
+        """Test that tokens queued behind a slow reader are coalesced."""
+
+        async def tokens():
+            for i in range(100):
+                yield {"type": "token", "text": f"{i} "}
+            yield {"type": "final", "output": {}}
+
+        async def run():
+            chunks = []
+            async for chunk in stream_events(tokens(), "ndjson", queue_size=2):
+                chunks.append(json.loads(chunk))
+                await asyncio.sleep(0.01)
+            return chunks
+
+        events = asyncio.run(run())
+
+        assert "".join(e["text"] for e in events[:-1]) == "".join(
+            f"{i} " for i in range(100)
+        )
+        assert len(events) < 10
+        assert events[-1]["type"] == "final"
+
+    def test_disconnect_cancels_investigation(self):
+        """Test that a disconnected client stops the event source."""
+        cancelled = []
+
+        async def endless():
+            try:
+                yield {"type": "routing", "next": "logs_agent"}
+                await asyncio.Event().wait()
+            finally:
+                cancelled.append(True)
+
+        async def disconnected():
+            return True
+
+        async def run():
+            return await _collect(
+                stream_events(
+                    endless(),
+                    "sse",
+                    is_disconnected=disconnected,
+                    heartbeat_seconds=0.01,
+                )
+            )
+
+        chunks = asyncio.run(run())
+
+        assert len(chunks) == 1
+        assert cancelled == [True]
+
+    def test_closing_stream_cancels_investigation(self):
+        """Test that closing the response iterator cancels the event source."""
+        cancelled = []
+
+        async def endless():
+            try:
+                while True:
+                    yield {"type": "token", "text": "x"}
+                    await asyncio.sleep(0)
+            finally:
+                cancelled.append(True)
+
+        async def run():
+            stream = stream_events(endless(), "sse")
+            await stream.__anext__()
+            await stream.aclose()
+
+        asyncio.run(run())
+
+        assert cancelled == [True]
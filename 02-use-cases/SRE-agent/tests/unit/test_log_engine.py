@@ -0,0 +1,226 @@
+import random
+from datetime import datetime, timedelta, timezone
+from itertools import islice
+
+import pytest
+
+from backend.servers.log_engine import LogFile, parse_log_line
+
+BASE_TIME = datetime(2024, 1, 15, 14, 0, tzinfo=timezone.utc)
+SERVICES = ["web-service", "api-service", "database"]
+LEVELS = ["INFO", "WARN", "ERROR"]
+
+
+def _parse(value: str) -> datetime:
+    return datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+
+def _line(second: int, level: str, service: str, message: str) -> str:
+    timestamp = (BASE_TIME + timedelta(seconds=second)).strftime(
+        "%Y-%m-%dT%H:%M:%S.000Z"
+    )
+    return f"{timestamp} [{level}] {service} {message}"
+
+
+def _lines(count: int, ordered: bool = True):
+    rng = random.Random(7)
+    seconds = list(range(count)) if ordered else rng.sample(range(count), count)
+    return [
+        _line(
+            second,
+            LEVELS[second % 3],
+            SERVICES[second % 2 + (second % 5 == 0)],
+            f"request {second} {'timeout' if second % 7 == 0 else 'ok'}",
+        )
+        for second in seconds
+    ]
+
+
+def _reference_search(lines, pattern=None, level=None, start=None, end=None):
+    """Read every line, as logs_server did before the engine."""
+    results = []
+    for line in lines:
+        if pattern and pattern.lower() not in line.lower():
+            continue
+        entry = parse_log_line(line)
+        if level and entry.get("level") != level:
+            continue
+        if start or end:
+            if "timestamp" not in entry:
+                continue
+            entry_time = _parse(entry["timestamp"])
+            if (start and entry_time < start) or (end and entry_time > end):
+                continue
+        results.append(entry)
+    return results
+
+
+def _write(path, lines, trailing_newline=True):
+    path.write_text("\n".join(lines) + ("\n" if trailing_newline else ""))
+
+
+class TestLogFile:
+    """Tests for LogFile search and recent reads."""
+
+    @pytest.fixture(params=[True, False], ids=["ordered", "unordered"])
+    def log(self, request, tmp_path):
+        """Create a multi-block log file in time order or shuffled."""
+        lines = _lines(300, ordered=request.param)
+        path = tmp_path / "application.log"
+        _write(path, lines)
+        return LogFile(path, time_parser=_parse, block_size=512), lines
+
+    def test_index_detects_time_order(self, log):
+        """Test that only a time-ordered file is marked for binary search."""
+        log_file, lines = log
+
+        stats = log_file.stats()
+        assert stats["blocks"] > 10
+        assert stats["time_ordered"] == (lines == sorted(lines))
+
+    @pytest.mark.parametrize(
+        "filters",
+        [
+            {"pattern": "timeout"},
+            {"pattern": "TIMEOUT", "level": "ERROR"},
+            {"pattern": "request", "start": BASE_TIME + timedelta(seconds=100)},
+            {
+                "pattern": "ok",
+                "start": BASE_TIME + timedelta(seconds=50),
+                "end": BASE_TIME + timedelta(seconds=75),
+            },
+            {"pattern": "api-service", "end": BASE_TIME + timedelta(seconds=20)},
+            {"pattern": "no such text"},
+        ],
+    )
+    def test_search_matches_full_scan(self, log, filters):
+        """Test that indexed search returns what a full scan returns."""
+        log_file, lines = log
+
+        results = list(
+            log_file.search(
+                pattern=filters.get("pattern"),
+                level=filters.get("level"),
+                start_time=filters.get("start"),
+                end_time=filters.get("end"),
+            )
+        )
+
+        assert results == _reference_search(lines, **filters)
+
+    def test_naive_bounds_are_utc(self, log):
+        """Test that a time bound without timezone is compared as UTC."""
+        log_file, lines = log
+        start = BASE_TIME + timedelta(seconds=290)
+
+        results = list(log_file.search(start_time=start.replace(tzinfo=None)))
+
+        assert results == _reference_search(lines, start=start)
+
+    def test_recent_reads_backwards(self, log):
+        """Test that recent returns the last lines, newest first."""
+        log_file, lines = log
+
+        recent = list(islice(log_file.recent(), 5))
+        assert recent == [parse_log_line(line) for line in reversed(lines[-5:])]
+
+        database = list(islice(log_file.recent(service="data"), 3))
+        expected = [
+            entry
+            for entry in map(parse_log_line, reversed(lines))
+            if "data" in entry["service"]
+        ][:3]
+        assert database == expected
+
+    def test_search_stops_reading_at_limit(self, tmp_path):
+        """Test that consuming a few results only reads the first blocks."""
+        path = tmp_path / "application.log"
+        _write(path, _lines(2000))
+        log_file = LogFile(path, time_parser=_parse, block_size=512)
+        blocks = log_file.stats()["blocks"]
+
+        read = []
+        original = log_file._matching_lines
+        log_file._matching_lines = lambda chunk, pattern: (
+            read.append(chunk) or original(chunk, pattern)
+        )
+        assert len(list(islice(log_file.search(pattern="request"), 10))) == 10
+
+        # Ten hits span the first two ~8-line blocks of a 250+ block file
+        assert len(read) == 2
+        assert blocks > 200
+
+    def test_lines_without_timestamp(self, tmp_path):
+        """Test that continuation lines are kept unless a time range is given."""
+        path = tmp_path / "application.log"
+        lines = [
+            _line(0, "ERROR", "web-service", "java.sql.SQLException: timed out"),
+            "    at com.example.Db.connect(Db.java:42)",
+            _line(5, "INFO", "web-service", "retry ok"),
+        ]
+        _write(path, lines, trailing_newline=False)
+        log_file = LogFile(path, time_parser=_parse, block_size=64)
+
+        assert list(log_file.search(pattern="db")) == _reference_search(lines, "db")
+        assert list(
+            log_file.search(start_time=BASE_TIME, end_time=BASE_TIME)
+        ) == _reference_search(lines, start=BASE_TIME, end=BASE_TIME)
+        assert not log_file.stats()["time_ordered"]
+
+    def test_appended_lines_extend_index(self, tmp_path):
+        """Test that growth re-indexes only the tail of the file."""
+        path = tmp_path / "application.log"
+        lines = _lines(200)
+        _write(path, lines[:100])
+        log_file = LogFile(path, time_parser=_parse, block_size=512, check_interval=0)
+        assert len(list(log_file.search(pattern="request"))) == 100
+
+        with open(path, "a") as f:
+            f.write("\n".join(lines[100:]) + "\n")
+
+        assert list(log_file.search(pattern="request")) == _reference_search(
+            lines, "request"
+        )
+        assert next(log_file.recent()) == parse_log_line(lines[-1])
+        assert log_file.index_builds == 2
+
+    def test_truncated_file_is_reindexed(self, tmp_path):
+        """Test that a rotated (truncated) file drops the old index."""
+        path = tmp_path / "application.log"
+        _write(path, _lines(200))
+        log_file = LogFile(path, time_parser=_parse, block_size=512, check_interval=0)
+        list(log_file.search(pattern="request"))
+
+        replacement = [_line(0, "INFO", "web-service", "rotated")]
+        _write(path, replacement)
+
+        assert list(log_file.search(pattern="r")) == _reference_search(replacement, "r")
+
+    def test_replaced_view_is_unmapped(self, tmp_path):
+        """Test that a superseded mapping is closed once its readers finish."""
+        path = tmp_path / "application.log"
+        lines = _lines(200)
+        _write(path, lines)
+        log_file = LogFile(path, time_parser=_parse, block_size=512, check_interval=0)
+
+        reader = log_file.recent()
+        assert next(reader) == parse_log_line(lines[-1])
+        old_mm = log_file._view.mm
+
+        _write(path, lines[:50])
+        assert next(log_file.recent()) == parse_log_line(lines[49])
+        assert not old_mm.closed
+        assert next(reader) == parse_log_line(lines[-2])
+
+        reader.close()
+        assert old_mm.closed
+        assert not log_file._view.mm.closed
+
+    def test_empty_file(self, tmp_path):
+        """Test that an empty file yields nothing."""
+        path = tmp_path / "application.log"
+        path.write_text("")
+        log_file = LogFile(path)
+
+        assert list(log_file.search(pattern="x")) == []
+        assert list(log_file.recent()) == []
@@ -0,0 +1,135 @@
+from sre_agent.agent_state import _merge_dicts, _merge_unique
+from sre_agent.graph_builder import _route_supervisor
+from sre_agent.supervisor import (
+    InvestigationPlan,
+    _order_agent_results,
+    plan_execution_waves,
+)
+
+
+def _plan(agents, dependencies=None):
+    return InvestigationPlan(
+        steps=[f"Run {agent}" for agent in agents],
+        agents_sequence=agents,
+        complexity="simple",
+        auto_execute=True,
+        reasoning="test",
+        dependencies=dependencies,
+    )
+
+
+class TestPlanExecutionWaves:
+    """Tests for plan_execution_waves."""
+
+    def test_without_dependencies_runs_sequentially(self):
+        """Test that plans without dependencies keep one agent per wave."""
+        plan = _plan(["logs_agent", "metrics_agent"])
+
+        assert plan_execution_waves(plan) == [["logs_agent"], ["metrics_agent"]]
+
+    def test_independent_agents_share_a_wave(self):
+        """Test that agents without dependencies between them run together."""
+        plan = _plan(
+            ["kubernetes_agent", "logs_agent", "metrics_agent", "runbooks_agent"],
+            [["logs_agent", "runbooks_agent"], ["metrics_agent", "runbooks_agent"]],
+        )
+
+        assert plan_execution_waves(plan) == [
+            ["kubernetes_agent", "logs_agent", "metrics_agent"],
+            ["runbooks_agent"],
+        ]
+
+    def test_chained_dependencies(self):
+        """Test that a dependency chain produces one wave per link."""
+        plan = _plan(
+            ["runbooks_agent", "logs_agent", "metrics_agent"],
+            [["logs_agent", "metrics_agent"], ["metrics_agent", "runbooks_agent"]],
+        )
+
+        assert plan_execution_waves(plan) == [
+            ["logs_agent"],
+            ["metrics_agent"],
+            ["runbooks_agent"],
+        ]
+
+    def test_cycle_falls_back_to_sequence(self):
+        """Test that cyclic dependencies run the remaining agents in order."""
+        plan = _plan(
+            ["kubernetes_agent", "logs_agent", "metrics_agent"],
+            [["logs_agent", "metrics_agent"], ["metrics_agent", "logs_agent"]],
+        )
+
+        assert plan_execution_waves(plan) == [
+            ["kubernetes_agent"],
+            ["logs_agent"],
+            ["metrics_agent"],
+        ]
+
+    def test_unknown_and_malformed_dependencies_ignored(self):
+        """Test that dependencies on agents outside the plan are ignored."""
+        plan = _plan(
+            ["logs_agent", "metrics_agent"],
+            [["search_agent", "logs_agent"], ["metrics_agent"]],
+        )
+
+        assert plan_execution_waves(plan) == [["logs_agent", "metrics_agent"]]
+
+    def test_repeated_agents_run_sequentially(self):
+        """Test that plans repeating an agent are not parallelised."""
+        plan = _plan(["logs_agent", "metrics_agent", "logs_agent"], [])
+
+        assert plan_execution_waves(plan) == [
+            ["logs_agent"],
+            ["metrics_agent"],
+            ["logs_agent"],
+        ]
+
+
+class TestParallelDispatch:
+    """Tests for routing and merging parallel agent results."""
+
+    def test_route_fans_out_wave(self):
+        """Test that a multi-agent wave routes to every agent node."""
+        state = {"next": "logs_agent", "next_wave": ["logs_agent", "metrics_agent"]}
+
+        assert _route_supervisor(state) == ["logs_agent", "metrics_agent"]
+
+    def test_route_single_agent(self):
+        """Test that single-agent waves route as before."""
+        state = {"next": "logs_agent", "next_wave": ["logs_agent"]}
+
+        assert _route_supervisor(state) == "logs_agent"
+
+    def test_route_finish(self):
+        """Test that FINISH goes to aggregation even with a stale wave."""
+        state = {"next": "FINISH", "next_wave": ["logs_agent", "metrics_agent"]}
+
+        assert _route_supervisor(state) == "aggregate"
+
+    def test_reducers_merge_parallel_updates(self):
+        """Test that results and invoked agents from one step are combined."""
+        results = _merge_dicts({"Application Logs Agent": "a"}, None)
+        results = _merge_dicts(results, {"Performance Metrics Agent": "b"})
+        invoked = _merge_unique(["Application Logs Agent"], ["Application Logs Agent"])
+        invoked = _merge_unique(invoked, ["Performance Metrics Agent"])
+
+        assert results == {
+            "Application Logs Agent": "a",
+            "Performance Metrics Agent": "b",
+        }
+        assert invoked == ["Application Logs Agent", "Performance Metrics Agent"]
+
+    def test_results_ordered_by_plan(self):
+        """Test that aggregation sees results in plan order."""
+        results = {
+            "Performance Metrics Agent": "b",
+            "Operational Runbooks Agent": "c",
+            "Application Logs Agent": "a",
+        }
+        plan = {"agents_sequence": ["logs_agent", "metrics_agent", "runbooks_agent"]}
+
+        assert list(_order_agent_results(results, plan)) == [
+            "Application Logs Agent",
+            "Performance Metrics Agent",
+            "Operational Runbooks Agent",
+        ]
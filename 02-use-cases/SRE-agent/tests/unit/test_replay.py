@@ -0,0 +1,67 @@
+import asyncio
+import copy
+from pathlib import Path
+
+import pytest
+
+from sre_agent.replay import InvestigationReplay, load_fixture
+
+FIXTURE = (
+    Path(__file__).parent.parent
+    / "fixtures"
+    / "replay"
+    / "api_latency_investigation.json"
+)
+
+
+@pytest.fixture
+def fixture(monkeypatch):
+    """Sample fixture, with the memory system off as replays require."""
+    monkeypatch.setenv("MEMORY_ENABLED", "false")
+    return load_fixture(str(FIXTURE))
+
+
+class TestInvestigationReplay:
+    """Tests for replaying recorded investigations through the agent graph."""
+
+    def test_replay_follows_the_recording(self, fixture):
+        """Test that repeated replays match the recording and time every node."""
+        replay = InvestigationReplay(fixture)
+
+        first = asyncio.run(replay.run())
+        second = asyncio.run(replay.run(trace_allocations=True))
+
+        assert first["divergences"] == []
+        assert first["matches_recording"]
+        assert second["final_response"] == first["final_response"]
+        assert first["tool_calls"] == len(fixture["tool_calls"])
+        assert set(first["nodes"]) == {
+            "prepare",
+            "supervisor",
+            "metrics_agent",
+            "logs_agent",
+            "aggregate",
+        }
+        assert first["phases"]["agents"] > 0
+        assert {node: usage["calls"] for node, usage in first["llm"].items()} == {
+            node: len(calls) for node, calls in fixture["llm_calls"].items()
+        }
+        assert second["allocations"]["peak_bytes"] > 0
+
+    def test_unrecorded_calls_are_reported(self, fixture):
+        """Test that a tool call the recording has no result for is a divergence."""
+        changed = copy.deepcopy(fixture)
+        call = changed["llm_calls"]["metrics_agent"][0]["message"]["data"]
+        call["tool_calls"][0]["args"]["service"] = "api-gateway"
+
+        result = asyncio.run(InvestigationReplay(changed).run())
+
+        assert len(result["divergences"]) == 1
+        assert "get_performance_metrics" in result["divergences"][0]
+
+    def test_replay_requires_memory_disabled(self, fixture, monkeypatch):
+        """Test that replays refuse to run against the memory system."""
+        monkeypatch.setenv("MEMORY_ENABLED", "true")
+
+        with pytest.raises(ValueError, match="MEMORY_ENABLED"):
+            InvestigationReplay(fixture)
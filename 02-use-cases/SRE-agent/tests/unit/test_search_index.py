@@ -0,0 +1,172 @@
+import json
+import os
+
+from backend.servers.search_index import (
+    Document,
+    LiveSearchIndex,
+    SearchIndex,
+    markdown_documents,
+    record_document,
+    tokenize,
+)
+
+PLAYBOOKS = [
+    {
+        "id": "memory-pressure-playbook",
+        "title": "High Memory Usage Incident Response",
+        "incident_type": "performance",
+        "severity": "high",
+        "steps": ["Check memory usage", "Restart affected pods"],
+    },
+    {
+        "id": "database-connection-failure",
+        "title": "Database Connection Failure Response",
+        "incident_type": "availability",
+        "severity": "critical",
+        "steps": ["Check database pod status", "Verify connection pool settings"],
+    },
+    {
+        "id": "pod-startup-failure",
+        "title": "Pod Startup Failure Resolution",
+        "incident_type": "deployment",
+        "severity": "medium",
+        "steps": ["Inspect CrashLoopBackOff events", "Review pod logs"],
+    },
+]
+
+MARKDOWN = """# Service Recovery
+
+## Web Service Recovery
+
+**Recovery ID:** `web-service-recovery`
+**Severity:** High
+
+1. Restart unhealthy web pods
+
+---
+
+## Notes without id
+
+Drain traffic before maintenance.
+"""
+
+
+def _index():
+    return SearchIndex(record_document(p, "playbook") for p in PLAYBOOKS)
+
+
+def _ids(hits):
+    return [hit.document.id for hit in hits]
+
+
+class TestSearchIndex:
+    """Tests for ranked keyword search."""
+
+    def test_tokenize_drops_case_punctuation_and_stop_words(self):
+        """Test that text is split into lowercase terms without stop words."""
+        assert tokenize("Check the DB-connection pool, (CrashLoopBackOff)!") == [
+            "check",
+            "db",
+            "connection",
+            "pool",
+            "crashloopbackoff",
+        ]
+
+    def test_title_match_ranks_first(self):
+        """Test that a term in the title outranks the same term in a step."""
+        total, hits = _index().search("memory")
+
+        assert total == 1
+        assert _ids(hits) == ["memory-pressure-playbook"]
+
+        total, hits = _index().search("pod")
+        assert total == 3
+        assert _ids(hits)[0] == "pod-startup-failure"
+
+    def test_documents_matching_more_keywords_rank_higher(self):
+        """Test multi-keyword queries match any term and reward matching all."""
+        total, hits = _index().search("database pool restart")
+
+        assert total == 2
+        assert _ids(hits) == ["database-connection-failure", "memory-pressure-playbook"]
+        assert hits[0].score > hits[1].score
+
+    def test_prefix_matches_longer_terms(self):
+        """Test that a query term matches terms it is a prefix of, below exact."""
+        total, hits = _index().search("crash")
+        assert _ids(hits) == ["pod-startup-failure"]
+
+        # "po" is too short to expand, so only exact "po" would match
+        assert _index().search("po") == (0, [])
+
+        exact = _index().search("pods")[1][0].score
+        prefix = _index().search("pod")[1]
+        memory_hit = next(h for h in prefix if h.document.id.startswith("memory"))
+        assert memory_hit.score < exact
+
+    def test_filters_and_pagination(self):
+        """Test equality filters and offset/limit over the ranking."""
+        index = _index()
+        total, hits = index.search("check", severity="critical")
+        assert (total, _ids(hits)) == (1, ["database-connection-failure"])
+
+        total, everything = index.search("check pod", limit=None)
+        _, page_two = index.search("check pod", offset=1, limit=1)
+        assert total == 3
+        assert _ids(page_two) == _ids(everything)[1:2]
+        assert index.search("check pod", offset=5, limit=1) == (3, [])
+
+    def test_duplicate_ids_keep_first_document(self):
+        """Test that a later document with a known id is not indexed."""
+        duplicate = Document("pod-startup-failure", "markdown", "Other", "", {}, {})
+        index = SearchIndex(
+            [record_document(p, "playbook") for p in PLAYBOOKS] + [duplicate]
+        )
+
+        assert len(index) == len(PLAYBOOKS)
+        assert index.search("other") == (0, [])
+
+
+class TestMarkdownDocuments:
+    """Tests for markdown runbook sections."""
+
+    def test_sections_become_documents(self, tmp_path):
+        """Test that each section is a document with its id and metadata."""
+        path = tmp_path / "service_recovery.md"
+        path.write_text(MARKDOWN)
+
+        documents = markdown_documents(path)
+
+        assert [d.id for d in documents] == [
+            "web-service-recovery",
+            "service_recovery#notes-without-id",
+        ]
+        assert documents[0].title == "Web Service Recovery"
+        assert documents[0].fields == {"severity": "high"}
+        assert documents[0].payload["file"] == "service_recovery.md"
+        assert not documents[0].text.endswith("---")
+
+
+class TestLiveSearchIndex:
+    """Tests for rebuilding the index when source files change."""
+
+    def test_rebuilds_only_when_files_change(self, tmp_path):
+        """Test that the index is built once and rebuilt after an edit."""
+        path = tmp_path / "incident_playbooks.json"
+        path.write_text(json.dumps({"playbooks": PLAYBOOKS[:1]}))
+        os.utime(path, (1000, 1000))
+
+        def load():
+            records = json.loads(path.read_text())["playbooks"]
+            return [record_document(r, "playbook") for r in records]
+
+        index = LiveSearchIndex(load, lambda: [path], check_interval=0)
+        assert index.search("database")[0] == 0
+        assert index.search("memory")[0] == 1
+        assert index.builds == 1
+
+        path.write_text(json.dumps({"playbooks": PLAYBOOKS}))
+        os.utime(path, (2000, 2000))
+
+        assert index.search("database")[0] == 1
+        assert index.builds == 2
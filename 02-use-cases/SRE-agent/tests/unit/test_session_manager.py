@@ -0,0 +1,199 @@
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+from langchain_core.messages import AIMessage, HumanMessage
+
+from sre_agent import agent_runtime
+from sre_agent.session_manager import (
+    InvocationScheduler,
+    QueueFullError,
+    SessionManager,
+    SessionStore,
+)
+
+
+def _exchange(prompt: str, response: str):
+    return [HumanMessage(content=prompt), AIMessage(content=response)]
+
+
+class _RecordingGraph:
+    """Graph stand-in that answers with the number of messages it was given."""
+
+    def __init__(self):
+        self.states = []
+
+    async def astream(self, state):
+        self.states.append(state)
+        yield {"aggregate": {"final_response": f"seen {len(state['messages'])}"}}
+
+
+class TestSessionStore:
+    """Tests for the in-memory LRU of session conversations."""
+
+    def test_least_recent_sessions_spill_to_sqlite(self, tmp_path):
+        """Test that evicted sessions are read back from SQLite."""
+        store = SessionStore(str(tmp_path / "sessions.db"), max_sessions=2)
+        for name in ("a", "b", "c"):
+            store.put(name, "user", _exchange(f"q-{name}", f"r-{name}"))
+
+        assert store.stats() == {"in_memory": 2, "stored": 1, "spilled": 1}
+        messages = store.get("a")
+        assert [type(m) for m in messages] == [HumanMessage, AIMessage]
+        assert [m.content for m in messages] == ["q-a", "r-a"]
+        # Reading "a" back made room by spilling "b"
+        assert store.stats()["spilled"] == 2
+
+    def test_close_persists_sessions(self, tmp_path):
+        """Test that closed stores are reloaded by a new store on the same file."""
+        path = str(tmp_path / "sessions.db")
+        store = SessionStore(path)
+        store.put("a", "user", _exchange("q", "r"))
+        store.close()
+
+        assert [m.content for m in SessionStore(path).get("a")] == ["q", "r"]
+        assert SessionStore(path).get("unknown") == []
+
+    def test_history_is_trimmed_to_whole_exchanges(self, tmp_path):
+        """Test that trimmed history starts with a user message."""
+        store = SessionStore(str(tmp_path / "sessions.db"), max_messages=3)
+        store.put("a", "user", _exchange("q1", "r1") + _exchange("q2", "r2"))
+
+        assert [m.content for m in store.get("a")] == ["q2", "r2"]
+        assert not (tmp_path / "sessions.db").exists()
+
+
+class TestInvocationScheduler:
+    """Tests for bounded, fair admission."""
+
+    def test_waiting_users_are_served_round_robin(self):
+        """Test that a user with many queued invocations does not starve others."""
+        order = []
+
+        async def invoke(scheduler, user, name, hold):
+            async with scheduler.slot(user):
+                order.append(name)
+                await hold.wait()
+
+        async def run():
+            scheduler = InvocationScheduler(max_concurrent=1)
+            hold = asyncio.Event()
+            tasks = [asyncio.create_task(invoke(scheduler, "a", "a1", hold))]
+            await asyncio.sleep(0)
+            for user, name in (("a", "a2"), ("a", "a3"), ("b", "b1")):
+                tasks.append(asyncio.create_task(invoke(scheduler, user, name, hold)))
+                await asyncio.sleep(0)
+            assert scheduler.queue_depth == 3
+            hold.set()
+            await asyncio.gather(*tasks)
+            return scheduler.metrics()
+
+        metrics = asyncio.run(run())
+
+        assert order == ["a1", "a2", "b1", "a3"]
+        assert metrics["admitted"] == 4
+        assert metrics["max_queue_depth"] == 3
+        assert metrics["running"] == 0
+
+    def test_full_queue_rejects_and_cancelled_waiters_leave(self):
+        """Test queue limits and removal of cancelled waiters."""
+
+        async def run():
+            scheduler = InvocationScheduler(max_concurrent=1, max_queued=1)
+            await scheduler.acquire("a")
+            waiter = asyncio.create_task(scheduler.acquire("b"))
+            await asyncio.sleep(0)
+            assert scheduler.full
+            with pytest.raises(QueueFullError):
+                await scheduler.acquire("c")
+
+            waiter.cancel()
+            await asyncio.sleep(0)
+            assert scheduler.queue_depth == 0
+            scheduler.release()
+            return scheduler.metrics()
+
+        metrics = asyncio.run(run())
+
+        assert metrics["rejected"] == 1
+        assert metrics["running"] == 0
+
+
+class TestSessionManager:
+    """Tests for ordered, history-carrying session turns."""
+
+    def test_turns_of_a_session_run_in_order_with_history(self, tmp_path):
+        """Test that concurrent turns of one session see each other's exchange."""
+        manager = SessionManager(
+            SessionStore(str(tmp_path / "sessions.db")),
+            InvocationScheduler(max_concurrent=4),
+        )
+        seen = []
+
+        async def turn(prompt):
+            async with manager.turn("s1", "user") as session_turn:
+                seen.append(len(session_turn.history))
+                await asyncio.sleep(0.01)
+                session_turn.record(prompt, f"answer to {prompt}")
+
+        async def run():
+            await asyncio.gather(turn("first"), turn("second"))
+
+        asyncio.run(run())
+
+        assert seen == [0, 2]
+        assert [m.content for m in manager.store.get("s1")] == [
+            "first",
+            "answer to first",
+            "second",
+            "answer to second",
+        ]
+        assert manager.metrics()["sessions"]["active"] == 0
+
+
+class TestRuntimeSessions:
+    """Tests for sessions and metrics on the agent runtime endpoints."""
+
+    @pytest.fixture
+    def graph(self, monkeypatch, tmp_path):
+        graph = _RecordingGraph()
+        monkeypatch.setattr(agent_runtime, "agent_graph", graph)
+        monkeypatch.setattr(
+            agent_runtime,
+            "session_manager",
+            SessionManager(
+                SessionStore(str(tmp_path / "sessions.db")), InvocationScheduler()
+            ),
+        )
+        return graph
+
+    def test_follow_up_turns_include_previous_exchange(self, graph):
+        """Test that a session's second invocation starts from its history."""
+        with TestClient(agent_runtime.app) as client:
+            for prompt in ("pods?", "and logs?"):
+                response = client.post(
+                    "/invocations",
+                    json={"input": {"prompt": prompt, "session_id": "s1"}},
+                )
+                assert response.status_code == 200
+            metrics = client.get("/metrics").json()
+
+        assert [m.content for m in graph.states[1]["messages"]] == [
+            "pods?",
+            "seen 1",
+            "and logs?",
+        ]
+        assert metrics["admitted"] == 2
+        assert metrics["sessions"]["in_memory"] == 1
+
+    def test_full_queue_returns_503(self, graph):
+        """Test that invocations are rejected while the queue is full."""
+        agent_runtime.session_manager.scheduler = InvocationScheduler(
+            max_concurrent=1, max_queued=0
+        )
+        agent_runtime.session_manager.scheduler.running = 1
+
+        with TestClient(agent_runtime.app) as client:
+            response = client.post("/invocations", json={"input": {"prompt": "x"}})
+
+        assert response.status_code == 503
@@ -0,0 +1,149 @@
+import json
+import os
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import pytest
+
+from backend.servers.data_store import Dataset
+from backend.servers.timeseries_store import TimeSeriesStore, format_epoch
+
+BASE_TIME = datetime(2024, 1, 15, 14, 0, tzinfo=timezone.utc)
+
+
+def _parse(value: str) -> datetime:
+    return datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+
+def _metrics(count: int, service: str = "web-service", step: int = 60):
+    return [
+        {
+            "timestamp": format_epoch(
+                (BASE_TIME + timedelta(seconds=i * step)).timestamp()
+            ),
+            "service": service,
+            "cpu_usage_percent": i % 100,
+            "memory_usage_mb": 500 + i,
+        }
+        for i in range(count)
+    ]
+
+
+def _store(tmp_path, records, mtime=None):
+    path = tmp_path / "resource_usage.json"
+    path.write_text(json.dumps({"metrics": records}))
+    if mtime is not None:
+        os.utime(path, (mtime, mtime))
+    dataset = Dataset(
+        path,
+        records_key="metrics",
+        indexes=("service",),
+        time_field="timestamp",
+        time_parser=_parse,
+        check_interval=0,
+    )
+    return TimeSeriesStore(dataset), dataset
+
+
+class TestTimeSeriesStore:
+    """Tests for columnar series slicing and rollups."""
+
+    def test_short_series_are_returned_raw_in_file_order(self, tmp_path):
+        """Test that series under max_points return their record positions."""
+        records = [
+            record
+            for pair in zip(_metrics(3), _metrics(3, service="api-service"))
+            for record in pair
+        ]
+        store, _ = _store(tmp_path, records)
+
+        result = store.query(max_points=10)
+
+        assert result["positions"] == list(range(6))
+        assert result["rollups"] == []
+        assert [s["service"] for s in result["summary"]] == [
+            "web-service",
+            "api-service",
+        ]
+
+    def test_range_slicing_matches_dataset_select(self, tmp_path):
+        """Test that windows hold what a per-record time filter returns."""
+        records = _metrics(50) + _metrics(50, service="api-service", step=37)
+        store, _ = _store(tmp_path, records)
+        since = BASE_TIME + timedelta(minutes=10)
+        until = BASE_TIME + timedelta(minutes=20)
+
+        result = store.query(since=since, until=until, service="api-service")
+
+        expected = [
+            r
+            for r in records
+            if r["service"] == "api-service"
+            and since <= _parse(r["timestamp"]) <= until
+        ]
+        assert store.records(result["positions"]) == expected
+
+    def test_summary_statistics_match_numpy(self, tmp_path):
+        """Test whole-window avg/percentiles/max against numpy."""
+        records = _metrics(37)
+        store, _ = _store(tmp_path, records)
+        values = np.array([r["cpu_usage_percent"] for r in records], dtype=float)
+
+        (summary,) = store.query(fields={"cpu": "cpu_usage_percent"})["summary"]
+
+        assert summary["count"] == 37
+        assert summary["timestamp"] == records[0]["timestamp"]
+        assert summary["end_timestamp"] == records[-1]["timestamp"]
+        assert summary["cpu"] == {
+            "avg": pytest.approx(values.mean(), abs=1e-3),
+            "p50": pytest.approx(np.percentile(values, 50), abs=1e-3),
+            "p95": pytest.approx(np.percentile(values, 95), abs=1e-3),
+            "p99": pytest.approx(np.percentile(values, 99), abs=1e-3),
+            "max": values.max(),
+        }
+        assert "memory_usage_mb" not in summary
+
+    def test_long_series_are_downsampled(self, tmp_path):
+        """Test that a series over max_points becomes at most max_points buckets."""
+        records = _metrics(1000)
+        store, _ = _store(tmp_path, records)
+
+        result = store.query(max_points=24)
+        buckets = result["rollups"]
+
+        assert result["positions"] == []
+        assert 1 < len(buckets) <= 24
+        assert sum(b["count"] for b in buckets) == 1000
+        width = buckets[0]["bucket_seconds"]
+        first = [
+            r["memory_usage_mb"]
+            for r in records
+            if _parse(r["timestamp"]) < BASE_TIME + timedelta(seconds=width)
+        ]
+        assert buckets[0]["memory_usage_mb"]["avg"] == pytest.approx(
+            np.mean(first), abs=1e-3
+        )
+        assert buckets[0]["memory_usage_mb"]["max"] == max(first)
+
+    def test_missing_values_are_skipped(self, tmp_path):
+        """Test that records lacking a field do not count towards its stats."""
+        records = _metrics(4)
+        del records[1]["cpu_usage_percent"]
+        records.append({"service": "web-service", "cpu_usage_percent": 99})
+        store, _ = _store(tmp_path, records)
+
+        (summary,) = store.query()["summary"]
+
+        assert summary["count"] == 4
+        assert summary["cpu_usage_percent"]["max"] == 3
+
+    def test_latest_and_rebuild_on_reload(self, tmp_path):
+        """Test that a changed data file is re-read into new series."""
+        store, _ = _store(tmp_path, _metrics(3), mtime=1000)
+        assert store.latest() == BASE_TIME + timedelta(minutes=2)
+
+        # Rewrites the same file with two more points
+        _store(tmp_path, _metrics(5), mtime=2000)
+
+        assert store.latest() == BASE_TIME + timedelta(minutes=4)
+        assert store.builds == 2
@@ -0,0 +1,193 @@
+import asyncio
+
+import pytest
+from langchain_core.tools import StructuredTool
+
+from sre_agent import tool_cache
+from sre_agent.tool_cache import (
+    ToolResultCache,
+    cache_tool,
+    start_tool_cache_scope,
+    tool_cache_report,
+)
+
+
+class _Backend:
+    """Counts requests and answers after a short delay."""
+
+    def __init__(self, delay: float = 0.01, fail: bool = False):
+        self.delay = delay
+        self.fail = fail
+        self.requests = []
+
+    async def get_pod_status(self, **kwargs):
+        self.requests.append(kwargs)
+        await asyncio.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError("backend unavailable")
+        return f"pods in {kwargs.get('namespace')}", None
+
+
+def _mcp_tool(backend: _Backend) -> StructuredTool:
+    return StructuredTool(
+        name="k8s-api___get_pod_status",
+        description="Get pod status",
+        args_schema={
+            "type": "object",
+            "properties": {
+                "namespace": {"type": "string"},
+                "pod_name": {"type": "string"},
+            },
+        },
+        coroutine=backend.get_pod_status,
+        response_format="content_and_artifact",
+    )
+
+
+def _call(cache, backend, scope="inv-1", **args):
+    return cache.call(
+        scope, "get_pod_status", args, lambda: backend.get_pod_status(**args)
+    )
+
+
+class TestToolResultCache:
+    """Tests for sharing tool results within a scope."""
+
+    def test_identical_calls_are_served_from_cache(self):
+        """Test hits for the same arguments in any order, misses otherwise."""
+        backend = _Backend()
+        cache = ToolResultCache()
+
+        async def run():
+            return [
+                await _call(cache, backend, namespace="prod", pod_name="web"),
+                await _call(cache, backend, pod_name="web", namespace="prod"),
+                await _call(cache, backend, namespace="staging", pod_name="web"),
+                await _call(cache, backend, "inv-2", namespace="prod", pod_name="web"),
+            ]
+
+        outcomes = [outcome for _, outcome in asyncio.run(run())]
+
+        assert outcomes == ["misses", "hits", "misses", "misses"]
+        assert len(backend.requests) == 3
+
+    def test_concurrent_identical_calls_share_one_request(self):
+        """Test that calls made while the first is in flight wait for its result."""
+        backend = _Backend(delay=0.05)
+        cache = ToolResultCache()
+
+        async def run():
+            return await asyncio.gather(
+                *(_call(cache, backend, namespace="prod") for _ in range(5))
+            )
+
+        results = asyncio.run(run())
+
+        assert len(backend.requests) == 1
+        assert sorted(outcome for _, outcome in results) == ["coalesced"] * 4 + [
+            "misses"
+        ]
+        assert {result for result, _ in results} == {("pods in prod", None)}
+        assert cache.stats()["in_flight"] == 0
+
+    def test_results_expire_after_ttl(self, monkeypatch):
+        """Test that results older than the TTL are fetched again."""
+        now = [1000.0]
+        monkeypatch.setattr(tool_cache.time, "monotonic", lambda: now[0])
+        backend = _Backend(delay=0)
+        cache = ToolResultCache(ttl_seconds=30)
+
+        async def run():
+            await _call(cache, backend, namespace="prod")
+            now[0] += 29
+            await _call(cache, backend, namespace="prod")
+            now[0] += 2
+            await _call(cache, backend, namespace="prod")
+
+        asyncio.run(run())
+
+        assert len(backend.requests) == 2
+
+    def test_failures_reach_waiters_and_are_not_cached(self):
+        """Test that a failed call fails its waiters and is retried next time."""
+        backend = _Backend(fail=True)
+        cache = ToolResultCache()
+
+        async def run():
+            results = await asyncio.gather(
+                _call(cache, backend, namespace="prod"),
+                _call(cache, backend, namespace="prod"),
+                return_exceptions=True,
+            )
+            backend.fail = False
+            return results, await _call(cache, backend, namespace="prod")
+
+        results, retry = asyncio.run(run())
+
+        assert all(isinstance(r, RuntimeError) for r in results)
+        assert retry[1] == "misses"
+        assert len(backend.requests) == 2
+
+    def test_waiter_takes_over_when_the_requesting_call_is_cancelled(self):
+        """Test that cancelling the first caller does not fail the second."""
+        backend = _Backend(delay=0.05)
+        cache = ToolResultCache()
+
+        async def run():
+            first = asyncio.create_task(_call(cache, backend, namespace="prod"))
+            await asyncio.sleep(0)
+            second = asyncio.create_task(_call(cache, backend, namespace="prod"))
+            await asyncio.sleep(0.01)
+            first.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await first
+            return await second
+
+        result, outcome = asyncio.run(run())
+
+        assert outcome == "misses"
+        assert result == ("pods in prod", None)
+        assert len(backend.requests) == 2
+
+
+class TestCachedTools:
+    """Tests for MCP tools wrapped with the cache."""
+
+    def test_agents_of_an_investigation_share_tool_results(self):
+        """Test per-agent statistics and the investigation report."""
+        backend = _Backend()
+        tool = cache_tool(_mcp_tool(backend), ToolResultCache())
+
+        async def agent(scope):
+            stats = start_tool_cache_scope(scope)
+            for _ in range(2):
+                await tool.ainvoke({"namespace": "prod"})
+            return stats.as_dict()
+
+        async def run():
+            return await asyncio.gather(agent("inv-1"), agent("inv-1"))
+
+        first, second = asyncio.run(run())
+        report = tool_cache_report(
+            {"Kubernetes_Agent_tool_cache": first, "Logs_Agent_tool_cache": second}
+        )
+
+        assert len(backend.requests) == 1
+        assert report["calls"] == 4
+        assert report["misses"] == 1
+        assert report["hit_rate"] == 0.75
+
+    def test_calls_outside_an_investigation_are_not_cached(self):
+        """Test that the wrapped tool behaves like the original without a scope."""
+        backend = _Backend()
+        original = _mcp_tool(backend)
+        tool = cache_tool(original, ToolResultCache())
+
+        async def run():
+            start_tool_cache_scope(None)
+            return [await tool.ainvoke({"namespace": "prod"}) for _ in range(2)]
+
+        assert asyncio.run(run()) == ["pods in prod"] * 2
+        assert len(backend.requests) == 2
+        assert tool.name == original.name
+        assert tool.response_format == "content_and_artifact"
@@ -0,0 +1,168 @@
+import asyncio
+import json
+
+import pytest
+from langchain_core.tools import StructuredTool
+
+from sre_agent import multi_agent_langgraph, tool_discovery
+from sre_agent.constants import SREConstants
+from sre_agent.tool_discovery import ToolSchemaCache, schema_version
+
+GATEWAY_URL = "https://gateway.example.com/mcp"
+
+
+def _schema(name: str, description: str = "Get pod status"):
+    return {
+        "name": name,
+        "description": description,
+        "inputSchema": {
+            "type": "object",
+            "properties": {"namespace": {"type": "string"}},
+        },
+    }
+
+
+SCHEMAS = [_schema("k8s-api___get_pod_status"), _schema("logs-api___search_logs")]
+
+
+class TestToolSchemaCache:
+    """Tests for the on-disk tool schema cache."""
+
+    def test_saved_schemas_are_loaded_per_gateway(self, tmp_path):
+        """Test round trip and schema versions independent of tool order."""
+        cache = ToolSchemaCache(str(tmp_path / "tools.json"))
+
+        version = cache.save(GATEWAY_URL, SCHEMAS)
+        entry = cache.load(GATEWAY_URL)
+
+        assert entry["tools"] == SCHEMAS
+        assert entry["version"] == version == schema_version(SCHEMAS[::-1])
+        assert schema_version([_schema("k8s-api___get_pod_status", "v2")]) != version
+        assert cache.load("https://other-gateway.example.com/mcp") is None
+
+    def test_unreadable_or_old_format_files_are_ignored(self, tmp_path):
+        """Test that a bad cache file means listing tools from the gateway."""
+        path = tmp_path / "tools.json"
+        cache = ToolSchemaCache(str(path))
+
+        path.write_text("{not json")
+        assert cache.load(GATEWAY_URL) is None
+
+        path.write_text(json.dumps({"format": 0, "gateways": {GATEWAY_URL: {}}}))
+        assert cache.load(GATEWAY_URL) is None
+        cache.save(GATEWAY_URL, SCHEMAS)
+        assert cache.load(GATEWAY_URL)["tools"] == SCHEMAS
+
+
+class TestStartupToolLoading:
+    """Tests for loading the gateway tools in create_multi_agent_system."""
+
+    @pytest.fixture
+    def gateway(self, monkeypatch, tmp_path):
+        """Gateway listing stand-in that counts listings."""
+        listings = []
+        schemas = list(SCHEMAS)
+
+        async def list_gateway_tools(client):
+            listings.append(client.connections["gateway"]["url"])
+            await asyncio.sleep(0)
+            return list(schemas)
+
+        monkeypatch.setattr(
+            multi_agent_langgraph,
+            "_read_gateway_config",
+            lambda: ("https://gateway.example.com", "token", "us-east-1"),
+        )
+        monkeypatch.setattr(
+            multi_agent_langgraph, "list_gateway_tools", list_gateway_tools
+        )
+        monkeypatch.setattr(tool_discovery, "list_gateway_tools", list_gateway_tools)
+        monkeypatch.setattr(
+            SREConstants.tool_discovery,
+            "schema_cache_path",
+            str(tmp_path / "tools.json"),
+        )
+        return listings, schemas
+
+    def test_cached_schemas_skip_the_gateway_at_startup(self, gateway):
+        """Test that the second start builds tools from the cache and revalidates."""
+        listings, _ = gateway
+
+        async def run():
+            first = await multi_agent_langgraph._load_mcp_tools()
+            second = await multi_agent_langgraph._load_mcp_tools()
+            listed_before_revalidation = len(listings)
+            changed = await asyncio.gather(*tool_discovery._revalidations)
+            return first, second, listed_before_revalidation, changed
+
+        first, second, listed_before_revalidation, changed = asyncio.run(run())
+
+        assert [t.name for t in second] == [t.name for t in first]
+        assert second[0].args == {"namespace": {"type": "string"}}
+        assert listed_before_revalidation == 1
+        assert listings == [GATEWAY_URL, GATEWAY_URL]
+        assert changed == [False]
+
+    def test_revalidation_stores_changed_schemas(self, gateway):
+        """Test that tools added to the gateway reach the cache for the next start."""
+        _, schemas = gateway
+
+        async def run():
+            await multi_agent_langgraph._load_mcp_tools()
+            schemas.append(_schema("metrics-api___get_error_rates"))
+            await multi_agent_langgraph._load_mcp_tools()
+            changed = await asyncio.gather(*tool_discovery._revalidations)
+            return changed, await multi_agent_langgraph._load_mcp_tools()
+
+        changed, tools = asyncio.run(run())
+
+        assert changed == [True]
+        assert len(tools) == 3
+
+
+class TestRateLimitRetry:
+    """Tests for backing off while the gateway answers 429."""
+
+    @pytest.fixture(autouse=True)
+    def no_backoff(self, monkeypatch):
+        monkeypatch.setattr(tool_discovery, "_backoff_seconds", lambda attempt: 0)
+
+    def _flaky_tool(self, errors):
+        """Tool that raises the given errors on its first calls."""
+        calls = []
+
+        async def get_pod_status(namespace: str) -> str:
+            """Get pod status"""
+            calls.append(namespace)
+            if len(calls) <= len(errors):
+                raise errors[len(calls) - 1]
+            return f"pods in {namespace}"
+
+        tool = StructuredTool.from_function(coroutine=get_pod_status)
+        return tool_discovery.retry_rate_limited(tool), calls
+
+    def test_lazily_connected_tool_retries_when_rate_limited(self):
+        """Test that a 429 on a tool's first connection is retried."""
+        tool, calls = self._flaky_tool(
+            [
+                ExceptionGroup("connect", [RuntimeError("429 Too Many Requests")]),
+                RuntimeError("Client error '429 Too Many Requests'"),
+            ]
+        )
+
+        result = asyncio.run(tool.ainvoke({"namespace": "production"}))
+
+        assert result == "pods in production"
+        assert len(calls) == 3
+
+    def test_other_errors_and_exhausted_retries_are_raised(self):
+        """Test that only rate limiting is retried, and at most three times."""
+        tool, calls = self._flaky_tool([ValueError("bad namespace")])
+        with pytest.raises(ValueError):
+            asyncio.run(tool.ainvoke({"namespace": "production"}))
+        assert len(calls) == 1
+
+        tool, calls = self._flaky_tool([RuntimeError("429 Too Many Requests")] * 3)
+        with pytest.raises(RuntimeError):
+            asyncio.run(tool.ainvoke({"namespace": "production"}))
+        assert len(calls) == 3
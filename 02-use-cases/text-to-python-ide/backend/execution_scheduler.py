@@ -0,0 +1,199 @@
+"""
+Execution scheduler for the blocking work of the IDE backend.
+
+Strands agent calls and code interpreter invocations are synchronous, so the
+async endpoints hand them to the scheduler instead of calling them on the
+event loop, where one long chart execution would stall every other request.
+Jobs run on a bounded pool of worker threads. Jobs of one IDE session run one
+at a time in arrival order, waiting on the event loop rather than in a worker,
+so a busy session does not hold threads that other sessions could use.
+
+A job that is still waiting for its session or for a worker is dropped when
+its caller is cancelled, e.g. when its websocket disconnects. A job that has
+started cannot be interrupted; it runs to completion on its worker, keeps its
+session busy until then, and its result is discarded.
+"""
+
+import asyncio
+import contextvars
+import os
+import threading
+import time
+from collections import deque
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+
+class SchedulerBusyError(Exception):
+    """Raised when the maximum number of jobs are already waiting"""
+
+
+def _percentiles(samples) -> dict[str, float]:
+    """p50, p95 and max of durations in seconds, as milliseconds"""
+    samples = sorted(samples)
+
+    def percentile(p):
+        if not samples:
+            return 0.0
+        return round(samples[min(len(samples) - 1, int(p * len(samples)))] * 1000, 2)
+
+    return {"p50": percentile(0.5), "p95": percentile(0.95), "max": percentile(1.0)}
+
+
+class ExecutionScheduler:
+    """Runs blocking calls on bounded worker threads, one at a time per session
+
+    Args:
+        max_workers: Jobs running at once across all sessions
+        max_queued: Jobs waiting for their session or a worker; further jobs
+            are rejected with SchedulerBusyError
+    """
+
+    def __init__(self, max_workers: int = 8, max_queued: int = 100):
+        self.max_workers = max_workers
+        self.max_queued = max_queued
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="ide-worker"
+        )
+
+        # Session locks live on the event loop; counters are also updated by workers
+        self._session_locks: dict[str, asyncio.Lock] = {}
+        self._session_jobs: dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._running = 0
+        self._queue_seconds = deque(maxlen=1000)
+        self._run_seconds = deque(maxlen=1000)
+        self._counts = {
+            "submitted": 0,
+            "completed": 0,
+            "failed": 0,
+            "cancelled": 0,
+            "rejected": 0,
+        }
+
+    def _count(self, key: str, queued: int = 0) -> None:
+        with self._lock:
+            self._counts[key] += 1
+            self._queued += queued
+
+    def _work(self, submitted: float, fn: Callable, args, kwargs):
+        """Worker side of a job: records queue and run time around the call"""
+        started = time.perf_counter()
+        with self._lock:
+            self._queued -= 1
+            self._running += 1
+            self._queue_seconds.append(started - submitted)
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            with self._lock:
+                self._running -= 1
+                self._run_seconds.append(time.perf_counter() - started)
+
+    async def run(self, session_id: str | None, fn: Callable, *args, **kwargs) -> Any:
+        """Run fn(*args, **kwargs) on a worker thread and return its result
+
+        Context variables of the caller are visible to fn.
+
+        Args:
+            session_id: IDE session of the job; jobs of a session run one at
+                a time. None runs the job without serialization.
+
+        Raises:
+            SchedulerBusyError: If max_queued jobs are already waiting
+        """
+        with self._lock:
+            if self._queued >= self.max_queued:
+                self._counts["rejected"] += 1
+                raise SchedulerBusyError(
+                    f"{self._queued} executions are already waiting, try again shortly"
+                )
+            self._queued += 1
+            self._counts["submitted"] += 1
+        submitted = time.perf_counter()
+
+        session_lock = None
+        if session_id is not None:
+            session_lock = self._session_locks.setdefault(session_id, asyncio.Lock())
+            self._session_jobs[session_id] = self._session_jobs.get(session_id, 0) + 1
+
+        def session_done(_=None, release=True):
+            if session_lock is None:
+                return
+            if release:
+                session_lock.release()
+            self._session_jobs[session_id] -= 1
+            if not self._session_jobs[session_id]:
+                del self._session_jobs[session_id]
+                del self._session_locks[session_id]
+
+        if session_lock is not None:
+            try:
+                await session_lock.acquire()
+            except asyncio.CancelledError:
+                self._count("cancelled", queued=-1)
+                session_done(release=False)
+                raise
+
+        context = contextvars.copy_context()
+        try:
+            job = self._executor.submit(
+                context.run, self._work, submitted, fn, args, kwargs
+            )
+        except Exception:
+            # E.g. RuntimeError after close(): the job never reaches a worker
+            self._count("failed", queued=-1)
+            session_done()
+            raise
+        future = asyncio.wrap_future(job)
+        try:
+            result = await asyncio.shield(future)
+        except asyncio.CancelledError:
+            if job.cancel():
+                # Never started: free the session for its next job
+                self._count("cancelled", queued=-1)
+                session_done()
+            else:
+                # Already running: the session stays busy until it finishes
+                self._count("cancelled")
+                future.add_done_callback(lambda f: f.cancelled() or f.exception())
+                future.add_done_callback(session_done)
+            raise
+        except Exception:
+            self._count("failed")
+            session_done()
+            raise
+
+        self._count("completed")
+        session_done()
+        return result
+
+    def close(self) -> None:
+        """Drop waiting jobs; running jobs finish on their workers"""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            stats = {
+                "max_workers": self.max_workers,
+                "max_queued": self.max_queued,
+                "running": self._running,
+                "queued": self._queued,
+                "busy_sessions": len(self._session_locks),
+                **self._counts,
+            }
+            queue_seconds = list(self._queue_seconds)
+            run_seconds = list(self._run_seconds)
+        stats["queue_ms"] = _percentiles(queue_seconds)
+        stats["run_ms"] = _percentiles(run_seconds)
+        return stats
+
+
+def create_execution_scheduler() -> ExecutionScheduler:
+    """Execution scheduler configured from the environment"""
+    return ExecutionScheduler(
+        max_workers=int(os.getenv("IDE_MAX_WORKERS", "8")),
+        max_queued=int(os.getenv("IDE_MAX_QUEUED", "100")),
+    )
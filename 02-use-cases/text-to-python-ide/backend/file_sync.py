@@ -0,0 +1,199 @@
+"""
+Content-addressed storage of uploaded files and upload-once sync to sandboxes.
+
+Uploaded files are kept on local disk under their SHA-256 digest instead of
+in the IDE session, which only keeps the digest. Each pooled sandbox records
+the digest of every file written to it, so an execution sends a file only
+when the sandbox does not hold that version yet. Files larger than the chunk
+size are written in parts and joined inside the sandbox. Code that overwrites
+an uploaded file in the sandbox keeps its version until different content is
+uploaded under that name.
+"""
+
+import hashlib
+import os
+import tempfile
+import threading
+from typing import Any
+
+
+class FileSyncError(Exception):
+    """Raised when the sandbox rejects a file upload"""
+
+
+class FileStore:
+    """Uploaded files on local disk, addressed by SHA-256 of their content
+
+    Args:
+        root: Directory of the stored files; created if missing
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+
+    def path(self, digest: str) -> str:
+        return os.path.join(self.root, digest[:2], digest)
+
+    def put(self, content: str) -> dict[str, Any]:
+        """Store text content; returns its sha256 and size in bytes"""
+        data = content.encode("utf-8")
+        digest = hashlib.sha256(data).hexdigest()
+        path = self.path(digest)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, temporary = tempfile.mkstemp(dir=os.path.dirname(path))
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(temporary, path)
+        return {"sha256": digest, "size": len(data)}
+
+    def read_text(self, digest: str, limit: int | None = None) -> str:
+        """Stored content, or its first limit characters"""
+        with open(self.path(digest), "r", encoding="utf-8") as f:
+            return f.read(limit) if limit is not None else f.read()
+
+    def exists(self, digest: str) -> bool:
+        return os.path.exists(self.path(digest))
+
+
+def _check(response, action: str) -> None:
+    for event in response["stream"]:
+        result = event.get("result", {})
+        if result.get("isError", False):
+            error_content = result.get("content", [{}])
+            error_text = (
+                error_content[0].get("text", "Unknown error")
+                if error_content
+                else "Unknown error"
+            )
+            raise FileSyncError(f"{action}: {error_text}")
+
+
+class SandboxFileSync:
+    """Writes stored files to leased sandboxes, skipping files they already hold
+
+    Args:
+        store: FileStore holding the file contents
+        chunk_chars: Largest file sent in a single writeFiles call; larger
+            files are sent in parts of this many characters
+    """
+
+    def __init__(self, store: FileStore, chunk_chars: int = 1_000_000):
+        self.store = store
+        self.chunk_chars = chunk_chars
+        self._lock = threading.Lock()
+        self._counts = {
+            "files_uploaded": 0,
+            "files_skipped": 0,
+            "bytes_uploaded": 0,
+            "bytes_skipped": 0,
+            "chunks_uploaded": 0,
+        }
+
+    def _count(self, **increments) -> None:
+        with self._lock:
+            for key, value in increments.items():
+                self._counts[key] += value
+
+    def _write_chunked(self, lease, filename: str, digest: str) -> int:
+        """Write a large file as parts and join them in the sandbox; returns parts"""
+        parts = []
+        with open(self.store.path(digest), "r", encoding="utf-8") as f:
+            while True:
+                chunk = f.read(self.chunk_chars)
+                if not chunk:
+                    break
+                part = f"{filename}.part{len(parts):05d}"
+                _check(
+                    lease.invoke(
+                        "writeFiles", {"content": [{"path": part, "text": chunk}]}
+                    ),
+                    f"Upload of {filename} part {len(parts) + 1}",
+                )
+                parts.append(part)
+
+        join_code = f"""def _ide_join_parts(path, parts):
+    import os
+    with open(path, 'w', encoding='utf-8') as out:
+        for part in parts:
+            with open(part, 'r', encoding='utf-8') as f:
+                out.write(f.read())
+            os.remove(part)
+_ide_join_parts({filename!r}, {parts!r})
+del _ide_join_parts"""
+        _check(
+            lease.invoke(
+                "executeCode",
+                {"code": join_code, "language": "python", "clearContext": False},
+            ),
+            f"Joining the parts of {filename}",
+        )
+        return len(parts)
+
+    def sync(self, lease, files: list[dict[str, Any]]) -> None:
+        """Make the leased sandbox hold these files
+
+        Args:
+            lease: SandboxLease of the sandbox
+            files: Dicts with filename, sha256 and size of stored files
+
+        Raises:
+            FileSyncError: If the sandbox rejects an upload
+        """
+        held = lease.files
+        small = []
+        for file_info in files:
+            filename, digest, size = (
+                file_info["filename"],
+                file_info["sha256"],
+                file_info["size"],
+            )
+            if held.get(filename) == digest:
+                print(f"⏭️  {filename} already in sandbox, skipped {size} bytes")
+                self._count(files_skipped=1, bytes_skipped=size)
+                continue
+
+            if size > self.chunk_chars:
+                print(f"📁 Uploading {filename} ({size} bytes) in parts...")
+                parts = self._write_chunked(lease, filename, digest)
+                held[filename] = digest
+                self._count(
+                    files_uploaded=1, bytes_uploaded=size, chunks_uploaded=parts
+                )
+            else:
+                small.append(file_info)
+
+        if small:
+            print(f"📁 Uploading {len(small)} files to sandbox...")
+            files_data = [
+                {"path": f["filename"], "text": self.store.read_text(f["sha256"])}
+                for f in small
+            ]
+            _check(lease.invoke("writeFiles", {"content": files_data}), "File upload")
+            for f in small:
+                held[f["filename"]] = f["sha256"]
+            self._count(
+                files_uploaded=len(small),
+                bytes_uploaded=sum(f["size"] for f in small),
+                chunks_uploaded=len(small),
+            )
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            stats = dict(self._counts)
+        total = stats["bytes_uploaded"] + stats["bytes_skipped"]
+        stats["bytes_skipped_ratio"] = (
+            round(stats["bytes_skipped"] / total, 3) if total else 0.0
+        )
+        return stats
+
+
+def create_file_sync() -> SandboxFileSync:
+    """File store and sandbox sync configured from the environment"""
+    root = os.getenv(
+        "IDE_UPLOAD_DIR",
+        os.path.join(os.path.dirname(os.path.abspath(__file__)), "uploads"),
+    )
+    chunk_chars = int(os.getenv("SANDBOX_UPLOAD_CHUNK_CHARS", "1000000"))
+    return SandboxFileSync(FileStore(root), chunk_chars)
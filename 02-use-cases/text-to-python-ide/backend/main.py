@@ -1,19 +1,30 @@
 import json
 import os
 from typing import Dict, Any, Optional, List
-from fastapi import FastAPI, HTTPException, WebSocket, WebSocketDisconnect
+from fastapi import FastAPI, HTTPException, Response, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 import asyncio
-import uuid
 from dotenv import load_dotenv
 import boto3
 from botocore.exceptions import NoCredentialsError, ProfileNotFound
 from botocore.config import Config
 from contextlib import asynccontextmanager
+import threading
 import time
 from functools import lru_cache
 
+# Warm AgentCore code interpreter sessions, one per IDE session
+from sandbox_pool import create_sandbox_pool
+# Uploaded files on local disk by SHA-256, sent to each sandbox once
+from file_sync import FileSyncError, create_file_sync
+# Bounded worker threads for agent calls and sandbox invocations
+from execution_scheduler import SchedulerBusyError, create_execution_scheduler
+# Incremental stdout processing and chart images by SHA-256
+from output_stream import OutputSplitter, create_image_cache
+# IDE sessions within memory bounds, with their history in SQLite
+from session_store import CONVERSATION, EXECUTION, CodeInterpreterSession, create_session_store
+
 # Load environment variables
 load_dotenv()
 
@@ -119,18 +130,30 @@ except ImportError:
         print("Please ensure strands-agents is installed: pip install strands-agents")
         raise
 
-# Import AgentCore for code interpreter
-from bedrock_agentcore.tools.code_interpreter_client import code_session
+sandbox_pool = None
+file_sync = None
+execution_scheduler = None
+image_cache = None
+session_store = None
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
-    global aws_session, aws_region
+    global aws_session, aws_region, sandbox_pool, file_sync, execution_scheduler, image_cache, session_store
     aws_session, aws_region = setup_aws_credentials()
+    file_sync = create_file_sync()
+    image_cache = create_image_cache()
+    sandbox_pool = create_sandbox_pool(aws_region)
+    execution_scheduler = create_execution_scheduler()
+    session_store = create_session_store(on_evict=release_session_sandbox, image_source=image_cache.get)
     initialize_agents()
+    sandbox_pool.start_maintenance()
+    session_store.start_maintenance()
     yield
-    # Shutdown (if needed)
-    pass
+    # Shutdown: drop waiting executions, stop the pooled sandboxes and close the session store
+    execution_scheduler.close()
+    sandbox_pool.close()
+    session_store.close()
 
 app = FastAPI(
     title="AgentCore Code Interpreter", 
@@ -169,56 +192,44 @@ class FileUploadRequest(BaseModel):
     session_id: Optional[str] = None
 
 # Session management
-class CodeInterpreterSession:
-    def __init__(self, session_id: str):
-        self.session_id = session_id
-        self.conversation_history = []
-        self.code_history = []
-        self.execution_results = []
-        self.interactive_sessions = {}  # Track interactive execution sessions
-        self.uploaded_csv = None  # Store uploaded CSV file data
+def release_session_sandbox(session_id: str):
+    """Stop the sandbox of a session leaving memory, without waiting for a running execution"""
+    threading.Thread(target=sandbox_pool.release, args=(session_id,), daemon=True).start()
 
 # Global variables for agents
 code_generator_agent = None
 code_executor_agent = None
 executor_type = "unknown"  # Track which executor type we're using
-active_sessions = {}
 
-def clean_output_for_display(output: str) -> str:
-    """Clean output for display by removing image binary data while preserving analysis text"""
-    if not output:
-        return output
-    
-    # If output contains IMAGE_DATA, extract everything except the binary
-    if 'IMAGE_DATA:' in output:
-        parts = output.split('IMAGE_DATA:')
-        cleaned_parts = []
-        
-        # Add the part before IMAGE_DATA
-        if parts[0].strip():
-            cleaned_parts.append(parts[0].strip())
-        
-        # Process parts after IMAGE_DATA
-        for i in range(1, len(parts)):
-            # Split on newline to separate binary from any following text
-            lines = parts[i].split('\n', 1)
-            if len(lines) > 1:
-                # Skip the binary line, keep any text after it
-                remaining_text = lines[1].strip()
-                if remaining_text and not remaining_text.startswith(('iVBOR', '/9j/', 'data:')):
-                    cleaned_parts.append(remaining_text)
-        
-        if cleaned_parts:
-            result = '\n\n'.join(cleaned_parts)
-            print(f"🧹 Cleaned output: removed image binary, kept {len(result)} chars of text")
-            return result
-        else:
-            return "Code executed successfully - chart generated"
-    
-    return output
+# Agent constructors by name; each scheduler worker builds its own agents, as
+# Strands agents keep conversation state and must not run in two threads at once.
+# Code executor agents are built per call for the IDE session their tool serves.
+_agent_factories = {}
+_worker_agents = threading.local()
+
+def get_worker_agent(name: str):
+    """Agent of the calling worker thread, created on first use"""
+    agents = getattr(_worker_agents, 'agents', None)
+    if agents is None:
+        agents = _worker_agents.agents = {}
+    if name not in agents:
+        agents[name] = _agent_factories[name]()
+    return agents[name]
+
+def run_agent(name: str, prompt: str):
+    """Call an agent on a scheduler worker"""
+    return get_worker_agent(name)(prompt)
+
+def run_executor_agent(session_id: str, prompt: str):
+    """Call a code executor agent whose tool runs code in the session's sandbox
+
+    The agent is built for this call: Strands runs tools on threads of its own,
+    so the session is bound into the tool rather than passed through context
+    """
+    return _agent_factories['code_executor'](session_id)(prompt)
 
 def extract_image_data(execution_result: str):
-    """Extract base64 image data from execution results - fixed for AgentCore format"""
+    """Extract images from execution results into the image cache; returns /api/images references"""
     try:
         import re
         import base64
@@ -252,19 +263,11 @@ def extract_image_data(execution_result: str):
                         
                         # Check if it looks like a PNG (starts with PNG signature)
                         if decoded.startswith(b'\x89PNG\r\n\x1a\n'):
-                            images.append({
-                                'format': 'png',
-                                'data': clean_match,
-                                'source': 'agentcore_stdout'
-                            })
+                            images.append(image_cache.reference(decoded, 'png'))
                             print(f"✅ Match {i+1} - Valid PNG image extracted")
                         # Also check for JPEG signatures
                         elif decoded.startswith(b'\xff\xd8\xff'):
-                            images.append({
-                                'format': 'jpeg',
-                                'data': clean_match,
-                                'source': 'agentcore_stdout'
-                            })
+                            images.append(image_cache.reference(decoded, 'jpeg'))
                             print(f"✅ Match {i+1} - Valid JPEG image extracted")
                         else:
                             print(f"⚠️  Match {i+1} - Invalid image signature")
@@ -281,36 +284,35 @@ def extract_image_data(execution_result: str):
         print(f"❌ Image extraction error: {e}")
         return []
 
-def upload_files_to_agentcore_sandbox(files_data: list, aws_region: str) -> bool:
-    """Upload files to AgentCore sandbox using writeFiles tool"""
+def upload_files_to_agentcore_sandbox(files_data: list, aws_region: str, session_id: str = None) -> bool:
+    """Upload files to the IDE session's AgentCore sandbox using writeFiles tool"""
     try:
         print(f"🔧 Uploading {len(files_data)} files to AgentCore sandbox...")
         
-        with code_session(aws_region) as code_client:
-            response = code_client.invoke("writeFiles", {"content": files_data})
-            
-            for event in response["stream"]:
-                result = event.get("result", {})
-                if result.get("isError", False):
-                    error_content = result.get("content", [{}])
-                    error_text = error_content[0].get("text", "Unknown error") if error_content else "Unknown error"
-                    print(f"❌ File upload error: {error_text}")
-                    return False
-                else:
-                    content = result.get("content", [])
-                    for item in content:
-                        if item.get("type") == "text":
-                            print(f"✅ File upload result: {item.get('text', '')}")
-                    return True
+        stored_files = [
+            {"filename": file_info["path"], **file_sync.store.put(file_info.get("text", ""))}
+            for file_info in files_data
+        ]
+        with sandbox_pool.lease(session_id) as code_client:
+            file_sync.sync(code_client, stored_files)
+            print(f"✅ File upload result: {len(stored_files)} files in sandbox")
+            return True
         
+    except FileSyncError as e:
+        print(f"❌ File upload error: {e}")
         return False
-        
     except Exception as e:
         print(f"❌ File upload failed: {str(e)}")
         return False
 
-def execute_chart_code_direct(code: str, session_files: list = None) -> tuple[str, list]:
-    """Execute chart code directly with AgentCore to preserve full base64 output"""
+def execute_chart_code_direct(code: str, session_files: list = None, session_id: str = None,
+                              on_event=None) -> tuple[str, list]:
+    """Execute chart code directly with AgentCore to preserve full base64 output
+    
+    Runs in the sandbox bound to the IDE session, so earlier variables are kept.
+    on_event, if given, is called with ("stdout", text), ("stderr", text) and
+    ("image", info) as the sandbox stream delivers them.
+    """
     try:
         print(f"\n🎨 Direct AgentCore chart execution")
         print(f"📝 Code length: {len(code)} characters")
@@ -319,31 +321,15 @@ def execute_chart_code_direct(code: str, session_files: list = None) -> tuple[st
         clean_code = extract_python_code_from_prompt(code)
         print(f"🔧 Clean code length: {len(clean_code)} characters")
         
-        with code_session(aws_region) as code_client:
-            # Upload files to sandbox if provided
+        with sandbox_pool.lease(session_id) as code_client:
+            # Upload the session files the sandbox does not hold yet
             if session_files:
-                print(f"📁 Uploading {len(session_files)} files to sandbox...")
-                files_data = []
-                for file_info in session_files:
-                    files_data.append({
-                        "path": file_info['filename'],
-                        "text": file_info['content']
-                    })
-                
-                # Upload files using writeFiles tool
-                upload_response = code_client.invoke("writeFiles", {"content": files_data})
-                for event in upload_response["stream"]:
-                    result = event.get("result", {})
-                    if result.get("isError", False):
-                        error_content = result.get("content", [{}])
-                        error_text = error_content[0].get("text", "Unknown error") if error_content else "Unknown error"
-                        print(f"❌ File upload error: {error_text}")
-                        return f"File upload failed: {error_text}", []
-                    else:
-                        content = result.get("content", [])
-                        for item in content:
-                            if item.get("type") == "text":
-                                print(f"✅ File upload: {item.get('text', '')}")
+                code_client.on_replace(lambda lease: file_sync.sync(lease, session_files))
+                try:
+                    file_sync.sync(code_client, session_files)
+                except FileSyncError as e:
+                    print(f"❌ File upload error: {e}")
+                    return f"File upload failed: {e}", []
             
             # Execute the cleaned code
             response = code_client.invoke("executeCode", {
@@ -352,48 +338,48 @@ def execute_chart_code_direct(code: str, session_files: list = None) -> tuple[st
                 "clearContext": False
             })
         
-        # Process response directly without Strands-Agents truncation
-        output_parts = []
-        full_stdout = ""
-        
-        for event in response["stream"]:
-            result = event.get("result", {})
+            # Process stream events as they arrive: text is passed on at once and
+            # each IMAGE_DATA line is decoded once into the image cache
+            splitter = OutputSplitter(image_cache, emit=on_event)
+            errors = []
+            
+            for event in response["stream"]:
+                result = event.get("result", {})
+                
+                if result.get("isError", False):
+                    error_content = result.get("content", [{}])
+                    error_text = error_content[0].get("text", "Unknown error") if error_content else "Unknown error"
+                    print(f"❌ Direct execution error: {error_text}")
+                    return f"Error: {error_text}", []
+                
+                # Extract structured content
+                structured_content = result.get("structuredContent", {})
+                stdout = structured_content.get("stdout", "")
+                stderr = structured_content.get("stderr", "")
+                
+                if stdout:
+                    splitter.feed(stdout)
+                    print(f"📤 Direct stdout captured: {len(stdout)} characters")
+                if stderr:
+                    errors.append(stderr)
+                    if on_event:
+                        on_event("stderr", stderr)
+                    print(f"⚠️  Direct stderr: {stderr}")
+            splitter.close()
             
-            if result.get("isError", False):
-                error_content = result.get("content", [{}])
-                error_text = error_content[0].get("text", "Unknown error") if error_content else "Unknown error"
-                print(f"❌ Direct execution error: {error_text}")
-                return f"Error: {error_text}", []
+            # Output text without image data, then any errors
+            display_output = splitter.text.strip()
+            if errors:
+                display_output = "\n".join(filter(None, [display_output, f"Errors: {''.join(errors)}"]))
+            if not display_output:
+                display_output = "Code executed successfully - chart generated" if splitter.images else "Code executed successfully"
             
-            # Extract structured content
-            structured_content = result.get("structuredContent", {})
-            stdout = structured_content.get("stdout", "")
-            stderr = structured_content.get("stderr", "")
+            print(f"✅ Direct execution completed:")
+            print(f"   Display output length: {len(display_output)}")
+            print(f"   Images extracted: {len(splitter.images)}")
+            
+            return display_output, splitter.images
             
-            if stdout:
-                output_parts.append(stdout)
-                full_stdout += stdout
-                print(f"📤 Direct stdout captured: {len(stdout)} characters")
-            if stderr:
-                output_parts.append(f"Errors: {stderr}")
-                print(f"⚠️  Direct stderr: {stderr}")
-        
-        # Combine output
-        final_output = "\n".join(output_parts) if output_parts else "Code executed successfully"
-        
-        # Extract images directly from full stdout
-        images = extract_image_data(full_stdout)
-        
-        # Clean the output for display (remove image binary but keep analysis text)
-        display_output = clean_output_for_display(final_output)
-        
-        print(f"✅ Direct execution completed:")
-        print(f"   Output length: {len(final_output)}")
-        print(f"   Display output length: {len(display_output)}")
-        print(f"   Images extracted: {len(images)}")
-        
-        return display_output, images
-        
     except Exception as e:
         print(f"❌ Direct AgentCore execution failed: {str(e)}")
         import traceback
@@ -651,9 +637,18 @@ def extract_python_code_from_prompt(input_text: str) -> str:
     print(f"🔧 Using input as-is (no markdown formatting detected)")
     return input_text.strip()
 
-@tool
-def execute_python_code(code: str, description: str = "", files: list = None) -> str:
-    """Execute Python code using AgentCore CodeInterpreter - reliable execution with proper output capture and file support"""
+def make_execute_python_code(session_id: Optional[str]):
+    """execute_python_code tool bound to the sandbox of an IDE session"""
+
+    @tool
+    def execute_python_code(code: str, description: str = "", files: list = None) -> str:
+        """Execute Python code using AgentCore CodeInterpreter - reliable execution with proper output capture and file support"""
+        return run_python_code(session_id, code, description, files)
+
+    return execute_python_code
+
+def run_python_code(session_id: Optional[str], code: str, description: str = "", files: list = None) -> str:
+    """Run code in the session's sandbox, uploading files it does not hold yet"""
     
     # Extract clean Python code from markdown-formatted input
     clean_code = extract_python_code_from_prompt(code)
@@ -667,31 +662,20 @@ def execute_python_code(code: str, description: str = "", files: list = None) ->
     print(f"🔧 Clean code preview: {clean_code[:200]}...")
     
     try:
-        with code_session(aws_region) as code_client:
-            # Upload files to sandbox if provided
+        with sandbox_pool.lease(session_id) as code_client:
+            # Upload files the sandbox does not hold yet
             if files:
-                print(f"📁 Uploading {len(files)} files to sandbox...")
-                files_data = []
-                for file_info in files:
-                    files_data.append({
-                        "path": file_info.get('filename', 'uploaded_file.csv'),
-                        "text": file_info.get('content', '')
-                    })
-                
-                # Upload files using writeFiles tool
-                upload_response = code_client.invoke("writeFiles", {"content": files_data})
-                for event in upload_response["stream"]:
-                    result = event.get("result", {})
-                    if result.get("isError", False):
-                        error_content = result.get("content", [{}])
-                        error_text = error_content[0].get("text", "Unknown error") if error_content else "Unknown error"
-                        print(f"❌ File upload error: {error_text}")
-                        return f"File upload failed: {error_text}"
-                    else:
-                        content = result.get("content", [])
-                        for item in content:
-                            if item.get("type") == "text":
-                                print(f"✅ File upload: {item.get('text', '')}")
+                stored_files = [
+                    {"filename": file_info.get('filename', 'uploaded_file.csv'),
+                     **file_sync.store.put(file_info.get('content', ''))}
+                    for file_info in files
+                ]
+                code_client.on_replace(lambda lease: file_sync.sync(lease, stored_files))
+                try:
+                    file_sync.sync(code_client, stored_files)
+                except FileSyncError as e:
+                    print(f"❌ File upload error: {e}")
+                    return f"File upload failed: {e}"
             
             # Execute the code
             response = code_client.invoke("executeCode", {
@@ -700,36 +684,36 @@ def execute_python_code(code: str, description: str = "", files: list = None) ->
                 "clearContext": False
             })
         
-        # Process the response stream to capture all output
-        output_parts = []
-        
-        for event in response["stream"]:
-            result = event.get("result", {})
+            # Process the response stream to capture all output
+            output_parts = []
             
-            if result.get("isError", False):
-                error_content = result.get("content", [{}])
-                error_text = error_content[0].get("text", "Unknown error") if error_content else "Unknown error"
-                print(f"❌ AgentCore execution error: {error_text}")
-                return f"Error: {error_text}"
+            for event in response["stream"]:
+                result = event.get("result", {})
+                
+                if result.get("isError", False):
+                    error_content = result.get("content", [{}])
+                    error_text = error_content[0].get("text", "Unknown error") if error_content else "Unknown error"
+                    print(f"❌ AgentCore execution error: {error_text}")
+                    return f"Error: {error_text}"
+                
+                # Extract structured content (stdout, stderr)
+                structured_content = result.get("structuredContent", {})
+                stdout = structured_content.get("stdout", "")
+                stderr = structured_content.get("stderr", "")
+                
+                if stdout:
+                    output_parts.append(stdout)
+                    print(f"📤 Stdout captured: {len(stdout)} characters")
+                if stderr:
+                    output_parts.append(f"Errors: {stderr}")
+                    print(f"⚠️  Stderr captured: {len(stderr)} characters")
             
-            # Extract structured content (stdout, stderr)
-            structured_content = result.get("structuredContent", {})
-            stdout = structured_content.get("stdout", "")
-            stderr = structured_content.get("stderr", "")
+            # Combine all output
+            final_output = "\n".join(output_parts) if output_parts else "Code executed successfully (no output)"
             
-            if stdout:
-                output_parts.append(stdout)
-                print(f"📤 Stdout captured: {len(stdout)} characters")
-            if stderr:
-                output_parts.append(f"Errors: {stderr}")
-                print(f"⚠️  Stderr captured: {len(stderr)} characters")
-        
-        # Combine all output
-        final_output = "\n".join(output_parts) if output_parts else "Code executed successfully (no output)"
-        
-        print(f"✅ AgentCore execution completed - Output length: {len(final_output)}")
-        return final_output
-                
+            print(f"✅ AgentCore execution completed - Output length: {len(final_output)}")
+            return final_output
+                    
     except Exception as e:
         print(f"❌ AgentCore execution error: {str(e)}")
         import traceback
@@ -838,6 +822,7 @@ def initialize_agents():
         print("✅ Using cached agents")
         code_generator_agent = _agents_cache['code_generator_agent']
         code_executor_agent = _agents_cache['code_executor_agent']
+        _agent_factories.update(_agents_cache['agent_factories'])
         current_model_id = _agents_cache['current_model_id']
         executor_type = _agents_cache['executor_type']
         return
@@ -853,7 +838,7 @@ def initialize_agents():
         print(f"🎯 Using model: {model_id}")
         
         # Initialize Code Generator Agent using strands-agents
-        code_generator_agent = Agent(
+        _agent_factories['code_generator'] = lambda: Agent(
             model=bedrock_model,
             system_prompt=f"""You are a Python code generator specialist powered by {model_id}. Your role is to:
             1. Generate clean, well-commented Python code based on user requirements
@@ -866,14 +851,10 @@ def initialize_agents():
             Focus on creating practical, efficient code that solves the user's specific problem.
             Return ONLY the Python code, no explanations, no markdown, no additional text."""
         )
+        code_generator_agent = _agent_factories['code_generator']()
         
-        # Test AgentCore availability
-        with code_session(aws_region) as test_client:
-            test_response = test_client.invoke("executeCode", {
-                "code": "print('AgentCore initialization test successful')",
-                "language": "python",
-                "clearContext": True
-            })
+        # Test AgentCore availability; the test sandbox stays warm as a spare
+        sandbox_pool.warm_up("print('AgentCore initialization test successful')")
         
         # AgentCore is working - create executor agent with AgentCore tool
         executor_type = "agentcore"
@@ -900,11 +881,12 @@ TOOL AVAILABLE:
 
 RESPONSE FORMAT: The execute_python_code tool returns execution results including stdout, stderr, and any errors."""
         
-        code_executor_agent = Agent(
+        _agent_factories['code_executor'] = lambda session_id=None: Agent(
             model=bedrock_model,
-            tools=[execute_python_code],
+            tools=[make_execute_python_code(session_id)],
             system_prompt=SYSTEM_PROMPT
         )
+        code_executor_agent = _agent_factories['code_executor']()
         
         print("✅ Agents initialized successfully:")
         print(f"   - Code Generator: Strands-Agents Agent with {model_id}")
@@ -916,6 +898,7 @@ RESPONSE FORMAT: The execute_python_code tool returns execution results includin
         _agents_cache['code_executor_agent'] = code_executor_agent
         _agents_cache['current_model_id'] = current_model_id
         _agents_cache['executor_type'] = executor_type
+        _agents_cache['agent_factories'] = dict(_agent_factories)
         
     except Exception as e:
         print(f"❌ Error initializing agents: {str(e)}")
@@ -925,14 +908,8 @@ RESPONSE FORMAT: The execute_python_code tool returns execution results includin
 # Startup is now handled by lifespan context manager
 
 def get_or_create_session(session_id: Optional[str] = None) -> CodeInterpreterSession:
-    """Get existing session or create new one"""
-    if session_id is None:
-        session_id = str(uuid.uuid4())
-    
-    if session_id not in active_sessions:
-        active_sessions[session_id] = CodeInterpreterSession(session_id)
-    
-    return active_sessions[session_id]
+    """Get existing session, from memory or disk, or create new one"""
+    return session_store.get_or_create(session_id)
 
 # Utility functions for code analysis
 def detect_chart_code(code: str) -> bool:
@@ -981,7 +958,7 @@ def input(prompt=''):
 async def generate_code(request: CodeGenerationRequest):
     """Generate Python code using the strands-agents code generator agent"""
     try:
-        session = get_or_create_session(request.session_id)
+        session = await asyncio.to_thread(get_or_create_session, request.session_id)
         
         # Check if prompt mentions files but no CSV is uploaded
         file_keywords = ['file', 'csv', 'data', 'dataset', 'load', 'read', 'import', 'upload']
@@ -1003,11 +980,12 @@ async def generate_code(request: CodeGenerationRequest):
         needs_visualization = any(keyword in request.prompt.lower() for keyword in chart_keywords)
         
         if session.uploaded_csv:
+            csv_preview = file_sync.store.read_text(session.uploaded_csv['sha256'], 1001)
             csv_info = f"""
 You have access to a CSV file named '{session.uploaded_csv['filename']}' with the following content preview:
 
 ```csv
-{session.uploaded_csv['content'][:1000]}{'...' if len(session.uploaded_csv['content']) > 1000 else ''}
+{csv_preview[:1000]}{'...' if len(csv_preview) > 1000 else ''}
 ```
 
 When generating code, assume this CSV data is available and can be loaded using pandas.read_csv() or similar methods. 
@@ -1055,14 +1033,14 @@ This ensures your charts are properly displayed in the web interface.
 """
             enhanced_prompt += chart_instructions
         
-        # Use the strands-agents agent for code generation
-        agent_result = code_generator_agent(enhanced_prompt)
+        # Use the strands-agents agent for code generation, off the event loop
+        agent_result = await execution_scheduler.run(session.session_id, run_agent, 'code_generator', enhanced_prompt)
         
         # Extract string content from AgentResult
         generated_code = str(agent_result) if agent_result is not None else ""
         
         # Store generation in session history
-        session.conversation_history.append({
+        await asyncio.to_thread(session.conversation_history.append, {
             "type": "generation",
             "prompt": request.prompt,
             "enhanced_prompt": enhanced_prompt if session.uploaded_csv else None,
@@ -1080,6 +1058,8 @@ This ensures your charts are properly displayed in the web interface.
             "csv_file_used": session.uploaded_csv['filename'] if session.uploaded_csv else None
         }
         
+    except SchedulerBusyError as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Code generation failed: {str(e)}")
 
@@ -1104,7 +1084,7 @@ Provide:
 
 Keep response short and practical."""
             
-            analysis_result = code_generator_agent(analysis_prompt)
+            analysis_result = await execution_scheduler.run(request.session_id, run_agent, 'code_generator', analysis_prompt)
             
             return {
                 "success": True,
@@ -1120,6 +1100,8 @@ Keep response short and practical."""
                 "suggestions": None
             }
         
+    except SchedulerBusyError as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Code analysis failed: {str(e)}")
 
@@ -1127,7 +1109,7 @@ Keep response short and practical."""
 async def execute_code(request: CodeExecutionRequest):
     """Execute Python code using hybrid approach: direct AgentCore for charts, Strands-Agents for others"""
     try:
-        session = get_or_create_session(request.session_id)
+        session = await asyncio.to_thread(get_or_create_session, request.session_id)
         
         # Track execution start time
         execution_start_time = time.time()
@@ -1179,7 +1161,8 @@ async def execute_code(request: CodeExecutionRequest):
         if session.uploaded_csv:
             session_files.append({
                 'filename': session.uploaded_csv['filename'],
-                'content': session.uploaded_csv['content']
+                'sha256': session.uploaded_csv['sha256'],
+                'size': session.uploaded_csv['size']
             })
         
         # REVERTED: Use original logic - only force direct AgentCore for charts and files, NOT for interactive
@@ -1187,7 +1170,8 @@ async def execute_code(request: CodeExecutionRequest):
             print(f"🎨 Chart code detected - using direct AgentCore execution")
             
             # Use direct AgentCore execution to preserve full base64 output
-            execution_result_str, images = execute_chart_code_direct(prepared_code, session_files)
+            execution_result_str, images = await execution_scheduler.run(
+                session.session_id, execute_chart_code_direct, prepared_code, session_files, session.session_id)
             agent_used = "direct_agentcore_charts"
             
         else:
@@ -1197,7 +1181,8 @@ async def execute_code(request: CodeExecutionRequest):
             # since Strands-Agents tools can't easily access session files
             if session_files:
                 print(f"📁 Files detected - switching to direct AgentCore for file access")
-                execution_result_str, images = execute_chart_code_direct(prepared_code, session_files)
+                execution_result_str, images = await execution_scheduler.run(
+                    session.session_id, execute_chart_code_direct, prepared_code, session_files, session.session_id)
                 agent_used = "direct_agentcore_with_files"
             else:
                 # Use strands-agents with AgentCore tool for regular code without files
@@ -1209,7 +1194,9 @@ async def execute_code(request: CodeExecutionRequest):
 
 Use the tool to run the code and return the complete output."""
                 
-                execution_result = code_executor_agent(execution_prompt)
+                # The agent's tool runs the code in this IDE session's sandbox
+                execution_result = await execution_scheduler.run(
+                    session.session_id, run_executor_agent, session.session_id, execution_prompt)
                 
                 # Debug the AgentResult structure
                 print(f"🔍 AgentResult type: {type(execution_result)}")
@@ -1228,7 +1215,7 @@ Use the tool to run the code and return the complete output."""
         
         # Store execution in session history
         session.code_history.append(request.code)
-        session.execution_results.append({
+        await asyncio.to_thread(session.execution_results.append, {
             "code": request.code,
             "result": execution_result_str,
             "agent": agent_used,
@@ -1256,6 +1243,9 @@ Use the tool to run the code and return the complete output."""
             "is_chart_code": is_chart_code
         }
         
+    except SchedulerBusyError as e:
+        print(f"⏳ Code execution rejected: {str(e)}")
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         print(f"❌ Code execution failed: {str(e)}")
         import traceback
@@ -1266,16 +1256,17 @@ Use the tool to run the code and return the complete output."""
 async def clear_csv_from_session(session_id: str):
     """Clear CSV file from session and AgentCore context"""
     try:
-        session = get_or_create_session(session_id)
+        session = await asyncio.to_thread(get_or_create_session, session_id)
         
         if session.uploaded_csv:
             filename = session.uploaded_csv['filename']
             
             # Clear CSV from session
             session.uploaded_csv = None
+            await asyncio.to_thread(session_store.save, session)
             
             # Add to conversation history
-            session.conversation_history.append({
+            await asyncio.to_thread(session.conversation_history.append, {
                 "type": "csv_removal",
                 "filename": filename,
                 "timestamp": time.time()
@@ -1303,26 +1294,30 @@ async def clear_csv_from_session(session_id: str):
 async def upload_csv_file(request: FileUploadRequest):
     """Upload and process a CSV file"""
     try:
-        session = get_or_create_session(request.session_id)
+        session = await asyncio.to_thread(get_or_create_session, request.session_id)
         
         # Validate CSV content
         if not request.filename.lower().endswith('.csv'):
             raise HTTPException(status_code=400, detail="Only CSV files are allowed")
         
-        # Store CSV file in session
-        session.conversation_history.append({
+        # Store CSV content on disk; the session keeps its SHA-256
+        stored = file_sync.store.put(request.content)
+        await asyncio.to_thread(session.conversation_history.append, {
             "type": "csv_upload",
             "filename": request.filename,
-            "content": request.content,
+            "sha256": stored['sha256'],
+            "size": stored['size'],
             "timestamp": time.time()
         })
         
-        # Store CSV data for code generation
+        # Store CSV reference for code generation and execution
         session.uploaded_csv = {
             "filename": request.filename,
-            "content": request.content,
+            "sha256": stored['sha256'],
+            "size": stored['size'],
             "timestamp": asyncio.get_event_loop().time()
         }
+        await asyncio.to_thread(session_store.save, session)
         
         return {
             "success": True,
@@ -1339,10 +1334,10 @@ async def upload_csv_file(request: FileUploadRequest):
 async def upload_file(request: FileUploadRequest):
     """Upload and process a Python file"""
     try:
-        session = get_or_create_session(request.session_id)
+        session = await asyncio.to_thread(get_or_create_session, request.session_id)
         
         # Store file in session
-        session.conversation_history.append({
+        await asyncio.to_thread(session.conversation_history.append, {
             "type": "file_upload",
             "filename": request.filename,
             "content": request.content,
@@ -1360,24 +1355,61 @@ async def upload_file(request: FileUploadRequest):
         raise HTTPException(status_code=500, detail=f"File upload failed: {str(e)}")
 
 @app.get("/api/session/{session_id}/history")
-async def get_session_history(session_id: str):
-    """Get session history"""
+async def get_session_history(session_id: str, offset: int = 0, limit: int = 50):
+    """Get a page of session history, read from the session store
+    
+    offset counts back from the most recent entry; each list is returned oldest first.
+    """
     try:
-        if session_id not in active_sessions:
+        if not await asyncio.to_thread(session_store.exists, session_id):
             raise HTTPException(status_code=404, detail="Session not found")
         
-        session = active_sessions[session_id]
+        offset = max(offset, 0)
+        limit = min(max(limit, 1), 500)
+        
+        def read_history():
+            conversation, conversation_total = session_store.history(session_id, CONVERSATION, offset, limit)
+            executions, executions_total = session_store.history(session_id, EXECUTION, offset, limit)
+            # Uploaded CSV content is read from the file store for display
+            conversation = [
+                {**entry, "content": file_sync.store.read_text(entry['sha256'])}
+                if entry.get('type') == 'csv_upload' and entry.get('sha256') and file_sync.store.exists(entry['sha256'])
+                else entry
+                for entry in conversation
+            ]
+            return conversation, conversation_total, executions, executions_total
+        
+        # SQLite and file reads run off the event loop
+        conversation_history, conversation_total, executions, executions_total = await asyncio.to_thread(read_history)
         
         return {
             "success": True,
             "session_id": session_id,
-            "conversation_history": session.conversation_history,
-            "execution_results": session.execution_results
+            "conversation_history": conversation_history,
+            "execution_results": executions,
+            "offset": offset,
+            "limit": limit,
+            "total_conversation": conversation_total,
+            "total_executions": executions_total,
+            "has_more": offset + limit < max(conversation_total, executions_total)
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to get session history: {str(e)}")
 
+@app.get("/api/sessions/stats")
+async def get_session_stats():
+    """Get session store statistics: sessions and history held in memory"""
+    if not session_store:
+        raise HTTPException(status_code=503, detail="Session store not initialized")
+    
+    return {
+        "success": True,
+        "sessions": await asyncio.to_thread(session_store.stats)
+    }
+
 @app.get("/api/agents/status")
 async def get_agents_status():
     """Get status of all agents"""
@@ -1417,61 +1449,154 @@ async def get_agents_status():
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to get agents status: {str(e)}")
 
+@app.get("/api/sandbox/stats")
+async def get_sandbox_stats():
+    """Get code interpreter sandbox pool and file sync statistics"""
+    if not sandbox_pool:
+        raise HTTPException(status_code=503, detail="Sandbox pool not initialized")
+    
+    return {
+        "success": True,
+        "sandbox_pool": sandbox_pool.stats(),
+        "file_sync": file_sync.stats(),
+        "image_cache": image_cache.stats()
+    }
+
 # WebSocket endpoint for real-time communication
+async def handle_websocket_message(websocket: WebSocket, session_id: str, message: dict):
+    """Run one websocket request on the execution scheduler and send its result"""
+    if message["type"] == "generate_code":
+        # Handle code generation via WebSocket
+        try:
+            agent_result = await execution_scheduler.run(session_id, run_agent, 'code_generator', message["prompt"])
+            
+            # Extract string content from AgentResult
+            generated_code = str(agent_result) if agent_result is not None else ""
+            
+            await websocket.send_text(json.dumps({
+                "type": "code_generated",
+                "success": True,
+                "code": generated_code,
+                "session_id": session_id
+            }))
+        except Exception as e:
+            await websocket.send_text(json.dumps({
+                "type": "error",
+                "success": False,
+                "error": str(e)
+            }))
+    
+    elif message["type"] == "execute_code":
+        # Handle code execution via WebSocket: run the code in the session's
+        # sandbox and stream its output while it runs
+        try:
+            session = await asyncio.to_thread(get_or_create_session, session_id)
+            session_files = []
+            if session.uploaded_csv:
+                session_files.append({
+                    'filename': session.uploaded_csv['filename'],
+                    'sha256': session.uploaded_csv['sha256'],
+                    'size': session.uploaded_csv['size']
+                })
+            
+            # Worker thread events are handed to the event loop and sent in order
+            loop = asyncio.get_running_loop()
+            events = asyncio.Queue()
+            
+            def on_event(kind, payload):
+                loop.call_soon_threadsafe(events.put_nowait, (kind, payload))
+            
+            async def send_events():
+                while True:
+                    kind, payload = await events.get()
+                    if kind is None:
+                        return
+                    if kind == "image":
+                        # Fetched by the client from payload["url"]
+                        await websocket.send_text(json.dumps({"type": "execution_image", **payload, "session_id": session_id}))
+                    else:
+                        await websocket.send_text(json.dumps({
+                            "type": "execution_output",
+                            "stream": kind,
+                            "text": payload,
+                            "session_id": session_id
+                        }))
+            
+            sender = asyncio.create_task(send_events())
+            try:
+                execution_result, images = await execution_scheduler.run(
+                    session_id, execute_chart_code_direct, message['code'], session_files, session_id, on_event)
+                # Send the remaining output before the result
+                events.put_nowait((None, None))
+                await sender
+            finally:
+                # On errors and cancellation the sender stops writing to the socket
+                sender.cancel()
+                await asyncio.gather(sender, return_exceptions=True)
+            
+            await websocket.send_text(json.dumps({
+                "type": "execution_result",
+                "success": True,
+                "result": execution_result,
+                "images": [{key: image[key] for key in ("sha256", "format", "size", "url")} for image in images],
+                "session_id": session_id
+            }))
+        except Exception as e:
+            await websocket.send_text(json.dumps({
+                "type": "error",
+                "success": False,
+                "error": str(e)
+            }))
+
 @app.websocket("/ws/{session_id}")
 async def websocket_endpoint(websocket: WebSocket, session_id: str):
     await websocket.accept()
     print(f"WebSocket connected for session {session_id}")
     
+    # Requests run as tasks so the socket keeps receiving while they wait;
+    # the scheduler runs them one at a time, in order, for this session
+    pending = set()
     try:
         while True:
             data = await websocket.receive_text()
             message = json.loads(data)
-            
-            if message["type"] == "generate_code":
-                # Handle code generation via WebSocket
-                try:
-                    agent_result = code_generator_agent(message["prompt"])
-                    
-                    # Extract string content from AgentResult
-                    generated_code = str(agent_result) if agent_result is not None else ""
-                    
-                    await websocket.send_text(json.dumps({
-                        "type": "code_generated",
-                        "success": True,
-                        "code": generated_code,
-                        "session_id": session_id
-                    }))
-                except Exception as e:
-                    await websocket.send_text(json.dumps({
-                        "type": "error",
-                        "success": False,
-                        "error": str(e)
-                    }))
-            
-            elif message["type"] == "execute_code":
-                # Handle code execution via WebSocket
-                try:
-                    if executor_type == "agentcore":
-                        execution_result = code_executor_agent(f"Execute this code: {message['code']}")
-                    else:
-                        execution_result = code_executor_agent(f"Simulate execution of: {message['code']}")
-                    
-                    await websocket.send_text(json.dumps({
-                        "type": "execution_result",
-                        "success": True,
-                        "result": execution_result,
-                        "session_id": session_id
-                    }))
-                except Exception as e:
-                    await websocket.send_text(json.dumps({
-                        "type": "error",
-                        "success": False,
-                        "error": str(e)
-                    }))
+            task = asyncio.create_task(handle_websocket_message(websocket, session_id, message))
+            pending.add(task)
+            task.add_done_callback(pending.discard)
                     
     except WebSocketDisconnect:
         print(f"WebSocket disconnected for session {session_id}")
+    finally:
+        # Drop requests of a closed socket that have not started yet
+        for task in pending:
+            task.cancel()
+        if pending:
+            print(f"🛑 Cancelled {len(pending)} pending requests for session {session_id}")
+
+@app.get("/api/images/{sha256}")
+async def get_image(sha256: str):
+    """Get a chart image produced by a code execution, by content hash"""
+    image = image_cache.get(sha256) if image_cache else None
+    if image is None and session_store:
+        # Images of earlier executions are kept with the session history
+        image = await asyncio.to_thread(session_store.get_image, sha256)
+    if image is None:
+        raise HTTPException(status_code=404, detail="Image not found")
+    
+    data, image_format = image
+    return Response(content=data, media_type=f"image/{image_format}",
+                    headers={"Cache-Control": "public, max-age=31536000, immutable"})
+
+@app.get("/api/scheduler/stats")
+async def get_scheduler_stats():
+    """Get execution scheduler statistics: workers, queue and queue time"""
+    if not execution_scheduler:
+        raise HTTPException(status_code=503, detail="Execution scheduler not initialized")
+    
+    return {
+        "success": True,
+        "scheduler": execution_scheduler.stats()
+    }
 
 @app.get("/health")
 async def health_check():
@@ -1486,6 +1611,9 @@ async def health_check():
         "current_model": current_model,
         "aws_region": aws_region,
         "authentication": "AWS Profile" if os.getenv('AWS_PROFILE') else "Access Keys",
+        "sandbox_pool": sandbox_pool.stats() if sandbox_pool else None,
+        "scheduler": execution_scheduler.stats() if execution_scheduler else None,
+        "sessions": await asyncio.to_thread(session_store.stats) if session_store else None,
         "architecture": {
             "code_generation": f"Strands-Agents Agent ({current_model})",
             "code_execution": f"{executor_type.title().replace('_', ' ')} Agent ({current_model})"
@@ -0,0 +1,187 @@
+"""
+Incremental processing of sandbox output for streaming to the IDE.
+
+Charts reach the backend as IMAGE_DATA:<base64> lines in stdout. OutputSplitter
+reads stdout chunk by chunk as the sandbox stream delivers it, passes text on
+at once and decodes each image line once, without a regex pass over the whole
+output. Decoded images are kept in an ImageCache by SHA-256, so clients fetch
+them from /api/images/{sha256} instead of receiving base64 inside text.
+"""
+
+import base64
+import binascii
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from collections.abc import Callable
+from typing import Any
+
+IMAGE_MARKER = "IMAGE_DATA:"
+
+# Decoded image signatures and their formats
+_SIGNATURES = (
+    (b"\x89PNG\r\n\x1a\n", "png"),
+    (b"\xff\xd8\xff", "jpeg"),
+)
+
+
+class ImageCache:
+    """Decoded chart images by SHA-256; least recently used dropped beyond max_bytes
+
+    Args:
+        max_bytes: Total size of the cached images
+    """
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._images: OrderedDict[str, tuple[bytes, str]] = OrderedDict()
+        self._bytes = 0
+        self._evicted = 0
+
+    def put(self, data: bytes, image_format: str) -> str:
+        """Cache an image; returns its sha256"""
+        digest = hashlib.sha256(data).hexdigest()
+        with self._lock:
+            if digest in self._images:
+                self._images.move_to_end(digest)
+                return digest
+            self._images[digest] = (data, image_format)
+            self._bytes += len(data)
+            while self._bytes > self.max_bytes and len(self._images) > 1:
+                _, (dropped, _) = self._images.popitem(last=False)
+                self._bytes -= len(dropped)
+                self._evicted += 1
+        return digest
+
+    def reference(self, data: bytes, image_format: str) -> dict[str, Any]:
+        """Cache an image; returns what clients need to fetch it"""
+        digest = self.put(data, image_format)
+        return {
+            "sha256": digest,
+            "format": image_format,
+            "size": len(data),
+            "url": f"/api/images/{digest}",
+        }
+
+    def get(self, digest: str) -> tuple[bytes, str] | None:
+        """Image bytes and format, or None if not cached"""
+        with self._lock:
+            image = self._images.get(digest)
+            if image is not None:
+                self._images.move_to_end(digest)
+            return image
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "images": len(self._images),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "evicted": self._evicted,
+            }
+
+
+def _partial_marker(text: str) -> int:
+    """Length of the longest end of text that begins IMAGE_MARKER"""
+    for length in range(min(len(IMAGE_MARKER) - 1, len(text)), 0, -1):
+        if text.endswith(IMAGE_MARKER[:length]):
+            return length
+    return 0
+
+
+class OutputSplitter:
+    """Splits sandbox stdout into text and images as chunks arrive
+
+    Args:
+        images: ImageCache receiving the decoded images
+        emit: Called with ("stdout", text) and ("image", info) in output order
+    """
+
+    def __init__(
+        self,
+        images: ImageCache,
+        emit: Callable[[str, Any], None] | None = None,
+    ):
+        self.image_cache = images
+        self.emit = emit or (lambda kind, payload: None)
+        self.text_parts: list[str] = []
+        self.images: list[dict[str, Any]] = []
+        self._held = ""  # End of the last chunk that may begin a marker
+        self._image_parts = None  # Base64 chunks of the image line being read
+
+    def _text(self, text: str) -> None:
+        if text:
+            self.text_parts.append(text)
+            self.emit("stdout", text)
+
+    def _finish_image(self) -> None:
+        data = "".join(self._image_parts).strip()
+        self._image_parts = None
+        if len(data) <= 1000:
+            print(
+                f"⚠️  Image data too short to be a valid image ({len(data)} characters)"
+            )
+            return
+        try:
+            decoded = base64.b64decode(data, validate=True)
+        except (binascii.Error, ValueError) as e:
+            print(f"❌ Image data is not valid base64: {e}")
+            return
+
+        image_format = next(
+            (name for signature, name in _SIGNATURES if decoded.startswith(signature)),
+            None,
+        )
+        if image_format is None:
+            print("⚠️  Image data has an unknown signature")
+            return
+
+        info = self.image_cache.reference(decoded, image_format)
+        print(f"✅ {image_format.upper()} image extracted ({len(decoded)} bytes)")
+        self.emit("image", dict(info))
+        self.images.append(info)
+
+    def feed(self, chunk: str) -> None:
+        """Process the next piece of stdout"""
+        while chunk:
+            if self._image_parts is not None:
+                end = chunk.find("\n")
+                if end < 0:
+                    self._image_parts.append(chunk)
+                    return
+                self._image_parts.append(chunk[:end])
+                self._finish_image()
+                chunk = chunk[end + 1 :]
+                continue
+
+            chunk, self._held = self._held + chunk, ""
+            start = chunk.find(IMAGE_MARKER)
+            if start < 0:
+                # Pass the text on now, except a tail that may begin a marker
+                keep = _partial_marker(chunk)
+                self._text(chunk[: len(chunk) - keep])
+                self._held = chunk[len(chunk) - keep :]
+                return
+            self._text(chunk[:start])
+            self._image_parts = []
+            chunk = chunk[start + len(IMAGE_MARKER) :]
+
+    def close(self) -> None:
+        """Process the end of stdout"""
+        if self._image_parts is not None:
+            self._finish_image()
+        self._text(self._held)
+        self._held = ""
+
+    @property
+    def text(self) -> str:
+        return "".join(self.text_parts)
+
+
+def create_image_cache() -> ImageCache:
+    """Image cache configured from the environment"""
+    return ImageCache(
+        max_bytes=int(float(os.getenv("IDE_IMAGE_CACHE_MB", "64")) * 1024 * 1024)
+    )
@@ -0,0 +1,586 @@
+"""
+Warm code interpreter sandbox pool for the IDE backend.
+
+Each IDE session_id is bound to one long-lived interpreter session, so
+repeated executions keep their variables and uploaded files and skip sandbox
+start-up. A few started sandboxes are kept as spares for new sessions, and
+sandboxes idle for longer than the TTL are stopped.
+
+Two sandbox backends share the interface of the AgentCore CodeInterpreter
+client (start/stop/invoke returning {"stream": [...]}):
+- AgentCore CodeInterpreter sessions (the default)
+- LocalSandbox, a Python subprocess per sandbox, to run and test the IDE
+  offline. It does not isolate code from the host.
+"""
+
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+from collections.abc import Callable
+from contextlib import contextmanager
+from typing import Any
+
+# Interpreter loop of a LocalSandbox: one JSON request per stdin line, one
+# JSON reply per stdout line. User code runs in a namespace kept between
+# requests, like an AgentCore session with clearContext False.
+_LOCAL_WORKER = r"""
+import contextlib, io, json, sys, traceback
+
+channel = sys.stdout
+namespace = {"__name__": "__main__"}
+for line in sys.stdin:
+    request = json.loads(line)
+    if request.get("clearContext"):
+        namespace.clear()
+        namespace["__name__"] = "__main__"
+    stdout, stderr = io.StringIO(), io.StringIO()
+    error = None
+    with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+        try:
+            exec(compile(request["code"], "<sandbox>", "exec"), namespace)
+        except BaseException:
+            error = traceback.format_exc()
+    channel.write(json.dumps({
+        "stdout": stdout.getvalue(), "stderr": stderr.getvalue(), "error": error
+    }) + "\n")
+    channel.flush()
+"""
+
+
+def _result(text: str, is_error: bool = False, **structured) -> dict[str, Any]:
+    """Single-event response stream in the AgentCore invoke format"""
+    result = {"content": [{"type": "text", "text": text}], "isError": is_error}
+    if structured:
+        result["structuredContent"] = structured
+    return {"stream": [{"result": result}]}
+
+
+class LocalSandbox:
+    """Subprocess stand-in for an AgentCore code interpreter session"""
+
+    def __init__(self, python: str = sys.executable):
+        self.python = python
+        self.session_id = None
+        self.workdir = None
+        self._process = None
+
+    def start(self) -> str:
+        self.workdir = tempfile.mkdtemp(prefix="ide-sandbox-")
+        self._process = subprocess.Popen(
+            [self.python, "-u", "-c", _LOCAL_WORKER],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            cwd=self.workdir,
+            text=True,
+        )
+        self.session_id = f"local-{uuid.uuid4().hex[:12]}"
+        return self.session_id
+
+    def stop(self) -> bool:
+        if self._process:
+            self._process.kill()
+            self._process.wait()
+            self._process = None
+        if self.workdir:
+            shutil.rmtree(self.workdir, ignore_errors=True)
+            self.workdir = None
+        self.session_id = None
+        return True
+
+    def _path(self, path: str) -> str:
+        full_path = os.path.realpath(os.path.join(self.workdir, path))
+        if not full_path.startswith(os.path.realpath(self.workdir) + os.sep):
+            raise ValueError(f"Path outside the sandbox: {path}")
+        return full_path
+
+    def invoke(self, method: str, params: dict | None = None) -> dict[str, Any]:
+        if not self._process or self._process.poll() is not None:
+            raise RuntimeError("Local sandbox is not running")
+        params = params or {}
+
+        if method == "executeCode":
+            request = {
+                "code": params["code"],
+                "clearContext": params.get("clearContext", False),
+            }
+            self._process.stdin.write(json.dumps(request) + "\n")
+            self._process.stdin.flush()
+            reply = self._process.stdout.readline()
+            if not reply:
+                raise RuntimeError("Local sandbox exited")
+            reply = json.loads(reply)
+            if reply["error"]:
+                return _result(
+                    reply["error"],
+                    True,
+                    stdout=reply["stdout"],
+                    stderr=reply["stderr"] + reply["error"],
+                    exitCode=1,
+                )
+            return _result(
+                reply["stdout"],
+                stdout=reply["stdout"],
+                stderr=reply["stderr"],
+                exitCode=0,
+            )
+
+        if method == "writeFiles":
+            for file_info in params.get("content", []):
+                full_path = self._path(file_info["path"])
+                os.makedirs(os.path.dirname(full_path), exist_ok=True)
+                if "blob" in file_info:
+                    with open(full_path, "wb") as f:
+                        f.write(file_info["blob"])
+                else:
+                    with open(full_path, "w") as f:
+                        f.write(file_info.get("text", ""))
+            return _result(f"Successfully wrote {len(params.get('content', []))} files")
+
+        if method == "listFiles":
+            directory = (
+                self._path(params["directoryPath"])
+                if params.get("directoryPath")
+                else self.workdir
+            )
+            return _result("\n".join(sorted(os.listdir(directory))))
+
+        return _result(f"Unsupported method for the local sandbox: {method}", True)
+
+
+def agentcore_sandbox_factory(
+    region: str, session_timeout_seconds: int = 1800
+) -> Callable[[], Any]:
+    """Factory of started AgentCore code interpreter sessions"""
+    from bedrock_agentcore.tools.code_interpreter_client import CodeInterpreter
+
+    def create():
+        client = CodeInterpreter(region)
+        client.start(session_timeout_seconds=session_timeout_seconds)
+        return client
+
+    return create
+
+
+def local_sandbox_factory() -> Callable[[], Any]:
+    """Factory of started local subprocess sandboxes"""
+
+    def create():
+        sandbox = LocalSandbox()
+        sandbox.start()
+        return sandbox
+
+    return create
+
+
+class _PooledSandbox:
+    """A started sandbox and its bookkeeping in the pool"""
+
+    def __init__(self, sandbox):
+        self.sandbox = sandbox
+        self.session_id = None
+        self.created_at = time.time()
+        self.last_used = self.created_at
+        self.lock = threading.Lock()
+        self.stopped = False
+        self.files = {}  # Sandbox path -> sha256 of the content written there
+
+
+class SandboxLease:
+    """Exclusive use of an IDE session's sandbox, see SandboxPool.lease()"""
+
+    def __init__(
+        self,
+        pool: "SandboxPool",
+        session_id: str | None,
+        entry: _PooledSandbox,
+        warm: bool,
+    ):
+        self._pool = pool
+        self._entry = entry
+        self.session_id = session_id
+        self.warm = warm  # Interpreter state of earlier executions is available
+        self.replaced = False
+        self._on_replace = []
+        self._replacing = False
+
+    @property
+    def sandbox(self):
+        return self._entry.sandbox
+
+    @property
+    def files(self) -> dict[str, str]:
+        """Files written to this sandbox, as path -> sha256"""
+        return self._entry.files
+
+    def on_replace(self, callback: Callable[["SandboxLease"], None]) -> None:
+        """Run callback on a replacement sandbox before retrying, e.g. to upload files"""
+        self._on_replace.append(callback)
+
+    def invoke(self, method: str, params: dict | None = None):
+        """Invoke a sandbox method; an expired or broken sandbox is replaced once"""
+        try:
+            return self._entry.sandbox.invoke(method, params)
+        except Exception as e:
+            if self._replacing:
+                raise
+            print(
+                f"⚠️  Sandbox {self._entry.sandbox.session_id} failed ({e}), replacing it"
+            )
+            self._entry = self._pool._replace(self.session_id, self._entry)
+            self.warm = False
+            self.replaced = True
+            self._replacing = True
+            try:
+                for callback in self._on_replace:
+                    callback(self)
+                return self._entry.sandbox.invoke(method, params)
+            finally:
+                self._replacing = False
+
+
+class SandboxPool:
+    """Long-lived sandboxes bound to IDE sessions, with pre-warmed spares
+
+    Args:
+        factory: Callable returning a started sandbox
+        spares: Started sandboxes kept ready for new sessions
+        idle_ttl: Seconds after which an unused sandbox is stopped; keep it
+            below the AgentCore session timeout
+        max_sessions: Sessions with a bound sandbox; the least recently used
+            one is recycled to bind another
+        backend: Name of the sandbox backend, for stats
+    """
+
+    def __init__(
+        self,
+        factory: Callable[[], Any],
+        spares: int = 2,
+        idle_ttl: float = 900,
+        max_sessions: int = 20,
+        backend: str = "agentcore",
+    ):
+        self.factory = factory
+        self.target_spares = spares
+        self.idle_ttl = idle_ttl
+        self.max_sessions = max_sessions
+        self.backend = backend
+
+        self._lock = threading.Lock()
+        self._bound: OrderedDict[str, _PooledSandbox] = OrderedDict()
+        self._spares = deque()
+        self._filling = False
+        self._closed = False
+        self._maintenance = None
+        self._stop_maintenance = threading.Event()
+
+        self._acquire_seconds = deque(maxlen=1000)
+        self._counts = {
+            "acquires": 0,
+            "warm": 0,  # Session already bound to a sandbox
+            "spare": 0,  # New binding served from a spare
+            "cold_starts": 0,  # New binding had to start a sandbox
+            "recycled_idle": 0,
+            "recycled_lru": 0,
+            "replaced": 0,
+            "start_failures": 0,
+        }
+
+    # Sandbox lifecycle
+
+    def _start(self) -> _PooledSandbox:
+        try:
+            return _PooledSandbox(self.factory())
+        except Exception:
+            with self._lock:
+                self._counts["start_failures"] += 1
+            raise
+
+    def _stop(self, entry: _PooledSandbox) -> None:
+        if entry.stopped:
+            return
+        entry.stopped = True
+        try:
+            entry.sandbox.stop()
+        except Exception as e:
+            print(f"⚠️  Failed to stop sandbox: {e}")
+
+    def _fill_spares(self) -> None:
+        try:
+            while True:
+                with self._lock:
+                    if self._closed or len(self._spares) >= self.target_spares:
+                        return
+                try:
+                    entry = self._start()
+                except Exception as e:
+                    print(f"⚠️  Could not pre-warm a sandbox: {e}")
+                    return
+                with self._lock:
+                    closed = self._closed
+                    if not closed:
+                        self._spares.append(entry)
+                if closed:
+                    self._stop(entry)
+                    return
+        finally:
+            with self._lock:
+                self._filling = False
+
+    def warm_up(self, test_code: str = "print('Sandbox ready')") -> None:
+        """Start a sandbox, run test code in it and keep it as a spare
+
+        Raises:
+            Exception: If the sandbox cannot start or run the code
+        """
+        entry = self._start()
+        try:
+            response = entry.sandbox.invoke(
+                "executeCode",
+                {"code": test_code, "language": "python", "clearContext": True},
+            )
+            for event in response["stream"]:
+                result = event.get("result", {})
+                if result.get("isError", False):
+                    raise RuntimeError(
+                        f"Sandbox test execution failed: {result.get('content')}"
+                    )
+        except Exception:
+            self._stop(entry)
+            raise
+        with self._lock:
+            self._spares.append(entry)
+        self.prewarm()
+
+    def prewarm(self, wait: bool = False) -> None:
+        """Start spare sandboxes up to the target, in the background unless wait"""
+        with self._lock:
+            if self._filling or self._closed or len(self._spares) >= self.target_spares:
+                return
+            self._filling = True
+        if wait:
+            self._fill_spares()
+        else:
+            threading.Thread(
+                target=self._fill_spares, name="sandbox-prewarm", daemon=True
+            ).start()
+
+    # Leases
+
+    def _bind(self, session_id: str | None):
+        """Sandbox of a session, binding a spare or a new one; (entry, warm)"""
+        start = time.perf_counter()
+        evicted = None
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("Sandbox pool is closed")
+            self._counts["acquires"] += 1
+            entry = self._bound.get(session_id) if session_id else None
+            if entry is not None and entry.stopped:
+                # Its replacement failed to start; bind another
+                del self._bound[session_id]
+                entry = None
+            if entry is not None:
+                self._bound.move_to_end(session_id)
+                self._counts["warm"] += 1
+                kind = "warm"
+            elif self._spares:
+                entry = self._spares.popleft()
+                self._counts["spare"] += 1
+                kind = "spare"
+            else:
+                self._counts["cold_starts"] += 1
+                kind = "cold"
+
+        if entry is None:
+            entry = self._start()
+
+        if kind != "warm":
+            with self._lock:
+                if session_id:
+                    existing = self._bound.get(session_id)
+                    if existing is not None and not existing.stopped:
+                        # Another request of the session bound one meanwhile
+                        self._spares.append(entry)
+                        entry, kind = existing, "warm"
+                    else:
+                        entry.session_id = session_id
+                        self._bound[session_id] = entry
+                        if len(self._bound) > self.max_sessions:
+                            _, evicted = self._bound.popitem(last=False)
+                            self._counts["recycled_lru"] += 1
+            self.prewarm()
+
+        if evicted is not None:
+            with evicted.lock:
+                self._stop(evicted)
+
+        with self._lock:
+            self._acquire_seconds.append(time.perf_counter() - start)
+        return entry, kind == "warm"
+
+    @contextmanager
+    def lease(self, session_id: str | None = None):
+        """Use the sandbox bound to an IDE session, one request at a time
+
+        Without a session_id the sandbox is used once and stopped.
+
+        Yields:
+            SandboxLease
+        """
+        while True:
+            entry, warm = self._bind(session_id)
+            entry.lock.acquire()
+            if not entry.stopped:
+                break
+            # Recycled while waiting for the lock
+            entry.lock.release()
+
+        lease = SandboxLease(self, session_id, entry, warm)
+        try:
+            yield lease
+        finally:
+            entry = lease._entry
+            entry.last_used = time.time()
+            if not session_id:
+                self._stop(entry)
+            entry.lock.release()
+
+    def _replace(self, session_id: str | None, entry: _PooledSandbox) -> _PooledSandbox:
+        """Stop a failed sandbox and start another in its place
+
+        The caller holds the failed sandbox's lock and gets the replacement's.
+        """
+        self._stop(entry)
+        replacement = self._start()
+        replacement.lock.acquire()
+        with self._lock:
+            self._counts["replaced"] += 1
+            if session_id and self._bound.get(session_id) is entry:
+                replacement.session_id = session_id
+                self._bound[session_id] = replacement
+        # Requests waiting for the failed sandbox find it stopped and rebind
+        entry.lock.release()
+        return replacement
+
+    def release(self, session_id: str) -> bool:
+        """Stop the sandbox bound to a session, e.g. when the session ends"""
+        with self._lock:
+            entry = self._bound.pop(session_id, None)
+        if entry is None:
+            return False
+        with entry.lock:
+            self._stop(entry)
+        return True
+
+    # Maintenance
+
+    def reap_idle(self) -> int:
+        """Stop sandboxes unused for idle_ttl seconds; returns how many"""
+        cutoff = time.time() - self.idle_ttl
+        with self._lock:
+            idle = [(sid, e) for sid, e in self._bound.items() if e.last_used < cutoff]
+            for session_id, _ in idle:
+                del self._bound[session_id]
+            stale = [e for e in self._spares if e.last_used < cutoff]
+            for entry in stale:
+                self._spares.remove(entry)
+            self._counts["recycled_idle"] += len(idle) + len(stale)
+
+        for _, entry in idle:
+            with entry.lock:
+                self._stop(entry)
+        for entry in stale:
+            self._stop(entry)
+        if idle or stale:
+            print(
+                f"♻️  Recycled {len(idle)} idle session sandboxes and {len(stale)} stale spares"
+            )
+            self.prewarm()
+        return len(idle) + len(stale)
+
+    def start_maintenance(self, interval: float = 60) -> None:
+        """Reap idle sandboxes and top up spares every interval seconds"""
+        if self._maintenance:
+            return
+
+        def run():
+            while not self._stop_maintenance.wait(interval):
+                try:
+                    self.reap_idle()
+                    self.prewarm()
+                except Exception as e:
+                    print(f"⚠️  Sandbox pool maintenance failed: {e}")
+
+        self._maintenance = threading.Thread(
+            target=run, name="sandbox-maintenance", daemon=True
+        )
+        self._maintenance.start()
+
+    def close(self) -> None:
+        """Stop every sandbox"""
+        self._stop_maintenance.set()
+        with self._lock:
+            self._closed = True
+            entries = list(self._bound.values()) + list(self._spares)
+            self._bound.clear()
+            self._spares.clear()
+        for entry in entries:
+            self._stop(entry)
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            latencies = sorted(self._acquire_seconds)
+            stats = {
+                "backend": self.backend,
+                "bound_sessions": len(self._bound),
+                "spares": len(self._spares),
+                "target_spares": self.target_spares,
+                "idle_ttl_seconds": self.idle_ttl,
+                **self._counts,
+            }
+
+        def percentile(p):
+            if not latencies:
+                return 0.0
+            return round(
+                latencies[min(len(latencies) - 1, int(p * len(latencies)))] * 1000, 2
+            )
+
+        stats["acquire_ms"] = {
+            "p50": percentile(0.5),
+            "p95": percentile(0.95),
+            "max": percentile(1.0),
+        }
+        return stats
+
+
+def create_sandbox_pool(region: str) -> SandboxPool:
+    """Sandbox pool configured from the environment
+
+    SANDBOX_BACKEND selects "agentcore" (default) or "local".
+    """
+    backend = os.getenv("SANDBOX_BACKEND", "agentcore").lower()
+    session_timeout = int(os.getenv("AGENTCORE_SESSION_TIMEOUT", "1800"))
+    if backend == "local":
+        factory = local_sandbox_factory()
+    else:
+        backend = "agentcore"
+        factory = agentcore_sandbox_factory(region, session_timeout)
+
+    return SandboxPool(
+        factory,
+        spares=int(os.getenv("SANDBOX_SPARES", "2")),
+        idle_ttl=float(
+            os.getenv("SANDBOX_IDLE_TTL", str(min(900, session_timeout - 60)))
+        ),
+        max_sessions=int(os.getenv("SANDBOX_MAX_SESSIONS", "20")),
+        backend=backend,
+    )
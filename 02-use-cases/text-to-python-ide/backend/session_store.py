@@ -0,0 +1,439 @@
+"""
+Bounded, persistent store of IDE sessions.
+
+Every history entry of a session is written to SQLite as it is appended;
+memory keeps only a session's most recent entries, within an entry count and
+a size cap, for the handlers that look back at recent history. Chart images
+in execution results are stored once by SHA-256 and replaced by references,
+so history never holds base64 image data. Sessions unused for the idle TTL,
+or the least recently used beyond max_sessions, leave memory and are loaded
+again from disk when next requested.
+"""
+
+import base64
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+from collections.abc import Callable
+from typing import Any
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    session_id TEXT PRIMARY KEY,
+    created_at REAL NOT NULL,
+    last_used REAL NOT NULL,
+    uploaded_csv TEXT
+);
+CREATE TABLE IF NOT EXISTS history (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    session_id TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    entry TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS history_session ON history (session_id, kind, id);
+CREATE TABLE IF NOT EXISTS images (
+    sha256 TEXT PRIMARY KEY,
+    format TEXT NOT NULL,
+    data BLOB NOT NULL
+);
+"""
+
+# History kinds: conversation entries and execution results
+CONVERSATION = "conversation"
+EXECUTION = "execution"
+
+
+class SessionHistory:
+    """One history list of a session: recent entries in memory, all on disk
+
+    Supports append, iteration and reversed() over the in-memory entries, in
+    the order they were appended.
+    """
+
+    def __init__(self, store: "SessionStore", session_id: str, kind: str):
+        self._store = store
+        self._session_id = session_id
+        self._kind = kind
+        self._recent = None  # deque of (entry, size), loaded on first use
+        self.bytes = 0
+
+    def _entries(self) -> deque:
+        if self._recent is None:
+            self._recent = deque()
+            self.bytes = 0
+            for entry, size in self._store._load_recent(self._session_id, self._kind):
+                self._recent.append((entry, size))
+                self.bytes += size
+        return self._recent
+
+    def append(self, entry: dict[str, Any]) -> None:
+        entry, size = self._store._append(self._session_id, self._kind, entry)
+        recent = self._entries()
+        recent.append((entry, size))
+        self.bytes += size
+        # Older entries stay on disk only
+        while len(recent) > 1 and (
+            len(recent) > self._store.max_entries
+            or self.bytes > self._store.max_session_bytes
+        ):
+            _, dropped = recent.popleft()
+            self.bytes -= dropped
+
+    def __iter__(self):
+        return (entry for entry, _ in list(self._entries()))
+
+    def __reversed__(self):
+        return (entry for entry, _ in reversed(list(self._entries())))
+
+    def __len__(self) -> int:
+        return len(self._entries())
+
+
+class CodeInterpreterSession:
+    """State of one IDE session"""
+
+    def __init__(
+        self,
+        session_id: str,
+        store: "SessionStore",
+        uploaded_csv: dict[str, Any] | None = None,
+    ):
+        self.session_id = session_id
+        self.conversation_history = SessionHistory(store, session_id, CONVERSATION)
+        self.execution_results = SessionHistory(store, session_id, EXECUTION)
+        self.code_history = deque(
+            maxlen=store.max_entries
+        )  # Also kept in execution results
+        self.interactive_sessions = {}  # Track interactive execution sessions
+        self.uploaded_csv = uploaded_csv  # Uploaded CSV filename, sha256 and size; content is in the file store
+        self.last_used = time.time()
+
+    @property
+    def memory_bytes(self) -> int:
+        return self.conversation_history.bytes + self.execution_results.bytes
+
+
+class SessionStore:
+    """IDE sessions kept in memory within bounds, with their history in SQLite
+
+    Args:
+        path: SQLite database file
+        max_sessions: Sessions in memory; the least recently used leaves memory
+            to make room for another
+        idle_ttl: Seconds after which an unused session leaves memory
+        max_entries: Recent entries per history list kept in memory
+        max_session_bytes: Size cap of a session's in-memory history lists
+        on_evict: Called with the session_id of each session leaving memory
+        image_source: Returns the bytes and format of a cached image by sha256,
+            for images that reach history as references only
+    """
+
+    def __init__(
+        self,
+        path: str,
+        max_sessions: int = 200,
+        idle_ttl: float = 3600,
+        max_entries: int = 50,
+        max_session_bytes: int = 1024 * 1024,
+        on_evict: Callable[[str], None] | None = None,
+        image_source: Callable[[str], tuple[bytes, str] | None] | None = None,
+    ):
+        self.path = path
+        self.max_sessions = max_sessions
+        self.idle_ttl = idle_ttl
+        self.max_entries = max_entries
+        self.max_session_bytes = max_session_bytes
+        self.on_evict = on_evict
+        self.image_source = image_source
+
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(_SCHEMA)
+
+        self._lock = threading.RLock()
+        self._sessions: OrderedDict[str, CodeInterpreterSession] = OrderedDict()
+        self._maintenance = None
+        self._stop_maintenance = threading.Event()
+        self._counts = {
+            "created": 0,
+            "loaded_from_disk": 0,
+            "evicted_idle": 0,
+            "evicted_lru": 0,
+            "entries_written": 0,
+            "images_stored": 0,
+        }
+
+    # Sessions
+
+    def get_or_create(self, session_id: str | None = None) -> CodeInterpreterSession:
+        """Session from memory or disk, or a new one"""
+        if session_id is None:
+            session_id = str(uuid.uuid4())
+
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is None:
+                session = self._load(session_id)
+                if session is None:
+                    now = time.time()
+                    self._db.execute(
+                        "INSERT INTO sessions (session_id, created_at, last_used) VALUES (?, ?, ?)",
+                        (session_id, now, now),
+                    )
+                    session = CodeInterpreterSession(session_id, self)
+                    self._counts["created"] += 1
+                self._sessions[session_id] = session
+                evicted = self._evict_lru()
+            else:
+                self._sessions.move_to_end(session_id)
+                evicted = []
+            session.last_used = time.time()
+
+        self._evicted(evicted)
+        return session
+
+    def save(self, session: CodeInterpreterSession) -> None:
+        """Persist the session's uploaded CSV reference"""
+        with self._lock:
+            self._db.execute(
+                "UPDATE sessions SET uploaded_csv = ?, last_used = ? WHERE session_id = ?",
+                (
+                    json.dumps(session.uploaded_csv) if session.uploaded_csv else None,
+                    time.time(),
+                    session.session_id,
+                ),
+            )
+
+    def exists(self, session_id: str) -> bool:
+        """Whether the session is in memory or on disk"""
+        with self._lock:
+            if session_id in self._sessions:
+                return True
+            return (
+                self._db.execute(
+                    "SELECT 1 FROM sessions WHERE session_id = ?", (session_id,)
+                ).fetchone()
+                is not None
+            )
+
+    def _load(self, session_id: str) -> CodeInterpreterSession | None:
+        row = self._db.execute(
+            "SELECT uploaded_csv FROM sessions WHERE session_id = ?", (session_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        self._counts["loaded_from_disk"] += 1
+        return CodeInterpreterSession(
+            session_id, self, json.loads(row[0]) if row[0] else None
+        )
+
+    def _evict_lru(self) -> list[str]:
+        evicted = []
+        while len(self._sessions) > self.max_sessions:
+            session_id, _ = self._sessions.popitem(last=False)
+            evicted.append(session_id)
+            self._counts["evicted_lru"] += 1
+        return evicted
+
+    def _evicted(self, session_ids: list[str]) -> None:
+        for session_id in session_ids:
+            print(f"💤 Session {session_id} moved out of memory")
+            if self.on_evict:
+                try:
+                    self.on_evict(session_id)
+                except Exception as e:
+                    print(f"⚠️  Session eviction callback failed for {session_id}: {e}")
+
+    # History
+
+    def _put_image(self, digest: str, image_format: str, data: bytes) -> None:
+        cursor = self._db.execute(
+            "INSERT OR IGNORE INTO images (sha256, format, data) VALUES (?, ?, ?)",
+            (digest, image_format, data),
+        )
+        self._counts["images_stored"] += cursor.rowcount
+
+    def _store_images(self, entry: dict[str, Any]) -> dict[str, Any]:
+        """Entry with its images stored once and base64 data replaced by references"""
+        if not entry.get("images"):
+            return entry
+        references = []
+        for image in entry["images"]:
+            data = image.get("data")
+            if data is None:
+                # A reference to the image cache, which drops images it is short of room for
+                cached = (
+                    self.image_source(image["sha256"])
+                    if self.image_source and "sha256" in image
+                    else None
+                )
+                if cached is not None:
+                    self._put_image(image["sha256"], cached[1], cached[0])
+                references.append(image)
+                continue
+            decoded = base64.b64decode(data)
+            digest = image.get("sha256") or hashlib.sha256(decoded).hexdigest()
+            image_format = image.get("format", "png")
+            self._put_image(digest, image_format, decoded)
+            references.append(
+                {
+                    "sha256": digest,
+                    "format": image_format,
+                    "size": len(decoded),
+                    "url": f"/api/images/{digest}",
+                }
+            )
+        return {**entry, "images": references}
+
+    def _append(
+        self, session_id: str, kind: str, entry: dict[str, Any]
+    ) -> tuple[dict[str, Any], int]:
+        with self._lock:
+            entry = self._store_images(entry)
+            encoded = json.dumps(entry, default=str)
+            self._db.execute(
+                "INSERT INTO history (session_id, kind, entry) VALUES (?, ?, ?)",
+                (session_id, kind, encoded),
+            )
+            self._counts["entries_written"] += 1
+        return entry, len(encoded)
+
+    def _load_recent(
+        self, session_id: str, kind: str
+    ) -> list[tuple[dict[str, Any], int]]:
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT entry FROM history WHERE session_id = ? AND kind = ? ORDER BY id DESC LIMIT ?",
+                (session_id, kind, self.max_entries),
+            ).fetchall()
+        recent, total = [], 0
+        for (encoded,) in rows:
+            if recent and total + len(encoded) > self.max_session_bytes:
+                break
+            recent.append((json.loads(encoded), len(encoded)))
+            total += len(encoded)
+        return recent[::-1]
+
+    def history(
+        self, session_id: str, kind: str, offset: int = 0, limit: int = 50
+    ) -> tuple[list[dict[str, Any]], int]:
+        """A page of history from disk, oldest first, and the total entries
+
+        offset counts back from the most recent entry.
+        """
+        with self._lock:
+            total = self._db.execute(
+                "SELECT COUNT(*) FROM history WHERE session_id = ? AND kind = ?",
+                (session_id, kind),
+            ).fetchone()[0]
+            rows = self._db.execute(
+                "SELECT entry FROM history WHERE session_id = ? AND kind = ? ORDER BY id DESC LIMIT ? OFFSET ?",
+                (session_id, kind, limit, offset),
+            ).fetchall()
+        return [json.loads(encoded) for (encoded,) in reversed(rows)], total
+
+    def get_image(self, digest: str) -> tuple[bytes, str] | None:
+        """Image bytes and format of a stored execution result image"""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT data, format FROM images WHERE sha256 = ?", (digest,)
+            ).fetchone()
+        return (bytes(row[0]), row[1]) if row else None
+
+    # Maintenance
+
+    def reap_idle(self) -> int:
+        """Move sessions unused for idle_ttl seconds out of memory; returns how many"""
+        cutoff = time.time() - self.idle_ttl
+        with self._lock:
+            idle = [
+                sid
+                for sid, session in self._sessions.items()
+                if session.last_used < cutoff
+            ]
+            for session_id in idle:
+                self._db.execute(
+                    "UPDATE sessions SET last_used = ? WHERE session_id = ?",
+                    (self._sessions[session_id].last_used, session_id),
+                )
+                del self._sessions[session_id]
+            self._counts["evicted_idle"] += len(idle)
+        self._evicted(idle)
+        return len(idle)
+
+    def start_maintenance(self, interval: float = 60) -> None:
+        """Reap idle sessions every interval seconds"""
+        if self._maintenance:
+            return
+
+        def run():
+            while not self._stop_maintenance.wait(interval):
+                try:
+                    self.reap_idle()
+                except Exception as e:
+                    print(f"⚠️  Session store maintenance failed: {e}")
+
+        self._maintenance = threading.Thread(
+            target=run, name="session-maintenance", daemon=True
+        )
+        self._maintenance.start()
+
+    def close(self) -> None:
+        self._stop_maintenance.set()
+        with self._lock:
+            self._sessions.clear()
+            self._db.close()
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            sessions = list(self._sessions.values())
+            stats = {
+                "sessions_in_memory": len(sessions),
+                "max_sessions": self.max_sessions,
+                "idle_ttl_seconds": self.idle_ttl,
+                "history_bytes_in_memory": sum(
+                    session.memory_bytes for session in sessions
+                ),
+                "largest_session_bytes": max(
+                    (session.memory_bytes for session in sessions), default=0
+                ),
+                "max_session_bytes": self.max_session_bytes,
+                "sessions_on_disk": self._db.execute(
+                    "SELECT COUNT(*) FROM sessions"
+                ).fetchone()[0],
+                **self._counts,
+            }
+        stats["database_bytes"] = sum(
+            os.path.getsize(self.path + suffix)
+            for suffix in ("", "-wal")
+            if os.path.exists(self.path + suffix)
+        )
+        return stats
+
+
+def create_session_store(
+    on_evict: Callable[[str], None] | None = None,
+    image_source: Callable[[str], tuple[bytes, str] | None] | None = None,
+) -> SessionStore:
+    """Session store configured from the environment"""
+    path = os.getenv(
+        "IDE_SESSION_DB",
+        os.path.join(os.path.dirname(os.path.abspath(__file__)), "sessions.db"),
+    )
+    return SessionStore(
+        path,
+        max_sessions=int(os.getenv("IDE_MAX_SESSIONS", "200")),
+        idle_ttl=float(os.getenv("IDE_SESSION_IDLE_TTL", "3600")),
+        max_entries=int(os.getenv("IDE_SESSION_RECENT_ENTRIES", "50")),
+        max_session_bytes=int(float(os.getenv("IDE_SESSION_MAX_KB", "1024")) * 1024),
+        on_evict=on_evict,
+        image_source=image_source,
+    )
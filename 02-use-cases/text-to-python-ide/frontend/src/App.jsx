@@ -74,6 +74,17 @@ function App() {
           setActiveTab('editor');
           setSuccessMessage('Code generated successfully via WebSocket!');
           setTimeout(() => setSuccessMessage(null), 5000);
+        } else if (data.type === 'execution_output' || data.type === 'execution_image') {
+          // Output of a running execution, shown as it arrives
+          setExecutionResult(prev => {
+            const current = prev && prev.streaming
+              ? prev
+              : { code: editedCode, result: '', success: true, images: [], streaming: true };
+            return data.type === 'execution_output'
+              ? { ...current, result: current.result + data.text, timestamp: new Date().toISOString() }
+              : { ...current, images: [...current.images, data], timestamp: new Date().toISOString() };
+          });
+          setActiveTab('results');
         } else if (data.type === 'execution_result' && data.success) {
           setExecutionResult({
             code: editedCode,
@@ -8,16 +8,17 @@ import {
   ColumnLayout,
   Badge
 } from '@cloudscape-design/components';
+import { getImageSrc } from '../services/api';
 
 const ImageDisplay = memo(({ images = [] }) => {
   if (!images || images.length === 0) {
     return null;
   }
 
-  const downloadImage = (imageData, index) => {
+  const downloadImage = (image, index) => {
     try {
       const link = document.createElement('a');
-      link.href = `data:image/png;base64,${imageData}`;
+      link.href = getImageSrc(image);
       link.download = `chart_${index + 1}.png`;
       document.body.appendChild(link);
       link.click();
@@ -40,14 +41,14 @@ const ImageDisplay = memo(({ images = [] }) => {
                 <Button
                   variant="link"
                   iconName="download"
-                  onClick={() => downloadImage(images[0].data, 0)}
+                  onClick={() => downloadImage(images[0], 0)}
                 >
                   Download PNG
                 </Button>
               </Box>
               <Box textAlign="center">
                 <img
-                  src={`data:image/png;base64,${images[0].data}`}
+                  src={getImageSrc(images[0])}
                   alt="Generated Chart 1"
                   style={{
                     maxWidth: '100%',
@@ -71,14 +72,14 @@ const ImageDisplay = memo(({ images = [] }) => {
                     <Button
                       variant="link"
                       iconName="download"
-                      onClick={() => downloadImage(image.data, index)}
+                      onClick={() => downloadImage(image, index)}
                     >
                       Download PNG
                     </Button>
                   </Box>
                   <Box textAlign="center">
                     <img
-                      src={`data:image/png;base64,${image.data}`}
+                      src={getImageSrc(image)}
                       alt={`Generated Chart ${index + 1}`}
                       style={{
                         maxWidth: '100%',
@@ -2,6 +2,14 @@ import axios from 'axios';
 
 const API_BASE_URL = import.meta.env.VITE_API_URL || 'http://localhost:8000';
 
+// Chart images are fetched by content hash, or embedded as base64 in older results
+export const getImageSrc = (image) => {
+  if (image.url) {
+    return `${API_BASE_URL}${image.url}`;
+  }
+  return `data:image/${image.format || 'png'};base64,${image.data}`;
+};
+
 const api = axios.create({
   baseURL: API_BASE_URL,
   headers: {
@@ -112,9 +120,10 @@ export const uploadFile = async (filename, content, sessionId = null) => {
   }
 };
 
-export const getSessionHistory = async (sessionId) => {
+// History is paged; offset counts back from the most recent entry
+export const getSessionHistory = async (sessionId, offset = 0, limit = 50) => {
   try {
-    const response = await api.get(`/api/session/${sessionId}/history`);
+    const response = await api.get(`/api/session/${sessionId}/history`, { params: { offset, limit } });
     return response;
   } catch (error) {
     console.error('Get session history error:', error);
@@ -0,0 +1,329 @@
+#!/usr/bin/env python3
+"""
+Test script for the execution scheduler, with a load test of 50 concurrent
+users against a fake agent and fake sandbox (no AWS access needed)
+"""
+
+import asyncio
+import os
+import sys
+import threading
+import time
+from contextvars import ContextVar
+
+sys.path.append(
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend")
+)
+
+from execution_scheduler import ExecutionScheduler, SchedulerBusyError
+from sandbox_pool import SandboxPool
+
+LLM_SECONDS = 0.02  # Fake agent model call
+SANDBOX_SECONDS = 0.01  # Fake sandbox code execution
+
+current_session = ContextVar("current_session", default=None)
+
+
+class FakeSandbox:
+    """Sandbox that blocks like a remote code interpreter call"""
+
+    session_id = "fake"
+
+    def start(self):
+        pass
+
+    def stop(self):
+        pass
+
+    def invoke(self, method, params):
+        time.sleep(SANDBOX_SECONDS)
+        return {
+            "stream": [
+                {
+                    "result": {
+                        "content": [{"type": "text", "text": "ok"}],
+                        "isError": False,
+                    }
+                }
+            ]
+        }
+
+
+def fake_agent(pool, prompt):
+    """Blocking agent turn: a model call, then its tool runs in the session's sandbox"""
+    time.sleep(LLM_SECONDS)
+    with pool.lease(current_session.get()) as lease:
+        lease.invoke("executeCode", {"code": prompt})
+    return "done"
+
+
+async def event_loop_lag(stop, lags):
+    """Record how late a 10ms timer fires while requests are served"""
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(0.01)
+        lags.append(time.perf_counter() - started - 0.01)
+
+
+async def simulate_users(users, requests_per_user, handle):
+    """Run users concurrently, each sending requests one after another"""
+    latencies = []
+    lags = []
+    stop = asyncio.Event()
+    monitor = asyncio.create_task(event_loop_lag(stop, lags))
+
+    async def user(number):
+        session_id = f"user-{number}"
+        for _ in range(requests_per_user):
+            started = time.perf_counter()
+            await handle(session_id)
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(user(number) for number in range(users)))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await monitor
+
+    latencies.sort()
+    return {
+        "requests_per_second": round(len(latencies) / elapsed, 1),
+        "p95_latency_ms": round(latencies[int(0.95 * len(latencies))] * 1000, 1),
+        "max_loop_lag_ms": round(max(lags, default=0) * 1000, 1),
+    }
+
+
+def test_limits_and_serialization():
+    """Test the global worker limit and one-at-a-time jobs per session"""
+    print("🧪 Testing Worker Limit and Per-Session Serialization")
+    print("=" * 50)
+
+    scheduler = ExecutionScheduler(max_workers=3)
+    lock = threading.Lock()
+    running = {"total": 0, "max_total": 0}
+    per_session = {}
+    overlaps = []
+
+    def job(session_id):
+        with lock:
+            running["total"] += 1
+            running["max_total"] = max(running["max_total"], running["total"])
+            per_session[session_id] = per_session.get(session_id, 0) + 1
+            if per_session[session_id] > 1:
+                overlaps.append(session_id)
+        time.sleep(0.02)
+        with lock:
+            running["total"] -= 1
+            per_session[session_id] -= 1
+
+    async def main():
+        sessions = ["a"] * 4 + ["b"] * 4 + ["c", "d", "e", "f"]
+        await asyncio.gather(
+            *(scheduler.run(session_id, job, session_id) for session_id in sessions)
+        )
+
+    try:
+        asyncio.run(main())
+        stats = scheduler.stats()
+        print(f"📊 Scheduler stats: {stats}")
+        if running["max_total"] > 3:
+            print(f"❌ {running['max_total']} jobs ran at once with 3 workers")
+            return False
+        if overlaps:
+            print(f"❌ Jobs of a session overlapped: {overlaps}")
+            return False
+        if stats["completed"] != 12 or stats["queued"] or stats["busy_sessions"]:
+            print("❌ Unexpected scheduler counters")
+            return False
+        print("✅ At most 3 jobs ran at once, one per session")
+        return True
+    finally:
+        scheduler.close()
+
+
+def test_context_and_errors():
+    """Test that context variables reach the worker and errors reach the caller"""
+    print("\n🧪 Testing Context Variables and Errors")
+    print("=" * 50)
+
+    scheduler = ExecutionScheduler(max_workers=2)
+
+    def fail():
+        raise ValueError("sandbox error")
+
+    async def main():
+        token = current_session.set("session-x")
+        try:
+            seen = await scheduler.run("session-x", current_session.get)
+        finally:
+            current_session.reset(token)
+        try:
+            await scheduler.run("session-x", fail)
+            raised = None
+        except ValueError as e:
+            raised = str(e)
+        return seen, raised
+
+    try:
+        seen, raised = asyncio.run(main())
+        if seen != "session-x":
+            print(f"❌ Worker saw session {seen!r}")
+            return False
+        if raised != "sandbox error" or scheduler.stats()["failed"] != 1:
+            print(f"❌ Error not passed to the caller: {raised!r}")
+            return False
+        print("✅ Context variables and errors passed through")
+        return True
+    finally:
+        scheduler.close()
+
+
+def test_submit_after_close():
+    """Test that a job refused by a closed scheduler frees its session and queue slot"""
+    print("\n🧪 Testing Jobs After Close")
+    print("=" * 50)
+
+    scheduler = ExecutionScheduler(max_workers=1, max_queued=1)
+    scheduler.close()
+
+    async def main():
+        errors = []
+        for _ in range(2):
+            try:
+                await asyncio.wait_for(scheduler.run("s", time.sleep, 0), timeout=1)
+            except RuntimeError as e:
+                errors.append(str(e))
+        return errors
+
+    errors = asyncio.run(main())
+    stats = scheduler.stats()
+    print(f"📊 Scheduler stats: {stats}")
+    if len(errors) != 2:
+        print(f"❌ Expected two refused jobs, got errors {errors}")
+        return False
+    if stats["queued"] or stats["busy_sessions"] or stats["failed"] != 2:
+        print("❌ Refused jobs left the session or queue busy")
+        return False
+    print("✅ Refused jobs released their session and queue slot")
+    return True
+
+
+def test_cancellation_and_backpressure():
+    """Test that waiting jobs of a disconnected client never run and full queues reject jobs"""
+    print("\n🧪 Testing Cancellation and Backpressure")
+    print("=" * 50)
+
+    scheduler = ExecutionScheduler(max_workers=1, max_queued=1)
+    release = threading.Event()
+    ran = []
+
+    async def main():
+        first = asyncio.create_task(scheduler.run("s", release.wait, 5))
+        second = asyncio.create_task(scheduler.run("s", ran.append, "second"))
+        await asyncio.sleep(0.05)
+
+        try:
+            await scheduler.run("other", ran.append, "third")
+            rejected = False
+        except SchedulerBusyError:
+            rejected = True
+
+        second.cancel()  # Client went away while its job waited
+        await asyncio.sleep(0.01)
+        release.set()
+        await first
+        await scheduler.run("s", ran.append, "after")
+        return rejected
+
+    try:
+        rejected = asyncio.run(main())
+        stats = scheduler.stats()
+        print(f"📊 Scheduler stats: {stats}")
+        if not rejected or stats["rejected"] != 1:
+            print("❌ Job accepted beyond max_queued")
+            return False
+        if ran != ["after"] or stats["cancelled"] != 1:
+            print(f"❌ Cancelled job ran: {ran}")
+            return False
+        print("✅ Waiting jobs cancelled and full queue rejected")
+        return True
+    finally:
+        scheduler.close()
+
+
+def test_load_50_users():
+    """Load test: 50 concurrent users against a fake agent and fake sandbox"""
+    print("\n🧪 Load Test: 50 Concurrent Users")
+    print("=" * 50)
+
+    users, requests_per_user = 50, 2
+    pool = SandboxPool(FakeSandbox, spares=0, max_sessions=users, backend="fake")
+    scheduler = ExecutionScheduler(max_workers=16, max_queued=users * requests_per_user)
+
+    async def blocking(session_id):
+        # The handlers before the scheduler: agent called on the event loop
+        token = current_session.set(session_id)
+        try:
+            fake_agent(pool, "print(1)")
+        finally:
+            current_session.reset(token)
+
+    async def scheduled(session_id):
+        token = current_session.set(session_id)
+        try:
+            await scheduler.run(session_id, fake_agent, pool, "print(1)")
+        finally:
+            current_session.reset(token)
+
+    try:
+        before = asyncio.run(simulate_users(users, requests_per_user, blocking))
+        after = asyncio.run(simulate_users(users, requests_per_user, scheduled))
+        print(f"📊 On the event loop: {before}")
+        print(f"📊 Scheduler (16 workers): {after}")
+        print(
+            f"📊 Scheduler stats: queue {scheduler.stats()['queue_ms']}, run {scheduler.stats()['run_ms']}"
+        )
+
+        if after["requests_per_second"] < 4 * before["requests_per_second"]:
+            print("❌ Scheduler did not raise throughput")
+            return False
+        if after["max_loop_lag_ms"] > 50:
+            print("❌ Event loop blocked while jobs ran")
+            return False
+        print(
+            f"✅ {after['requests_per_second'] / before['requests_per_second']:.1f}x throughput, event loop stays responsive"
+        )
+        return True
+    finally:
+        scheduler.close()
+        pool.close()
+
+
+def main():
+    """Run execution scheduler tests"""
+    print("⏱️  Execution Scheduler Test Suite")
+    print("=" * 60)
+
+    tests = [
+        test_limits_and_serialization,
+        test_context_and_errors,
+        test_submit_after_close,
+        test_cancellation_and_backpressure,
+        test_load_50_users,
+    ]
+
+    passed = 0
+    for test in tests:
+        try:
+            if test():
+                passed += 1
+        except Exception as e:
+            print(f"❌ {test.__name__} failed with exception: {e}")
+
+    print("\n" + "=" * 60)
+    print(f"Tests passed: {passed}/{len(tests)}")
+    return 0 if passed == len(tests) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
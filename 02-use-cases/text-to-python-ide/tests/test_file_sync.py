@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Test script for the content-addressed file store and upload-once sandbox sync,
+using local subprocess sandboxes (no AWS access needed)
+"""
+
+import os
+import sys
+import tempfile
+
+sys.path.append(
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend")
+)
+
+from file_sync import FileStore, SandboxFileSync
+from sandbox_pool import SandboxPool, local_sandbox_factory
+
+
+def read_in_sandbox(lease, filename):
+    """Return the length and SHA-256 of a file as seen inside the sandbox"""
+    code = f"import hashlib\ndata = open({filename!r}, encoding='utf-8').read()\nprint(len(data), hashlib.sha256(data.encode()).hexdigest())"
+    response = lease.invoke(
+        "executeCode", {"code": code, "language": "python", "clearContext": False}
+    )
+    return (
+        response["stream"][0]["result"]
+        .get("structuredContent", {})
+        .get("stdout", "")
+        .strip()
+    )
+
+
+def test_upload_once():
+    """Test that a file is uploaded once per sandbox and re-uploaded when it changes"""
+    print("🧪 Testing Upload Once")
+    print("=" * 50)
+
+    with tempfile.TemporaryDirectory() as root:
+        file_sync = SandboxFileSync(FileStore(root))
+        pool = SandboxPool(local_sandbox_factory(), spares=0, backend="local")
+        try:
+            csv = "name,value\n" + "".join(f"row{i},{i}\n" for i in range(1000))
+            files = [{"filename": "data.csv", **file_sync.store.put(csv)}]
+            for _ in range(3):
+                with pool.lease("session") as lease:
+                    file_sync.sync(lease, files)
+
+            stats = file_sync.stats()
+            print(f"📊 File sync stats: {stats}")
+            if (
+                stats["files_uploaded"] != 1
+                or stats["bytes_skipped"] != 2 * files[0]["size"]
+            ):
+                print("❌ Unchanged file was uploaded again")
+                return False
+            print("✅ Unchanged file skipped on later executions")
+
+            changed = [
+                {"filename": "data.csv", **file_sync.store.put(csv + "row,extra\n")}
+            ]
+            with pool.lease("session") as lease:
+                file_sync.sync(lease, changed)
+                seen = read_in_sandbox(lease, "data.csv")
+            if file_sync.stats()["files_uploaded"] != 2 or not seen.endswith(
+                changed[0]["sha256"]
+            ):
+                print(f"❌ Changed file not re-uploaded: {seen}")
+                return False
+            print("✅ Changed file re-uploaded")
+            return True
+        finally:
+            pool.close()
+
+
+def test_chunked_upload():
+    """Test that a file larger than the chunk size arrives whole"""
+    print("\n🧪 Testing Chunked Upload")
+    print("=" * 50)
+
+    with tempfile.TemporaryDirectory() as root:
+        file_sync = SandboxFileSync(FileStore(root), chunk_chars=1000)
+        pool = SandboxPool(local_sandbox_factory(), spares=0, backend="local")
+        try:
+            content = "".join(f"{i},é{i * 7}\n" for i in range(1500))
+            stored = file_sync.store.put(content)
+            with pool.lease("session") as lease:
+                file_sync.sync(lease, [{"filename": "big.csv", **stored}])
+                seen = read_in_sandbox(lease, "big.csv")
+                response = lease.invoke(
+                    "executeCode",
+                    {"code": "import glob\nprint(glob.glob('big.csv.part*'))"},
+                )
+                leftover = response["stream"][0]["result"]["structuredContent"][
+                    "stdout"
+                ].strip()
+
+            stats = file_sync.stats()
+            print(f"📊 File sync stats: {stats}")
+            if seen != f"{len(content)} {stored['sha256']}":
+                print(f"❌ Joined file differs: {seen}")
+                return False
+            if stats["chunks_uploaded"] < 2 or leftover != "[]":
+                print(
+                    f"❌ File was not sent in parts or parts were left behind: {leftover}"
+                )
+                return False
+            print("✅ Large file sent in parts and joined in the sandbox")
+            return True
+        finally:
+            pool.close()
+
+
+def test_resync_after_replacement():
+    """Test that files are written again to a sandbox that replaces a failed one"""
+    print("\n🧪 Testing Re-sync After Replacement")
+    print("=" * 50)
+
+    with tempfile.TemporaryDirectory() as root:
+        file_sync = SandboxFileSync(FileStore(root))
+        pool = SandboxPool(local_sandbox_factory(), spares=0, backend="local")
+        try:
+            files = [{"filename": "data.csv", **file_sync.store.put("a,b\n1,2\n")}]
+            with pool.lease("session") as lease:
+                file_sync.sync(lease, files)
+            with pool.lease("session") as lease:
+                lease.on_replace(lambda replacement: file_sync.sync(replacement, files))
+                file_sync.sync(lease, files)
+                lease.sandbox.stop()  # Stand-in for an expired session
+                seen = read_in_sandbox(lease, "data.csv")
+
+            if not lease.replaced or not seen.endswith(files[0]["sha256"]):
+                print(f"❌ Files missing from the replacement sandbox: {seen}")
+                return False
+            print("✅ Files written again to the replacement sandbox")
+            return True
+        finally:
+            pool.close()
+
+
+def main():
+    """Run file sync tests"""
+    print("📁 File Sync Test Suite")
+    print("=" * 60)
+
+    tests = [
+        test_upload_once,
+        test_chunked_upload,
+        test_resync_after_replacement,
+    ]
+
+    passed = 0
+    for test in tests:
+        try:
+            if test():
+                passed += 1
+        except Exception as e:
+            print(f"❌ {test.__name__} failed with exception: {e}")
+
+    print("\n" + "=" * 60)
+    print(f"Tests passed: {passed}/{len(tests)}")
+    return 0 if passed == len(tests) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Test script for incremental sandbox output processing: streamed text, chart
+images split from stdout and the image cache (no AWS access needed)
+"""
+
+import base64
+import os
+import struct
+import sys
+import time
+import zlib
+
+sys.path.append(
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend")
+)
+
+from output_stream import ImageCache, OutputSplitter
+
+
+def make_png(width, height):
+    """Valid PNG of random-looking pixels, so it does not compress"""
+
+    def chunk(kind, data):
+        return (
+            struct.pack(">I", len(data))
+            + kind
+            + data
+            + struct.pack(">I", zlib.crc32(kind + data))
+        )
+
+    rows = b"".join(b"\x00" + os.urandom(width * 3) for _ in range(height))
+    header = struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)
+    return (
+        b"\x89PNG\r\n\x1a\n"
+        + chunk(b"IHDR", header)
+        + chunk(b"IDAT", zlib.compress(rows, 0))
+        + chunk(b"IEND", b"")
+    )
+
+
+def split(stdout, chunk_size):
+    """Feed stdout in chunks of chunk_size; return the splitter and emitted events"""
+    events = []
+    splitter = OutputSplitter(
+        ImageCache(),
+        emit=lambda kind, payload: events.append((kind, payload)),
+    )
+    for start in range(0, len(stdout), chunk_size):
+        splitter.feed(stdout[start : start + chunk_size])
+    splitter.close()
+    return splitter, events
+
+
+def test_text_and_images():
+    """Test that images are split from text however stdout is chunked"""
+    print("🧪 Testing Text and Image Splitting")
+    print("=" * 50)
+
+    png = make_png(40, 40)
+    encoded = base64.b64encode(png).decode()
+    stdout = f"Loading data\nMean: 4.2\nIMAGE_DATA:{encoded}\nChart generated successfully!\n"
+
+    for chunk_size in (len(stdout), 7, 1):
+        splitter, events = split(stdout, chunk_size)
+        images = [payload for kind, payload in events if kind == "image"]
+        if splitter.text != "Loading data\nMean: 4.2\nChart generated successfully!\n":
+            print(f"❌ Chunks of {chunk_size}: unexpected text {splitter.text!r}")
+            return False
+        if len(images) != 1 or images[0]["size"] != len(png) or "data" in images[0]:
+            print(f"❌ Chunks of {chunk_size}: unexpected images {images}")
+            return False
+        if (
+            splitter.images != images
+            or splitter.image_cache.get(images[0]["sha256"])[0] != png
+        ):
+            print(f"❌ Chunks of {chunk_size}: image data differs")
+            return False
+        kinds = [kind for kind, _ in events]
+        if kinds.index("image") < kinds.index("stdout") or kinds[-1] != "stdout":
+            print(f"❌ Chunks of {chunk_size}: events out of order")
+            return False
+    print("✅ Text and images split alike for whole, 7 and 1 character chunks")
+
+    splitter, _ = split(
+        f"IMAGE_DATA:{base64.b64encode(b'not an image' * 200).decode()}\ndone\n", 64
+    )
+    if splitter.images or splitter.text != "done\n":
+        print("❌ Invalid image data was not dropped")
+        return False
+    print("✅ Data without an image signature dropped")
+    return True
+
+
+def test_text_streams_before_image_ends():
+    """Test that text is passed on before a large image has fully arrived"""
+    print("\n🧪 Testing Time to First Output")
+    print("=" * 50)
+
+    encoded = base64.b64encode(make_png(600, 600)).decode()
+    stdout = f"Step 1 done\nIMAGE_DATA:{encoded}\n"
+    events = []
+    splitter = OutputSplitter(
+        ImageCache(), emit=lambda kind, payload: events.append(kind)
+    )
+
+    chunk_size = 64 * 1024
+    first_text_after = None
+    started = time.perf_counter()
+    for count, start in enumerate(range(0, len(stdout), chunk_size), 1):
+        splitter.feed(stdout[start : start + chunk_size])
+        if first_text_after is None and "stdout" in events:
+            first_text_after = count
+    splitter.close()
+    elapsed = time.perf_counter() - started
+
+    print(
+        f"📊 {len(stdout)} characters of stdout in {count} chunks, split in {elapsed * 1000:.1f}ms"
+    )
+    if first_text_after != 1 or events[-1] != "image":
+        print(f"❌ First text after chunk {first_text_after}, events {events}")
+        return False
+    print("✅ Text sent with the first chunk, image once complete")
+    return True
+
+
+def test_image_cache():
+    """Test that the image cache drops the least recently used images"""
+    print("\n🧪 Testing Image Cache")
+    print("=" * 50)
+
+    cache = ImageCache(max_bytes=250)
+    first = cache.put(b"a" * 100, "png")
+    second = cache.put(b"b" * 100, "png")
+    cache.get(first)
+    third = cache.put(b"c" * 100, "jpeg")
+
+    stats = cache.stats()
+    print(f"📊 Image cache stats: {stats}")
+    if (
+        cache.get(second) is not None
+        or cache.get(first) is None
+        or cache.get(third)[1] != "jpeg"
+    ):
+        print("❌ Wrong image evicted")
+        return False
+    if stats["bytes"] != 200 or stats["evicted"] != 1:
+        print("❌ Unexpected cache counters")
+        return False
+    print("✅ Least recently used image evicted")
+    return True
+
+
+def main():
+    """Run output stream tests"""
+    print("📡 Output Stream Test Suite")
+    print("=" * 60)
+
+    tests = [
+        test_text_and_images,
+        test_text_streams_before_image_ends,
+        test_image_cache,
+    ]
+
+    passed = 0
+    for test in tests:
+        try:
+            if test():
+                passed += 1
+        except Exception as e:
+            print(f"❌ {test.__name__} failed with exception: {e}")
+
+    print("\n" + "=" * 60)
+    print(f"Tests passed: {passed}/{len(tests)}")
+    return 0 if passed == len(tests) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
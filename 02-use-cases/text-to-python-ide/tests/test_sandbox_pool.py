@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+Test script for the warm code interpreter sandbox pool, using local subprocess
+sandboxes (no AWS access needed)
+"""
+
+import os
+import sys
+import threading
+import time
+
+sys.path.append(
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend")
+)
+
+from sandbox_pool import LocalSandbox, SandboxPool, local_sandbox_factory
+
+
+def run(lease, code):
+    """Execute code in a leased sandbox and return (stdout, is_error)"""
+    response = lease.invoke(
+        "executeCode", {"code": code, "language": "python", "clearContext": False}
+    )
+    result = response["stream"][0]["result"]
+    return result.get("structuredContent", {}).get("stdout", ""), result["isError"]
+
+
+def test_local_sandbox():
+    """Test that the local sandbox keeps state, reads written files and reports errors"""
+    print("🧪 Testing Local Sandbox")
+    print("=" * 50)
+
+    sandbox = LocalSandbox()
+    sandbox.start()
+    try:
+        sandbox.invoke("executeCode", {"code": "counter = 41"})
+        sandbox.invoke(
+            "writeFiles", {"content": [{"path": "data.csv", "text": "a,b\n1,2\n"}]}
+        )
+        response = sandbox.invoke(
+            "executeCode",
+            {"code": "print(counter + 1, open('data.csv').read().split()[1])"},
+        )
+        stdout = response["stream"][0]["result"]["structuredContent"]["stdout"]
+        if stdout.strip() != "42 1,2":
+            print(f"❌ Unexpected output: {stdout!r}")
+            return False
+        print("✅ Interpreter state and files persist between executions")
+
+        response = sandbox.invoke("executeCode", {"code": "1 / 0"})
+        result = response["stream"][0]["result"]
+        if (
+            not result["isError"]
+            or "ZeroDivisionError" not in result["content"][0]["text"]
+        ):
+            print(f"❌ Error not reported: {result}")
+            return False
+        print("✅ Exceptions are reported as errors")
+        return True
+    finally:
+        sandbox.stop()
+
+
+def test_session_binding():
+    """Test that a session keeps its warm sandbox and new sessions use spares"""
+    print("\n🧪 Testing Session Binding")
+    print("=" * 50)
+
+    pool = SandboxPool(local_sandbox_factory(), spares=1, backend="local")
+    try:
+        pool.warm_up()
+        with pool.lease("session-a") as lease:
+            run(lease, "x = 'kept'")
+        with pool.lease("session-a") as lease:
+            output, _ = run(lease, "print(x)")
+            warm = lease.warm
+        with pool.lease("session-b") as lease:
+            _, is_error = run(lease, "print(x)")
+
+        stats = pool.stats()
+        print(f"📊 Pool stats: {stats}")
+        if output.strip() != "kept" or not warm:
+            print("❌ Session state was not kept")
+            return False
+        if not is_error:
+            print("❌ Sessions share interpreter state")
+            return False
+        if (
+            stats["warm"] != 1
+            or stats["cold_starts"] > 1
+            or stats["bound_sessions"] != 2
+        ):
+            print("❌ Unexpected pool counters")
+            return False
+        print("✅ Sessions keep their own warm sandbox")
+        return True
+    finally:
+        pool.close()
+
+
+def test_recycling():
+    """Test idle TTL recycling and least recently used eviction"""
+    print("\n🧪 Testing Sandbox Recycling")
+    print("=" * 50)
+
+    pool = SandboxPool(
+        local_sandbox_factory(), spares=0, idle_ttl=0.2, max_sessions=2, backend="local"
+    )
+    try:
+        for session_id in ("a", "b", "c"):
+            with pool.lease(session_id) as lease:
+                run(lease, "pass")
+        if pool.stats()["recycled_lru"] != 1 or pool.stats()["bound_sessions"] != 2:
+            print(f"❌ Least recently used session not recycled: {pool.stats()}")
+            return False
+        print("✅ Oldest session recycled at max_sessions")
+
+        time.sleep(0.3)
+        recycled = pool.reap_idle()
+        if recycled != 2 or pool.stats()["bound_sessions"] != 0:
+            print(f"❌ Idle sandboxes not recycled: {pool.stats()}")
+            return False
+        print("✅ Idle sandboxes recycled after the TTL")
+        return True
+    finally:
+        pool.close()
+
+
+def test_replacement_and_serialization():
+    """Test that a failed sandbox is replaced and a session runs one request at a time"""
+    print("\n🧪 Testing Replacement and Per-Session Serialization")
+    print("=" * 50)
+
+    pool = SandboxPool(local_sandbox_factory(), spares=0, backend="local")
+    try:
+        with pool.lease("session") as lease:
+            run(lease, "import time")
+            lease.sandbox.stop()  # Stand-in for an expired session
+            output, _ = run(lease, "print('recovered')")
+        if output.strip() != "recovered" or pool.stats()["replaced"] != 1:
+            print(f"❌ Failed sandbox not replaced: {pool.stats()}")
+            return False
+        print("✅ Failed sandbox replaced transparently")
+
+        with pool.lease("session") as lease:
+            run(lease, "import time\nactive = []")
+        errors = []
+
+        def execute():
+            with pool.lease("session") as lease:
+                output, _ = run(
+                    lease,
+                    "active.append(1)\ntime.sleep(0.05)\nprint(len(active))\nactive.pop()",
+                )
+                if output.strip() != "1":
+                    errors.append(output)
+
+        threads = [threading.Thread(target=execute) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        if errors:
+            print(f"❌ Overlapping executions in one session: {errors}")
+            return False
+        print("✅ Executions of a session are serialized")
+        return True
+    finally:
+        pool.close()
+
+
+def main():
+    """Run sandbox pool tests"""
+    print("♨️  Sandbox Pool Test Suite")
+    print("=" * 60)
+
+    tests = [
+        test_local_sandbox,
+        test_session_binding,
+        test_recycling,
+        test_replacement_and_serialization,
+    ]
+
+    passed = 0
+    for test in tests:
+        try:
+            if test():
+                passed += 1
+        except Exception as e:
+            print(f"❌ {test.__name__} failed with exception: {e}")
+
+    print("\n" + "=" * 60)
+    print(f"Tests passed: {passed}/{len(tests)}")
+    return 0 if passed == len(tests) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
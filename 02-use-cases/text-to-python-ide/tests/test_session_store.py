@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+Test script for the bounded, persistent IDE session store (no AWS access needed)
+"""
+
+import base64
+import os
+import sys
+import tempfile
+import time
+
+sys.path.append(
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend")
+)
+
+from output_stream import ImageCache
+from session_store import CONVERSATION, EXECUTION, SessionStore
+
+
+def test_persistence_and_paging():
+    """Test that history and the uploaded CSV survive a restart and are paged from disk"""
+    print("🧪 Testing Persistence and Paging")
+    print("=" * 50)
+
+    with tempfile.TemporaryDirectory() as root:
+        path = os.path.join(root, "sessions.db")
+        store = SessionStore(path)
+        session = store.get_or_create("session-a")
+        for number in range(120):
+            session.conversation_history.append(
+                {"type": "generation", "prompt": f"prompt {number}"}
+            )
+        session.uploaded_csv = {"filename": "data.csv", "sha256": "ab" * 32, "size": 10}
+        store.save(session)
+        store.close()
+
+        store = SessionStore(path)
+        try:
+            session = store.get_or_create("session-a")
+            recent = [entry["prompt"] for entry in session.conversation_history]
+            if session.uploaded_csv != {
+                "filename": "data.csv",
+                "sha256": "ab" * 32,
+                "size": 10,
+            }:
+                print(f"❌ Uploaded CSV not restored: {session.uploaded_csv}")
+                return False
+            if len(recent) != 50 or recent[-1] != "prompt 119":
+                print(f"❌ Recent history not loaded: {len(recent)} entries")
+                return False
+            print("✅ Session reloaded from disk with its recent history")
+
+            page, total = store.history("session-a", CONVERSATION, offset=0, limit=30)
+            older, _ = store.history("session-a", CONVERSATION, offset=110, limit=30)
+            if (
+                total != 120
+                or page[0]["prompt"] != "prompt 90"
+                or page[-1]["prompt"] != "prompt 119"
+            ):
+                print(
+                    f"❌ Unexpected first page: total {total}, {page[0]} .. {page[-1]}"
+                )
+                return False
+            if [entry["prompt"] for entry in older] != [
+                f"prompt {n}" for n in range(10)
+            ]:
+                print(f"❌ Unexpected last page: {older}")
+                return False
+            print("✅ History paged from disk, newest page first")
+            return True
+        finally:
+            store.close()
+
+
+def test_memory_caps_and_images():
+    """Test per-session memory caps and that images are kept apart from the history"""
+    print("\n🧪 Testing Memory Caps and Images")
+    print("=" * 50)
+
+    with tempfile.TemporaryDirectory() as root:
+        image_cache = ImageCache()
+        store = SessionStore(
+            os.path.join(root, "sessions.db"),
+            max_entries=10,
+            max_session_bytes=20_000,
+            image_source=image_cache.get,
+        )
+        try:
+            session = store.get_or_create("session-a")
+            image = b"\x89PNG\r\n\x1a\n" + os.urandom(200_000)
+            for number in range(40):
+                # Executions return references to the image cache
+                session.execution_results.append(
+                    {
+                        "code": "plot()",
+                        "result": "x" * 1000,
+                        "images": [image_cache.reference(image, "png")],
+                        "timestamp": number,
+                    }
+                )
+
+            stats = store.stats()
+            print(f"📊 Session store stats: {stats}")
+            if (
+                len(session.execution_results) > 10
+                or stats["history_bytes_in_memory"] > 20_000
+            ):
+                print("❌ In-memory history exceeds its caps")
+                return False
+            print(
+                f"✅ {len(session.execution_results)} of 40 results in memory, {stats['history_bytes_in_memory']} bytes"
+            )
+
+            latest = list(session.execution_results)[-1]["images"][0]
+            if "data" in latest or store.get_image(latest["sha256"]) != (image, "png"):
+                print(f"❌ Image not stored by reference: {list(latest)}")
+                return False
+            if stats["images_stored"] != 1:
+                print("❌ Identical images stored more than once")
+                return False
+
+            # Base64 images in an entry are stored and replaced by references too
+            other = b"\x89PNG\r\n\x1a\n" + os.urandom(1000)
+            session.execution_results.append(
+                {
+                    "images": [
+                        {
+                            "format": "png",
+                            "data": base64.b64encode(other).decode(),
+                            "source": "agentcore_stdout",
+                        }
+                    ],
+                }
+            )
+            latest = list(session.execution_results)[-1]["images"][0]
+            if "data" in latest or store.get_image(latest["sha256"]) != (other, "png"):
+                print(f"❌ Base64 image not stored by reference: {list(latest)}")
+                return False
+            _, total = store.history("session-a", EXECUTION)
+            if total != 41:
+                print(f"❌ {total} results on disk")
+                return False
+            print("✅ Images stored once and referenced by hash")
+            return True
+        finally:
+            store.close()
+
+
+def test_eviction():
+    """Test least recently used and idle eviction, with the eviction callback"""
+    print("\n🧪 Testing Session Eviction")
+    print("=" * 50)
+
+    with tempfile.TemporaryDirectory() as root:
+        evicted = []
+        store = SessionStore(
+            os.path.join(root, "sessions.db"),
+            max_sessions=2,
+            idle_ttl=0.2,
+            on_evict=evicted.append,
+        )
+        try:
+            for session_id in ("a", "b", "a", "c"):
+                store.get_or_create(session_id).conversation_history.append(
+                    {"type": "generation"}
+                )
+            if evicted != ["b"] or store.stats()["sessions_in_memory"] != 2:
+                print(f"❌ Least recently used session not evicted: {evicted}")
+                return False
+            print("✅ Least recently used session left memory")
+
+            time.sleep(0.3)
+            if store.reap_idle() != 2 or sorted(evicted) != ["a", "b", "c"]:
+                print(f"❌ Idle sessions not evicted: {evicted}")
+                return False
+            print("✅ Idle sessions left memory")
+
+            if (
+                not store.exists("b")
+                or len(store.get_or_create("b").conversation_history) != 1
+            ):
+                print("❌ Evicted session not loaded again")
+                return False
+            if store.stats()["loaded_from_disk"] != 1:
+                print("❌ Unexpected load counter")
+                return False
+            print("✅ Evicted session loaded again from disk")
+            return True
+        finally:
+            store.close()
+
+
+def main():
+    """Run session store tests"""
+    print("🗂️  Session Store Test Suite")
+    print("=" * 60)
+
+    tests = [
+        test_persistence_and_paging,
+        test_memory_caps_and_images,
+        test_eviction,
+    ]
+
+    passed = 0
+    for test in tests:
+        try:
+            if test():
+                passed += 1
+        except Exception as e:
+            print(f"❌ {test.__name__} failed with exception: {e}")
+
+    print("\n" + "=" * 60)
+    print(f"Tests passed: {passed}/{len(tests)}")
+    return 0 if passed == len(tests) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
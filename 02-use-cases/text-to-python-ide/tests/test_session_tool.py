@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""
+Test script for binding the execute_python_code tool to an IDE session's
+sandbox when Strands runs the tool on a thread of its own (no AWS access needed)
+"""
+
+import itertools
+import os
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.append(
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend")
+)
+
+import main
+from sandbox_pool import SandboxPool
+
+_sandbox_ids = itertools.count(1)
+
+
+class FakeSandbox:
+    """Sandbox that reports which instance ran the code"""
+
+    def __init__(self):
+        self.session_id = f"sandbox-{next(_sandbox_ids)}"
+        self.stopped = False
+
+    def start(self):
+        pass
+
+    def stop(self):
+        self.stopped = True
+
+    def invoke(self, method, params):
+        text = f"ran in {self.session_id}"
+        return {
+            "stream": [
+                {"result": {"structuredContent": {"stdout": text}, "isError": False}}
+            ]
+        }
+
+
+def call_like_strands(tool, **kwargs):
+    """Call a tool the way Strands' Agent.__call__ does: on a new thread, without the caller's context"""
+    with ThreadPoolExecutor() as executor:
+        return executor.submit(tool, **kwargs).result()
+
+
+def test_tool_uses_the_session_sandbox():
+    """Test that every call of a session's tool reaches that session's warm sandbox"""
+    print("🧪 Testing Session Sandbox from the Tool Thread")
+    print("=" * 50)
+
+    pool = SandboxPool(FakeSandbox, spares=0, backend="fake")
+    main.sandbox_pool = pool
+    try:
+        tool = main.make_execute_python_code("session-a")
+        outputs = [call_like_strands(tool, code="print(1)") for _ in range(3)]
+        stats = pool.stats()
+        print(f"📊 Outputs: {outputs}")
+        if len(set(outputs)) != 1:
+            print("❌ Calls of one session ran in different sandboxes")
+            return False
+        if stats["bound_sessions"] != 1 or stats["warm"] != 2:
+            print(f"❌ Session sandbox not kept warm: {stats}")
+            return False
+        print("✅ Tool calls from Strands threads reused the session's sandbox")
+        return True
+    finally:
+        pool.close()
+
+
+def test_sessions_do_not_share_sandboxes():
+    """Test that concurrent tool calls of two sessions stay in their own sandboxes"""
+    print("\n🧪 Testing Concurrent Sessions")
+    print("=" * 50)
+
+    pool = SandboxPool(FakeSandbox, spares=0, backend="fake")
+    main.sandbox_pool = pool
+    outputs = {}
+    lock = threading.Lock()
+
+    def run(session_id):
+        tool = main.make_execute_python_code(session_id)
+        for _ in range(3):
+            output = call_like_strands(tool, code="print(1)")
+            with lock:
+                outputs.setdefault(session_id, set()).add(output)
+
+    try:
+        threads = [
+            threading.Thread(target=run, args=(session_id,))
+            for session_id in ("a", "b")
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        print(f"📊 Outputs: {outputs}")
+        if (
+            any(len(seen) != 1 for seen in outputs.values())
+            or outputs["a"] == outputs["b"]
+        ):
+            print("❌ Sessions shared or switched sandboxes")
+            return False
+        print("✅ Each session kept its own sandbox")
+        return True
+    finally:
+        pool.close()
+
+
+def test_agent_call_reaches_the_session_sandbox():
+    """Test a full Strands agent turn: a scripted model calls the tool, Strands runs it"""
+    print("\n🧪 Testing Executor Agent Turns")
+    print("=" * 50)
+
+    try:
+        from strands import Agent
+        from strands.models.model import Model
+    except ImportError:
+        print("⚠️  Skipped: needs the Model interface of strands-agents 1.x")
+        return True
+
+    class ScriptedModel(Model):
+        """Model that asks for one execute_python_code call, then echoes its result"""
+
+        def __init__(self):
+            self.turns = 0
+
+        def update_config(self, **model_config):
+            pass
+
+        def get_config(self):
+            return {}
+
+        async def structured_output(self, *args, **kwargs):
+            raise NotImplementedError
+            yield
+
+        async def stream(self, messages, tool_specs=None, system_prompt=None, **kwargs):
+            self.turns += 1
+            yield {"messageStart": {"role": "assistant"}}
+            if self.turns == 1:
+                yield {
+                    "contentBlockStart": {
+                        "start": {
+                            "toolUse": {
+                                "toolUseId": "call-1",
+                                "name": "execute_python_code",
+                            }
+                        }
+                    }
+                }
+                yield {
+                    "contentBlockDelta": {
+                        "delta": {"toolUse": {"input": '{"code": "print(1)"}'}}
+                    }
+                }
+                yield {"contentBlockStop": {}}
+                yield {"messageStop": {"stopReason": "tool_use"}}
+            else:
+                text = messages[-1]["content"][0]["toolResult"]["content"][0]["text"]
+                yield {"contentBlockDelta": {"delta": {"text": text}}}
+                yield {"contentBlockStop": {}}
+                yield {"messageStop": {"stopReason": "end_turn"}}
+
+    pool = SandboxPool(FakeSandbox, spares=0, backend="fake")
+    main.sandbox_pool = pool
+    factories = dict(main._agent_factories)
+    main._agent_factories["code_executor"] = lambda session_id=None: Agent(
+        model=ScriptedModel(),
+        tools=[main.make_execute_python_code(session_id)],
+        callback_handler=None,
+    )
+    try:
+        outputs = [
+            str(main.run_executor_agent("session-a", "Run print(1)")).strip()
+            for _ in range(2)
+        ]
+        stats = pool.stats()
+        print(f"📊 Outputs: {outputs}")
+        if len(set(outputs)) != 1 or not outputs[0].startswith("ran in sandbox-"):
+            print("❌ Agent turns did not run in one sandbox")
+            return False
+        if stats["bound_sessions"] != 1 or stats["warm"] != 1:
+            print(f"❌ Session sandbox not used by the agent's tool: {stats}")
+            return False
+        print("✅ Agent tool calls ran in the session's warm sandbox")
+        return True
+    finally:
+        main._agent_factories.clear()
+        main._agent_factories.update(factories)
+        pool.close()
+
+
+def main_tests():
+    """Run session tool tests"""
+    print("🔗 Session Tool Test Suite")
+    print("=" * 60)
+
+    tests = [
+        test_tool_uses_the_session_sandbox,
+        test_sessions_do_not_share_sandboxes,
+        test_agent_call_reaches_the_session_sandbox,
+    ]
+
+    passed = 0
+    for test in tests:
+        try:
+            if test():
+                passed += 1
+        except Exception as e:
+            print(f"❌ {test.__name__} failed with exception: {e}")
+
+    print("\n" + "=" * 60)
+    print(f"Tests passed: {passed}/{len(tests)}")
+    return 0 if passed == len(tests) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main_tests())